@@ -22,6 +22,8 @@ from asyncord.typedefs import Unset, UnsetType
 if TYPE_CHECKING:
     from asyncord.client.http.client import HttpClient
     from asyncord.client.http.middleware.ratelimit import RateLimitStrategy
+    from asyncord.gateway.client.latency import LatencySnapshot
+    from asyncord.gateway.client.session_store import SessionStore
 
 __all__ = ('ClientGroup', 'ClientHub')
 
@@ -40,6 +42,7 @@ class ClientHub:
         self,
         session: aiohttp.ClientSession | None = None,
         heartbeat_factory_type: type[HeartbeatFactory] = HeartbeatFactory,
+        session_store: SessionStore | None = None,
     ) -> None:
         """Initialize hub to process multiple clients.
 
@@ -48,6 +51,8 @@ class ClientHub:
                 If none is provided, a new one is created.
             heartbeat_factory_type: Factory to create heartbeat clients.
                 Defaults to HeartbeatFactory.
+            session_store: Store to keep gateway sessions between process restarts.
+                Sessions are resumed on start and saved on stop.
             event_dispatcher_type: Event dispatcher to use for the clients.
                 Defaults to EventDispatcher.
         """
@@ -59,6 +64,7 @@ class ClientHub:
             self._is_outer_session = False
 
         self.heartbeat_factory = heartbeat_factory_type()
+        self.session_store = session_store
         self.client_groups: dict[str, ClientGroup] = {}  # Added type annotation
 
         logger.info('New ClientHub instance created.')  # Added logging
@@ -139,6 +145,23 @@ class ClientHub:
             await self.session.close()
         logger.info(':wave: Shutdown complete', extra={'markup': True})
 
+    def latency_snapshot(self) -> dict[str, LatencySnapshot]:
+        """Get gateway latency statistics of all client groups.
+
+        Groups without a gateway client are skipped.
+
+        Returns:
+            Latency statistics by group name.
+        """
+        snapshot: dict[str, LatencySnapshot] = {}
+        for group_name, client_group in self.client_groups.items():
+            try:
+                gateway_client = client_group.gateway_client
+            except ValueError:
+                continue
+            snapshot[group_name] = gateway_client.latency
+        return snapshot
+
     def __del__(self) -> None:
         """Log unclosed session for debugging."""
         if not self.session.closed:
@@ -187,6 +210,7 @@ class ClientHub:
                 dispatcher=dispatcher,
                 name=group_name,
             )
+            gateway_client.session_store = self.session_store
         else:
             gateway_client = None
             logger.warning('Gateway client requires a token to connect. It will not be created.')
@@ -246,6 +270,7 @@ class ClientGroup:
     async def close(self) -> None:
         """Close the connection to the Discord client."""
         await self.gateway_client.close()
+        await self.dispatcher.close()
 
 
 @asynccontextmanager
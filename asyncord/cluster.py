@@ -0,0 +1,549 @@
+"""This module contains the multi-process shard cluster.
+
+A single `ClientHub` runs all clients on one event loop, so decoding and dispatching
+events of all shards is limited by one CPU core. The cluster splits shards between
+worker processes. Every worker runs its own `ClientHub` with its own loop and
+heartbeat thread, and the supervisor process restarts crashed workers, shares
+the identify rate limit between them and collects their status.
+
+Workers are started with the `spawn` method, so the setup function must be importable
+(defined at the module level) and everything it needs must be created in the worker:
+
+    def setup(group: ClientGroup) -> None:
+        group.dispatcher.add_handler(on_message)
+
+    if __name__ == '__main__':
+        ShardCluster(token, setup, shard_count=16, workers=4).run()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import os
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Final, Literal
+
+from yarl import URL
+
+from asyncord.client_hub import ClientGroup, ClientHub
+from asyncord.gateway.intents import DEFAULT_INTENTS, Intent
+from asyncord.urls import GATEWAY_URL
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from multiprocessing.process import BaseProcess
+
+__all__ = (
+    'DEFAULT_IDENTIFY_INTERVAL',
+    'DEFAULT_RESTART_DELAY',
+    'DEFAULT_STATUS_INTERVAL',
+    'IdentifyScheduler',
+    'ShardCluster',
+    'ShardStatus',
+    'WorkerSetupFunc',
+    'WorkerSpec',
+    'WorkerStatus',
+    'run_worker',
+    'split_shards',
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IDENTIFY_INTERVAL: Final[float] = 5
+"""Minimum time between identifies in one rate limit bucket in seconds."""
+
+DEFAULT_STATUS_INTERVAL: Final[float] = 5
+"""Interval of status reports of workers in seconds."""
+
+DEFAULT_RESTART_DELAY: Final[float] = 5
+"""Delay before restarting a crashed worker in seconds."""
+
+DEFAULT_STOP_TIMEOUT: Final[float] = 30
+"""Time to wait for workers to close connections before killing them in seconds."""
+
+type WorkerSetupFunc = Callable[[ClientGroup], None]
+"""Type alias for a function to set up the client group of a shard in a worker."""
+
+
+@dataclass(frozen=True, slots=True)
+class ShardStatus:
+    """Status of a shard reported by its worker."""
+
+    shard_id: int
+    """Shard id."""
+
+    connected: bool
+    """Whether the shard has an open gateway connection."""
+
+    seq: int
+    """Sequence number of the last received event."""
+
+    latency_p50: float | None
+    """Median heartbeat latency in seconds."""
+
+    latency_p99: float | None
+    """99th percentile of heartbeat latency in seconds."""
+
+    send_queue_depth: int
+    """Number of commands waiting to be sent."""
+
+    ready: bool = False
+    """Whether all guilds of the shard have loaded after READY."""
+
+    pending_guilds: int = 0
+    """Number of guilds which haven't arrived after READY yet."""
+
+
+@dataclass(frozen=True, slots=True)
+class WorkerStatus:
+    """Status of a worker process."""
+
+    worker_id: int
+    """Worker id."""
+
+    pid: int | None
+    """Process id of the current worker process."""
+
+    alive: bool
+    """Whether the worker process is running."""
+
+    restarts: int
+    """Number of times the worker was restarted."""
+
+    shard_ids: tuple[int, ...]
+    """Shards owned by the worker."""
+
+    shards: tuple[ShardStatus, ...]
+    """Latest reported status of the shards."""
+
+    reported_at: float | None
+    """Time of the latest status report, seconds since the epoch."""
+
+
+def split_shards(shard_count: int, workers: int) -> list[tuple[int, ...]]:
+    """Split shards into contiguous ranges of nearly equal size.
+
+    Args:
+        shard_count: Total number of shards.
+        workers: Number of workers.
+
+    Returns:
+        Shard ids of every worker.
+    """
+    if shard_count < 1 or workers < 1:
+        raise ValueError('Number of shards and workers must be positive')
+
+    workers = min(workers, shard_count)
+    size, rest = divmod(shard_count, workers)
+    ranges = []
+    start = 0
+    for worker_id in range(workers):
+        stop = start + size + (worker_id < rest)
+        ranges.append(tuple(range(start, stop)))
+        start = stop
+    return ranges
+
+
+class IdentifyScheduler:
+    """Shares the identify rate limit between shards.
+
+    Shards are split into `max_concurrency` buckets by `shard_id % max_concurrency`.
+    Only one shard of a bucket can identify per `interval` seconds.
+    """
+
+    def __init__(self, max_concurrency: int = 1, interval: float = DEFAULT_IDENTIFY_INTERVAL) -> None:
+        """Initialize the identify scheduler.
+
+        Args:
+            max_concurrency: Number of identify rate limit buckets.
+            interval: Minimum time between identifies in one bucket in seconds.
+        """
+        if max_concurrency < 1:
+            raise ValueError('Max concurrency must be positive')
+
+        self.max_concurrency = max_concurrency
+        self.interval = interval
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._next_at: dict[int, float] = {}
+
+    async def acquire(self, shard_id: int) -> None:
+        """Wait until the shard can identify.
+
+        Args:
+            shard_id: Shard id.
+        """
+        bucket = shard_id % self.max_concurrency
+        loop = asyncio.get_running_loop()
+        async with self._locks.setdefault(bucket, asyncio.Lock()):
+            delay = self._next_at.get(bucket, 0) - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_at[bucket] = loop.time() + self.interval
+
+
+class ShardCluster:
+    """Supervisor of worker processes running shards.
+
+    Attributes:
+        token: Bot token.
+        setup: Function to set up the client group of every shard in workers.
+        shard_count: Total number of shards.
+        workers: Number of worker processes.
+        intents: Intents to identify with.
+        identify_scheduler: Scheduler of identifies of all shards.
+        gateway_url: URL to connect to the gateway.
+        status_interval: Interval of status reports of workers in seconds.
+        restart_delay: Delay before restarting a crashed worker in seconds.
+        stop_timeout: Time to wait for workers to stop before killing them in seconds.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        setup: WorkerSetupFunc,
+        shard_count: int,
+        workers: int | None = None,
+        max_concurrency: int = 1,
+        intents: Intent | Literal['auto'] = DEFAULT_INTENTS,
+    ) -> None:
+        """Initialize the shard cluster.
+
+        Args:
+            token: Bot token.
+            setup: Function to set up the client group of every shard in workers.
+                It must be defined at the module level to be passed to workers.
+            shard_count: Total number of shards.
+            workers: Number of worker processes. Defaults to the number of CPU cores.
+            max_concurrency: Number of identify rate limit buckets of the bot.
+            intents: Intents to identify with, or `AUTO_INTENTS` to compute them
+                from handlers of every shard.
+        """
+        self.token = token
+        self.setup = setup
+        self.shard_count = shard_count
+        self.workers = min(workers or os.cpu_count() or 1, shard_count)
+        self.intents = intents
+        self.identify_scheduler = IdentifyScheduler(max_concurrency)
+        self.gateway_url = GATEWAY_URL
+        self.status_interval = DEFAULT_STATUS_INTERVAL
+        self.restart_delay = DEFAULT_RESTART_DELAY
+        self.stop_timeout = DEFAULT_STOP_TIMEOUT
+
+        self._context = multiprocessing.get_context('spawn')
+        self._worker_target: Callable[[WorkerSpec, Connection], None] = run_worker
+        self._workers: dict[int, _Worker] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._restart_handles: dict[int, asyncio.TimerHandle] = {}
+        self._stopping = False
+        self._stopped = asyncio.Event()
+
+    def run(self) -> None:
+        """Run the cluster until it is interrupted."""
+        with contextlib.suppress(KeyboardInterrupt):
+            asyncio.run(self.start())
+
+    async def start(self) -> None:
+        """Start workers and supervise them until the cluster is stopped."""
+        self._stopping = False
+        self._stopped.clear()
+        for worker_id, shard_ids in enumerate(split_shards(self.shard_count, self.workers)):
+            self._spawn(worker_id, shard_ids, restarts=0)
+
+        logger.info('Started %i workers for %i shards', self.workers, self.shard_count)
+        try:
+            await self._stopped.wait()
+        finally:
+            await self.stop()
+
+    async def stop(self) -> None:
+        """Ask workers to close connections and wait for them to exit."""
+        if self._stopping:
+            await self._stopped.wait()
+            return
+
+        self._stopping = True
+        for handle in self._restart_handles.values():
+            handle.cancel()
+        self._restart_handles.clear()
+
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.send(('stop',))
+
+        await asyncio.gather(*(asyncio.to_thread(worker.process.join, self.stop_timeout) for worker in workers))
+        for worker in workers:
+            if worker.process.is_alive():
+                logger.warning('Worker %i did not stop in time, killing it', worker.worker_id)
+                worker.process.kill()
+                worker.process.join()
+            self._detach(worker)
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._stopped.set()
+
+    def status(self) -> list[WorkerStatus]:
+        """Get the status of all workers."""
+        return [
+            WorkerStatus(
+                worker_id=worker.worker_id,
+                pid=worker.process.pid,
+                alive=worker.process.is_alive(),
+                restarts=worker.restarts,
+                shard_ids=worker.shard_ids,
+                shards=worker.shards,
+                reported_at=worker.reported_at,
+            )
+            for worker in sorted(self._workers.values(), key=lambda worker: worker.worker_id)
+        ]
+
+    def _spawn(self, worker_id: int, shard_ids: tuple[int, ...], restarts: int) -> None:
+        """Start a worker process."""
+        self._restart_handles.pop(worker_id, None)
+        spec = WorkerSpec(
+            worker_id=worker_id,
+            token=self.token,
+            shard_ids=shard_ids,
+            shard_count=self.shard_count,
+            setup=self.setup,
+            intents=self.intents,
+            gateway_url=str(self.gateway_url),
+            status_interval=self.status_interval,
+        )
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=self._worker_target,
+            args=(spec, child_conn),
+            name=f'asyncord-worker-{worker_id}',
+        )
+        process.start()
+        child_conn.close()
+
+        worker = _Worker(worker_id, shard_ids, process, parent_conn, restarts)
+        self._workers[worker_id] = worker
+
+        loop = asyncio.get_running_loop()
+        loop.add_reader(parent_conn.fileno(), self._on_worker_message, worker)
+        loop.add_reader(process.sentinel, self._on_worker_exit, worker)
+        logger.info('Worker %i started with shards %s, pid %i', worker_id, shard_ids, process.pid)
+
+    def _on_worker_message(self, worker: _Worker) -> None:
+        """Handle messages from a worker."""
+        while True:
+            try:
+                if not worker.conn.poll():
+                    return
+                message = worker.conn.recv()
+            except (EOFError, OSError):
+                asyncio.get_running_loop().remove_reader(worker.conn.fileno())
+                return
+
+            match message:
+                case ('identify', int(shard_id)):
+                    task = asyncio.create_task(self._grant_identify(worker, shard_id))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                case ('status', shards):
+                    worker.shards = shards
+                    worker.reported_at = time.time()
+                case _:
+                    logger.warning('Unknown message from worker %i: %r', worker.worker_id, message)
+
+    async def _grant_identify(self, worker: _Worker, shard_id: int) -> None:
+        """Allow the worker to identify the shard when the rate limit allows."""
+        await self.identify_scheduler.acquire(shard_id)
+        if self._workers.get(worker.worker_id) is worker:
+            worker.send(('identify_ok', shard_id))
+
+    def _on_worker_exit(self, worker: _Worker) -> None:
+        """Restart the worker if it exited unexpectedly."""
+        self._detach(worker)
+        worker.process.join()
+        if self._stopping:
+            return
+
+        logger.error(
+            'Worker %i exited with code %s, restarting in %.1f seconds',
+            worker.worker_id,
+            worker.process.exitcode,
+            self.restart_delay,
+        )
+        self._restart_handles[worker.worker_id] = asyncio.get_running_loop().call_later(
+            self.restart_delay,
+            self._spawn,
+            worker.worker_id,
+            worker.shard_ids,
+            worker.restarts + 1,
+        )
+
+    @staticmethod
+    def _detach(worker: _Worker) -> None:
+        """Stop watching the worker and close its pipe."""
+        if worker.conn.closed:
+            return
+
+        loop = asyncio.get_running_loop()
+        loop.remove_reader(worker.conn.fileno())
+        loop.remove_reader(worker.process.sentinel)
+        worker.conn.close()
+
+
+class _Worker:
+    """Worker process watched by the supervisor."""
+
+    def __init__(
+        self,
+        worker_id: int,
+        shard_ids: tuple[int, ...],
+        process: BaseProcess,
+        conn: Connection,
+        restarts: int,
+    ) -> None:
+        self.worker_id = worker_id
+        self.shard_ids = shard_ids
+        self.process = process
+        self.conn = conn
+        self.restarts = restarts
+        self.shards: tuple[ShardStatus, ...] = ()
+        self.reported_at: float | None = None
+
+    def send(self, message: tuple[Any, ...]) -> None:
+        """Send a message to the worker, ignoring closed pipes."""
+        with contextlib.suppress(OSError, ValueError):
+            self.conn.send(message)
+
+
+@dataclass(frozen=True, slots=True)
+class WorkerSpec:
+    """Everything a worker process needs to run its shards.
+
+    It's pickled to be passed to the worker process.
+    """
+
+    worker_id: int
+    """Worker id."""
+
+    token: str
+    """Bot token."""
+
+    shard_ids: tuple[int, ...]
+    """Shards owned by the worker."""
+
+    shard_count: int
+    """Total number of shards."""
+
+    setup: WorkerSetupFunc
+    """Function to set up the client group of every shard."""
+
+    intents: Intent | Literal['auto']
+    """Intents to identify with."""
+
+    gateway_url: str
+    """URL to connect to the gateway."""
+
+    status_interval: float
+    """Interval of status reports in seconds."""
+
+
+def run_worker(spec: WorkerSpec, conn: Connection) -> None:
+    """Run shards of a worker process.
+
+    Args:
+        spec: Worker specification.
+        conn: Pipe to the supervisor.
+    """
+    asyncio.run(_WorkerRuntime(spec, conn).run())
+
+
+class _WorkerRuntime:
+    """Shards of a worker process and their link to the supervisor."""
+
+    def __init__(self, spec: WorkerSpec, conn: Connection) -> None:
+        self.spec = spec
+        self.conn = conn
+        self._identify_waiters: dict[int, asyncio.Future[None]] = {}
+        self._stop_requested = asyncio.Event()
+
+    async def run(self) -> None:
+        """Run the hub until the supervisor asks to stop."""
+        hub = ClientHub()
+        for shard_id in self.spec.shard_ids:
+            group = hub.create_client_group(f'shard-{shard_id}', auth=self.spec.token)
+            gateway_client = group.gateway_client
+            gateway_client.shard = (shard_id, self.spec.shard_count)
+            gateway_client.intents = self.spec.intents
+            gateway_client.conn_data.resume_url = URL(self.spec.gateway_url)
+            gateway_client.identify_gate = self.wait_identify
+            self.spec.setup(group)
+
+        loop = asyncio.get_running_loop()
+        loop.add_reader(self.conn.fileno(), self._on_message)
+
+        hub_task = asyncio.create_task(hub.start())
+        status_task = asyncio.create_task(self._report_status(hub))
+        stop_task = asyncio.create_task(self._stop_requested.wait())
+        try:
+            await asyncio.wait((hub_task, stop_task), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            loop.remove_reader(self.conn.fileno())
+            for task in (hub_task, status_task, stop_task):
+                task.cancel()
+            await asyncio.gather(hub_task, status_task, stop_task, return_exceptions=True)
+
+    async def wait_identify(self, shard_id: int) -> None:
+        """Wait for the supervisor to allow identifying the shard."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._identify_waiters[shard_id] = waiter
+        self.conn.send(('identify', shard_id))
+        await waiter
+
+    def _on_message(self, _: Any = None) -> None:  # noqa: ANN401
+        """Handle messages from the supervisor."""
+        while True:
+            try:
+                if not self.conn.poll():
+                    return
+                message = self.conn.recv()
+            except (EOFError, OSError):
+                # the supervisor is gone, nobody will restart or stop the worker
+                self._stop_requested.set()
+                asyncio.get_running_loop().remove_reader(self.conn.fileno())
+                return
+
+            match message:
+                case ('identify_ok', int(shard_id)):
+                    waiter = self._identify_waiters.pop(shard_id, None)
+                    if waiter and not waiter.done():
+                        waiter.set_result(None)
+                case ('stop',):
+                    self._stop_requested.set()
+
+    async def _report_status(self, hub: ClientHub) -> None:
+        """Send the status of shards to the supervisor periodically."""
+        while True:
+            shards = []
+            for group in hub.client_groups.values():
+                gateway_client = group.gateway_client
+                latency = gateway_client.latency
+                readiness = gateway_client.readiness.progress
+                shards.append(
+                    ShardStatus(
+                        shard_id=gateway_client.shard[0] if gateway_client.shard else 0,
+                        connected=gateway_client.is_connected,
+                        seq=gateway_client.conn_data.seq,
+                        latency_p50=latency.p50,
+                        latency_p99=latency.p99,
+                        send_queue_depth=gateway_client.send_queue_depth,
+                        ready=readiness.ready,
+                        pending_guilds=readiness.pending,
+                    ),
+                )
+            with contextlib.suppress(OSError, ValueError):
+                self.conn.send(('status', tuple(shards)))
+            await asyncio.sleep(self.spec.status_interval)
@@ -0,0 +1,719 @@
+"""This module contains the entity cache fed by gateway events.
+
+`GUILD_CREATE` brings channels, threads, roles, emojis and members of the guild,
+and following events keep them up to date. The cache keeps these entities, so handlers
+don't need to fetch them with the REST client.
+
+The cache is opt-in. Assign it to the gateway client to fill it:
+
+    cache = EntityCache(CacheFlag.GUILDS | CacheFlag.CHANNELS | CacheFlag.ROLES)
+    client_group.gateway_client.cache = cache
+
+One cache can be shared by clients of several shards.
+
+The cache is updated when an event is received, before it's dispatched. Handlers
+run inline by `EventDispatcher` see the state right after their event. With
+`PartitionedEventDispatcher` handlers run later, so the cache can already have
+changes of events still queued behind the event being handled.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import enum
+import functools
+import logging
+import operator
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any, Final
+
+from asyncord.client.channels.models.responses import ChannelResponse, ThreadResponse
+from asyncord.client.emojis.models.responses import EmojiResponse
+from asyncord.client.guilds.models.responses import GuildResponse
+from asyncord.client.members.models.responses import MemberResponse
+from asyncord.client.roles.models.responses import RoleResponse
+from asyncord.gateway.cache.members import (
+    COMPACT_MEMBER_SIZE,
+    CachedMember,
+    CompactMember,
+    CompactMemberStore,
+    DictMemberStore,
+    MemberStore,
+)
+from asyncord.gateway.cache.messages import MessageCache
+from asyncord.gateway.cache.permissions import PermissionResolver
+from asyncord.gateway.cache.policies import CachePolicy, CacheStats, PolicyTracker, estimate_size
+from asyncord.gateway.events.base import GatewayEvent
+from asyncord.gateway.events.channels import (
+    ChannelCreateEvent,
+    ChannelDeleteEvent,
+    ChannelUpdateEvent,
+    ThreadCreateEvent,
+    ThreadDeleteEvent,
+    ThreadListSyncEvent,
+    ThreadUpdateEvent,
+)
+from asyncord.gateway.events.guilds import (
+    GuildCreateEvent,
+    GuildDeleteEvent,
+    GuildEmojisUpdateEvent,
+    GuildMemberAddEvent,
+    GuildMemberRemoveEvent,
+    GuildMembersChunkEvent,
+    GuildMemberUpdateEvent,
+    GuildRoleCreateEvent,
+    GuildRoleDeleteEvent,
+    GuildRoleUpdateEvent,
+    GuildUpdateEvent,
+)
+
+__all__ = ('ALL_CACHE_FLAGS', 'DEFAULT_CACHE_FLAGS', 'CacheFlag', 'EntityCache')
+
+logger = logging.getLogger(__name__)
+
+
+@enum.unique
+class CacheFlag(enum.IntFlag):
+    """Entities to cache."""
+
+    GUILDS = 1 << 0
+    CHANNELS = 1 << 1
+    THREADS = 1 << 2
+    ROLES = 1 << 3
+    MEMBERS = 1 << 4
+    EMOJIS = 1 << 5
+
+
+ALL_CACHE_FLAGS: Final[CacheFlag] = functools.reduce(operator.or_, CacheFlag)
+"""All cacheable entities."""
+
+DEFAULT_CACHE_FLAGS: Final[CacheFlag] = ALL_CACHE_FLAGS & ~CacheFlag.MEMBERS
+"""Default cached entities.
+
+Members take most of the memory in large guilds, so they are cached only on request.
+"""
+
+_EVENT_FLAGS: Final[dict[type[GatewayEvent], CacheFlag]] = {
+    GuildCreateEvent: ALL_CACHE_FLAGS,
+    GuildUpdateEvent: CacheFlag.GUILDS | CacheFlag.ROLES | CacheFlag.EMOJIS,
+    GuildDeleteEvent: ALL_CACHE_FLAGS,
+    ChannelCreateEvent: CacheFlag.CHANNELS,
+    ChannelUpdateEvent: CacheFlag.CHANNELS,
+    ChannelDeleteEvent: CacheFlag.CHANNELS | CacheFlag.THREADS,
+    ThreadCreateEvent: CacheFlag.THREADS,
+    ThreadUpdateEvent: CacheFlag.THREADS,
+    ThreadDeleteEvent: CacheFlag.THREADS,
+    ThreadListSyncEvent: CacheFlag.THREADS,
+    GuildRoleCreateEvent: CacheFlag.ROLES,
+    GuildRoleUpdateEvent: CacheFlag.ROLES,
+    GuildRoleDeleteEvent: CacheFlag.ROLES,
+    GuildEmojisUpdateEvent: CacheFlag.EMOJIS,
+    GuildMemberAddEvent: CacheFlag.MEMBERS,
+    GuildMemberUpdateEvent: CacheFlag.MEMBERS,
+    GuildMemberRemoveEvent: CacheFlag.MEMBERS,
+    GuildMembersChunkEvent: CacheFlag.MEMBERS,
+}
+"""Entities updated by events."""
+
+_GUILD_ENTITY_FIELDS: Final[frozenset[str]] = frozenset({'roles', 'emojis'})
+"""Fields of the guild object which are kept in separate stores."""
+
+
+class _GuildIndex[ENTITY_T]:
+    """Entities by id with an index of entity ids by guild id."""
+
+    __slots__ = ('by_guild', 'by_id', 'guild_of', 'stats', 'tracker')
+
+    def __init__(self, policy: CachePolicy | None = None) -> None:
+        self.by_id: dict[int, ENTITY_T] = {}
+        self.by_guild: dict[int, set[int]] = {}
+        self.guild_of: dict[int, int] = {}
+        self.stats = CacheStats()
+        self.tracker = None if policy is None else PolicyTracker[int](policy, self.stats)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def get(self, entity_id: int) -> ENTITY_T | None:
+        """Look up an entity and count the hit or miss."""
+        entity = self.by_id.get(entity_id)
+        if entity is not None and self.tracker is not None and not self.tracker.access(entity_id):
+            self._remove(entity_id)
+            entity = None
+
+        if entity is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return entity
+
+    def set(self, guild_id: int, entity_id: int, entity: ENTITY_T) -> None:
+        """Add or replace an entity."""
+        self.by_id[entity_id] = entity
+        self.guild_of[entity_id] = guild_id
+        self.by_guild.setdefault(guild_id, set()).add(entity_id)
+        if self.tracker is not None:
+            size = estimate_size(entity) if self.tracker.tracks_size else 0
+            for evicted_id in self.tracker.touch(entity_id, size):
+                self._remove(evicted_id)
+
+    def pop(self, entity_id: int) -> ENTITY_T | None:
+        """Remove an entity."""
+        if self.tracker is not None:
+            self.tracker.discard(entity_id)
+        return self._remove(entity_id)
+
+    def of_guild(self, guild_id: int) -> list[ENTITY_T]:
+        """Get all entities of a guild."""
+        self.expire()
+        return [self.by_id[entity_id] for entity_id in self.by_guild.get(guild_id, ())]
+
+    def replace_guild(self, guild_id: int, entities: Iterable[tuple[int, ENTITY_T]]) -> None:
+        """Replace all entities of a guild."""
+        self.clear_guild(guild_id)
+        for entity_id, entity in entities:
+            self.set(guild_id, entity_id, entity)
+
+    def expire(self) -> None:
+        """Remove expired entities."""
+        if self.tracker is not None:
+            for entity_id in self.tracker.expire():
+                self._remove(entity_id)
+
+    def clear(self) -> None:
+        """Remove all entities."""
+        self.by_id.clear()
+        self.by_guild.clear()
+        self.guild_of.clear()
+        if self.tracker is not None:
+            self.tracker.clear()
+
+    def clear_guild(self, guild_id: int) -> None:
+        """Remove all entities of a guild."""
+        for entity_id in self.by_guild.pop(guild_id, ()):
+            self.by_id.pop(entity_id, None)
+            self.guild_of.pop(entity_id, None)
+            if self.tracker is not None:
+                self.tracker.discard(entity_id)
+
+    def _remove(self, entity_id: int) -> ENTITY_T | None:
+        """Remove an entity without telling the tracker."""
+        guild_id = self.guild_of.pop(entity_id, None)
+        entity_ids = None if guild_id is None else self.by_guild.get(guild_id)
+        if entity_ids is not None:
+            entity_ids.discard(entity_id)
+            if not entity_ids:
+                del self.by_guild[guild_id]  # type: ignore[arg-type]
+        return self.by_id.pop(entity_id, None)
+
+
+class EntityCache:  # noqa: PLR0904
+    """Cache of guild entities fed by gateway events.
+
+    Cached objects are shared with handlers, so they must not be modified.
+
+    Every entity type can be bounded by a policy, for example to keep only members
+    seen in the last 10 minutes and at most 64 MiB of channels:
+
+        cache = EntityCache(
+            ALL_CACHE_FLAGS,
+            policies={
+                CacheFlag.MEMBERS: CachePolicy.seen_within(600),
+                CacheFlag.CHANNELS: CachePolicy.lru(max_bytes=64 * 1024 * 1024),
+            },
+        )
+
+    Attributes:
+        flags: Cached entities.
+        compact_members: Whether members are kept in compact stores.
+        guild_filter: Function which tells whether entities of a guild are cached.
+        messages: Cache of recent messages.
+        permissions: Resolver of effective permissions over cached entities.
+    """
+
+    def __init__(
+        self,
+        flags: CacheFlag = DEFAULT_CACHE_FLAGS,
+        *,
+        compact_members: bool = False,
+        policies: Mapping[CacheFlag, CachePolicy] | None = None,
+        guild_filter: Callable[[int], bool] | None = None,
+        messages: MessageCache | None = None,
+    ) -> None:
+        """Initialize the entity cache.
+
+        Args:
+            flags: Entities to cache.
+            compact_members: Whether to keep members in compact stores. Compact stores
+                take a fraction of memory of member models, and return members as
+                `CompactMember` snapshots.
+            policies: Eviction policies by entity type. A policy of combined flags
+                applies to every entity type separately. Entities without a policy
+                are kept until they are deleted.
+            guild_filter: Function which tells whether entities of a guild are cached,
+                for example `active_guilds.__contains__` to cache only guilds with
+                active handlers. Use `evict_guild` when a guild stops passing the filter.
+            messages: Cache of recent messages. Message update and delete events get
+                prior versions of messages from it.
+        """
+        self.flags = flags
+        self.compact_members = compact_members
+        self.guild_filter = guild_filter
+        self.messages = messages
+        self.permissions = PermissionResolver(self)
+
+        flag_policies: dict[CacheFlag, CachePolicy] = {}
+        for policy_flags, policy in (policies or {}).items():
+            flag_policies.update(dict.fromkeys(policy_flags, policy))
+
+        self._guilds = _GuildIndex[GuildResponse](flag_policies.get(CacheFlag.GUILDS))
+        self._channels = _GuildIndex[ChannelResponse](flag_policies.get(CacheFlag.CHANNELS))
+        self._threads = _GuildIndex[ThreadResponse](flag_policies.get(CacheFlag.THREADS))
+        self._roles = _GuildIndex[RoleResponse](flag_policies.get(CacheFlag.ROLES))
+        self._emojis = _GuildIndex[EmojiResponse](flag_policies.get(CacheFlag.EMOJIS))
+        self._indexes: dict[CacheFlag, _GuildIndex[Any]] = {
+            CacheFlag.GUILDS: self._guilds,
+            CacheFlag.CHANNELS: self._channels,
+            CacheFlag.THREADS: self._threads,
+            CacheFlag.ROLES: self._roles,
+            CacheFlag.EMOJIS: self._emojis,
+        }
+
+        self._members: dict[int, MemberStore] = {}
+        self._member_stats = CacheStats()
+        member_policy = flag_policies.get(CacheFlag.MEMBERS)
+        self._member_tracker = (
+            None if member_policy is None else PolicyTracker[tuple[int, int]](member_policy, self._member_stats)
+        )
+
+        self._updaters: dict[type[GatewayEvent], Callable[[Any], None]] = {
+            GuildCreateEvent: self._on_guild_create,
+            GuildUpdateEvent: self._on_guild_update,
+            GuildDeleteEvent: self._on_guild_delete,
+            ChannelCreateEvent: self._on_channel_update,
+            ChannelUpdateEvent: self._on_channel_update,
+            ChannelDeleteEvent: self._on_channel_delete,
+            ThreadCreateEvent: self._on_thread_update,
+            ThreadUpdateEvent: self._on_thread_update,
+            ThreadDeleteEvent: self._on_thread_delete,
+            ThreadListSyncEvent: self._on_thread_list_sync,
+            GuildRoleCreateEvent: self._on_role_update,
+            GuildRoleUpdateEvent: self._on_role_update,
+            GuildRoleDeleteEvent: self._on_role_delete,
+            GuildEmojisUpdateEvent: self._on_emojis_update,
+            GuildMemberAddEvent: self._on_member_add,
+            GuildMemberUpdateEvent: self._on_member_update,
+            GuildMemberRemoveEvent: self._on_member_remove,
+            GuildMembersChunkEvent: self._on_members_chunk,
+        }
+        self._entity_event_types = frozenset(
+            event_type for event_type, event_flags in _EVENT_FLAGS.items() if event_flags & flags
+        )
+        self._event_types = self._entity_event_types
+        if messages is not None:
+            self._event_types |= messages.event_types
+
+    @property
+    def event_types(self) -> frozenset[type[GatewayEvent]]:
+        """Event types which update the cache."""
+        return self._event_types
+
+    def handles(self, event_type: type[GatewayEvent]) -> bool:
+        """Check if the event type updates the cache.
+
+        Args:
+            event_type: Event type to check.
+
+        Returns:
+            True if events of the type must be passed to `update`.
+        """
+        return event_type in self._event_types
+
+    def update(self, event: GatewayEvent) -> None:
+        """Update the cache with an event.
+
+        Args:
+            event: Dispatched event. Events which don't update the cache and events
+                of guilds rejected by the guild filter are ignored.
+        """
+        event_type = type(event)
+        if event_type not in self._event_types:
+            return
+
+        if self.guild_filter is not None and not isinstance(event, GuildDeleteEvent):
+            guild_id = event.id if isinstance(event, GuildResponse) else getattr(event, 'guild_id', None)
+            if guild_id is not None and not self.guild_filter(int(guild_id)):
+                return
+
+        if event_type in self._entity_event_types:
+            self._updaters[event_type](event)
+            self.permissions.invalidate(event)
+        if self.messages is not None:
+            self.messages.update(event)
+
+    def clear(self) -> None:
+        """Remove all cached entities."""
+        for index in self._indexes.values():
+            index.clear()
+        self._members.clear()
+        if self._member_tracker is not None:
+            self._member_tracker.clear()
+        if self.messages is not None:
+            self.messages.clear()
+        self.permissions.clear()
+
+    def evict_guild(self, guild_id: int) -> None:
+        """Remove the guild and all its entities.
+
+        Args:
+            guild_id: Guild id.
+        """
+        self._guilds.pop(guild_id)
+        self._channels.clear_guild(guild_id)
+        self._threads.clear_guild(guild_id)
+        self._roles.clear_guild(guild_id)
+        self._emojis.clear_guild(guild_id)
+        self._clear_members(guild_id)
+        if self.messages is not None:
+            self.messages.clear_guild(guild_id)
+        self.permissions.invalidate_guild(guild_id)
+
+    def caches_members(self, guild_id: int) -> bool:
+        """Check if members of the guild are cached.
+
+        Args:
+            guild_id: Guild id.
+        """
+        return CacheFlag.MEMBERS in self.flags and (self.guild_filter is None or self.guild_filter(guild_id))
+
+    def add_members(self, guild_id: int, members: Iterable[MemberResponse], *, replace: bool = False) -> None:
+        """Add members which are not carried by events.
+
+        It's used by incremental decoding of large `GUILD_CREATE` frames, members of
+        such frames are fed to the cache in chunks instead of the event.
+
+        Args:
+            guild_id: Guild id.
+            members: Members to add or replace.
+            replace: Whether to remove previously cached members of the guild first.
+        """
+        if not self.caches_members(guild_id):
+            return
+
+        if replace:
+            self._clear_members(guild_id)
+        self._add_members(guild_id, members)
+        self.permissions.invalidate_guild(guild_id)
+
+    def stats(self) -> dict[CacheFlag, CacheStats]:
+        """Get counters of cached entities.
+
+        Returns:
+            Snapshots of counters of every cached entity type.
+        """
+        stats = {}
+        for flag, index in self._indexes.items():
+            if flag in self.flags:
+                index.expire()
+                stats[flag] = dataclasses.replace(index.stats, entries=len(index))
+
+        if CacheFlag.MEMBERS in self.flags:
+            self._expire_members()
+            entries = sum(len(members) for members in self._members.values())
+            stats[CacheFlag.MEMBERS] = dataclasses.replace(self._member_stats, entries=entries)
+        return stats
+
+    def get_guild(self, guild_id: int) -> GuildResponse | None:
+        """Get a guild.
+
+        Roles and emojis are not included in the guild object, use `guild_roles`
+        and `guild_emojis` to get them.
+
+        Args:
+            guild_id: Guild id.
+
+        Returns:
+            Guild or None if it is not cached.
+        """
+        return self._guilds.get(guild_id)
+
+    def get_channel(self, channel_id: int) -> ChannelResponse | None:
+        """Get a guild channel.
+
+        Args:
+            channel_id: Channel id.
+
+        Returns:
+            Channel or None if it is not cached.
+        """
+        return self._channels.get(channel_id)
+
+    def get_thread(self, thread_id: int) -> ThreadResponse | None:
+        """Get a thread.
+
+        Args:
+            thread_id: Thread id.
+
+        Returns:
+            Thread or None if it is not cached.
+        """
+        return self._threads.get(thread_id)
+
+    def get_role(self, role_id: int) -> RoleResponse | None:
+        """Get a role.
+
+        Args:
+            role_id: Role id.
+
+        Returns:
+            Role or None if it is not cached.
+        """
+        return self._roles.get(role_id)
+
+    def get_emoji(self, emoji_id: int) -> EmojiResponse | None:
+        """Get a guild emoji.
+
+        Args:
+            emoji_id: Emoji id.
+
+        Returns:
+            Emoji or None if it is not cached.
+        """
+        return self._emojis.get(emoji_id)
+
+    def get_member(self, guild_id: int, user_id: int) -> CachedMember | None:
+        """Get a guild member.
+
+        Args:
+            guild_id: Guild id.
+            user_id: User id.
+
+        Returns:
+            Member or None if it is not cached.
+        """
+        members = self._members.get(guild_id)
+        member = None if members is None else members.get(user_id)
+        tracker = self._member_tracker
+        if member is not None and tracker is not None and not tracker.access((guild_id, user_id)):
+            members.pop(user_id)  # type: ignore[union-attr]
+            member = None
+
+        if member is None:
+            self._member_stats.misses += 1
+        else:
+            self._member_stats.hits += 1
+        return member
+
+    def member_roles(self, guild_id: int, user_id: int) -> tuple[int, ...] | None:
+        """Get role ids of a guild member.
+
+        It's cheaper than `get_member` for compact stores, and doesn't count lookups.
+
+        Args:
+            guild_id: Guild id.
+            user_id: User id.
+
+        Returns:
+            Sorted role ids or None if the member is not cached.
+        """
+        members = self._members.get(guild_id)
+        return None if members is None else members.get_roles(user_id)
+
+    def guild_member_roles(self, guild_id: int) -> list[tuple[int, tuple[int, ...]]]:
+        """Get user ids of cached members of a guild with their sorted role ids."""
+        self._expire_members()
+        members = self._members.get(guild_id)
+        return [] if members is None else members.roles()
+
+    def guilds(self) -> list[GuildResponse]:
+        """Get all cached guilds."""
+        self._guilds.expire()
+        return list(self._guilds.by_id.values())
+
+    def guild_channels(self, guild_id: int) -> list[ChannelResponse]:
+        """Get cached channels of a guild."""
+        return self._channels.of_guild(guild_id)
+
+    def guild_threads(self, guild_id: int) -> list[ThreadResponse]:
+        """Get cached threads of a guild."""
+        return self._threads.of_guild(guild_id)
+
+    def guild_roles(self, guild_id: int) -> list[RoleResponse]:
+        """Get cached roles of a guild."""
+        return self._roles.of_guild(guild_id)
+
+    def guild_emojis(self, guild_id: int) -> list[EmojiResponse]:
+        """Get cached emojis of a guild."""
+        return self._emojis.of_guild(guild_id)
+
+    def guild_members(self, guild_id: int) -> list[CachedMember]:
+        """Get cached members of a guild."""
+        self._expire_members()
+        return list(self._members.get(guild_id, ()))
+
+    def _on_guild_create(self, event: GuildCreateEvent) -> None:
+        """Cache the guild and all its entities."""
+        if event.unavailable:
+            return
+
+        guild_id = int(event.id)
+        self._on_guild_update(event)
+
+        if CacheFlag.CHANNELS in self.flags and event.channels is not None:
+            channels = (ChannelResponse.model_validate({**data, 'guild_id': guild_id}) for data in event.channels)
+            self._channels.replace_guild(guild_id, ((int(channel.id), channel) for channel in channels))
+
+        if CacheFlag.THREADS in self.flags and event.threads is not None:
+            threads = (ThreadResponse.model_validate({**data, 'guild_id': guild_id}) for data in event.threads)
+            self._threads.replace_guild(guild_id, ((int(thread.id), thread) for thread in threads))
+
+        if CacheFlag.MEMBERS in self.flags and event.members is not None:
+            self._clear_members(guild_id)
+            self._add_members(guild_id, event.members)
+
+    def _on_guild_update(self, event: GuildResponse) -> None:
+        """Cache the guild, its roles and emojis."""
+        guild_id = int(event.id)
+        if CacheFlag.GUILDS in self.flags:
+            fields = {
+                name: None if name in _GUILD_ENTITY_FIELDS else getattr(event, name)
+                for name in GuildResponse.model_fields
+            }
+            self._guilds.set(guild_id, guild_id, GuildResponse.model_construct(**fields))
+
+        if CacheFlag.ROLES in self.flags and event.roles is not None:
+            self._roles.replace_guild(guild_id, ((int(role.id), role) for role in event.roles))
+
+        if CacheFlag.EMOJIS in self.flags and event.emojis is not None:
+            self._emojis.replace_guild(guild_id, self._emoji_entries(event.emojis))
+
+    def _on_guild_delete(self, event: GuildDeleteEvent) -> None:
+        """Remove the guild and all its entities.
+
+        Unavailable guilds are removed too, they are sent again when they become available.
+        """
+        self.evict_guild(int(event.id))
+
+    def _on_channel_update(self, event: ChannelResponse) -> None:
+        """Cache a created or updated channel."""
+        if event.guild_id is not None:
+            self._channels.set(int(event.guild_id), int(event.id), event)
+
+    def _on_channel_delete(self, event: ChannelDeleteEvent) -> None:
+        """Remove the channel and its threads."""
+        channel_id = int(event.id)
+        self._channels.pop(channel_id)
+        for thread in self._threads.of_guild(int(event.guild_id)):
+            if thread.parent_id is not None and int(thread.parent_id) == channel_id:
+                self._threads.pop(int(thread.id))
+
+    def _on_thread_update(self, event: ThreadResponse) -> None:
+        """Cache a created or updated thread."""
+        if event.guild_id is not None:
+            self._threads.set(int(event.guild_id), int(event.id), event)
+
+    def _on_thread_delete(self, event: ThreadDeleteEvent) -> None:
+        """Remove the thread."""
+        self._threads.pop(int(event.id))
+
+    def _on_thread_list_sync(self, event: ThreadListSyncEvent) -> None:
+        """Replace threads of the synced channels."""
+        guild_id = int(event.guild_id)
+        synced_channel_ids = {int(channel_id) for channel_id in event.channel_ids}
+        for thread in self._threads.of_guild(guild_id):
+            parent_id = None if thread.parent_id is None else int(thread.parent_id)
+            if not synced_channel_ids or parent_id in synced_channel_ids:
+                self._threads.pop(int(thread.id))
+        for thread in event.threads:
+            self._threads.set(guild_id, int(thread.id), thread)
+
+    def _on_role_update(self, event: GuildRoleCreateEvent | GuildRoleUpdateEvent) -> None:
+        """Cache a created or updated role."""
+        self._roles.set(int(event.guild_id), int(event.role.id), event.role)
+
+    def _on_role_delete(self, event: GuildRoleDeleteEvent) -> None:
+        """Remove the role."""
+        self._roles.pop(int(event.role_id))
+
+    def _on_emojis_update(self, event: GuildEmojisUpdateEvent) -> None:
+        """Replace emojis of the guild."""
+        self._emojis.replace_guild(int(event.guild_id), self._emoji_entries(event.emojis))
+
+    def _on_member_add(self, event: GuildMemberAddEvent) -> None:
+        """Cache a joined member."""
+        self._add_members(int(event.guild_id), [event])
+
+    def _on_member_update(self, event: GuildMemberUpdateEvent) -> None:
+        """Merge the update into the cached member.
+
+        The update is partial: it has no `deaf` and `mute`, and may miss `joined_at`.
+        Fields it doesn't carry are kept from the cached member.
+        """
+        guild_id = int(event.guild_id)
+        members = self._members.get(guild_id)
+        cached = members.get(int(event.user.id)) if members is not None else None
+        if cached is None:
+            self._add_members(guild_id, [event])
+            return
+
+        if isinstance(cached, CompactMember):
+            cached = cached.to_response()
+        fields = event.model_fields_set & MemberResponse.model_fields.keys()
+        self._add_members(guild_id, [cached.model_copy(update={name: getattr(event, name) for name in fields})])
+
+    def _on_member_remove(self, event: GuildMemberRemoveEvent) -> None:
+        """Remove the member."""
+        guild_id = int(event.guild_id)
+        user_id = int(event.user.id)
+        members = self._members.get(guild_id)
+        if members is not None:
+            members.pop(user_id)
+        if self._member_tracker is not None:
+            self._member_tracker.discard((guild_id, user_id))
+
+    def _on_members_chunk(self, event: GuildMembersChunkEvent) -> None:
+        """Cache requested members."""
+        self._add_members(int(event.guild_id), event.members)
+
+    def _add_members(self, guild_id: int, members: Iterable[MemberResponse]) -> None:
+        """Add or replace members of the guild."""
+        guild_members = self._members.get(guild_id)
+        if guild_members is None:
+            guild_members = self._members[guild_id] = (
+                CompactMemberStore() if self.compact_members else DictMemberStore()
+            )
+
+        tracker = self._member_tracker
+        for member in members:
+            guild_members.set(member)
+            if tracker is None or member.user is None:
+                continue
+
+            size = 0
+            if tracker.tracks_size:
+                size = COMPACT_MEMBER_SIZE if self.compact_members else estimate_size(member)
+            self._pop_members(tracker.touch((guild_id, int(member.user.id)), size))
+
+    def _clear_members(self, guild_id: int) -> None:
+        """Remove all members of the guild."""
+        members = self._members.pop(guild_id, None)
+        if members is not None and self._member_tracker is not None:
+            for user_id in members.user_ids():
+                self._member_tracker.discard((guild_id, user_id))
+
+    def _expire_members(self) -> None:
+        """Remove expired members."""
+        if self._member_tracker is not None:
+            self._pop_members(self._member_tracker.expire())
+
+    def _pop_members(self, keys: Iterable[tuple[int, int]]) -> None:
+        """Remove members evicted by the tracker."""
+        for guild_id, user_id in keys:
+            members = self._members.get(guild_id)
+            if members is not None:
+                members.pop(user_id)
+
+    @staticmethod
+    def _emoji_entries(emojis: Iterable[EmojiResponse]) -> list[tuple[int, EmojiResponse]]:
+        """Get emojis with ids, guild emojis always have them."""
+        return [(int(emoji.id), emoji) for emoji in emojis if emoji.id is not None]
@@ -0,0 +1,432 @@
+"""This module contains member stores of the entity cache.
+
+Guilds can have hundreds of thousands of members. A `MemberResponse` with its nested
+`UserResponse`, datetimes and snowflakes takes a few kilobytes, so caching large
+guilds as pydantic models costs gigabytes.
+
+`CompactMemberStore` keeps members in columns: ids and times in int64 arrays,
+role sets as tuples interned per unique combination (most members share a few
+combinations) and strings interned. Members are materialized as `CompactMember`
+objects on access.
+"""
+
+from __future__ import annotations
+
+import datetime
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from collections.abc import Iterator
+from typing import Final
+
+from asyncord.client.members.models.common import GuildMemberFlags
+from asyncord.client.members.models.responses import MemberResponse
+from asyncord.client.users.models.responses import UserResponse
+
+__all__ = (
+    'COMPACT_MEMBER_SIZE',
+    'CachedMember',
+    'CompactMember',
+    'CompactMemberStore',
+    'DictMemberStore',
+    'MemberStore',
+)
+
+COMPACT_MEMBER_SIZE: Final[int] = 256
+"""Estimated size of a member in a compact store in bytes, measured by `benchmarks.member_store`."""
+
+_NO_TIME: Final[int] = -(2**63)
+"""Value of time columns for missing times."""
+
+_DEAF: Final[int] = 1 << 0
+_MUTE: Final[int] = 1 << 1
+_PENDING: Final[int] = 1 << 2
+_PENDING_KNOWN: Final[int] = 1 << 3
+_BOT: Final[int] = 1 << 4
+
+
+def _to_ms(value: datetime.datetime | None) -> int:
+    """Convert a datetime to milliseconds since the epoch."""
+    return _NO_TIME if value is None else int(value.timestamp() * 1000)
+
+
+def _from_ms(value: int) -> datetime.datetime | None:
+    """Convert milliseconds since the epoch to a datetime."""
+    return None if value == _NO_TIME else datetime.datetime.fromtimestamp(value / 1000, tz=datetime.UTC)
+
+
+def _intern(value: str | None) -> str | None:
+    """Intern a string."""
+    return None if value is None else sys.intern(value)
+
+
+class CompactMember:
+    """Member materialized from a compact store.
+
+    It's a snapshot: later updates of the member don't change it.
+    """
+
+    __slots__ = (
+        'avatar',
+        'bot',
+        'communication_disabled_until',
+        'deaf',
+        'discriminator',
+        'flags',
+        'global_name',
+        'joined_at',
+        'mute',
+        'nick',
+        'pending',
+        'premium_since',
+        'roles',
+        'user_avatar',
+        'user_id',
+        'username',
+    )
+
+    user_id: int
+    """User id."""
+
+    username: str
+    """Username."""
+
+    discriminator: str
+    """User's Discord-tag."""
+
+    global_name: str | None
+    """User's display name."""
+
+    user_avatar: str | None
+    """User's avatar hash."""
+
+    bot: bool
+    """Whether the user is a bot."""
+
+    nick: str | None
+    """User's guild nickname."""
+
+    avatar: str | None
+    """Member's guild avatar hash."""
+
+    roles: tuple[int, ...]
+    """Role ids, sorted."""
+
+    joined_at: datetime.datetime | None
+    """When the user joined the guild."""
+
+    premium_since: datetime.datetime | None
+    """When the user started boosting the guild."""
+
+    communication_disabled_until: datetime.datetime | None
+    """When the user's timeout will expire."""
+
+    deaf: bool
+    """Whether the user is deafened in voice channels."""
+
+    mute: bool
+    """Whether the user is muted in voice channels."""
+
+    pending: bool | None
+    """Whether the user has not yet passed the Membership Screening."""
+
+    flags: GuildMemberFlags
+    """Guild member flags."""
+
+    def __repr__(self) -> str:
+        """Get representation of the member."""
+        return f'{type(self).__name__}(user_id={self.user_id}, username={self.username!r})'
+
+    def to_response(self) -> MemberResponse:
+        """Convert the member to the response model.
+
+        Only fields kept by the compact store are filled.
+        """
+        user = UserResponse.model_construct(
+            id=self.user_id,
+            username=self.username,
+            discriminator=self.discriminator,
+            global_name=self.global_name,
+            avatar=self.user_avatar,
+            bot=self.bot,
+        )
+        return MemberResponse.model_construct(
+            user=user,
+            nick=self.nick,
+            avatar=self.avatar,
+            roles=list(self.roles),
+            joined_at=self.joined_at,
+            premium_since=self.premium_since,
+            deaf=self.deaf,
+            mute=self.mute,
+            flags=self.flags,
+            pending=self.pending,
+            communication_disabled_until=self.communication_disabled_until,
+        )
+
+
+type CachedMember = MemberResponse | CompactMember
+"""Type alias for a member returned by member stores."""
+
+
+class MemberStore(ABC):
+    """Base class for stores of members of one guild."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Get the number of members."""
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[CachedMember]:
+        """Iterate over members."""
+
+    @abstractmethod
+    def user_ids(self) -> list[int]:
+        """Get ids of stored members."""
+
+    @abstractmethod
+    def get(self, user_id: int) -> CachedMember | None:
+        """Get a member.
+
+        Args:
+            user_id: User id.
+
+        Returns:
+            Member or None if it's not stored.
+        """
+
+    @abstractmethod
+    def get_roles(self, user_id: int) -> tuple[int, ...] | None:
+        """Get role ids of a member without materializing it.
+
+        Args:
+            user_id: User id.
+
+        Returns:
+            Sorted role ids or None if the member isn't stored.
+        """
+
+    @abstractmethod
+    def roles(self) -> list[tuple[int, tuple[int, ...]]]:
+        """Get user ids of stored members with their sorted role ids."""
+
+    @abstractmethod
+    def set(self, member: MemberResponse) -> None:
+        """Add or replace a member.
+
+        Members without the user object are ignored.
+
+        Args:
+            member: Member to store.
+        """
+
+    @abstractmethod
+    def pop(self, user_id: int) -> CachedMember | None:
+        """Remove a member.
+
+        Args:
+            user_id: User id.
+
+        Returns:
+            Removed member or None if it wasn't stored.
+        """
+
+
+class DictMemberStore(MemberStore):
+    """Store which keeps member models as they are."""
+
+    def __init__(self) -> None:
+        """Initialize the store."""
+        self._members: dict[int, MemberResponse] = {}
+
+    def __len__(self) -> int:
+        """Get the number of members."""
+        return len(self._members)
+
+    def __iter__(self) -> Iterator[MemberResponse]:
+        """Iterate over members."""
+        return iter(list(self._members.values()))
+
+    def user_ids(self) -> list[int]:
+        """Get ids of stored members."""
+        return list(self._members)
+
+    def get(self, user_id: int) -> MemberResponse | None:
+        """Get a member."""
+        return self._members.get(user_id)
+
+    def get_roles(self, user_id: int) -> tuple[int, ...] | None:
+        """Get role ids of a member without materializing it."""
+        member = self._members.get(user_id)
+        return None if member is None else tuple(sorted(int(role_id) for role_id in member.roles))
+
+    def roles(self) -> list[tuple[int, tuple[int, ...]]]:
+        """Get user ids of stored members with their sorted role ids."""
+        return [
+            (user_id, tuple(sorted(int(role_id) for role_id in member.roles)))
+            for user_id, member in self._members.items()
+        ]
+
+    def set(self, member: MemberResponse) -> None:
+        """Add or replace a member."""
+        if member.user is not None:
+            self._members[int(member.user.id)] = member
+
+    def pop(self, user_id: int) -> MemberResponse | None:
+        """Remove a member."""
+        return self._members.pop(user_id, None)
+
+
+class CompactMemberStore(MemberStore):
+    """Store which keeps members in columns.
+
+    Removed rows are replaced by the last row, so columns have no holes.
+    Only fields of `CompactMember` are kept.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the store."""
+        self._rows: dict[int, int] = {}
+        self._user_ids = array('q')
+        self._joined_at = array('q')
+        self._premium_since = array('q')
+        self._timeout_until = array('q')
+        self._flags = array('q')
+        self._bits = array('B')
+        self._roles: list[tuple[int, ...]] = []
+        self._nicks: list[str | None] = []
+        self._avatars: list[str | None] = []
+        self._usernames: list[str] = []
+        self._discriminators: list[str] = []
+        self._global_names: list[str | None] = []
+        self._user_avatars: list[str | None] = []
+        self._role_sets: dict[tuple[int, ...], tuple[int, ...]] = {}
+
+    def __len__(self) -> int:
+        """Get the number of members."""
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[CompactMember]:
+        """Iterate over members."""
+        return (self._materialize(row) for row in range(len(self._user_ids)))
+
+    @property
+    def role_sets(self) -> int:
+        """Number of interned role combinations."""
+        return len(self._role_sets)
+
+    def user_ids(self) -> list[int]:
+        """Get ids of stored members."""
+        return list(self._rows)
+
+    def get(self, user_id: int) -> CompactMember | None:
+        """Get a member."""
+        row = self._rows.get(user_id)
+        return None if row is None else self._materialize(row)
+
+    def get_roles(self, user_id: int) -> tuple[int, ...] | None:
+        """Get role ids of a member without materializing it."""
+        row = self._rows.get(user_id)
+        return None if row is None else self._roles[row]
+
+    def roles(self) -> list[tuple[int, tuple[int, ...]]]:
+        """Get user ids of stored members with their sorted role ids."""
+        return list(zip(self._user_ids, self._roles, strict=True))
+
+    def set(self, member: MemberResponse) -> None:
+        """Add or replace a member."""
+        user = member.user
+        if user is None:
+            return
+
+        user_id = int(user.id)
+        roles = tuple(sorted(int(role_id) for role_id in member.roles))
+        roles = self._role_sets.setdefault(roles, roles)
+        bits = (
+            (_DEAF if member.deaf else 0)
+            | (_MUTE if member.mute else 0)
+            | (_PENDING if member.pending else 0)
+            | (_PENDING_KNOWN if member.pending is not None else 0)
+            | (_BOT if user.bot else 0)
+        )
+        values = (
+            user_id,
+            _to_ms(member.joined_at),
+            _to_ms(member.premium_since),
+            _to_ms(member.communication_disabled_until),
+            int(member.flags),
+            bits,
+            roles,
+            _intern(member.nick),
+            _intern(member.avatar),
+            sys.intern(user.username),
+            sys.intern(user.discriminator),
+            _intern(user.global_name),
+            _intern(user.avatar),
+        )
+
+        row = self._rows.get(user_id)
+        if row is None:
+            self._rows[user_id] = len(self._user_ids)
+            for column, value in zip(self._columns, values, strict=True):
+                column.append(value)  # type: ignore[arg-type]
+        else:
+            for column, value in zip(self._columns, values, strict=True):
+                column[row] = value
+
+    def pop(self, user_id: int) -> CompactMember | None:
+        """Remove a member."""
+        row = self._rows.pop(user_id, None)
+        if row is None:
+            return None
+
+        member = self._materialize(row)
+        last_row = len(self._user_ids) - 1
+        if row != last_row:
+            for column in self._columns:
+                column[row] = column[last_row]
+            self._rows[self._user_ids[row]] = row
+        for column in self._columns:
+            column.pop()
+        return member
+
+    @property
+    def _columns(self) -> tuple[array[int] | list[object], ...]:
+        """Columns in the order of values of `set`."""
+        return (
+            self._user_ids,
+            self._joined_at,
+            self._premium_since,
+            self._timeout_until,
+            self._flags,
+            self._bits,
+            self._roles,  # type: ignore[return-value]
+            self._nicks,  # type: ignore[return-value]
+            self._avatars,  # type: ignore[return-value]
+            self._usernames,  # type: ignore[return-value]
+            self._discriminators,  # type: ignore[return-value]
+            self._global_names,  # type: ignore[return-value]
+            self._user_avatars,  # type: ignore[return-value]
+        )
+
+    def _materialize(self, row: int) -> CompactMember:
+        """Build a member from a row."""
+        bits = self._bits[row]
+        member = CompactMember()
+        member.user_id = self._user_ids[row]
+        member.username = self._usernames[row]
+        member.discriminator = self._discriminators[row]
+        member.global_name = self._global_names[row]
+        member.user_avatar = self._user_avatars[row]
+        member.bot = bool(bits & _BOT)
+        member.nick = self._nicks[row]
+        member.avatar = self._avatars[row]
+        member.roles = self._roles[row]
+        member.joined_at = _from_ms(self._joined_at[row])
+        member.premium_since = _from_ms(self._premium_since[row])
+        member.communication_disabled_until = _from_ms(self._timeout_until[row])
+        member.deaf = bool(bits & _DEAF)
+        member.mute = bool(bits & _MUTE)
+        member.pending = bool(bits & _PENDING) if bits & _PENDING_KNOWN else None
+        member.flags = GuildMemberFlags(self._flags[row])
+        return member
@@ -0,0 +1,305 @@
+"""This module contains the message cache of the entity cache.
+
+Update and delete events carry only the new state or ids of messages. The message
+cache keeps recent messages of every channel, so these events can carry the prior version:
+
+    cache = EntityCache(messages=MessageCache(max_messages=100))
+    client_group.gateway_client.cache = cache
+
+    @client_group.add_handler
+    async def on_delete(event: MessageDeleteEvent) -> None:
+        if event.cached_message is not None:
+            logger.info('Deleted: %s', event.cached_message.content)
+
+Messages are kept as `CachedMessage` tuples with the content and ids only.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import sys
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from typing import Any, Final
+
+from asyncord.gateway.cache.policies import CacheStats
+from asyncord.gateway.events.base import GatewayEvent
+from asyncord.gateway.events.channels import ChannelDeleteEvent, ThreadDeleteEvent
+from asyncord.gateway.events.messages import (
+    CachedMessage,
+    MessageCreateEvent,
+    MessageDeleteBulkEvent,
+    MessageDeleteEvent,
+    MessageUpdateEvent,
+)
+
+__all__ = (
+    'DEFAULT_CHANNEL_MESSAGES',
+    'DEFAULT_MESSAGE_CACHE_BYTES',
+    'MessageCache',
+)
+
+DEFAULT_CHANNEL_MESSAGES: Final[int] = 100
+"""Default number of messages kept per channel."""
+
+DEFAULT_MESSAGE_CACHE_BYTES: Final[int] = 64 * 1024 * 1024
+"""Default maximum estimated size of all cached messages in bytes."""
+
+_MESSAGE_OVERHEAD: Final[int] = 400
+"""Estimated size of a cached message without its content and attachments in bytes.
+
+It includes the tuple, int objects of ids and the entry of the channel buffer.
+"""
+
+_ATTACHMENT_SIZE: Final[int] = 40
+"""Estimated size of an attachment id in bytes."""
+
+
+def _message_size(message: CachedMessage) -> int:
+    """Estimate the size of a cached message."""
+    return _MESSAGE_OVERHEAD + sys.getsizeof(message.content) + _ATTACHMENT_SIZE * len(message.attachment_ids)
+
+
+class _ChannelBuffer:
+    """Ring buffer of recent messages of a channel."""
+
+    __slots__ = ('max_messages', 'messages')
+
+    def __init__(self, max_messages: int) -> None:
+        self.max_messages = max_messages
+        self.messages: OrderedDict[int, CachedMessage] = OrderedDict()
+
+
+class MessageCache:
+    """Cache of recent messages of every channel.
+
+    Every channel keeps the latest `max_messages` messages unless another size is
+    set for it. When the estimated size of all messages exceeds `max_bytes`, the
+    oldest messages of the least recently active channels are evicted.
+
+    Attributes:
+        max_messages: Number of messages kept per channel.
+        max_bytes: Maximum estimated size of all cached messages in bytes.
+    """
+
+    def __init__(
+        self,
+        max_messages: int = DEFAULT_CHANNEL_MESSAGES,
+        max_bytes: int = DEFAULT_MESSAGE_CACHE_BYTES,
+        channel_sizes: Mapping[int, int] | None = None,
+    ) -> None:
+        """Initialize the message cache.
+
+        Args:
+            max_messages: Number of messages kept per channel.
+            max_bytes: Maximum estimated size of all cached messages in bytes.
+            channel_sizes: Numbers of messages kept in specific channels. Zero
+                disables caching of the channel.
+        """
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+
+        self._channel_sizes = dict(channel_sizes or {})
+        self._channels: OrderedDict[int, _ChannelBuffer] = OrderedDict()
+        self._stats = CacheStats()
+        self._updaters: dict[type[GatewayEvent], Callable[[Any], None]] = {
+            MessageCreateEvent: self._on_message_create,
+            MessageUpdateEvent: self._on_message_update,
+            MessageDeleteEvent: self._on_message_delete,
+            MessageDeleteBulkEvent: self._on_message_delete_bulk,
+            ChannelDeleteEvent: self._on_channel_delete,
+            ThreadDeleteEvent: self._on_channel_delete,
+        }
+
+    @property
+    def event_types(self) -> frozenset[type[GatewayEvent]]:
+        """Event types which update the cache."""
+        return frozenset(self._updaters)
+
+    @property
+    def stats(self) -> CacheStats:
+        """Snapshot of counters of cached messages.
+
+        Lookups of update and delete events are counted as hits and misses too.
+        """
+        entries = sum(len(buffer.messages) for buffer in self._channels.values())
+        return dataclasses.replace(self._stats, entries=entries)
+
+    def update(self, event: GatewayEvent) -> None:
+        """Update the cache with an event.
+
+        Update and delete events get the cached prior version of their messages.
+
+        Args:
+            event: Dispatched event. Events which don't update the cache are ignored.
+        """
+        updater = self._updaters.get(type(event))
+        if updater is not None:
+            updater(event)
+
+    def set_channel_size(self, channel_id: int, max_messages: int | None) -> None:
+        """Set the number of messages kept in a channel.
+
+        Args:
+            channel_id: Channel id.
+            max_messages: Number of messages to keep. Zero disables caching of
+                the channel, None resets it to the default size.
+        """
+        if max_messages is None:
+            self._channel_sizes.pop(channel_id, None)
+        else:
+            self._channel_sizes[channel_id] = max_messages
+
+        buffer = self._channels.get(channel_id)
+        if buffer is not None:
+            buffer.max_messages = self.max_messages if max_messages is None else max_messages
+            self._trim(buffer)
+            if not buffer.messages:
+                del self._channels[channel_id]
+
+    def get(self, channel_id: int, message_id: int) -> CachedMessage | None:
+        """Get a cached message.
+
+        Args:
+            channel_id: Channel id.
+            message_id: Message id.
+
+        Returns:
+            Message or None if it's not cached.
+        """
+        buffer = self._channels.get(channel_id)
+        message = None if buffer is None else buffer.messages.get(message_id)
+        if message is None:
+            self._stats.misses += 1
+        else:
+            self._stats.hits += 1
+        return message
+
+    def channel_messages(self, channel_id: int) -> list[CachedMessage]:
+        """Get cached messages of a channel from the oldest to the newest.
+
+        Args:
+            channel_id: Channel id.
+        """
+        buffer = self._channels.get(channel_id)
+        return [] if buffer is None else list(buffer.messages.values())
+
+    def clear(self) -> None:
+        """Remove all cached messages."""
+        self._channels.clear()
+        self._stats.bytes = 0
+
+    def clear_guild(self, guild_id: int) -> None:
+        """Remove cached messages of a guild.
+
+        Args:
+            guild_id: Guild id.
+        """
+        for channel_id, buffer in list(self._channels.items()):
+            message = next(iter(buffer.messages.values()))
+            if message.guild_id == guild_id:
+                self._remove_channel(channel_id)
+
+    def _on_message_create(self, event: MessageCreateEvent) -> None:
+        """Cache a created message."""
+        channel_id = int(event.channel_id)
+        buffer = self._channels.get(channel_id)
+        if buffer is None:
+            max_messages = self._channel_sizes.get(channel_id, self.max_messages)
+            if max_messages <= 0:
+                return
+            buffer = self._channels[channel_id] = _ChannelBuffer(max_messages)
+        else:
+            self._channels.move_to_end(channel_id)
+
+        message = CachedMessage(
+            id=int(event.id),
+            channel_id=channel_id,
+            guild_id=None if event.guild_id is None else int(event.guild_id),
+            author_id=int(event.author.id),
+            content=event.content,
+            edited_timestamp=event.edited_timestamp,
+            attachment_ids=tuple(int(attachment.id) for attachment in event.attachments),
+        )
+        self._put(buffer, message)
+        self._trim(buffer)
+        self._enforce_budget()
+
+    def _on_message_update(self, event: MessageUpdateEvent) -> None:
+        """Attach the prior version to the event and cache the new one."""
+        message = self.get(int(event.channel_id), int(event.id))
+        if message is None:
+            return
+
+        event.cached_message = message
+        updated = message._replace(
+            content=message.content if event.content is None else event.content,
+            edited_timestamp=event.edited_timestamp or message.edited_timestamp,
+            attachment_ids=(
+                message.attachment_ids
+                if event.attachments is None
+                else tuple(int(attachment.id) for attachment in event.attachments)
+            ),
+        )
+        self._put(self._channels[message.channel_id], updated)
+        self._enforce_budget()
+
+    def _on_message_delete(self, event: MessageDeleteEvent) -> None:
+        """Attach the deleted message to the event and remove it."""
+        event.cached_message = self._pop(int(event.channel_id), int(event.id))
+
+    def _on_message_delete_bulk(self, event: MessageDeleteBulkEvent) -> None:
+        """Attach the deleted messages to the event and remove them."""
+        channel_id = int(event.channel_id)
+        messages = (self._pop(channel_id, int(message_id)) for message_id in event.ids)
+        event.cached_messages = [message for message in messages if message is not None]
+
+    def _on_channel_delete(self, event: ChannelDeleteEvent | ThreadDeleteEvent) -> None:
+        """Remove messages of the deleted channel."""
+        self._remove_channel(int(event.id))
+        self._channel_sizes.pop(int(event.id), None)
+
+    def _remove_channel(self, channel_id: int) -> None:
+        """Remove all messages of a channel."""
+        buffer = self._channels.pop(channel_id, None)
+        if buffer is not None:
+            self._stats.bytes -= sum(_message_size(message) for message in buffer.messages.values())
+
+    def _put(self, buffer: _ChannelBuffer, message: CachedMessage) -> None:
+        """Add or replace a message of the buffer."""
+        previous = buffer.messages.get(message.id)
+        if previous is not None:
+            self._stats.bytes -= _message_size(previous)
+        buffer.messages[message.id] = message
+        self._stats.bytes += _message_size(message)
+
+    def _pop(self, channel_id: int, message_id: int) -> CachedMessage | None:
+        """Remove a message."""
+        buffer = self._channels.get(channel_id)
+        message = None if buffer is None else buffer.messages.pop(message_id, None)
+        if message is None:
+            self._stats.misses += 1
+            return None
+
+        self._stats.hits += 1
+        self._stats.bytes -= _message_size(message)
+        if not buffer.messages:  # type: ignore[union-attr]
+            del self._channels[channel_id]
+        return message
+
+    def _trim(self, buffer: _ChannelBuffer) -> None:
+        """Evict the oldest messages of the buffer over its size."""
+        while len(buffer.messages) > max(buffer.max_messages, 0):
+            _, message = buffer.messages.popitem(last=False)
+            self._stats.bytes -= _message_size(message)
+            self._stats.evictions += 1
+
+    def _enforce_budget(self) -> None:
+        """Evict messages of the least recently active channels over the memory cap."""
+        while self._stats.bytes > self.max_bytes and self._channels:
+            channel_id, buffer = next(iter(self._channels.items()))
+            _, message = buffer.messages.popitem(last=False)
+            self._stats.bytes -= _message_size(message)
+            self._stats.evictions += 1
+            if not buffer.messages:
+                del self._channels[channel_id]
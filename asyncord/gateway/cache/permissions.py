@@ -0,0 +1,367 @@
+"""This module contains the permission resolver of the entity cache.
+
+Effective permissions of a member in a channel depend on the @everyone role, roles
+of the member, and overwrites of the channel for @everyone, the roles and the member:
+https://discord.com/developers/docs/topics/permissions#permission-overwrites
+
+Most members of a guild share a few role combinations, so the resolver memoizes
+permissions per channel and role set. Only member overwrites and the guild owner
+are checked per member, which makes batch checks of large guilds cheap:
+
+    resolver = cache.permissions
+    readers = resolver.members_with(channel_id, PermissionFlag.VIEW_CHANNEL)
+
+Memoized permissions are invalidated by role, guild and channel events. Member updates
+don't invalidate anything because members are mapped to role sets on every lookup.
+"""
+
+from __future__ import annotations
+
+import functools
+import operator
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Final
+
+from asyncord.client.channels.models.common import OverwriteType
+from asyncord.client.channels.models.responses import ChannelResponse
+from asyncord.client.models.permissions import PermissionFlag
+from asyncord.gateway.cache.policies import CacheStats
+from asyncord.gateway.events.channels import ChannelDeleteEvent, ChannelUpdateEvent
+from asyncord.gateway.events.guilds import (
+    GuildCreateEvent,
+    GuildDeleteEvent,
+    GuildRoleCreateEvent,
+    GuildRoleDeleteEvent,
+    GuildRoleUpdateEvent,
+    GuildUpdateEvent,
+)
+
+if TYPE_CHECKING:
+    from asyncord.gateway.cache.entity_cache import EntityCache
+    from asyncord.gateway.events.base import GatewayEvent
+
+__all__ = ('ALL_PERMISSIONS', 'PermissionResolver')
+
+ALL_PERMISSIONS: Final[PermissionFlag] = functools.reduce(operator.or_, PermissionFlag)
+"""All permissions, granted to administrators and guild owners."""
+
+_GUILD_LEVEL: Final[int] = 0
+"""Channel id of memoized guild permissions without overwrites."""
+
+
+class _Overwrites:
+    """Overwrites of a channel by target."""
+
+    __slots__ = ('everyone', 'members', 'roles')
+
+    def __init__(self, guild_id: int, channel: ChannelResponse) -> None:
+        self.everyone = (0, 0)
+        self.roles: dict[int, tuple[int, int]] = {}
+        self.members: dict[int, tuple[int, int]] = {}
+        for overwrite in channel.permission_overwrites or ():
+            target_id = int(overwrite.id)
+            pair = (int(overwrite.allow), int(overwrite.deny))
+            if overwrite.type == OverwriteType.USER:
+                self.members[target_id] = pair
+            elif target_id == guild_id:
+                self.everyone = pair
+            else:
+                self.roles[target_id] = pair
+
+
+class _GuildMemo:
+    """Memoized permissions of a guild."""
+
+    __slots__ = ('overwrites', 'permissions')
+
+    def __init__(self) -> None:
+        self.permissions: dict[tuple[int, tuple[int, ...]], int] = {}
+        self.overwrites: dict[int, _Overwrites] = {}
+
+    def drop_role(self, role_id: int) -> None:
+        """Forget permissions of role sets with the role."""
+        for key in [key for key in self.permissions if role_id in key[1]]:
+            del self.permissions[key]
+
+    def drop_channel(self, channel_id: int) -> None:
+        """Forget permissions and overwrites of the channel."""
+        self.overwrites.pop(channel_id, None)
+        for key in [key for key in self.permissions if key[0] == channel_id]:
+            del self.permissions[key]
+
+
+class PermissionResolver:
+    """Resolver of effective permissions over cached entities.
+
+    It needs cached guilds, roles and channels. Members are needed only to resolve
+    permissions by user ids, role ids can be passed directly instead.
+
+    Threads have permissions of their parent channels. Members without
+    the `VIEW_CHANNEL` permission implicitly have no permissions in the channel.
+    """
+
+    def __init__(self, cache: EntityCache) -> None:
+        """Initialize the permission resolver.
+
+        Args:
+            cache: Cache of guild entities.
+        """
+        self.cache = cache
+        self._guilds: dict[int, _GuildMemo] = {}
+        self._stats = CacheStats()
+
+    @property
+    def stats(self) -> CacheStats:
+        """Snapshot of counters of memoized permissions."""
+        entries = sum(len(memo.permissions) for memo in self._guilds.values())
+        return CacheStats(entries=entries, hits=self._stats.hits, misses=self._stats.misses)
+
+    def guild_permissions(self, guild_id: int, user_id: int) -> PermissionFlag | None:
+        """Get permissions of a member in the guild without channel overwrites.
+
+        Args:
+            guild_id: Guild id.
+            user_id: User id.
+
+        Returns:
+            Permissions or None if the member is not cached.
+        """
+        roles = self.cache.member_roles(guild_id, user_id)
+        if roles is None:
+            return None
+        if self._owner_id(guild_id) == user_id:
+            return ALL_PERMISSIONS
+        return PermissionFlag(self._memoized(guild_id, None, roles))
+
+    def channel_permissions(self, channel_id: int, user_id: int) -> PermissionFlag | None:
+        """Get permissions of a member in a channel or thread.
+
+        Args:
+            channel_id: Channel or thread id.
+            user_id: User id.
+
+        Returns:
+            Permissions or None if the channel or the member is not cached.
+        """
+        channel = self._permission_channel(channel_id)
+        if channel is None:
+            return None
+
+        guild_id = int(channel.guild_id)  # type: ignore[arg-type]
+        roles = self.cache.member_roles(guild_id, user_id)
+        if roles is None:
+            return None
+        owner_id = self._owner_id(guild_id)
+        return PermissionFlag(self._member_permissions(guild_id, channel, user_id, roles, owner_id))
+
+    def role_permissions(
+        self,
+        guild_id: int,
+        role_ids: Iterable[int],
+        channel_id: int | None = None,
+    ) -> PermissionFlag:
+        """Get permissions of a role set.
+
+        Member overwrites and the guild owner are not taken into account.
+
+        Args:
+            guild_id: Guild id.
+            role_ids: Role ids, the @everyone role is always included.
+            channel_id: Channel or thread id to apply overwrites of. Guild permissions
+                are returned if it's None or the channel is not cached.
+
+        Returns:
+            Permissions of the role set.
+        """
+        channel = None if channel_id is None else self._permission_channel(channel_id)
+        roles = tuple(sorted({int(role_id) for role_id in role_ids}))
+        permissions = self._memoized(guild_id, channel, roles)
+        if channel is not None:
+            permissions = self._implicit(permissions)
+        return PermissionFlag(permissions)
+
+    def members_with(
+        self,
+        channel_id: int,
+        permissions: PermissionFlag = PermissionFlag.VIEW_CHANNEL,
+        user_ids: Iterable[int] | None = None,
+    ) -> list[int]:
+        """Get members which have permissions in a channel.
+
+        Args:
+            channel_id: Channel or thread id.
+            permissions: Permissions to check, all of them are required.
+            user_ids: User ids to check. All cached members are checked if it's None,
+                members which are not cached are skipped.
+
+        Returns:
+            User ids of members which have the permissions.
+        """
+        channel = self._permission_channel(channel_id)
+        if channel is None:
+            return []
+
+        guild_id = int(channel.guild_id)  # type: ignore[arg-type]
+        if user_ids is None:
+            members = self.cache.guild_member_roles(guild_id)
+        else:
+            members = [(user_id, self.cache.member_roles(guild_id, user_id)) for user_id in user_ids]
+
+        owner_id = self._owner_id(guild_id)
+        member_overwrites = self._overwrites(guild_id, channel).members
+        required = int(permissions)
+        # members without own overwrites are checked once per role set
+        allowed_role_sets: dict[tuple[int, ...], bool] = {}
+        user_ids_with: list[int] = []
+        for user_id, roles in members:
+            if roles is None:
+                continue
+
+            if user_id in member_overwrites or user_id == owner_id:
+                allowed = self._member_permissions(guild_id, channel, user_id, roles, owner_id) & required == required
+            else:
+                allowed = allowed_role_sets.get(roles)  # type: ignore[assignment]
+                if allowed is None:
+                    role_set_permissions = self._implicit(self._memoized(guild_id, channel, roles))
+                    allowed = allowed_role_sets[roles] = role_set_permissions & required == required
+
+            if allowed:
+                user_ids_with.append(user_id)
+        return user_ids_with
+
+    def invalidate(self, event: GatewayEvent) -> None:
+        """Forget permissions which depend on entities changed by the event.
+
+        Args:
+            event: Event which updated the cache.
+        """
+        match event:
+            case GuildCreateEvent() | GuildUpdateEvent() | GuildDeleteEvent():
+                self.invalidate_guild(int(event.id))
+            case GuildRoleCreateEvent() | GuildRoleUpdateEvent():
+                self._invalidate_role(int(event.guild_id), int(event.role.id))
+            case GuildRoleDeleteEvent():
+                self._invalidate_role(int(event.guild_id), int(event.role_id))
+            case ChannelUpdateEvent() | ChannelDeleteEvent() if event.guild_id is not None:
+                memo = self._guilds.get(int(event.guild_id))
+                if memo is not None:
+                    memo.drop_channel(int(event.id))
+
+    def invalidate_guild(self, guild_id: int) -> None:
+        """Forget all permissions of a guild.
+
+        Args:
+            guild_id: Guild id.
+        """
+        self._guilds.pop(guild_id, None)
+
+    def clear(self) -> None:
+        """Forget all permissions."""
+        self._guilds.clear()
+
+    def _invalidate_role(self, guild_id: int, role_id: int) -> None:
+        """Forget permissions of role sets with the role."""
+        if role_id == guild_id:
+            # the @everyone role is a part of every role set
+            self.invalidate_guild(guild_id)
+            return
+
+        memo = self._guilds.get(guild_id)
+        if memo is not None:
+            memo.drop_role(role_id)
+
+    def _permission_channel(self, channel_id: int) -> ChannelResponse | None:
+        """Get the channel which defines permissions of a channel or thread."""
+        channel = self.cache.get_channel(channel_id)
+        if channel is None:
+            thread = self.cache.get_thread(channel_id)
+            if thread is None or thread.parent_id is None:
+                return None
+            channel = self.cache.get_channel(int(thread.parent_id))
+        return channel if channel is not None and channel.guild_id is not None else None
+
+    def _owner_id(self, guild_id: int) -> int | None:
+        """Get the id of the guild owner."""
+        guild = self.cache.get_guild(guild_id)
+        return None if guild is None else int(guild.owner_id)
+
+    def _member_permissions(
+        self,
+        guild_id: int,
+        channel: ChannelResponse,
+        user_id: int,
+        roles: tuple[int, ...],
+        owner_id: int | None,
+    ) -> int:
+        """Get permissions of a member in a channel."""
+        permissions = self._memoized(guild_id, channel, roles)
+        if permissions & PermissionFlag.ADMINISTRATOR or user_id == owner_id:
+            return ALL_PERMISSIONS
+
+        member_overwrite = self._overwrites(guild_id, channel).members.get(user_id)
+        if member_overwrite is not None:
+            allow, deny = member_overwrite
+            permissions = (permissions & ~deny) | allow
+        return self._implicit(permissions)
+
+    def _memoized(self, guild_id: int, channel: ChannelResponse | None, roles: tuple[int, ...]) -> int:
+        """Get memoized permissions of a role set."""
+        memo = self._guilds.get(guild_id)
+        if memo is None:
+            memo = self._guilds[guild_id] = _GuildMemo()
+
+        key = (_GUILD_LEVEL if channel is None else int(channel.id), roles)
+        permissions = memo.permissions.get(key)
+        if permissions is not None:
+            self._stats.hits += 1
+            return permissions
+
+        self._stats.misses += 1
+        permissions = self._role_set_permissions(guild_id, channel, roles)
+        memo.permissions[key] = permissions
+        return permissions
+
+    def _role_set_permissions(self, guild_id: int, channel: ChannelResponse | None, roles: tuple[int, ...]) -> int:
+        """Compute permissions of a role set."""
+        everyone = self.cache.get_role(guild_id)
+        permissions = 0 if everyone is None else int(everyone.permissions)
+        for role_id in roles:
+            role = self.cache.get_role(role_id)
+            if role is not None:
+                permissions |= int(role.permissions)
+
+        if permissions & PermissionFlag.ADMINISTRATOR:
+            return ALL_PERMISSIONS
+        if channel is None:
+            return permissions
+
+        overwrites = self._overwrites(guild_id, channel)
+        allow, deny = overwrites.everyone
+        permissions = (permissions & ~deny) | allow
+
+        allow = deny = 0
+        for role_id in roles:
+            role_overwrite = overwrites.roles.get(role_id)
+            if role_overwrite is not None:
+                allow |= role_overwrite[0]
+                deny |= role_overwrite[1]
+        return (permissions & ~deny) | allow
+
+    def _overwrites(self, guild_id: int, channel: ChannelResponse) -> _Overwrites:
+        """Get parsed overwrites of a channel."""
+        memo = self._guilds.get(guild_id)
+        if memo is None:
+            memo = self._guilds[guild_id] = _GuildMemo()
+
+        channel_id = int(channel.id)
+        overwrites = memo.overwrites.get(channel_id)
+        if overwrites is None:
+            overwrites = memo.overwrites[channel_id] = _Overwrites(guild_id, channel)
+        return overwrites
+
+    @staticmethod
+    def _implicit(permissions: int) -> int:
+        """Drop channel permissions of members which can't view the channel."""
+        if permissions & PermissionFlag.ADMINISTRATOR or permissions & PermissionFlag.VIEW_CHANNEL:
+            return permissions
+        return 0
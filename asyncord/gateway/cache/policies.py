@@ -0,0 +1,272 @@
+"""This module contains eviction policies of the entity cache.
+
+Without limits the cache grows with every guild, member and thread the bot sees.
+A policy bounds one entity type by the number of entries, by the estimated
+size in bytes and by the time since the entry was last seen.
+"""
+
+from __future__ import annotations
+
+import sys
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Final, Self
+
+from pydantic import BaseModel
+
+__all__ = ('CachePolicy', 'CacheStats', 'PolicyTracker', 'estimate_size')
+
+_MAX_SIZE_DEPTH: Final[int] = 8
+"""Maximum depth of nested objects to count in size estimations."""
+
+
+@dataclass(frozen=True, slots=True)
+class CachePolicy:
+    """Limits of cached entities of one type.
+
+    Entries are ordered by the time they were last touched. Updates always touch
+    an entry, lookups touch it only if `refresh_on_access` is set. When a limit
+    is exceeded, the least recently touched entries are evicted.
+    """
+
+    max_entries: int | None = None
+    """Maximum number of entries."""
+
+    max_bytes: int | None = None
+    """Maximum estimated size of entries in bytes."""
+
+    expire_after: float | None = None
+    """Time in seconds after the last touch when an entry expires."""
+
+    refresh_on_access: bool = True
+    """Whether lookups touch entries."""
+
+    @classmethod
+    def lru(cls, max_entries: int | None = None, max_bytes: int | None = None) -> Self:
+        """Create a policy which evicts the least recently used entries.
+
+        Args:
+            max_entries: Maximum number of entries.
+            max_bytes: Maximum estimated size of entries in bytes.
+        """
+        return cls(max_entries=max_entries, max_bytes=max_bytes)
+
+    @classmethod
+    def ttl(cls, seconds: float, max_entries: int | None = None, max_bytes: int | None = None) -> Self:
+        """Create a policy which evicts entries not updated for some time.
+
+        Lookups don't extend the life of entries, so data is never older than `seconds`.
+
+        Args:
+            seconds: Time to live of entries in seconds.
+            max_entries: Maximum number of entries.
+            max_bytes: Maximum estimated size of entries in bytes.
+        """
+        return cls(max_entries=max_entries, max_bytes=max_bytes, expire_after=seconds, refresh_on_access=False)
+
+    @classmethod
+    def seen_within(cls, seconds: float, max_entries: int | None = None, max_bytes: int | None = None) -> Self:
+        """Create a policy which keeps only entries seen recently.
+
+        Entries are seen when they are updated by events or looked up, for example
+        only members active in the last 10 minutes are kept with `seen_within(600)`.
+
+        Args:
+            seconds: Time in seconds since the entry was seen.
+            max_entries: Maximum number of entries.
+            max_bytes: Maximum estimated size of entries in bytes.
+        """
+        return cls(max_entries=max_entries, max_bytes=max_bytes, expire_after=seconds)
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """Counters of cached entities of one type."""
+
+    entries: int = 0
+    """Number of cached entries."""
+
+    bytes: int = 0
+    """Estimated size of entries in bytes, counted only with a byte budget."""
+
+    hits: int = 0
+    """Number of lookups which found an entry."""
+
+    misses: int = 0
+    """Number of lookups which didn't find an entry."""
+
+    evictions: int = 0
+    """Number of entries evicted by the policy."""
+
+
+def estimate_size(obj: Any) -> int:  # noqa: ANN401
+    """Estimate the memory taken by an object with its nested objects.
+
+    Fields of models, items of containers and values of dicts are counted,
+    objects shared within `obj` are counted once.
+
+    Args:
+        obj: Object to estimate.
+
+    Returns:
+        Estimated size in bytes.
+    """
+    return _estimate_size(obj, set(), 0)
+
+
+def _estimate_size(obj: Any, seen: set[int], depth: int) -> int:  # noqa: ANN401
+    """Estimate the size of an object which wasn't counted yet."""
+    if id(obj) in seen or depth > _MAX_SIZE_DEPTH:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    match obj:
+        case BaseModel():
+            size += _estimate_size(obj.__dict__, seen, depth + 1)
+        case dict():
+            size += sum(
+                _estimate_size(key, seen, depth + 1) + _estimate_size(value, seen, depth + 1)
+                for key, value in obj.items()
+            )
+        case list() | tuple() | set() | frozenset():
+            size += sum(_estimate_size(item, seen, depth + 1) for item in obj)
+        case _ if hasattr(obj, '__slots__'):
+            size += sum(_estimate_size(getattr(obj, name, None), seen, depth + 1) for name in obj.__slots__)
+    return size
+
+
+@dataclass(slots=True)
+class _TrackedEntry:
+    """Bookkeeping of a cached entry."""
+
+    size: int
+    """Estimated size of the entry in bytes."""
+
+    touched_at: float
+    """Time of the last touch."""
+
+
+class PolicyTracker[KEY_T: Hashable]:
+    """Tracks cached entries of one type and decides which of them to evict.
+
+    The tracker doesn't hold entities, the owner removes evicted keys from its storage.
+
+    Attributes:
+        policy: Policy to apply.
+        stats: Counters to update.
+    """
+
+    def __init__(self, policy: CachePolicy, stats: CacheStats) -> None:
+        """Initialize the policy tracker.
+
+        Args:
+            policy: Policy to apply.
+            stats: Counters to update.
+        """
+        self.policy = policy
+        self.stats = stats
+        self._entries: OrderedDict[KEY_T, _TrackedEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Get the number of tracked entries."""
+        return len(self._entries)
+
+    @property
+    def tracks_size(self) -> bool:
+        """Whether entries must be passed with their sizes."""
+        return self.policy.max_bytes is not None
+
+    def touch(self, key: KEY_T, size: int = 0) -> list[KEY_T]:
+        """Add or update an entry.
+
+        Args:
+            key: Key of the entry.
+            size: Estimated size of the entry, used only with a byte budget.
+
+        Returns:
+            Keys of evicted entries. It can include the key itself if the entry
+            alone doesn't fit the byte budget.
+        """
+        now = monotonic()
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = _TrackedEntry(size, now)
+        else:
+            self.stats.bytes -= entry.size
+            entry.size = size
+            entry.touched_at = now
+            self._entries.move_to_end(key)
+        self.stats.bytes += size
+        return self._evict(now)
+
+    def access(self, key: KEY_T) -> bool:
+        """Register a lookup of an entry.
+
+        Args:
+            key: Key of the entry.
+
+        Returns:
+            False if the entry is expired. It's forgotten and must be removed by the owner.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return True
+
+        now = monotonic()
+        if self._is_expired(entry, now):
+            self.discard(key)
+            self.stats.evictions += 1
+            return False
+
+        if self.policy.refresh_on_access:
+            entry.touched_at = now
+            self._entries.move_to_end(key)
+        return True
+
+    def expire(self) -> list[KEY_T]:
+        """Forget expired entries.
+
+        Returns:
+            Keys of expired entries.
+        """
+        return self._evict(monotonic())
+
+    def discard(self, key: KEY_T) -> None:
+        """Forget an entry removed by the owner.
+
+        Args:
+            key: Key of the entry.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.stats.bytes -= entry.size
+
+    def clear(self) -> None:
+        """Forget all entries."""
+        self._entries.clear()
+        self.stats.bytes = 0
+
+    def _is_expired(self, entry: _TrackedEntry, now: float) -> bool:
+        """Check if the entry is expired."""
+        expire_after = self.policy.expire_after
+        return expire_after is not None and now - entry.touched_at > expire_after
+
+    def _evict(self, now: float) -> list[KEY_T]:
+        """Forget expired entries and entries over the limits."""
+        policy = self.policy
+        evicted = []
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            over_entries = policy.max_entries is not None and len(self._entries) > policy.max_entries
+            over_bytes = policy.max_bytes is not None and self.stats.bytes > policy.max_bytes
+            if not (over_entries or over_bytes or self._is_expired(entry, now)):
+                break
+
+            self.discard(key)
+            evicted.append(key)
+
+        self.stats.evictions += len(evicted)
+        return evicted
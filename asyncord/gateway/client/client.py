@@ -7,10 +7,11 @@ Also contains some useful types and classes for the gateway client.
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import logging
-from collections.abc import Mapping
+from collections.abc import Awaitable, Callable, Iterable, Mapping
 from types import MappingProxyType
-from typing import TYPE_CHECKING, Any, Protocol, runtime_checkable
+from typing import TYPE_CHECKING, Any, Final, Literal, Protocol, runtime_checkable
 
 import aiohttp
 from pydantic import BaseModel
@@ -18,37 +19,94 @@ from yarl import URL
 
 from asyncord.gateway.client import errors, opcode_handlers
 from asyncord.gateway.client.heartbeat import Heartbeat
+from asyncord.gateway.client.large_frames import LARGE_FRAME_SIZE, decode_large_frame
+from asyncord.gateway.client.latency import LatencySnapshot, LatencyTracker
+from asyncord.gateway.client.member_requests import DEFAULT_CHUNK_TIMEOUT, GuildMembersRequest, MemberRequestRegistry
+from asyncord.gateway.client.send_queue import CommandRateLimiter, GatewaySendQueue
+from asyncord.gateway.client.session_store import SessionState
+from asyncord.gateway.commands import RequestGuildMembersCommand
 from asyncord.gateway.dispatcher import EventDispatcher
-from asyncord.gateway.intents import DEFAULT_INTENTS
+from asyncord.gateway.intents import AUTO_INTENTS, DEFAULT_INTENTS, intents_for_events
 from asyncord.gateway.message import (
+    DispatchEnvelope,
     DispatchMessage,
     GatewayCommandOpcode,
-    GatewayMessageAdapter,
     GatewayMessageOpcode,
+    parse_gateway_message,
 )
+from asyncord.gateway.readiness import ReadinessTracker, ShardReadyEvent
 from asyncord.logger import NameLoggerAdapter
 from asyncord.urls import GATEWAY_URL
 
 if TYPE_CHECKING:
     from asyncord.client.http.middleware.auth import BotTokenAuthStrategy
+    from asyncord.gateway.cache.entity_cache import EntityCache
+    from asyncord.gateway.client.prefilter import PayloadFilter
+    from asyncord.gateway.client.session_store import SessionStore
     from asyncord.gateway.commands import IdentifyCommand, PresenceUpdateData, ResumeCommand
     from asyncord.gateway.intents import Intent
     from asyncord.gateway.message import DatalessMessage, GatewayMessageType
+    from asyncord.gateway.relay import EventRelayServer
+    from asyncord.snowflake import SnowflakeInputType
 
 __all__ = (
+    'RESUMABLE_CLOSE_CODE',
     'ConnectionData',
     'GatewayClient',
     'HeartbeatFactoryProtocol',
     'HeartbeatProtocol',
+    'IdentifyGate',
 )
 
 logger = logging.getLogger(__name__)
 
+RESUMABLE_CLOSE_CODE: Final[int] = 4000
+"""Close code which keeps the session resumable.
+
+The gateway invalidates the session if the connection is closed with 1000 or 1001.
+"""
+
+_DIRECT_OPCODES: Final[frozenset[GatewayCommandOpcode]] = frozenset({
+    GatewayCommandOpcode.HEARTBEAT,
+    GatewayCommandOpcode.IDENTIFY,
+    GatewayCommandOpcode.RESUME,
+})
+"""Commands which skip the queue.
+
+Identify and resume must be the first commands on a new connection, and the heartbeat
+must not be delayed.
+"""
+
+type IdentifyGate = Callable[[int], Awaitable[None]]
+"""Type alias for a function to wait for the permission to identify a shard."""
+
 
 class GatewayClient:
     """Client used to connect to the Discord gateway.
 
     It's main entity used to connect to the Discord gateway and send/proccess messages.
+
+    Attributes:
+        session_store: Store to keep the session between process restarts. If set,
+            the client tries to resume the saved session on start and saves
+            the session on close.
+        shard: Shard id and number of shards to identify with.
+        identify_gate: Function to wait for before identifying. It's called with
+            the shard id and used to share the identify rate limit between clients.
+        event_relay: Relay to send raw dispatch payloads to subscriber processes.
+        cache: Entity cache to update with received events. It's updated before
+            events are dispatched, so it can be ahead of events queued by
+            a partitioned dispatcher.
+        stream_large_guilds: Whether to decode large `GUILD_CREATE` frames incrementally.
+            Members are fed to the cache in chunks without blocking the event loop,
+            and the dispatched event has no members and presences. It's used only
+            with a cache, without an event relay, and without a payload filter,
+            which could drop the guild after its members are cached.
+        readiness: Tracker of guilds loading after READY. It dispatches `ShardReadyEvent`
+            when all guilds have arrived, even if their handlers are still queued.
+        member_requests: Registry of member requests waiting for their chunks.
+        payload_filter: Filter of raw payloads applied before validation. Dropped events
+            are not validated, cached, or dispatched.
     """
 
     def __init__(
@@ -57,7 +115,7 @@ class GatewayClient:
         token: str | BotTokenAuthStrategy,
         session: aiohttp.ClientSession,
         conn_data: ConnectionData | None = None,
-        intents: Intent = DEFAULT_INTENTS,
+        intents: Intent | Literal['auto'] = DEFAULT_INTENTS,
         heartbeat_class: type[HeartbeatProtocol] | HeartbeatFactoryProtocol = Heartbeat,
         dispatcher: EventDispatcher | None = None,
         name: str | None = None,
@@ -68,7 +126,8 @@ class GatewayClient:
             token: Token used to connect to the gateway.
             session: Client session used to connect to the gateway.
             conn_data: Data used to connect or resume to the gateway.
-            intents: Intents to use for the client.
+            intents: Intents to use for the client. With `AUTO_INTENTS`, the minimal intents
+                are computed from handled events on identify.
             heartbeat_class: Class used to create the heartbeat for the client.
             dispatcher: Event dispatcher used to dispatch events.
             name: Name of the client.
@@ -87,6 +146,15 @@ class GatewayClient:
 
         self.is_started = False
         self.name = name
+        self.session_store: SessionStore | None = None
+        self.shard: tuple[int, int] | None = None
+        self.identify_gate: IdentifyGate | None = None
+        self.event_relay: EventRelayServer | None = None
+        self.cache: EntityCache | None = None
+        self.stream_large_guilds = False
+        self.readiness = ReadinessTracker(self._dispatch_shard_ready)
+        self.member_requests = MemberRequestRegistry()
+        self.payload_filter: PayloadFilter | None = None
 
         if self.name:
             self.logger = NameLoggerAdapter(logger, self.name)
@@ -94,6 +162,7 @@ class GatewayClient:
             self.logger = logger
 
         self._ws = None
+        self._send_queue = GatewaySendQueue(self._send_json, CommandRateLimiter())
         self._need_restart = asyncio.Event()
         self._opcode_handlers: Mapping[GatewayMessageOpcode, opcode_handlers.OpcodeHandler] = MappingProxyType({
             GatewayMessageOpcode.DISPATCH: opcode_handlers.DispatchHandler(self, self.logger),
@@ -109,6 +178,7 @@ class GatewayClient:
             raise RuntimeError('Client is already started')
 
         self.is_started = True
+        await self._restore_session()
 
         await asyncio.shield(self._connect())
 
@@ -121,24 +191,97 @@ class GatewayClient:
         self.is_started = False
         self._need_restart.set()
         self.heartbeat.stop()
+        self.readiness.reset()
+        self.member_requests.fail(RuntimeError('Client is closed'))
+        await self._send_queue.close(RuntimeError('Client is closed'))
         if self._ws:
-            await self._ws.close()
+            await self._ws.close(code=self._close_code)
         self._ws = None
+        await self._save_session()
         self.logger.info('Gateway client closed')
 
-    async def send_command(self, opcode: GatewayCommandOpcode, data: Any) -> None:  # noqa: ANN401
+    @property
+    def session_key(self) -> str:
+        """Key of the session in the session store.
+
+        The token is hashed, so it isn't saved to the store.
+        """
+        token_hash = hashlib.sha256(self.conn_data.token.encode()).hexdigest()[:16]
+        return f'{self.name}:{token_hash}' if self.name else token_hash
+
+    @property
+    def is_connected(self) -> bool:
+        """Whether the client has an open websocket connection."""
+        return self._ws is not None and not self._ws.closed
+
+    @property
+    def identify_intents(self) -> Intent:
+        """Intents to identify with.
+
+        Auto intents cover events of handlers registered on the dispatcher and events
+        updating the cache. Handlers added after identifying don't change them until
+        the next identify. Events handled only by relay subscribers are not known to
+        the client, so relays need explicit intents.
+        """
+        if self.intents != AUTO_INTENTS:
+            return self.intents  # type: ignore[return-value]
+
+        event_types = set(self.dispatcher.subscribed_event_types)
+        if self.cache is not None:
+            event_types |= self.cache.event_types
+        return intents_for_events(event_type.__event_name__ for event_type in event_types)
+
+    @property
+    def rate_limiter(self) -> CommandRateLimiter:
+        """Rate limiter of outbound commands."""
+        return self._send_queue.rate_limiter
+
+    @property
+    def latency(self) -> LatencySnapshot:
+        """Heartbeat round-trip time statistics of the current connection."""
+        return self.heartbeat.latency.snapshot()
+
+    @property
+    def send_queue_depth(self) -> int:
+        """Number of commands waiting for the rate limit to be sent."""
+        return self._send_queue.depth
+
+    async def send_command(
+        self,
+        opcode: GatewayCommandOpcode,
+        data: Any,  # noqa: ANN401
+        *,
+        coalesce: bool = False,
+    ) -> None:
         """Send a command to the gateway.
 
+        Heartbeats, identify, and resume are sent immediately using the reserved
+        budget. Other commands are queued and sent in order when the rate limit allows.
+        While the client connects, queued commands wait until the session is ready
+        or resumed.
+
         Args:
             opcode: Opcode of the command.
             data: Data to send to the gateway.
+            coalesce: Whether the command replaces a queued command with the same
+                opcode instead of being queued after it.
 
         Raises:
             RuntimeError: If the client is not connected.
         """
         if not self._ws:
             raise RuntimeError('Client is not connected')
-        await self._ws.send_json({'op': opcode, 'd': data})
+
+        if opcode in _DIRECT_OPCODES:
+            self.rate_limiter.acquire_heartbeat()
+            await self._send_json(opcode, data)
+            return
+
+        await self._send_queue.put(opcode, data, coalesce=coalesce)
+
+    def release_commands(self) -> None:
+        """Send commands held while connecting, the session is ready or resumed."""
+        self._send_queue.release()
 
     def reconnect(self) -> None:
         """Reconnect to the gateway.
@@ -177,19 +320,83 @@ class GatewayClient:
     async def update_presence(self, presence_data: PresenceUpdateData) -> None:
         """Update the client's presence.
 
+        If a presence update is still waiting in the send queue, it's replaced by
+        the new one, so only the latest presence is sent.
+
         Args:
             presence_data: Data to send to the gateway.
         """
         prepared_data = presence_data.model_dump(mode='json')
-        await self.send_command(GatewayCommandOpcode.PRESENCE_UPDATE, prepared_data)
+        await self.send_command(GatewayCommandOpcode.PRESENCE_UPDATE, prepared_data, coalesce=True)
+
+    def request_guild_members(
+        self,
+        guild_ids: SnowflakeInputType | Iterable[SnowflakeInputType],
+        *,
+        query: str | None = None,
+        limit: int = 0,
+        user_ids: Iterable[SnowflakeInputType] | None = None,
+        presences: bool = False,
+        timeout: float = DEFAULT_CHUNK_TIMEOUT,
+    ) -> GuildMembersRequest:
+        """Request members of guilds from the gateway.
+
+        Requests are sent when the iteration starts. Without a query and user ids,
+        all members are requested, which needs the `GUILD_MEMBERS` intent.
+        Presences need the `GUILD_PRESENCES` intent.
+
+            async with gateway_client.request_guild_members(guild_id) as request:
+                async for chunk in request:
+                    for member in chunk.members:
+                        ...
+
+        Chunks are dispatched to event handlers too.
+
+        Args:
+            guild_ids: Guild id or ids to get members for.
+            query: String that usernames start with.
+            limit: Maximum number of members per guild matching the query, 0 for no limit.
+            user_ids: Users to fetch.
+            presences: Whether to return presences of the members.
+            timeout: Time to wait for the next chunk in seconds.
+
+        Returns:
+            Async iterator over received chunks.
+        """
+        if isinstance(guild_ids, int | str):
+            guild_ids = [guild_ids]
+        if user_ids is not None:
+            user_ids = list(user_ids)
+        elif query is None:
+            query = ''
+
+        commands = [
+            RequestGuildMembersCommand(
+                guild_id=guild_id,
+                query=query,
+                limit=limit,
+                presences=presences or None,
+                user_ids=user_ids,  # type: ignore[arg-type]
+            )
+            for guild_id in guild_ids
+        ]
+        return GuildMembersRequest(commands, self._send_member_request, self.member_requests, timeout)
+
+    async def _send_member_request(self, command: RequestGuildMembersCommand) -> None:
+        """Send a guild members request."""
+        payload = command.model_dump(mode='json', exclude_none=True)
+        await self.send_command(GatewayCommandOpcode.REQUEST_GUILD_MEMBERS, payload)
 
     async def _connect(self) -> None:
         while self.is_started:
             self._need_restart.clear()
+            # commands wait for the new session, the gateway closes unauthenticated connections
+            self._send_queue.hold()
 
             url = self.conn_data.resume_url
             async with self.session.ws_connect(url=url) as ws:
                 self._ws = ws
+                self.rate_limiter.reset()
                 try:
                     await self._ws_recv_loop(ws)
                 except errors.ConnectionClosedError as err:
@@ -202,40 +409,113 @@ class GatewayClient:
                 self.logger.info('Reconnecting in 3 seconds')
                 await asyncio.sleep(3)
 
+    @property
+    def _close_code(self) -> int:
+        """Close code of the websocket.
+
+        The session is kept on restarts and on close if it's saved to resume later.
+        """
+        if self.is_started or self.session_store is not None:
+            return RESUMABLE_CLOSE_CODE
+        return aiohttp.WSCloseCode.OK
+
+    async def _restore_session(self) -> None:
+        """Restore the session from the session store."""
+        if self.session_store is None or self.conn_data.can_resume:
+            return
+
+        try:
+            state = await self.session_store.load(self.session_key)
+        except Exception:
+            self.logger.exception('Failed to load the session state')
+            return
+
+        if state:
+            self.logger.info("Restored session '%s' to resume it", state.session_id)
+            self.conn_data.restore(state)
+
+    async def _save_session(self) -> None:
+        """Save the session to the session store."""
+        if self.session_store is None:
+            return
+
+        state = self.conn_data.session_state
+        try:
+            if state:
+                await self.session_store.save(self.session_key, state)
+            else:
+                await self.session_store.clear(self.session_key)
+        except Exception:
+            self.logger.exception('Failed to save the session state')
+
+    async def _send_json(self, opcode: GatewayCommandOpcode, data: Any) -> None:  # noqa: ANN401
+        """Write a command to the websocket."""
+        if not self._ws:
+            raise RuntimeError('Client is not connected')
+        await self._ws.send_json({'op': opcode, 'd': data})
+
+    async def _dispatch_shard_ready(self, event: ShardReadyEvent) -> None:
+        """Dispatch the synthetic shard ready event."""
+        self.logger.info('Shard is ready: %i guilds loaded', len(event.guild_ids))
+        if self.dispatcher.has_subscribers(ShardReadyEvent):
+            await self.dispatcher.dispatch(event)
+
     async def _handle_heartbeat_ack(self, _: DatalessMessage) -> None:
         await self.heartbeat.handle_heartbeat_ack()
 
     async def _ws_recv_loop(self, ws: aiohttp.ClientWebSocketResponse) -> None:
-        while self.is_started and not self._need_restart.is_set():
-            msg_task = asyncio.create_task(self._get_message(ws), name='GatewayClient._get_message')
-            need_restart_task = asyncio.create_task(
-                self._need_restart.wait(),
-                name='GatewayClient._need_restart.wait',
-            )
-
-            done, _ = await asyncio.wait(
-                {msg_task, need_restart_task},
-                return_when=asyncio.FIRST_COMPLETED,
-            )
-
-            if need_restart_task in done:
-                await need_restart_task
-                if not msg_task.cancel():
-                    await msg_task
-                return
+        """Receive and handle messages until the connection is closed or restarted.
 
-            need_restart_task.cancel()
-            message = await msg_task
-            # when get ending message, message is None
-            if message:
-                await self._handle_message(message)
+        Messages are read directly in the loop. Restart is signalled by a single
+        watcher task per connection which closes the websocket and thereby breaks
+        the pending receive, so no tasks are created per message.
+        """
+        if not self.is_started or self._need_restart.is_set():
+            return
 
-    async def _get_message(self, ws_resp: aiohttp.ClientWebSocketResponse) -> GatewayMessageType | None:
+        restart_watcher = asyncio.create_task(
+            self._close_on_restart(ws),
+            name='GatewayClient._close_on_restart',
+        )
+        try:
+            while self.is_started and not self._need_restart.is_set():
+                try:
+                    message = await self._get_message(ws)
+                except errors.ConnectionClosedError:
+                    # the connection was closed by the restart watcher
+                    if self._need_restart.is_set():
+                        return
+                    raise
+
+                # when get ending message, message is None
+                if message:
+                    await self._handle_message(message)
+        finally:
+            if not restart_watcher.done():
+                restart_watcher.cancel()
+            await asyncio.gather(restart_watcher, return_exceptions=True)
+
+    async def _close_on_restart(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        """Close the websocket when the client needs to restart."""
+        await self._need_restart.wait()
+        await ws.close(code=self._close_code)
+
+    async def _get_message(
+        self,
+        ws_resp: aiohttp.ClientWebSocketResponse,
+    ) -> GatewayMessageType | DispatchEnvelope | None:
         """Get a message from the websocket."""
         msg = await ws_resp.receive()
         if msg.type is aiohttp.WSMsgType.TEXT:
-            data = msg.json()
-            return GatewayMessageAdapter.validate_python(data)
+            if (
+                self.stream_large_guilds
+                and self.cache is not None
+                and self.event_relay is None
+                and self.payload_filter is None
+                and len(msg.data) >= LARGE_FRAME_SIZE
+            ):
+                return parse_gateway_message(await decode_large_frame(msg.data, self.cache))
+            return parse_gateway_message(msg.json())
 
         if msg.type in {aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.CLOSED}:
             raise errors.ConnectionClosedError
@@ -243,8 +523,8 @@ class GatewayClient:
         self.logger.warning('Unhandled message type: %s', msg.type)
         return None
 
-    async def _handle_message(self, message: GatewayMessageType) -> None:
-        if isinstance(message, DispatchMessage):
+    async def _handle_message(self, message: GatewayMessageType | DispatchEnvelope) -> None:
+        if isinstance(message, DispatchEnvelope | DispatchMessage):
             self.logger.debug('Dispatching event: %s', message.event_name)
         else:
             self.logger.debug('Received message: %s', message.opcode.name)
@@ -278,6 +558,28 @@ class ConnectionData(BaseModel, arbitrary_types_allowed=True):
         """Whether the connection data can be used to resume a session."""
         return all((self.resume_url, self.session_id, self.seq))
 
+    @property
+    def session_state(self) -> SessionState | None:
+        """State to save and resume the session later, None if it can't be resumed."""
+        if not self.can_resume:
+            return None
+
+        return SessionState(
+            session_id=self.session_id,  # type: ignore
+            seq=self.seq,
+            resume_url=str(self.resume_url),
+        )
+
+    def restore(self, state: SessionState) -> None:
+        """Restore the connection data from a saved session state.
+
+        Args:
+            state: Saved session state.
+        """
+        self.session_id = state.session_id
+        self.seq = state.seq
+        self.resume_url = URL(state.resume_url)
+
     def reset(self) -> None:
         """Reset the connection data."""
         self.resume_url = GATEWAY_URL
@@ -288,6 +590,9 @@ class ConnectionData(BaseModel, arbitrary_types_allowed=True):
 class HeartbeatProtocol(Protocol):
     """Protocol for the heartbeat class."""
 
+    latency: LatencyTracker
+    """Round-trip time of heartbeats."""
+
     def __init__(self, client: GatewayClient, conn_data: ConnectionData) -> None:
         """Initialize the heartbeat."""
 
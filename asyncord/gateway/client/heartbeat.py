@@ -11,8 +11,11 @@ import datetime
 import logging
 import random
 import threading
+import time
 from typing import TYPE_CHECKING
 
+from asyncord.gateway.client.latency import LatencyTracker
+
 if TYPE_CHECKING:
     from asyncord.gateway.client.client import ConnectionData, GatewayClient
 
@@ -23,7 +26,11 @@ logger = logging.getLogger(__name__)
 
 
 class Heartbeat:
-    """Heartbeat for the gateway."""
+    """Heartbeat for the gateway.
+
+    Attributes:
+        latency: Round-trip time of heartbeats of the current connection.
+    """
 
     def __init__(
         self,
@@ -39,14 +46,25 @@ class Heartbeat:
         self._interval = datetime.timedelta(seconds=0)
         self._task = None
         self._ack_event = asyncio.Event()
+        self._sent_at: float | None = None
+        self.latency = LatencyTracker()
 
     async def handle_heartbeat_ack(self) -> None:
         """Handle a heartbeat ack."""
+        sent_at = self._sent_at
+        if sent_at is not None:
+            self._sent_at = None
+            self.latency.record(time.perf_counter() - sent_at)
         self._ack_event.set()
 
     def run(self, interval: int) -> None:
-        """Run the heartbeat."""
+        """Run the heartbeat.
+
+        Args:
+            interval: Interval to send heartbeats at in milliseconds.
+        """
         self.stop()
+        self.latency.reset()
         self._interval = datetime.timedelta(milliseconds=interval)
         self._task = asyncio.run_coroutine_threadsafe(self._run(self._interval), self._loop)
 
@@ -71,6 +89,7 @@ class Heartbeat:
     def _cleanup(self) -> None:
         """Cleanup the heartbeat."""
         self._ack_event.clear()
+        self._sent_at = None
         self._interval = datetime.timedelta(seconds=0)
 
     async def _run(self, interval: datetime.timedelta) -> None:
@@ -103,8 +122,15 @@ class Heartbeat:
                 break
 
     async def _wait_heartbeat_ack(self) -> None:
-        """Wait for a heartbeat ack."""
-        for _ in range(100):
+        """Wait for a heartbeat ack.
+
+        The round-trip time is measured from the last attempt, so waiting for lost acks
+        doesn't inflate it. Resends are counted by the latency tracker instead.
+        """
+        for attempt in range(100):
+            if attempt:
+                self.latency.record_resend()
+            self._sent_at = time.perf_counter()
             await self.client.send_heartbeat(seq=self.conn_data.seq)
             logger.debug('Heartbeat sent')
             try:
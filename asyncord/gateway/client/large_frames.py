@@ -0,0 +1,222 @@
+"""Incremental decoding of large gateway frames.
+
+`GUILD_CREATE` of a guild with tens of thousands of members is a multi-megabyte frame.
+Decoding it in one go and validating all members blocks the event loop for hundreds
+of milliseconds. The decoder reads such frames value by value: members and presences
+are decoded element by element, members are validated and fed to the entity cache
+in chunks, and the event loop gets control between chunks.
+
+Streamed arrays are removed from the decoded payload, so the dispatched
+`GuildCreateEvent` has no members and presences.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+from typing import TYPE_CHECKING, Any, Final
+
+from asyncord.client.members.models.responses import MemberResponse
+from asyncord.gateway.events.guilds import GuildCreateEvent
+
+if TYPE_CHECKING:
+    from asyncord.gateway.cache.entity_cache import EntityCache
+
+__all__ = (
+    'DECODE_CHUNK_SIZE',
+    'LARGE_FRAME_SIZE',
+    'STREAMED_FIELDS',
+    'decode_large_frame',
+)
+
+LARGE_FRAME_SIZE: Final[int] = 1024 * 1024
+"""Minimum size of frames in characters to decode incrementally."""
+
+DECODE_CHUNK_SIZE: Final[int] = 500
+"""Number of array elements decoded between yields to the event loop."""
+
+STREAMED_FIELDS: Final[frozenset[str]] = frozenset({'members', 'presences'})
+"""Fields of the `GUILD_CREATE` payload which are streamed instead of decoded into the payload."""
+
+_WHITESPACE: Final[re.Pattern[str]] = re.compile(r'[ \t\n\r]*')
+"""Pattern of whitespace between JSON tokens."""
+
+_decoder: Final[json.JSONDecoder] = json.JSONDecoder()
+"""Decoder of single JSON values."""
+
+
+async def decode_large_frame(text: str, cache: EntityCache, chunk_size: int = DECODE_CHUNK_SIZE) -> dict[str, Any]:
+    """Decode a frame, streaming members of `GUILD_CREATE` to the cache.
+
+    Other frames, and frames which have the payload before the event name,
+    are decoded as usual.
+
+    Args:
+        text: Text of the frame.
+        cache: Cache to feed members to.
+        chunk_size: Number of array elements decoded between yields to the event loop.
+
+    Returns:
+        Decoded frame without streamed fields in the payload.
+
+    Raises:
+        ValueError: If the frame is not valid JSON.
+    """
+    return await _FrameReader(text, cache, chunk_size).read_frame()
+
+
+class _FrameReader:
+    """Reader of one frame."""
+
+    __slots__ = ('cache', 'chunk_size', 'pending', 'pos', 'replaced', 'text')
+
+    def __init__(self, text: str, cache: EntityCache, chunk_size: int) -> None:
+        """Initialize the reader.
+
+        Args:
+            text: Text of the frame.
+            cache: Cache to feed members to.
+            chunk_size: Number of array elements decoded between yields to the event loop.
+        """
+        self.text = text
+        self.cache = cache
+        self.chunk_size = max(chunk_size, 1)
+        self.pos = 0
+        self.pending: list[Any] = []
+        self.replaced = False
+
+    async def read_frame(self) -> dict[str, Any]:
+        """Read the frame object."""
+        frame: dict[str, Any] = {}
+        self._expect('{')
+        first = True
+        while (key := self._next_key(first=first)) is not None:
+            first = False
+            if key == 'd' and frame.get('t') == GuildCreateEvent.__event_name__ and self._peek() == '{':
+                frame[key] = await self._read_payload()
+            else:
+                frame[key] = self._value()
+
+        self._expect_end()
+        return frame
+
+    async def _read_payload(self) -> dict[str, Any]:
+        """Read the payload object, streaming large arrays."""
+        payload: dict[str, Any] = {}
+        self._expect('{')
+        first = True
+        while (key := self._next_key(first=first)) is not None:
+            first = False
+            if key in STREAMED_FIELDS and self._peek() == '[':
+                await self._stream_array(key, payload)
+            else:
+                payload[key] = self._value()
+                if key == 'id' and self.pending:
+                    self._feed(payload, self.pending)
+                    self.pending = []
+
+        if self.pending:
+            # a payload without an id is invalid, let the event validation report it
+            payload['members'] = self.pending
+            self.pending = []
+        return payload
+
+    async def _stream_array(self, field: str, payload: dict[str, Any]) -> None:
+        """Decode an array element by element and feed it in chunks."""
+        self._expect('[')
+        if self._peek() == ']':
+            self.pos += 1
+            # nothing to stream, the event replaces cached members as usual
+            payload[field] = []
+            return
+
+        chunk: list[Any] = []
+        while True:
+            chunk.append(self._value())
+            separator = self._peek()
+            self.pos += 1
+            if separator == ']':
+                break
+            if separator != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", self.text, self.pos - 1)
+
+            if len(chunk) >= self.chunk_size:
+                self._consume(field, payload, chunk)
+                chunk = []
+                await asyncio.sleep(0)
+
+        self._consume(field, payload, chunk)
+
+    def _consume(self, field: str, payload: dict[str, Any], chunk: list[Any]) -> None:
+        """Handle a chunk of decoded elements.
+
+        Presences are not cached, so they are dropped.
+        """
+        if field != 'members':
+            return
+
+        if 'id' in payload:
+            self._feed(payload, chunk)
+        else:
+            # the guild id is not read yet, keep members until it is
+            self.pending.extend(chunk)
+
+    def _feed(self, payload: dict[str, Any], members: list[Any]) -> None:
+        """Validate members and add them to the cache."""
+        guild_id = int(payload['id'])
+        if not self.cache.caches_members(guild_id):
+            return
+
+        validated = [MemberResponse.model_validate(member) for member in members]
+        self.cache.add_members(guild_id, validated, replace=not self.replaced)
+        self.replaced = True
+
+    def _next_key(self, *, first: bool) -> str | None:
+        """Read the next key of the object.
+
+        Args:
+            first: Whether the key is the first one, it isn't preceded by a comma.
+
+        Returns:
+            Key or None if the object is over.
+        """
+        if self._peek() == '}':
+            self.pos += 1
+            return None
+        if not first:
+            self._expect(',')
+
+        key = self._value()
+        if not isinstance(key, str):
+            raise json.JSONDecodeError('Expecting property name', self.text, self.pos)
+        self._expect(':')
+        return key
+
+    def _value(self) -> Any:  # noqa: ANN401
+        """Decode the next value."""
+        value, self.pos = _decoder.raw_decode(self.text, self._skip_whitespace())
+        return value
+
+    def _peek(self) -> str:
+        """Get the next character after whitespace."""
+        pos = self._skip_whitespace()
+        if pos >= len(self.text):
+            raise json.JSONDecodeError('Unexpected end of frame', self.text, pos)
+        return self.text[pos]
+
+    def _expect(self, char: str) -> None:
+        """Skip the expected character."""
+        if self._peek() != char:
+            raise json.JSONDecodeError(f'Expecting {char!r}', self.text, self.pos)
+        self.pos += 1
+
+    def _expect_end(self) -> None:
+        """Check there is nothing after the frame."""
+        if self._skip_whitespace() != len(self.text):
+            raise json.JSONDecodeError('Extra data', self.text, self.pos)
+
+    def _skip_whitespace(self) -> int:
+        """Move the position to the next token."""
+        self.pos = _WHITESPACE.match(self.text, self.pos).end()  # type: ignore[union-attr]
+        return self.pos
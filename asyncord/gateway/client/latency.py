@@ -0,0 +1,132 @@
+"""This module contains the gateway latency tracker.
+
+Latency is measured as the time between sending a heartbeat and handling its
+acknowledgement. The acknowledgement is handled by the event loop of the client,
+so the latency includes the time the loop was too busy to read the socket.
+Heartbeats resent without an acknowledgement are counted separately.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Final
+
+__all__ = ('DEFAULT_LATENCY_WINDOW', 'LatencySnapshot', 'LatencyTracker')
+
+DEFAULT_LATENCY_WINDOW: Final[int] = 100
+"""Default number of the latest samples to keep."""
+
+
+@dataclass(frozen=True, slots=True)
+class LatencySnapshot:
+    """Latency statistics at some moment.
+
+    Latency values are in seconds and None if there are no samples yet.
+    """
+
+    last: float | None
+    """Latest measured latency."""
+
+    p50: float | None
+    """Median latency in the window."""
+
+    p99: float | None
+    """99th percentile of latency in the window."""
+
+    samples: int
+    """Number of samples in the window."""
+
+    resends: int = 0
+    """Number of heartbeats resent because their acknowledgement didn't arrive."""
+
+
+class LatencyTracker:
+    """Rolling window of latency samples.
+
+    Samples are recorded by the client loop and can be read from other threads,
+    so the window is guarded by a lock.
+
+    Attributes:
+        window: Maximum number of samples to keep.
+    """
+
+    def __init__(self, window: int = DEFAULT_LATENCY_WINDOW) -> None:
+        """Initialize the latency tracker.
+
+        Args:
+            window: Maximum number of samples to keep.
+        """
+        if window < 1:
+            raise ValueError('Latency window must be positive')
+
+        self.window = window
+        self._samples: deque[float] = deque(maxlen=window)
+        self._resends = 0
+        self._lock = threading.Lock()
+
+    @property
+    def last(self) -> float | None:
+        """Latest measured latency in seconds."""
+        with self._lock:
+            return self._samples[-1] if self._samples else None
+
+    def record(self, latency: float) -> None:
+        """Add a latency sample.
+
+        Args:
+            latency: Latency in seconds.
+        """
+        with self._lock:
+            self._samples.append(latency)
+
+    def record_resend(self) -> None:
+        """Count a heartbeat resent without an acknowledgement."""
+        with self._lock:
+            self._resends += 1
+
+    def percentile(self, percent: float) -> float | None:
+        """Get the percentile of latency in the window.
+
+        The nearest-rank method is used, so the result is always one of the samples.
+
+        Args:
+            percent: Percentile to get, from 0 to 100.
+
+        Returns:
+            Latency in seconds or None if there are no samples.
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        return _nearest_rank(samples, percent)
+
+    def snapshot(self) -> LatencySnapshot:
+        """Get the current latency statistics."""
+        with self._lock:
+            last = self._samples[-1] if self._samples else None
+            samples = sorted(self._samples)
+            resends = self._resends
+
+        return LatencySnapshot(
+            last=last,
+            p50=_nearest_rank(samples, 50),
+            p99=_nearest_rank(samples, 99),
+            samples=len(samples),
+            resends=resends,
+        )
+
+    def reset(self) -> None:
+        """Drop all samples and resends, for example when a new connection is established."""
+        with self._lock:
+            self._samples.clear()
+            self._resends = 0
+
+
+def _nearest_rank(sorted_samples: list[float], percent: float) -> float | None:
+    """Get the percentile of sorted samples by the nearest-rank method."""
+    if not sorted_samples:
+        return None
+    rank = max(math.ceil(percent / 100 * len(sorted_samples)), 1)
+    return sorted_samples[rank - 1]
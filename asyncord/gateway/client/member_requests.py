@@ -0,0 +1,232 @@
+"""Requests of guild members over the gateway.
+
+Members requested with `REQUEST_GUILD_MEMBERS` arrive in `GUILD_MEMBERS_CHUNK`
+events of up to 1000 members. Requests are correlated with their chunks by nonce,
+so several requests can run at once and chunks don't have to be caught by a global
+handler. Chunks are handed to the consumer as they arrive:
+
+    async with gateway_client.request_guild_members(guild_ids) as request:
+        async for chunk in request:
+            for member in chunk.members:
+                ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import secrets
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Final, Self
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from asyncord.gateway.commands import RequestGuildMembersCommand
+    from asyncord.gateway.events.guilds import GuildMembersChunkEvent
+
+__all__ = (
+    'DEFAULT_CHUNK_TIMEOUT',
+    'GuildMembersRequest',
+    'MemberRequestRegistry',
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_TIMEOUT: Final[float] = 10
+"""Default time to wait for the next chunk of members in seconds."""
+
+type SendRequestFunc = Callable[[RequestGuildMembersCommand], Awaitable[None]]
+"""Type alias for a function to send a member request to the gateway."""
+
+
+class MemberRequestRegistry:
+    """Registry of member requests waiting for their chunks."""
+
+    def __init__(self) -> None:
+        """Initialize the registry."""
+        self._requests: dict[str, GuildMembersRequest] = {}
+
+    def __len__(self) -> int:
+        """Get the number of guilds waiting for chunks."""
+        return len(self._requests)
+
+    def expects(self, nonce: str | None) -> bool:
+        """Check whether chunks with the nonce are waited for.
+
+        Args:
+            nonce: Nonce of the chunk.
+        """
+        return nonce is not None and nonce in self._requests
+
+    def feed(self, chunk: GuildMembersChunkEvent) -> None:
+        """Pass a chunk to its request.
+
+        Args:
+            chunk: Received chunk.
+        """
+        request = self._requests.get(chunk.nonce) if chunk.nonce is not None else None
+        if request is not None:
+            request.put_chunk(chunk)
+
+    def fail(self, exc: BaseException) -> None:
+        """Fail all pending requests, for example when the client is closed.
+
+        Args:
+            exc: Error to raise to the consumers.
+        """
+        for request in {*self._requests.values()}:
+            request.put_error(exc)
+        self._requests.clear()
+
+    def register(self, nonce: str, request: GuildMembersRequest) -> None:
+        """Register a request to receive chunks with the nonce."""
+        self._requests[nonce] = request
+
+    def unregister(self, nonce: str) -> None:
+        """Stop passing chunks with the nonce."""
+        self._requests.pop(nonce, None)
+
+
+class GuildMembersRequest:
+    """Async iterator over chunks of requested members.
+
+    Requests of all guilds are sent by a background task through the send queue of
+    the client, so they take the gateway rate limit into account and other commands
+    are not blocked behind them. Chunks of different guilds are yielded in the order
+    they arrive. Members are not accumulated: a chunk is dropped when the consumer
+    takes it.
+
+    Iteration stops when all chunks of all guilds are received. It raises
+    `TimeoutError` if no chunk arrived for the timeout.
+
+    Attributes:
+        timeout: Time to wait for the next chunk in seconds.
+        chunks: Number of received chunks.
+        members: Number of received members.
+        not_found: Number of requested users which were not found.
+    """
+
+    def __init__(
+        self,
+        commands: list[RequestGuildMembersCommand],
+        send: SendRequestFunc,
+        registry: MemberRequestRegistry,
+        timeout: float = DEFAULT_CHUNK_TIMEOUT,
+    ) -> None:
+        """Initialize the request.
+
+        Args:
+            commands: Commands to send, one per guild. Nonces are set by the request.
+            send: Function to send a command to the gateway.
+            registry: Registry to receive chunks from.
+            timeout: Time to wait for the next chunk in seconds.
+        """
+        self.timeout = timeout
+        self.chunks = 0
+        self.members = 0
+        self.not_found = 0
+
+        self._commands = commands
+        self._send = send
+        self._registry = registry
+        # nonce -> number of chunks left, unknown until the first chunk
+        self._remaining: dict[str, int | None] = {}
+        self._queue: asyncio.Queue[GuildMembersChunkEvent | BaseException] = asyncio.Queue()
+        self._send_task: asyncio.Task[None] | None = None
+        self._closed = False
+
+        for command in commands:
+            command.nonce = secrets.token_hex(16)
+            self._remaining[command.nonce] = None
+
+    @property
+    def done(self) -> bool:
+        """Whether all chunks are received or the request is closed."""
+        return self._closed or not self._remaining
+
+    def put_chunk(self, chunk: GuildMembersChunkEvent) -> None:
+        """Pass a received chunk to the consumer."""
+        nonce: str = chunk.nonce  # type: ignore[assignment]
+        remaining = self._remaining.get(nonce)
+        remaining = (chunk.chunk_count if remaining is None else remaining) - 1
+        if remaining > 0:
+            self._remaining[nonce] = remaining
+        else:
+            self._remaining.pop(nonce, None)
+            self._registry.unregister(nonce)
+
+        self._queue.put_nowait(chunk)
+
+    def put_error(self, exc: BaseException) -> None:
+        """Pass an error to the consumer."""
+        self._queue.put_nowait(exc)
+
+    async def aclose(self) -> None:
+        """Stop waiting for chunks and sending requests."""
+        self._closed = True
+        for nonce in self._remaining:
+            self._registry.unregister(nonce)
+        self._remaining.clear()
+
+        if self._send_task is not None and not self._send_task.done():
+            self._send_task.cancel()
+            await asyncio.gather(self._send_task, return_exceptions=True)
+
+    def __aiter__(self) -> Self:
+        """Get the iterator."""
+        return self
+
+    async def __anext__(self) -> GuildMembersChunkEvent:
+        """Wait for the next chunk."""
+        if self._send_task is None and not self._closed:
+            self._start()
+
+        if self._closed or (self._queue.empty() and not self._remaining):
+            await self.aclose()
+            raise StopAsyncIteration
+
+        try:
+            async with asyncio.timeout(self.timeout):
+                item = await self._queue.get()
+        except BaseException:
+            await self.aclose()
+            raise
+
+        if isinstance(item, BaseException):
+            await self.aclose()
+            raise item
+
+        self.chunks += 1
+        self.members += len(item.members)
+        self.not_found += len(item.not_found or ())
+        return item
+
+    async def __aenter__(self) -> Self:
+        """Enter the context manager."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop the request when the consumer is done."""
+        await self.aclose()
+
+    def _start(self) -> None:
+        """Register nonces and start sending the requests."""
+        for nonce in self._remaining:
+            self._registry.register(nonce, self)
+        self._send_task = asyncio.create_task(self._send_all(), name='GuildMembersRequest._send_all')
+
+    async def _send_all(self) -> None:
+        """Send requests of all guilds."""
+        try:
+            # requests are queued one by one, so other commands can be sent between them
+            for command in self._commands:
+                await self._send(command)
+        except Exception as exc:
+            logger.warning('Failed to request guild members: %s', exc)
+            self.put_error(exc)
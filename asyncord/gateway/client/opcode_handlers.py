@@ -7,21 +7,25 @@ from __future__ import annotations
 
 import logging
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, ClassVar
+from typing import TYPE_CHECKING, Any, ClassVar, Final
 
 from yarl import URL
 
 from asyncord.gateway.commands import IdentifyCommand, ResumeCommand
-from asyncord.gateway.events.base import ReadyEvent
+from asyncord.gateway.events.base import ReadyEvent, ResumedEvent
 from asyncord.gateway.events.event_map import EVENT_MAP
+from asyncord.gateway.events.guilds import GuildCreateEvent, GuildDeleteEvent, GuildMembersChunkEvent
 from asyncord.gateway.message import GatewayMessageOpcode
 
 if TYPE_CHECKING:
     from asyncord.gateway.client.client import GatewayClient
+    from asyncord.gateway.events.base import GatewayEvent
     from asyncord.gateway.message import (
         DatalessMessage,
+        DispatchEnvelope,
         DispatchMessage,
         GatewayMessageType,
+        HelloMessage,
         InvalidSessionMessage,
     )
 
@@ -34,6 +38,15 @@ __all__ = (
     'ReconnectHandler',
 )
 
+_GUILD_ARRIVAL_EVENTS: Final[frozenset[type]] = frozenset({GuildCreateEvent, GuildDeleteEvent})
+"""Events which deliver guilds listed in READY.
+
+Guilds unavailable because of an outage arrive as GUILD_DELETE.
+"""
+
+_SESSION_START_EVENTS: Final[frozenset[type]] = frozenset({ReadyEvent, ResumedEvent})
+"""Events after which the session accepts commands."""
+
 
 class OpcodeHandler(ABC):
     """Base class for opcode handlers.
@@ -58,7 +71,7 @@ class OpcodeHandler(ABC):
         self.logger = logger
 
     @abstractmethod
-    async def handle(self, message: GatewayMessageType) -> None:
+    async def handle(self, message: GatewayMessageType | DispatchEnvelope) -> None:
         """Handle the message."""
         raise NotImplementedError('handle method must be implemented')
 
@@ -68,22 +81,72 @@ class DispatchHandler(OpcodeHandler):
 
     opcode = GatewayMessageOpcode.DISPATCH
 
-    async def handle(self, message: DispatchMessage) -> None:
+    async def handle(self, message: DispatchMessage | DispatchEnvelope) -> None:
         """Handle the DISPATCH opcode."""
         client = self.client
         client.conn_data.seq = max(client.conn_data.seq, message.sequence_number)
-
-        if message.event_name == ReadyEvent.__event_name__:
-            event = ReadyEvent.model_validate(message.data)
-            await self._handle_ready(event)
+        if client.event_relay is not None:
+            client.event_relay.publish(message.event_name, message.sequence_number, message.data)
 
         event_type = EVENT_MAP.get(message.event_name)
         if not event_type:
             self.logger.warning('Unhandled event: %s', message.event_name)
             return
 
-        event = event_type.model_validate(message.data)
-        await client.dispatcher.dispatch(event)
+        if event_type in _SESSION_START_EVENTS:
+            # handlers can wait for their commands, so commands are released before dispatching
+            client.release_commands()
+
+        dispatcher = client.dispatcher
+        has_subscribers = dispatcher.has_subscribers(event_type)
+        has_projections = dispatcher.has_projections(event_type)
+        cache = client.cache if client.cache is not None and client.cache.handles(event_type) else None
+        requested = event_type is GuildMembersChunkEvent and client.member_requests.expects(message.data.get('nonce'))
+        if client.payload_filter is not None and not client.payload_filter.accept(message.event_name, message.data):
+            # dropped events are still counted by the readiness tracker and fed to member requests
+            has_subscribers = has_projections = False
+            cache = None
+
+        event = None
+        if event_type is ReadyEvent:
+            # ready event is always parsed, it contains the session data to resume later
+            event = ReadyEvent.model_validate(message.data)
+            await self._handle_ready(event)
+        elif has_subscribers or cache is not None or requested:
+            event = event_type.model_validate(message.data)
+        # otherwise nobody needs the full event, so don't waste time on parsing
+
+        if event is not None:
+            if cache is not None:
+                # inline handlers see the state after the event; the cache is updated on receive,
+                # so with a partitioned dispatcher it can be ahead of the event being handled
+                cache.update(event)
+            if has_subscribers:
+                await dispatcher.dispatch(event)
+            if requested:
+                client.member_requests.feed(event)  # type: ignore[arg-type]
+
+        if has_projections:
+            # projection handlers need only their slim models
+            await dispatcher.dispatch_projections(event_type, message.data)
+
+        # guilds are counted after dispatching, so with a partitioned dispatcher
+        # the shard can be ready while their handlers are still queued
+        await self._track_readiness(event_type, event, message.data)
+
+    async def _track_readiness(
+        self,
+        event_type: type[GatewayEvent],
+        event: GatewayEvent | None,
+        data: dict[str, Any],
+    ) -> None:
+        """Start tracking guilds on READY and count guilds arriving after it."""
+        readiness = self.client.readiness
+        if isinstance(event, ReadyEvent):
+            await readiness.start(event)
+        elif event_type in _GUILD_ARRIVAL_EVENTS and readiness.tracking:
+            available = event_type is GuildCreateEvent and not data.get('unavailable')
+            await readiness.guild_received(int(data['id']), available=available)
 
     async def _handle_ready(self, message: ReadyEvent) -> None:
         """Handle the ready event.
@@ -126,11 +189,12 @@ class HelloHandler(OpcodeHandler):
 
     opcode = GatewayMessageOpcode.HELLO
 
-    async def handle(self, _message: DatalessMessage) -> None:
+    async def handle(self, message: HelloMessage) -> None:
         """Handle the HELLO opcode."""
-        self.logger.info('Received HELLO opcode')
+        heartbeat_interval = message.data.heartbeat_interval
+        self.logger.info('Received HELLO opcode, heartbeat interval: %i ms', heartbeat_interval)
 
-        self.client.heartbeat.run(interval=41250)
+        self.client.heartbeat.run(interval=heartbeat_interval)
 
         if self.client.conn_data.can_resume:
             self.logger.info("Resuming session '%s'...", self.client.conn_data.session_id)
@@ -143,10 +207,15 @@ class HelloHandler(OpcodeHandler):
             )
         else:
             self.logger.info('Starting new session')
+            shard = self.client.shard
+            if self.client.identify_gate:
+                await self.client.identify_gate(shard[0] if shard else 0)
+
             await self.client.identify(
                 IdentifyCommand(
                     token=self.client.conn_data.token,
-                    intents=self.client.intents,
+                    intents=self.client.identify_intents,
+                    shard=shard,
                 ),
             )
 
@@ -0,0 +1,247 @@
+"""Filter of raw dispatch payloads applied before event validation.
+
+Validation of events is the most expensive part of dispatching. When a few giant
+guilds flood the gateway with presences and typing, most of the CPU goes to events
+nobody needs. The filter checks raw payloads by their ids against allow and deny
+sets, and thins out high-volume event types by sampling and rate shedding.
+Dropped events are not validated, cached, or dispatched:
+
+    gateway_client.payload_filter = PayloadFilter(
+        denied_guild_ids=noisy_guild_ids,
+        sample_rates={'TYPING_START': 0.1},
+        rate_limits={'PRESENCE_UPDATE': 500},
+    )
+
+The filter is applied after the raw payload is published to the event relay,
+so relay subscribers receive all events.
+"""
+
+from __future__ import annotations
+
+import enum
+import time
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from fractions import Fraction
+from typing import Any, Final
+
+from asyncord.snowflake import SnowflakeInputType
+
+__all__ = (
+    'DropReason',
+    'PayloadFilter',
+)
+
+_PROTECTED_EVENTS: Final[frozenset[str]] = frozenset({'READY', 'RESUMED'})
+"""Events which are never dropped, the client needs them to manage the session."""
+
+_GUILD_OBJECT_EVENTS: Final[frozenset[str]] = frozenset({'GUILD_CREATE', 'GUILD_UPDATE', 'GUILD_DELETE'})
+"""Events which payload is the guild, so the guild id is stored in the `id` key."""
+
+_SAMPLE_RATE_PRECISION: Final = 1_000_000
+"""Maximum denominator of sample rates, so `0.1` is sampled as exactly one tenth."""
+
+
+@enum.unique
+class DropReason(enum.StrEnum):
+    """Reason to drop a payload."""
+
+    DENIED = 'denied'
+    """An id of the payload is in a deny set."""
+
+    NOT_ALLOWED = 'not_allowed'
+    """An id of the payload is not in an allow set."""
+
+    SAMPLED = 'sampled'
+    """The payload is not in the sample of its event type."""
+
+    SHED = 'shed'
+    """The rate limit of its event type is exceeded."""
+
+
+class _RateBucket:
+    """Token bucket of an event type, it holds events of up to one second."""
+
+    __slots__ = ('rate', 'tokens', 'updated_at')
+
+    def __init__(self, rate: float) -> None:
+        """Initialize the bucket."""
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+
+    def take(self) -> bool:
+        """Take a token if there is one."""
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class PayloadFilter:
+    """Filter of raw dispatch payloads.
+
+    Id filters apply only to payloads having the id: with an allow set of guilds,
+    direct messages are still accepted. The user is taken from `user_id`, `author`,
+    `user`, or `member.user` keys. Ids are compared as strings, so payloads are
+    filtered without converting ids to ints.
+
+    Sampling is deterministic: with the rate of 0.1, every tenth event of the type
+    is accepted. Events are counted with integers, so the rate doesn't drift because
+    of float rounding. READY and RESUMED are never dropped.
+
+    Attributes:
+        sample_rates: Fractions of events to accept by event name.
+        dropped: Number of dropped events by event name.
+        drop_reasons: Number of dropped events by reason.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        allowed_guild_ids: Iterable[SnowflakeInputType] | None = None,
+        denied_guild_ids: Iterable[SnowflakeInputType] | None = None,
+        allowed_channel_ids: Iterable[SnowflakeInputType] | None = None,
+        denied_channel_ids: Iterable[SnowflakeInputType] | None = None,
+        allowed_user_ids: Iterable[SnowflakeInputType] | None = None,
+        denied_user_ids: Iterable[SnowflakeInputType] | None = None,
+        sample_rates: Mapping[str, float] | None = None,
+        rate_limits: Mapping[str, float] | None = None,
+    ) -> None:
+        """Initialize the filter.
+
+        Args:
+            allowed_guild_ids: Guilds to accept events from.
+            denied_guild_ids: Guilds to drop events from.
+            allowed_channel_ids: Channels to accept events from.
+            denied_channel_ids: Channels to drop events from.
+            allowed_user_ids: Users to accept events of.
+            denied_user_ids: Users to drop events of.
+            sample_rates: Fractions of events to accept by event name, from 0 to 1.
+            rate_limits: Maximum number of events per second by event name.
+                Events over the limit are dropped.
+        """
+        self._allowed_guilds = _to_str_set(allowed_guild_ids)
+        self._denied_guilds = _to_str_set(denied_guild_ids)
+        self._allowed_channels = _to_str_set(allowed_channel_ids)
+        self._denied_channels = _to_str_set(denied_channel_ids)
+        self._allowed_users = _to_str_set(allowed_user_ids)
+        self._denied_users = _to_str_set(denied_user_ids)
+        self._filters_guilds = self._allowed_guilds is not None or self._denied_guilds is not None
+        self._filters_channels = self._allowed_channels is not None or self._denied_channels is not None
+        self._filters_users = self._allowed_users is not None or self._denied_users is not None
+
+        self.sample_rates = dict(sample_rates or {})
+        for event_name, rate in self.sample_rates.items():
+            if not 0 <= rate <= 1:
+                raise ValueError(f'Sample rate of {event_name} must be between 0 and 1')
+        self._sample_fractions = {
+            event_name: Fraction(rate).limit_denominator(_SAMPLE_RATE_PRECISION)
+            for event_name, rate in self.sample_rates.items()
+        }
+        self._sample_positions: dict[str, int] = dict.fromkeys(self.sample_rates, 0)
+
+        self._buckets: dict[str, _RateBucket] = {}
+        for event_name, limit in (rate_limits or {}).items():
+            if limit <= 0:
+                raise ValueError(f'Rate limit of {event_name} must be positive')
+            self._buckets[event_name] = _RateBucket(limit)
+
+        self.dropped: Counter[str] = Counter()
+        self.drop_reasons: Counter[DropReason] = Counter()
+
+    def accept(self, event_name: str, data: Any) -> bool:  # noqa: ANN401
+        """Check whether the payload should be validated and dispatched.
+
+        Args:
+            event_name: Name of the event.
+            data: Raw payload of the event.
+
+        Returns:
+            True if the payload is accepted.
+        """
+        if event_name in _PROTECTED_EVENTS or not isinstance(data, dict):
+            return True
+
+        reason = self._check_ids(event_name, data) or self._check_volume(event_name)
+        if reason is None:
+            return True
+
+        self.dropped[event_name] += 1
+        self.drop_reasons[reason] += 1
+        return False
+
+    @property
+    def total_dropped(self) -> int:
+        """Number of dropped events."""
+        return self.dropped.total()
+
+    def _check_ids(self, event_name: str, data: dict[str, Any]) -> DropReason | None:
+        """Match ids of the payload against allow and deny sets."""
+        if self._filters_guilds:
+            guild_id = data.get('id') if event_name in _GUILD_OBJECT_EVENTS else data.get('guild_id')
+            reason = _match(guild_id, self._allowed_guilds, self._denied_guilds)
+            if reason is not None:
+                return reason
+
+        if self._filters_channels:
+            reason = _match(data.get('channel_id'), self._allowed_channels, self._denied_channels)
+            if reason is not None:
+                return reason
+
+        if self._filters_users:
+            return _match(_get_user_id(data), self._allowed_users, self._denied_users)
+
+        return None
+
+    def _check_volume(self, event_name: str) -> DropReason | None:
+        """Apply sampling and the rate limit of the event type."""
+        rate = self._sample_fractions.get(event_name)
+        if rate is not None:
+            # the event is accepted when floor(position * rate) grows, the position wraps at the denominator
+            position = self._sample_positions[event_name]
+            self._sample_positions[event_name] = (position + 1) % rate.denominator
+            if (position + 1) * rate.numerator // rate.denominator == position * rate.numerator // rate.denominator:
+                return DropReason.SAMPLED
+
+        bucket = self._buckets.get(event_name)
+        if bucket is not None and not bucket.take():
+            return DropReason.SHED
+
+        return None
+
+
+def _match(value: Any, allowed: frozenset[str] | None, denied: frozenset[str] | None) -> DropReason | None:  # noqa: ANN401
+    """Match an id against allow and deny sets."""
+    if value is None:
+        return None
+    if denied is not None and value in denied:
+        return DropReason.DENIED
+    if allowed is not None and value not in allowed:
+        return DropReason.NOT_ALLOWED
+    return None
+
+
+def _get_user_id(data: dict[str, Any]) -> Any:  # noqa: ANN401
+    """Get the id of the user who caused the event from a raw payload."""
+    user_id = data.get('user_id')
+    if user_id is not None:
+        return user_id
+
+    user = data.get('author') or data.get('user')
+    if user is None and isinstance(member := data.get('member'), dict):
+        # guild interactions have the user in the member object
+        user = member.get('user')
+    if isinstance(user, dict):
+        return user.get('id')
+    return None
+
+
+def _to_str_set(ids: Iterable[SnowflakeInputType] | None) -> frozenset[str] | None:
+    """Convert ids to a set of their string forms, as they are sent by the gateway."""
+    if ids is None:
+        return None
+    return frozenset(str(int(snowflake_id)) for snowflake_id in ids)
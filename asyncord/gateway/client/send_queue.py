@@ -0,0 +1,285 @@
+"""This module contains the outbound command queue of the gateway client.
+
+The gateway closes connections which send more than 120 commands per 60 seconds.
+Commands are sent through a queue limited by a token bucket. A part of the budget
+is reserved for heartbeats, so bulk commands can't make the connection look dead.
+
+The queue is held while the client connects: the gateway closes connections which
+send commands before IDENTIFY or RESUME, so queued commands wait for the session.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any, Final
+
+from asyncord.gateway.message import GatewayCommandOpcode
+
+__all__ = (
+    'DEFAULT_COMMAND_BURST',
+    'DEFAULT_COMMAND_LIMIT',
+    'DEFAULT_COMMAND_PERIOD',
+    'DEFAULT_HEARTBEAT_RESERVE',
+    'CommandRateLimiter',
+    'GatewaySendQueue',
+)
+
+DEFAULT_COMMAND_LIMIT: Final[int] = 120
+"""Maximum number of commands per period allowed by the gateway."""
+
+DEFAULT_COMMAND_PERIOD: Final[float] = 60
+"""Period of the gateway command limit in seconds."""
+
+DEFAULT_COMMAND_BURST: Final[int] = 60
+"""Default number of commands which can be sent at once."""
+
+DEFAULT_HEARTBEAT_RESERVE: Final[int] = 5
+"""Default number of tokens only heartbeats can take.
+
+The heartbeat is sent about every 41 seconds, and resent every 5 seconds while
+the acknowledgement is missing.
+"""
+
+type SendCommandFunc = Callable[[GatewayCommandOpcode, Any], Awaitable[None]]
+"""Type alias for a function to write a command to the websocket."""
+
+
+class CommandRateLimiter:
+    """Token bucket for gateway commands.
+
+    The bucket holds up to `burst` tokens and refills with the rate of
+    `(limit - burst) / period` tokens per second, so no window of `period` seconds
+    has more than `limit` commands regardless of the server window alignment.
+
+    Regular commands can't take the last `heartbeat_reserve` tokens. Heartbeats
+    take any token and are never delayed.
+
+    The heartbeat can run in another thread, so the bucket state is guarded by a lock.
+
+    Attributes:
+        limit: Maximum number of commands per period.
+        period: Period of the limit in seconds.
+        burst: Capacity of the bucket.
+        heartbeat_reserve: Number of tokens reserved for heartbeats.
+    """
+
+    def __init__(
+        self,
+        limit: int = DEFAULT_COMMAND_LIMIT,
+        period: float = DEFAULT_COMMAND_PERIOD,
+        burst: int = DEFAULT_COMMAND_BURST,
+        heartbeat_reserve: int = DEFAULT_HEARTBEAT_RESERVE,
+    ) -> None:
+        """Initialize the rate limiter.
+
+        Args:
+            limit: Maximum number of commands per period.
+            period: Period of the limit in seconds.
+            burst: Capacity of the bucket.
+            heartbeat_reserve: Number of tokens reserved for heartbeats.
+        """
+        if not 0 <= heartbeat_reserve < burst < limit:
+            raise ValueError('Rate limit arguments must satisfy 0 <= heartbeat_reserve < burst < limit')
+
+        self.limit = limit
+        self.period = period
+        self.burst = burst
+        self.heartbeat_reserve = heartbeat_reserve
+
+        self._rate = (limit - burst) / period
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+
+    @property
+    def tokens(self) -> float:
+        """Number of available tokens including the heartbeat reserve."""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def acquire(self) -> float:
+        """Take a token for a regular command.
+
+        Returns:
+            0 if the token was taken, otherwise the time in seconds to wait
+            before the next try.
+        """
+        with self._lock:
+            self._refill()
+            needed = self.heartbeat_reserve + 1
+            if self._tokens >= needed:
+                self._tokens -= 1
+                return 0
+            return (needed - self._tokens) / self._rate
+
+    def acquire_heartbeat(self) -> None:
+        """Take a token for a heartbeat or a session command.
+
+        The command is sent even if the bucket is empty, it should never happen
+        with a reasonable reserve. Identify and resume are sent on a new connection,
+        so the bucket is full then.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = max(self._tokens - 1, 0)
+
+    def reset(self) -> None:
+        """Fill the bucket, the gateway counts commands per connection."""
+        with self._lock:
+            self._tokens = float(self.burst)
+            self._updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        """Add tokens for the time passed since the last update."""
+        now = time.monotonic()
+        self._tokens = min(self._tokens + (now - self._updated_at) * self._rate, self.burst)
+        self._updated_at = now
+
+
+class _QueuedCommand:
+    """Command waiting to be sent."""
+
+    __slots__ = ('data', 'opcode', 'waiters')
+
+    def __init__(self, opcode: GatewayCommandOpcode, data: Any) -> None:  # noqa: ANN401
+        """Initialize the queued command."""
+        self.opcode = opcode
+        self.data = data
+        self.waiters: list[asyncio.Future[None]] = []
+
+
+class GatewaySendQueue:
+    """Queue of outbound gateway commands.
+
+    Commands are sent in order by a drain task, which is started when the first
+    command is queued and stops when the queue is empty.
+
+    Coalescing commands replace the data of the queued command with the same opcode,
+    so only the latest data is sent, on the position of the first queued command.
+
+    A held queue keeps commands until it's released.
+    """
+
+    def __init__(self, send: SendCommandFunc, rate_limiter: CommandRateLimiter) -> None:
+        """Initialize the send queue.
+
+        Args:
+            send: Function to write a command to the websocket.
+            rate_limiter: Rate limiter of the commands.
+        """
+        self.rate_limiter = rate_limiter
+
+        self._send = send
+        self._queue: deque[_QueuedCommand] = deque()
+        self._coalescing: dict[GatewayCommandOpcode, _QueuedCommand] = {}
+        self._drain_task: asyncio.Task[None] | None = None
+        self._held = False
+
+    @property
+    def depth(self) -> int:
+        """Number of commands waiting to be sent."""
+        return len(self._queue)
+
+    @property
+    def held(self) -> bool:
+        """Whether commands are kept in the queue."""
+        return self._held
+
+    def hold(self) -> None:
+        """Keep commands in the queue until it's released.
+
+        The command being written when the queue is held is still sent.
+        """
+        self._held = True
+
+    def release(self) -> None:
+        """Send held commands."""
+        self._held = False
+        self._start_drain()
+
+    async def put(self, opcode: GatewayCommandOpcode, data: Any, *, coalesce: bool = False) -> None:  # noqa: ANN401
+        """Queue a command and wait until it's sent.
+
+        Args:
+            opcode: Opcode of the command.
+            data: Data of the command.
+            coalesce: Whether the command replaces a queued command with the same opcode.
+
+        Raises:
+            Exception: Error of writing the command to the websocket.
+        """
+        command = self._coalescing.get(opcode) if coalesce else None
+        if command is None:
+            command = _QueuedCommand(opcode, data)
+            self._queue.append(command)
+            if coalesce:
+                self._coalescing[opcode] = command
+        else:
+            command.data = data
+
+        waiter = asyncio.get_running_loop().create_future()
+        command.waiters.append(waiter)
+
+        self._start_drain()
+        await waiter
+
+    async def close(self, exc: BaseException) -> None:
+        """Stop sending and fail queued commands.
+
+        Args:
+            exc: Error to raise to the code waiting for queued commands.
+        """
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            await asyncio.gather(self._drain_task, return_exceptions=True)
+            self._drain_task = None
+
+        while self._queue:
+            self._finish(self._queue.popleft(), exc)
+        self._coalescing.clear()
+
+    def _start_drain(self) -> None:
+        """Start the drain task if the queue isn't held and the task isn't running."""
+        if self._held or not self._queue:
+            return
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.create_task(self._drain(), name='GatewaySendQueue._drain')
+
+    async def _drain(self) -> None:
+        """Send queued commands when the rate limit allows."""
+        while self._queue and not self._held:
+            delay = self.rate_limiter.acquire()
+            if delay:
+                await asyncio.sleep(delay)
+                continue
+
+            command = self._queue.popleft()
+            if self._coalescing.get(command.opcode) is command:
+                del self._coalescing[command.opcode]
+
+            try:
+                await self._send(command.opcode, command.data)
+            except asyncio.CancelledError:
+                for waiter in command.waiters:
+                    waiter.cancel()
+                raise
+            except Exception as exc:
+                self._finish(command, exc)
+            else:
+                self._finish(command, None)
+
+    @staticmethod
+    def _finish(command: _QueuedCommand, exc: BaseException | None) -> None:
+        """Resolve waiters of the command."""
+        for waiter in command.waiters:
+            if waiter.done():
+                continue
+            if exc is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(exc)
@@ -0,0 +1,135 @@
+"""This module contains stores to keep gateway sessions between process restarts.
+
+When the state of a session is saved on shutdown, the next process can resume
+the session instead of identifying again. Resuming replays only missed events,
+while identifying costs a part of the daily identify budget and replays
+`GUILD_CREATE` for every guild.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from pydantic import BaseModel, ValidationError
+
+__all__ = ('FileSessionStore', 'SessionState', 'SessionStore')
+
+logger = logging.getLogger(__name__)
+
+
+class SessionState(BaseModel, frozen=True):
+    """State required to resume a gateway session."""
+
+    session_id: str
+    """ID of the session."""
+
+    seq: int
+    """Sequence number of the last received event."""
+
+    resume_url: str
+    """URL to resume the session at."""
+
+
+class SessionStore(ABC):
+    """Base class for session stores.
+
+    Sessions are stored by key. The gateway client uses a key derived from
+    the token and the client name, so one store can keep sessions of several clients.
+    """
+
+    @abstractmethod
+    async def load(self, key: str) -> SessionState | None:
+        """Load the session state.
+
+        Args:
+            key: Key of the session.
+
+        Returns:
+            Session state or None if there is no saved session.
+        """
+
+    @abstractmethod
+    async def save(self, key: str, state: SessionState) -> None:
+        """Save the session state.
+
+        Args:
+            key: Key of the session.
+            state: Session state to save.
+        """
+
+    @abstractmethod
+    async def clear(self, key: str) -> None:
+        """Remove the saved session state.
+
+        Args:
+            key: Key of the session.
+        """
+
+
+class FileSessionStore(SessionStore):
+    """Session store which keeps sessions in a JSON file.
+
+    The file is replaced atomically, so a crash while saving doesn't corrupt it.
+    File operations run in a thread to not block the event loop.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        """Initialize the file session store.
+
+        Args:
+            path: Path to the file.
+        """
+        self.path = Path(path)
+        self._lock = asyncio.Lock()
+
+    async def load(self, key: str) -> SessionState | None:
+        """Load the session state from the file."""
+        async with self._lock:
+            raw_state = (await asyncio.to_thread(self._read)).get(key)
+
+        if raw_state is None:
+            return None
+
+        try:
+            return SessionState.model_validate(raw_state)
+        except ValidationError:
+            logger.warning('Invalid session state in %s, ignoring it', self.path)
+            return None
+
+    async def save(self, key: str, state: SessionState) -> None:
+        """Save the session state to the file."""
+        async with self._lock:
+            sessions = await asyncio.to_thread(self._read)
+            sessions[key] = state.model_dump(mode='json')
+            await asyncio.to_thread(self._write, sessions)
+
+    async def clear(self, key: str) -> None:
+        """Remove the session state from the file."""
+        async with self._lock:
+            sessions = await asyncio.to_thread(self._read)
+            if sessions.pop(key, None) is not None:
+                await asyncio.to_thread(self._write, sessions)
+
+    def _read(self) -> dict[str, dict[str, object]]:
+        """Read all sessions from the file."""
+        try:
+            sessions = json.loads(self.path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            logger.warning('Failed to read sessions from %s, ignoring them', self.path, exc_info=True)
+            return {}
+
+        return sessions if isinstance(sessions, dict) else {}
+
+    def _write(self, sessions: dict[str, dict[str, object]]) -> None:
+        """Write all sessions to the file atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f'{self.path.name}.tmp')
+        tmp_path.write_text(json.dumps(sessions), encoding='utf-8')
+        tmp_path.replace(self.path)
@@ -8,11 +8,13 @@ from pydantic import BaseModel
 from asyncord import __version__
 from asyncord.client.models.activities import Activity
 from asyncord.gateway.intents import DEFAULT_INTENTS, Intent
+from asyncord.snowflake import SnowflakeInputType
 
 __all__ = (
     'IdentifyCommand',
     'IdentifyConnectionProperties',
     'PresenceUpdateData',
+    'RequestGuildMembersCommand',
     'ResumeCommand',
     'StatusType',
 )
@@ -132,3 +134,38 @@ class IdentifyCommand(BaseModel):
 
     properties: IdentifyConnectionProperties = IdentifyConnectionProperties()
     """Connection properties."""
+
+
+class RequestGuildMembersCommand(BaseModel):
+    """Request members of a guild.
+
+    Members are sent back in `GUILD_MEMBERS_CHUNK` events with the same nonce.
+    Either `query` or `user_ids` must be set.
+
+    Reference:
+    https://discord.com/developers/docs/topics/gateway-events#request-guild-members-request-guild-members-structure
+    """
+
+    guild_id: SnowflakeInputType
+    """Guild id to get members for."""
+
+    query: str | None = None
+    """String that username starts with, or an empty string to return all members."""
+
+    limit: int = 0
+    """Maximum number of members to send matching the query.
+
+    A limit of 0 can be used with an empty string query to return all members.
+    """
+
+    presences: bool | None = None
+    """Whether to return presences of the matched members."""
+
+    user_ids: list[SnowflakeInputType] | None = None
+    """Users to fetch."""
+
+    nonce: str | None = None
+    """Nonce to identify the chunks of the response.
+
+    Up to 32 bytes.
+    """
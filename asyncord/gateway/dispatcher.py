@@ -1,4 +1,18 @@
-"""This module defines the EventDispatcher class, which dispatches events to registered handlers."""
+"""This module defines the EventDispatcher class, which dispatches events to registered handlers.
+
+Handlers usually receive full event models. A handler can be registered with a slim
+user-defined model (a projection) instead, then the raw payload is validated into
+the projection only, which is much cheaper for big events like messages:
+
+    class MessageText(BaseModel):
+        channel_id: Snowflake
+        content: str
+
+    async def on_message(message: MessageText) -> None:
+        ...
+
+    dispatcher.add_projection_handler(MessageCreateEvent, MessageText, on_message)
+"""
 
 from __future__ import annotations
 
@@ -9,16 +23,30 @@ from typing import (
     Any,
     Concatenate,
     TypeVar,
+    Unpack,
     cast,
     get_type_hints,
     overload,
 )
 
+from pydantic import BaseModel, ValidationError
+
 from asyncord.gateway.events.base import GatewayEvent
+from asyncord.gateway.filters import EventFilter, EventFilterArgs, FilterIndex
+from asyncord.gateway.streams import (
+    DEFAULT_STREAM_MAXSIZE,
+    CoalesceKeyFunc,
+    EventStream,
+    EventStreams,
+    StreamOverflow,
+    default_coalesce_key,
+)
+from asyncord.gateway.waiters import EventWaiters
 
 __all__ = (
     'EventDispatcher',
     'EventHandlerType',
+    'ProjectionHandlerType',
 )
 
 logger = logging.getLogger(__name__)
@@ -33,12 +61,22 @@ This old generic alias format to make code complexity lower.
 type EventHandlerType[EVENT_T: GatewayEvent] = Callable[Concatenate[EVENT_T, ...], Awaitable[None]]
 """Type alias for an event handler."""
 
+type ProjectionHandlerType[MODEL_T: BaseModel] = Callable[Concatenate[MODEL_T, ...], Awaitable[None]]
+"""Type alias for a handler of a projection."""
+
+type ProjectionHandlers = dict[type[BaseModel], FilterIndex[EventHandlerType]]
+"""Type alias for handlers of projections of an event type indexed by projection models."""
+
 
 class EventDispatcher:
     """Dispatches events to registered handlers.
 
     Attributes:
         _handlers: Mapping of event types to event handlers.
+        _handler_index: Event handlers indexed by their event filters.
+        _projections: Handlers of projections indexed by event types and projection models.
+        _waiters: Pending one-shot waiters for events.
+        _streams: Open event streams.
         _args: Arguments can be passed to all event handlers.
         _cached_args: Cached arguments to pass to event handlers.
     """
@@ -46,6 +84,10 @@ class EventDispatcher:
     def __init__(self) -> None:
         """Initialize the event dispatcher."""
         self._handlers: _HandlersMutMapping = defaultdict(list)
+        self._handler_index: dict[type[GatewayEvent], FilterIndex[EventHandlerType]] = {}
+        self._projections: dict[type[GatewayEvent], ProjectionHandlers] = {}
+        self._waiters = EventWaiters()
+        self._streams = EventStreams()
 
         self._args: dict[str, Any] = {}
         self._cached_args: dict[EventHandlerType, dict[str, Any]] = {}
@@ -56,11 +98,16 @@ class EventDispatcher:
         self,
         event_type: type[EVENT_T],
         event_handler: EventHandlerType[EVENT_T],
+        **filters: Unpack[EventFilterArgs],
     ) -> None:
         ...
 
     @overload
-    def add_handler(self, event_type: EventHandlerType[EVENT_T]) -> None:
+    def add_handler(
+        self,
+        event_type: EventHandlerType[EVENT_T],
+        **filters: Unpack[EventFilterArgs],
+    ) -> None:
         ...
     # fmt: on
 
@@ -69,18 +116,28 @@ class EventDispatcher:
         self,
         event_type: type[EVENT_T] | EventHandlerType[EVENT_T],
         event_handler: EventHandlerType[EVENT_T] | None = None,
+        **filters: Unpack[EventFilterArgs],
     ) -> None:
         """Add a handler for a specific event type.
 
         If the event type is not specified, the type will be inferred from
         the type hints of the event handler.
 
+        Filters restrict the handler to events with the given values, for example
+        `add_handler(on_message, channel_id=123)`. Handlers are indexed by filters,
+        so dispatching doesn't call handlers which events don't match.
+
+        Handlers annotated with a model which is not a gateway event are rejected,
+        register them with `add_projection_handler` to receive projections.
+
         Args:
             event_type: Event type to handle.
             event_handler: Handler to call when the event is dispatched.
+            **filters: Event filters, see `EventFilterArgs`.
 
         Raises:
             ValueError: If the event type is not specified and cannot be inferred.
+            TypeError: If the handler is annotated with a model which is not a gateway event.
         """
         if event_handler is None:
             if callable(event_type):
@@ -103,8 +160,57 @@ class EventDispatcher:
         if not callable(event_handler):
             raise TypeError('Event handler must be Callable')
 
+        projection_type = self._infer_projection_type(event_handler)
+        if projection_type is not None:
+            raise TypeError(
+                f'Event handler is annotated with {projection_type.__name__}, which is not a gateway event, '
+                'use add_projection_handler to receive projections',
+            )
+
+        event_filter = EventFilter.build(**filters)
         self._update_args_cache(event_handler)
+
         self._handlers[event_type].append(event_handler)
+        self._handler_index.setdefault(event_type, FilterIndex()).add(event_handler, event_filter)
+
+    def add_projection_handler[MODEL_T: BaseModel](
+        self,
+        event_type: type[GatewayEvent],
+        projection_type: type[MODEL_T],
+        event_handler: ProjectionHandlerType[MODEL_T],
+        **filters: Unpack[EventFilterArgs],
+    ) -> None:
+        """Add a handler for projections of a specific event type.
+
+        The handler receives a projection: the raw payload of the event validated
+        into the projection model. Filters are applied to projections, so they must
+        have the filtered fields.
+
+        Args:
+            event_type: Event type to handle.
+            projection_type: Model to validate raw payloads into.
+            event_handler: Handler to call when the event is dispatched.
+            **filters: Event filters, see `EventFilterArgs`.
+
+        Raises:
+            TypeError: If the event type is not a gateway event or the projection
+                type is not a model.
+        """
+        if not isinstance(event_type, type) or not issubclass(event_type, GatewayEvent):
+            raise TypeError('Event type must be a gateway event')
+
+        if not isinstance(projection_type, type) or not issubclass(projection_type, BaseModel):
+            raise TypeError('Projection type must be a pydantic model')
+
+        if not callable(event_handler):
+            raise TypeError('Event handler must be Callable')
+
+        event_filter = EventFilter.build(**filters)
+        handler = cast(EventHandlerType, event_handler)
+        self._update_args_cache(handler)
+
+        projections = self._projections.setdefault(event_type, {})
+        projections.setdefault(projection_type, FilterIndex()).add(handler, event_filter)
 
     def add_argument(self, arg_name: str, arg_value: Any) -> None:  # noqa: ANN401
         """Add an argument to be passed to all event handlers.
@@ -118,14 +224,180 @@ class EventDispatcher:
             for event_handler in event_handlers:
                 self._update_args_cache(event_handler)
 
+        for projections in self._projections.values():
+            for handler_index in projections.values():
+                for event_handler in handler_index:
+                    self._update_args_cache(event_handler)
+
+    @property
+    def subscribed_event_types(self) -> frozenset[type[GatewayEvent]]:
+        """Event types which have at least one subscriber or projection handler."""
+        handler_types = {event_type for event_type, handlers in self._handlers.items() if handlers}
+        return frozenset(
+            handler_types | self._projections.keys() | self._waiters.event_types | self._streams.event_types,
+        )
+
+    def has_subscribers(self, event_type: type[GatewayEvent]) -> bool:
+        """Check if the event type has at least one subscriber.
+
+        The gateway client uses it to skip parsing of events nobody listens to.
+
+        Args:
+            event_type: Event type to check.
+
+        Returns:
+            True if dispatching the event type can reach any handler.
+        """
+        return (
+            bool(self._handlers.get(event_type))
+            or self._waiters.has_waiters(event_type)
+            or self._streams.has_streams(event_type)
+        )
+
+    def has_projections(self, event_type: type[GatewayEvent]) -> bool:
+        """Check if the event type has handlers of projections.
+
+        Projections are validated from raw payloads, so the gateway client passes
+        payloads to `dispatch_projections` even if the event has no other subscribers.
+
+        Args:
+            event_type: Event type to check.
+
+        Returns:
+            True if the event type has at least one projection handler.
+        """
+        return event_type in self._projections
+
+    async def wait_for(
+        self,
+        event_type: type[EVENT_T],
+        predicate: Callable[[EVENT_T], bool] | None = None,
+        *,
+        timeout: float | None = None,
+        **filters: Unpack[EventFilterArgs],
+    ) -> EVENT_T:
+        """Wait for the next event of the type which matches filters and the predicate.
+
+        Waiters are resolved before handlers of the event are called. Filters are
+        indexed the same way as handler filters, so prefer them over predicates
+        when many waiters are pending, for example:
+
+            event = await dispatcher.wait_for(
+                InteractionCreateEvent,
+                custom_id_prefix=f'confirm:{message_id}',
+                timeout=60,
+            )
+
+        Args:
+            event_type: Event type to wait for.
+            predicate: Additional check of the event.
+            timeout: Maximum time to wait in seconds. If None, wait forever.
+            **filters: Event filters, see `EventFilterArgs`.
+
+        Returns:
+            Matched event.
+
+        Raises:
+            TimeoutError: If no matching event was dispatched in time.
+        """
+        event_filter = EventFilter.build(**filters)
+        return await self._waiters.wait(event_type, predicate, event_filter, timeout)
+
+    def stream(
+        self,
+        event_type: type[EVENT_T],
+        maxsize: int = DEFAULT_STREAM_MAXSIZE,
+        overflow: StreamOverflow | str = StreamOverflow.DROP_OLDEST,
+        *,
+        coalesce_key: CoalesceKeyFunc = default_coalesce_key,
+        **filters: Unpack[EventFilterArgs],
+    ) -> EventStream[EVENT_T]:
+        """Open an async iterator over events of the type.
+
+        The stream receives events from the moment it is opened until it is closed:
+
+            async with dispatcher.stream(MessageCreateEvent, maxsize=500) as stream:
+                while batch := await stream.get_batch(100):
+                    await ship_logs(batch)
+
+        Args:
+            event_type: Event type to receive.
+            maxsize: Maximum number of buffered events.
+            overflow: Policy to apply when the buffer is full: `drop_oldest`,
+                `block` or `coalesce`.
+            coalesce_key: Function to get the key of events for the coalesce policy.
+            **filters: Event filters, see `EventFilterArgs`.
+
+        Returns:
+            Event stream.
+        """
+        event_filter = EventFilter.build(**filters)
+        return self._streams.open(event_type, event_filter, maxsize, overflow, coalesce_key)
+
     async def dispatch(self, event: GatewayEvent) -> None:
         """Dispatch an event to all handlers.
 
         Args:
             event: Event to dispatch.
         """
-        event_type = type(event)
-        for event_handler in self._handlers.get(event_type, []):
+        self._waiters.resolve(event)
+        await self._streams.publish(event)
+
+        handler_index = self._handler_index.get(type(event))
+        if handler_index is not None:
+            await self._call_handlers(handler_index, event)
+
+    async def dispatch_projections(self, event_type: type[GatewayEvent], payload: dict[str, Any]) -> None:
+        """Validate a raw payload into projections of the event type and dispatch them.
+
+        The payload is validated once per projection model, no matter how many
+        handlers share it. Payloads which don't fit a projection are logged and skipped.
+
+        Args:
+            event_type: Event type of the payload.
+            payload: Raw event payload.
+        """
+        for projection, handler_index in self._project(event_type, payload):
+            await self._call_handlers(handler_index, projection)
+
+    async def close(self) -> None:
+        """Release resources held by the dispatcher.
+
+        Pending waiters are cancelled and streams are closed. Subclasses can also
+        run background workers which must be stopped with the client.
+        """
+        self._waiters.cancel_all()
+        self._streams.close_all()
+
+    def _project(
+        self,
+        event_type: type[GatewayEvent],
+        payload: dict[str, Any],
+    ) -> list[tuple[BaseModel, FilterIndex[EventHandlerType]]]:
+        """Validate a raw payload into projections of the event type.
+
+        Args:
+            event_type: Event type of the payload.
+            payload: Raw event payload.
+
+        Returns:
+            Projections with their handlers.
+        """
+        projections = []
+        for projection_type, handler_index in self._projections.get(event_type, {}).items():
+            projection = _validate_projection(projection_type, payload)
+            if projection is not None:
+                projections.append((projection, handler_index))
+        return projections
+
+    async def _call_handlers(self, handler_index: FilterIndex[EventHandlerType], event: BaseModel) -> None:
+        """Call handlers which filters match the event.
+
+        Args:
+            handler_index: Handlers indexed by their filters.
+            event: Event or projection to pass to handlers.
+        """
+        for event_handler in handler_index.match(event):
             kwargs = self._cached_args[event_handler]
             try:
                 await event_handler(event, **kwargs)
@@ -160,6 +432,38 @@ class EventDispatcher:
 
         return cast(type[EVENT_T], handler_arg_types[0])
 
+    @classmethod
+    def _infer_projection_type(cls, event_handler: EventHandlerType[EVENT_T]) -> type[BaseModel] | None:
+        """Get the model of a handler annotated with a model which is not a gateway event.
+
+        Returns:
+            Model of the first argument if it's a model but not a gateway event, None otherwise.
+        """
+        try:
+            type_hints = get_type_hints(event_handler)
+        except (NameError, TypeError):
+            # unresolvable hints can't be checked
+            return None
+
+        type_hints.pop('return', None)
+        arg_type = next(iter(type_hints.values()), None)
+        if isinstance(arg_type, type) and issubclass(arg_type, BaseModel) and not issubclass(arg_type, GatewayEvent):
+            return arg_type
+        return None
+
+
+def _validate_projection(projection_type: type[BaseModel], payload: dict[str, Any]) -> BaseModel | None:
+    """Validate a raw payload into a projection.
+
+    Returns:
+        Projection or None if the payload doesn't fit the projection model.
+    """
+    try:
+        return projection_type.model_validate(payload)
+    except ValidationError:
+        logger.exception('Failed to validate payload into projection %s', projection_type.__name__)
+        return None
+
 
 type _HandlersMutMapping[EVENT_T: GatewayEvent] = MutableMapping[
     type[EVENT_T],
@@ -3,9 +3,10 @@
 from __future__ import annotations
 
 import datetime
+from typing import NamedTuple
 
 from fbenum.adapter import FallbackAdapter
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from asyncord.client.channels.models.responses import ChannelResponse
 from asyncord.client.members.models.responses import MemberResponse
@@ -28,6 +29,7 @@ from asyncord.gateway.events.base import GatewayEvent
 from asyncord.snowflake import Snowflake
 
 __all__ = (
+    'CachedMessage',
     'MentionUser',
     'MessageCreateEvent',
     'MessageDeleteBulkEvent',
@@ -42,6 +44,35 @@ __all__ = (
 )
 
 
+class CachedMessage(NamedTuple):
+    """Message kept by the message cache.
+
+    Only ids and the content are kept, so cached messages take a fraction of memory
+    of message models.
+    """
+
+    id: int
+    """Message id."""
+
+    channel_id: int
+    """Channel id the message was sent in."""
+
+    guild_id: int | None
+    """Guild id the message was sent in."""
+
+    author_id: int
+    """Author id."""
+
+    content: str
+    """Contents of the message."""
+
+    edited_timestamp: datetime.datetime | None
+    """When the message was edited, None if never."""
+
+    attachment_ids: tuple[int, ...]
+    """Ids of attached files."""
+
+
 class MessageMember(BaseModel):
     """Mentioned user object."""
 
@@ -229,6 +260,12 @@ class MessageUpdateEvent(GatewayEvent):
     mentions: list[MentionUser] | None = None
     """Users specifically mentioned in the message."""
 
+    cached_message: CachedMessage | None = Field(None, exclude=True)
+    """Message before the update.
+
+    Filled by the message cache if the message was cached, it's not sent by Discord.
+    """
+
 
 class MessageDeleteEvent(GatewayEvent):
     """Sent when a message is deleted.
@@ -246,6 +283,12 @@ class MessageDeleteEvent(GatewayEvent):
     guild_id: Snowflake | None = None
     """Guild id."""
 
+    cached_message: CachedMessage | None = Field(None, exclude=True)
+    """Deleted message.
+
+    Filled by the message cache if the message was cached, it's not sent by Discord.
+    """
+
 
 class MessageDeleteBulkEvent(GatewayEvent):
     """Sent when multiple messages are deleted at once.
@@ -263,6 +306,12 @@ class MessageDeleteBulkEvent(GatewayEvent):
     guild_id: Snowflake | None = None
     """Guild id."""
 
+    cached_messages: list[CachedMessage] = Field(default_factory=list, exclude=True)
+    """Deleted messages found in the message cache.
+
+    Filled by the message cache, it's not sent by Discord.
+    """
+
 
 class MessageReactionEmoji(BaseModel):
     """Emoji sent with a message reaction.
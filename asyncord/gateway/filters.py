@@ -0,0 +1,367 @@
+"""This module defines declarative event filters and the index to match them.
+
+Filters are set when subscribing to an event, for example to receive messages only
+from one channel. The index groups subscriptions by filter values, so matching an event
+costs a few dictionary lookups instead of checking every subscription.
+"""
+
+from __future__ import annotations
+
+import itertools
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Any, Final, NamedTuple, TypedDict
+
+from asyncord.gateway.events.channels import ChannelCreateEvent, ChannelDeleteEvent, ChannelUpdateEvent
+from asyncord.gateway.events.guilds import GuildCreateEvent, GuildDeleteEvent, GuildUpdateEvent
+from asyncord.snowflake import Snowflake
+
+__all__ = (
+    'EventFilter',
+    'EventFilterArgs',
+    'FilterIndex',
+    'get_author_id',
+    'get_channel_id',
+    'get_command_name',
+    'get_custom_id',
+    'get_guild_id',
+)
+
+type _SnowflakeArg = int | str | Snowflake
+"""Snowflake value accepted by filters."""
+
+_GUILD_OBJECT_EVENTS: Final = (GuildCreateEvent, GuildUpdateEvent, GuildDeleteEvent)
+"""Events which carry the guild id in the `id` field."""
+
+_CHANNEL_OBJECT_EVENTS: Final = (ChannelCreateEvent, ChannelUpdateEvent, ChannelDeleteEvent)
+"""Events which carry the channel id in the `id` field."""
+
+
+class EventFilterArgs(TypedDict, total=False):
+    """Keyword arguments to build an event filter.
+
+    Each argument accepts a single value or a collection of values.
+    """
+
+    guild_id: _SnowflakeArg | Iterable[_SnowflakeArg]
+    """Guild the event belongs to."""
+
+    channel_id: _SnowflakeArg | Iterable[_SnowflakeArg]
+    """Channel the event belongs to."""
+
+    author_id: _SnowflakeArg | Iterable[_SnowflakeArg]
+    """User who caused the event: message author, interaction user, typing user, etc."""
+
+    command_name: str | Iterable[str]
+    """Name of the application command of the interaction."""
+
+    custom_id_prefix: str
+    """Prefix of the custom id of the component or modal interaction."""
+
+
+def _payload(event: Any) -> Any:  # noqa: ANN401
+    """Get the object with event fields.
+
+    Interaction events are root models, their fields are stored in the root object.
+    """
+    return getattr(event, 'root', event)
+
+
+def get_guild_id(event: Any) -> int | None:  # noqa: ANN401
+    """Get the guild id of an event.
+
+    Guild events are the guild objects, so their guild id is the object id.
+    """
+    if isinstance(event, _GUILD_OBJECT_EVENTS):
+        return int(event.id)
+    guild_id = getattr(_payload(event), 'guild_id', None)
+    return None if guild_id is None else int(guild_id)
+
+
+def get_channel_id(event: Any) -> int | None:  # noqa: ANN401
+    """Get the channel id of an event.
+
+    Channel events are the channel objects, so their channel id is the object id.
+    """
+    if isinstance(event, _CHANNEL_OBJECT_EVENTS):
+        return int(event.id)
+    channel_id = getattr(_payload(event), 'channel_id', None)
+    return None if channel_id is None else int(channel_id)
+
+
+def get_author_id(event: Any) -> int | None:  # noqa: ANN401
+    """Get the id of the user who caused an event."""
+    payload = _payload(event)
+
+    # messages
+    author = getattr(payload, 'author', None)
+    if author is not None:
+        return int(author.id)
+
+    # typing and reactions
+    user_id = getattr(payload, 'user_id', None)
+    if user_id is not None:
+        return int(user_id)
+
+    # guild interactions have the user in the member object
+    member = getattr(payload, 'member', None)
+    user = getattr(member, 'user', None) or getattr(payload, 'user', None)
+    if user is not None:
+        return int(user.id)
+
+    return None
+
+
+def get_custom_id(event: Any) -> str | None:  # noqa: ANN401
+    """Get the custom id of a component or modal interaction."""
+    return getattr(getattr(_payload(event), 'data', None), 'custom_id', None)
+
+
+def get_command_name(event: Any) -> str | None:  # noqa: ANN401
+    """Get the command name of an application command interaction."""
+    return getattr(getattr(_payload(event), 'data', None), 'name', None)
+
+
+_EXACT_GETTERS: Final[dict[str, Callable[[Any], Hashable | None]]] = {
+    # ordered by selectivity, the first set field is used to index a filter
+    'channel_id': get_channel_id,
+    'author_id': get_author_id,
+    'command_name': get_command_name,
+    'guild_id': get_guild_id,
+}
+"""Functions to get values of the exact match filter fields."""
+
+
+@dataclass(frozen=True, slots=True)
+class EventFilter:
+    """Declarative event filter.
+
+    An event matches the filter if it matches all set fields.
+    Use `EventFilter.build` to make a filter from user arguments.
+    Sets of allowed values can't be empty, such a filter would match nothing.
+    """
+
+    channel_id: frozenset[int] | None = None
+    """Allowed channel ids."""
+
+    author_id: frozenset[int] | None = None
+    """Allowed author ids."""
+
+    command_name: frozenset[str] | None = None
+    """Allowed command names."""
+
+    guild_id: frozenset[int] | None = None
+    """Allowed guild ids."""
+
+    custom_id_prefix: str | None = None
+    """Required custom id prefix."""
+
+    def __post_init__(self) -> None:
+        """Check that sets of allowed values are not empty."""
+        for field_name in _EXACT_GETTERS:
+            if getattr(self, field_name) == frozenset():
+                raise ValueError(f'Event filter {field_name} must not be empty')
+
+    @classmethod
+    def build(cls, **filter_args: Any) -> EventFilter | None:  # noqa: ANN401
+        """Build a filter from keyword arguments.
+
+        Args:
+            **filter_args: Filter fields, see `EventFilterArgs`.
+
+        Returns:
+            Event filter or None if no filter fields are set.
+
+        Raises:
+            TypeError: If an unknown filter field is passed.
+            ValueError: If an empty collection is passed.
+        """
+        unknown_args = filter_args.keys() - EventFilterArgs.__annotations__.keys()
+        if unknown_args:
+            raise TypeError(f'Unknown event filters: {", ".join(sorted(unknown_args))}')
+
+        if all(value is None for value in filter_args.values()):
+            return None
+
+        return cls(
+            channel_id=_to_id_set(filter_args.get('channel_id')),
+            author_id=_to_id_set(filter_args.get('author_id')),
+            command_name=_to_str_set(filter_args.get('command_name')),
+            guild_id=_to_id_set(filter_args.get('guild_id')),
+            custom_id_prefix=filter_args.get('custom_id_prefix'),
+        )
+
+    def matches(self, event: Any) -> bool:  # noqa: ANN401
+        """Check if the event matches the filter.
+
+        Args:
+            event: Event to check.
+
+        Returns:
+            True if the event matches all set fields.
+        """
+        for field_name, getter in _EXACT_GETTERS.items():
+            allowed = getattr(self, field_name)
+            if allowed is not None and getter(event) not in allowed:
+                return False
+
+        if self.custom_id_prefix is not None:
+            custom_id = get_custom_id(event)
+            return custom_id is not None and custom_id.startswith(self.custom_id_prefix)
+
+        return True
+
+
+class _Entry[T](NamedTuple):
+    """Entry of the filter index."""
+
+    event_filter: EventFilter | None
+    item: T
+
+
+type _Bucket[T] = dict[int, _Entry[T]]
+"""Entries by entry id. Entry ids grow, so buckets keep the insertion order."""
+
+
+class FilterIndex[T]:
+    """Index of items subscribed with event filters.
+
+    Every filtered item is stored under the values of the most selective exact field
+    of its filter (or under its custom id prefix). To match an event, the index gets
+    the values of the event once and looks up the corresponding buckets, then checks
+    the rest of the filter for the found items only.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the filter index."""
+        self._entry_ids = itertools.count()
+        self._unfiltered: _Bucket[T] = {}
+        self._exact: dict[str, dict[Hashable, _Bucket[T]]] = {}
+        self._prefixes: dict[int, dict[str, _Bucket[T]]] = {}
+        self._locations: dict[int, list[tuple[dict[Any, _Bucket[T]], Hashable]]] = {}
+
+    def add(self, item: T, event_filter: EventFilter | None = None) -> int:
+        """Add an item to the index.
+
+        Args:
+            item: Item to add.
+            event_filter: Filter of the item. If None, the item matches all events.
+
+        Returns:
+            Id of the entry to remove it later.
+        """
+        entry_id = next(self._entry_ids)
+        entry = _Entry(event_filter, item)
+
+        if event_filter is None:
+            self._unfiltered[entry_id] = entry
+            return entry_id
+
+        locations = []
+        for field_name in _EXACT_GETTERS:
+            values = getattr(event_filter, field_name)
+            if values is not None:
+                table = self._exact.setdefault(field_name, {})
+                for value in values:
+                    table.setdefault(value, {})[entry_id] = entry
+                    locations.append((table, value))
+                break
+        else:
+            prefix = event_filter.custom_id_prefix or ''
+            table = self._prefixes.setdefault(len(prefix), {})
+            table.setdefault(prefix, {})[entry_id] = entry
+            locations.append((table, prefix))
+
+        self._locations[entry_id] = locations
+        return entry_id
+
+    def remove(self, entry_id: int) -> None:
+        """Remove an entry from the index.
+
+        Args:
+            entry_id: Id of the entry returned by `add`.
+        """
+        if self._unfiltered.pop(entry_id, None) is not None:
+            return
+
+        has_empty_tables = False
+        for table, key in self._locations.pop(entry_id, ()):
+            bucket = table[key]
+            del bucket[entry_id]
+            if not bucket:
+                del table[key]
+                has_empty_tables = has_empty_tables or not table
+
+        # drop empty tables, so matching does not check them
+        if has_empty_tables:
+            self._exact = {name: table for name, table in self._exact.items() if table}
+            self._prefixes = {length: table for length, table in self._prefixes.items() if table}
+
+    def match(self, event: Any) -> list[T]:  # noqa: ANN401
+        """Get items which filters match the event.
+
+        Args:
+            event: Event to match.
+
+        Returns:
+            Matched items in the order they were added.
+        """
+        if not self._exact and not self._prefixes:
+            return [entry.item for entry in self._unfiltered.values()]
+
+        found = list(self._unfiltered.items())
+        sources = 1 if found else 0
+        for field_name, table in self._exact.items():
+            value = _EXACT_GETTERS[field_name](event)
+            if value is not None and (bucket := table.get(value)):
+                found.extend(bucket.items())
+                sources += 1
+
+        if self._prefixes:
+            custom_id = get_custom_id(event)
+            if custom_id is not None:
+                for length, table in self._prefixes.items():
+                    if bucket := table.get(custom_id[:length]):
+                        found.extend(bucket.items())
+                        sources += 1
+
+        if sources > 1:
+            found.sort(key=itemgetter(0))
+
+        # fmt: off
+        return [
+            entry.item
+            for _, entry in found
+            if entry.event_filter is None or entry.event_filter.matches(event)
+        ]
+        # fmt: on
+
+    def __len__(self) -> int:
+        """Get the number of items in the index."""
+        return len(self._unfiltered) + len(self._locations)
+
+    def __iter__(self) -> Iterator[T]:
+        """Iterate over all items in the index."""
+        yield from (entry.item for entry in self._unfiltered.values())
+        for entry_id, locations in self._locations.items():
+            table, key = locations[0]
+            yield table[key][entry_id].item
+
+
+def _to_id_set(value: _SnowflakeArg | Iterable[_SnowflakeArg] | None) -> frozenset[int] | None:
+    """Convert a filter value to a set of ids."""
+    if value is None:
+        return None
+    if isinstance(value, int | str | Snowflake):
+        return frozenset((int(value),))
+    return frozenset(int(item) for item in value)
+
+
+def _to_str_set(value: str | Iterable[str] | None) -> frozenset[str] | None:
+    """Convert a filter value to a set of strings."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return frozenset((value,))
+    return frozenset(value)
@@ -1,8 +1,30 @@
-"""Gateway intents."""
+"""Gateway intents.
+
+Intents can be computed from the handled events instead of being listed by hand:
+a client created with `intents=AUTO_INTENTS` identifies with the minimal set of intents
+which delivers events of its handlers and entity cache. High-volume events like
+presences and typing are not received if nothing handles them.
+"""
 
 import functools
+import logging
 import operator
+from collections.abc import Iterable, Mapping
 from enum import IntFlag, unique
+from types import MappingProxyType
+from typing import Final
+
+__all__ = (
+    'ALL_INTENTS',
+    'AUTO_INTENTS',
+    'DEFAULT_INTENTS',
+    'EVENT_INTENTS',
+    'PRIVILEGED_INTENTS',
+    'Intent',
+    'intents_for_events',
+)
+
+logger = logging.getLogger(__name__)
 
 
 @unique
@@ -58,3 +80,106 @@ DEFAULT_INTENTS = (
 
 It's lighter than ALL_INTENTS, but not enough. Please use custom intents set instead.
 """
+
+
+PRIVILEGED_INTENTS: Final[Intent] = Intent.GUILD_MEMBERS | Intent.GUILD_PRESENCES | Intent.MESSAGE_CONTENT
+"""Intents which must be enabled for the application in the Developer Portal."""
+
+AUTO_INTENTS: Final = 'auto'
+"""Value of intents to compute them from handled events on identify."""
+
+_MESSAGES: Final[Intent] = Intent.GUILD_MESSAGES | Intent.DIRECT_MESSAGES
+"""Intents of messages in guilds and direct messages."""
+
+_REACTIONS: Final[Intent] = Intent.GUILD_MESSAGE_REACTIONS | Intent.DIRECT_MESSAGE_REACTIONS
+"""Intents of reactions in guilds and direct messages."""
+
+EVENT_INTENTS: Final[Mapping[str, Intent]] = MappingProxyType({
+    'GUILD_CREATE': Intent.GUILDS,
+    'GUILD_UPDATE': Intent.GUILDS,
+    'GUILD_DELETE': Intent.GUILDS,
+    'GUILD_ROLE_CREATE': Intent.GUILDS,
+    'GUILD_ROLE_UPDATE': Intent.GUILDS,
+    'GUILD_ROLE_DELETE': Intent.GUILDS,
+    'CHANNEL_CREATE': Intent.GUILDS,
+    'CHANNEL_UPDATE': Intent.GUILDS,
+    'CHANNEL_DELETE': Intent.GUILDS,
+    'CHANNEL_PINS_UPDATE': Intent.GUILDS | Intent.DIRECT_MESSAGES,
+    'THREAD_CREATE': Intent.GUILDS,
+    'THREAD_UPDATE': Intent.GUILDS,
+    'THREAD_DELETE': Intent.GUILDS,
+    'THREAD_LIST_SYNC': Intent.GUILDS,
+    'THREAD_MEMBER_UPDATE': Intent.GUILDS,
+    'THREAD_MEMBERS_UPDATE': Intent.GUILDS,
+    'GUILD_MEMBER_ADD': Intent.GUILD_MEMBERS,
+    'GUILD_MEMBER_UPDATE': Intent.GUILD_MEMBERS,
+    'GUILD_MEMBER_REMOVE': Intent.GUILD_MEMBERS,
+    'GUILD_BAN_ADD': Intent.GUILD_BANS,
+    'GUILD_BAN_REMOVE': Intent.GUILD_BANS,
+    'GUILD_EMOJIS_UPDATE': Intent.GUILD_EMOJIS_AND_STICKERS,
+    'GUILD_STICKERS_UPDATE': Intent.GUILD_EMOJIS_AND_STICKERS,
+    'GUILD_INTEGRATIONS_UPDATE': Intent.GUILD_INTEGRATIONS,
+    'WEBHOOKS_UPDATE': Intent.GUILD_WEBHOOKS,
+    'INVITE_CREATE': Intent.GUILD_INVITES,
+    'INVITE_DELETE': Intent.GUILD_INVITES,
+    'VOICE_STATE_UPDATE': Intent.GUILD_VOICE_STATES,
+    'PRESENCE_UPDATE': Intent.GUILD_PRESENCES,
+    'MESSAGE_CREATE': _MESSAGES,
+    'MESSAGE_UPDATE': _MESSAGES,
+    'MESSAGE_DELETE': _MESSAGES,
+    'MESSAGE_DELETE_BULK': Intent.GUILD_MESSAGES,
+    'MESSAGE_REACTION_ADD': _REACTIONS,
+    'MESSAGE_REACTION_REMOVE': _REACTIONS,
+    'MESSAGE_REACTION_REMOVE_ALL': _REACTIONS,
+    'MESSAGE_REACTION_REMOVE_EMOJI': _REACTIONS,
+    'TYPING_START': Intent.GUILD_MESSAGE_TYPING | Intent.DIRECT_MESSAGE_TYPING,
+    'GUILD_SCHEDULED_EVENT_CREATE': Intent.GUILD_SCHEDULED_EVENTS,
+    'GUILD_SCHEDULED_EVENT_UPDATE': Intent.GUILD_SCHEDULED_EVENTS,
+    'GUILD_SCHEDULED_EVENT_DELETE': Intent.GUILD_SCHEDULED_EVENTS,
+    'GUILD_SCHEDULED_EVENT_USER_ADD': Intent.GUILD_SCHEDULED_EVENTS,
+    'GUILD_SCHEDULED_EVENT_USER_REMOVE': Intent.GUILD_SCHEDULED_EVENTS,
+    'AUTO_MODERATION_RULE_CREATE': Intent.AUTO_MODERATION_CONFIGURATION,
+    'AUTO_MODERATION_RULE_UPDATE': Intent.AUTO_MODERATION_CONFIGURATION,
+    'AUTO_MODERATION_RULE_DELETE': Intent.AUTO_MODERATION_CONFIGURATION,
+    'AUTO_MODERATION_ACTION_EXECUTION': Intent.AUTO_MODERATION_EXECUTION,
+})
+"""Intents which deliver events, by event name.
+
+Events missing in the table, like READY or INTERACTION_CREATE, are sent regardless
+of intents. Events sent both for guilds and direct messages map to both intents.
+
+Reference:
+https://discord.com/developers/docs/topics/gateway#list-of-intents
+"""
+
+
+def intents_for_events(event_names: Iterable[str], base: Intent = Intent.GUILDS) -> Intent:
+    """Compute the minimal intents to receive events.
+
+    `MESSAGE_CONTENT` is never added: message events are delivered without it,
+    only with empty content. Add it to `base` if handlers read messages.
+
+    Args:
+        event_names: Names of the events to receive.
+        base: Intents to always include. `GUILDS` is needed to receive guilds
+            after READY, which most bots and the entity cache rely on.
+
+    Returns:
+        Intents to identify with.
+    """
+    intents = base
+    for event_name in sorted(set(event_names)):
+        event_intents = EVENT_INTENTS.get(event_name)
+        if event_intents is None:
+            continue
+
+        privileged = event_intents & PRIVILEGED_INTENTS
+        if privileged and not privileged & base:
+            logger.warning(
+                '%s needs the privileged %s intent, it must be enabled in the Developer Portal',
+                event_name,
+                privileged.name,
+            )
+        intents |= event_intents
+
+    return intents
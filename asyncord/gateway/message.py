@@ -1,7 +1,7 @@
 """Gateway message models."""
 
 import enum
-from typing import Annotated, Any, Literal
+from typing import Annotated, Any, Literal, NamedTuple
 
 from fbenum.adapter import FallbackAdapter
 from fbenum.enum import FallbackEnum
@@ -10,6 +10,7 @@ from pydantic import BaseModel, Field, TypeAdapter
 __all__ = (
     'BaseGatewayMessage',
     'DatalessMessage',
+    'DispatchEnvelope',
     'DispatchMessage',
     'FallbackGatewayMessage',
     'GatewayCommandOpcode',
@@ -19,6 +20,7 @@ __all__ = (
     'HelloMessage',
     'HelloMessageData',
     'InvalidSessionMessage',
+    'parse_gateway_message',
 )
 
 
@@ -104,6 +106,29 @@ class DispatchMessage(BaseGatewayMessage, frozen=True):
     """
 
 
+class DispatchEnvelope(NamedTuple):
+    """Lightweight dispatch message.
+
+    Dispatch messages are the vast majority of gateway traffic. The envelope is read
+    straight from the decoded frame without validation, unlike `DispatchMessage`.
+    """
+
+    event_name: str
+    """Name of the event."""
+
+    sequence_number: int
+    """Sequence number of the message."""
+
+    data: Any
+    """Raw event data.
+
+    It's validated only if somebody listens to the event.
+    """
+
+    opcode: GatewayMessageOpcode = GatewayMessageOpcode.DISPATCH
+    """Message opcode."""
+
+
 class HelloMessageData(BaseModel):
     """Hello message data."""
 
@@ -157,3 +182,22 @@ type GatewayMessageType = (
 
 GatewayMessageAdapter: TypeAdapter[GatewayMessageType] = TypeAdapter(GatewayMessageType)
 """Gateway message type adapter."""
+
+
+def parse_gateway_message(data: dict[str, Any]) -> GatewayMessageType | DispatchEnvelope:
+    """Parse a decoded gateway frame.
+
+    Dispatch frames are read directly into `DispatchEnvelope`. Other opcodes are rare,
+    so they are fully validated with `GatewayMessageAdapter`.
+
+    Args:
+        data: Decoded gateway frame.
+
+    Returns:
+        Parsed gateway message.
+    """
+    # malformed frames are left to the full validation
+    if data.get('op') == GatewayMessageOpcode.DISPATCH and 't' in data and 's' in data:
+        return DispatchEnvelope(data['t'], data['s'], data.get('d'))
+
+    return GatewayMessageAdapter.validate_python(data)
@@ -0,0 +1,240 @@
+"""This module defines the partitioned event dispatcher.
+
+The base dispatcher runs handlers inline, one event at a time. The partitioned
+dispatcher runs events of different guilds in parallel on a pool of workers, but keeps
+strict ordering of events within one partition (a guild, or a channel for DMs).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Callable, Hashable
+from typing import Any, Final, NamedTuple
+
+from pydantic import BaseModel
+
+from asyncord.gateway.dispatcher import EventDispatcher, EventHandlerType
+from asyncord.gateway.events.base import GatewayEvent
+from asyncord.gateway.filters import FilterIndex, get_channel_id, get_guild_id
+
+__all__ = (
+    'DEFAULT_MAX_PENDING',
+    'DEFAULT_WORKERS',
+    'PartitionKeyFunc',
+    'PartitionedEventDispatcher',
+    'default_partition_key',
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS: Final[int] = 16
+"""Default number of workers processing partitions."""
+
+DEFAULT_MAX_PENDING: Final[int] = 10_000
+"""Default maximum number of queued events before dispatching blocks."""
+
+type PartitionKeyFunc = Callable[[GatewayEvent], Hashable]
+"""Type alias for a function extracting the partition key from an event."""
+
+
+class _Projection(NamedTuple):
+    """Queued projection of an event with its handlers."""
+
+    projection: BaseModel
+    handlers: FilterIndex[EventHandlerType]
+
+
+def default_partition_key(event: GatewayEvent) -> Hashable:
+    """Get the partition key of an event.
+
+    Events are partitioned by guild id. Events without a guild (DMs) are
+    partitioned by channel id. Events without both go to the common partition.
+
+    Args:
+        event: Event to get the partition key for.
+
+    Returns:
+        Partition key of the event.
+    """
+    guild_id = get_guild_id(event)
+    if guild_id is not None:
+        return guild_id
+    return get_channel_id(event)
+
+
+class PartitionedEventDispatcher(EventDispatcher):
+    """Dispatches events in parallel while preserving ordering within a partition.
+
+    Every event is put into the queue of its partition. Partitions with pending events
+    are processed by a pool of workers, and each partition is processed by at most one
+    worker at a time. So handlers of the event always complete before handlers of the
+    next event in the same partition start, while different partitions run concurrently.
+
+    Queue of a partition is released as soon as it becomes empty, so memory usage depends
+    on the number of partitions with pending events, not on the number of guilds.
+
+    Projections are partitioned by the same key function, so they keep their order with
+    full events only if they have the fields of the key, `guild_id` or `channel_id`.
+
+    The entity cache of the gateway client is updated when events are queued, not when
+    their handlers run, so handlers can see cache state of later events.
+
+    Attributes:
+        workers: Number of workers processing partitions.
+        max_pending: Maximum number of queued events. When it's reached,
+            dispatching waits for workers to free up the space.
+        partition_key: Function to extract the partition key from an event.
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        partition_key: PartitionKeyFunc = default_partition_key,
+    ) -> None:
+        """Initialize the partitioned event dispatcher.
+
+        Args:
+            workers: Number of workers processing partitions.
+            max_pending: Maximum number of queued events.
+            partition_key: Function to extract the partition key from an event.
+        """
+        if workers < 1:
+            raise ValueError('Number of workers must be positive')
+        if max_pending < 1:
+            raise ValueError('Maximum number of pending events must be positive')
+
+        super().__init__()
+        self.workers = workers
+        self.max_pending = max_pending
+        self.partition_key = partition_key
+
+        self._partitions: dict[Hashable, deque[GatewayEvent | _Projection]] = {}
+        self._ready_partitions: asyncio.Queue[Hashable] = asyncio.Queue()
+        self._pending = 0
+        self._has_capacity = asyncio.Event()
+        self._has_capacity.set()
+        self._worker_tasks: list[asyncio.Task[None]] = []
+
+    @property
+    def pending(self) -> int:
+        """Number of events waiting to be processed."""
+        return self._pending
+
+    @property
+    def partition_count(self) -> int:
+        """Number of partitions with pending events."""
+        return len(self._partitions)
+
+    async def dispatch(self, event: GatewayEvent) -> None:
+        """Put an event to the queue of its partition.
+
+        The method returns as soon as the event is queued. If the queue is full,
+        it waits until workers process some events.
+
+        Args:
+            event: Event to dispatch.
+        """
+        await self._enqueue(self.partition_key(event), event)
+
+    async def dispatch_projections(self, event_type: type[GatewayEvent], payload: dict[str, Any]) -> None:
+        """Validate a raw payload into projections and put them to queues of their partitions.
+
+        Args:
+            event_type: Event type of the payload.
+            payload: Raw event payload.
+        """
+        for projection, handlers in self._project(event_type, payload):
+            await self._enqueue(self.partition_key(projection), _Projection(projection, handlers))  # type: ignore[arg-type]
+
+    async def join(self) -> None:
+        """Wait until all queued events are processed."""
+        if self._worker_tasks:
+            await self._ready_partitions.join()
+
+    async def close(self) -> None:
+        """Stop the workers.
+
+        Events which are still queued are dropped, pending waiters are cancelled.
+        Calls of `join` waiting for the queued events return.
+        """
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks.clear()
+
+        if self._pending:
+            logger.warning(
+                'Partitioned dispatcher closed with %i pending events in %i partitions',
+                self._pending,
+                len(self._partitions),
+            )
+
+        # cancelled workers have finished their partitions, so mark the rest done to release joins
+        while not self._ready_partitions.empty():
+            self._ready_partitions.get_nowait()
+            self._ready_partitions.task_done()
+
+        self._partitions.clear()
+        self._pending = 0
+        self._has_capacity.set()
+        await super().close()
+
+    async def _enqueue(self, key: Hashable, item: GatewayEvent | _Projection) -> None:
+        """Put an event or a projection to the queue of the partition.
+
+        Args:
+            key: Partition key.
+            item: Event or projection to queue.
+        """
+        self._ensure_workers()
+
+        while self._pending >= self.max_pending:
+            self._has_capacity.clear()
+            await self._has_capacity.wait()
+
+        self._pending += 1
+
+        partition = self._partitions.get(key)
+        if partition is None:
+            self._partitions[key] = deque((item,))
+            self._ready_partitions.put_nowait(key)
+        else:
+            # partition is already scheduled or processed by a worker,
+            # the worker will reschedule it after the current event
+            partition.append(item)
+
+    def _ensure_workers(self) -> None:
+        """Start workers if they are not started yet."""
+        if self._worker_tasks:
+            return
+
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(), name=f'PartitionedEventDispatcher._worker-{worker_num}')
+            for worker_num in range(self.workers)
+        ]
+
+    async def _worker(self) -> None:
+        """Process ready partitions one event at a time."""
+        while True:
+            key = await self._ready_partitions.get()
+            partition = self._partitions[key]
+            item = partition.popleft()
+            try:
+                if isinstance(item, _Projection):
+                    await self._call_handlers(item.handlers, item.projection)
+                else:
+                    await super().dispatch(item)
+            finally:
+                self._pending -= 1
+                self._has_capacity.set()
+
+                # Reschedule the partition to the end of the queue to let others go,
+                # or release it if there is nothing left
+                if partition:
+                    self._ready_partitions.put_nowait(key)
+                else:
+                    del self._partitions[key]
+                self._ready_partitions.task_done()
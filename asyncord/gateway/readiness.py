@@ -0,0 +1,248 @@
+"""This module tracks loading of guilds after the READY event.
+
+READY lists guilds of the shard as unavailable, then they arrive one by one as
+GUILD_CREATE events. The tracker keeps the ids of guilds which haven't arrived yet
+and dispatches the synthetic `ShardReadyEvent` as soon as all guilds arrived, or when
+no guild arrived for the timeout. Startup work can wait for it instead of sleeping:
+
+    @client_group.add_handler
+    async def on_shard_ready(event: ShardReadyEvent) -> None:
+        if event.timed_out:
+            logger.warning('Guilds %s are not loaded', event.missing_guild_ids)
+        await start_background_jobs()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import ClassVar, Final
+
+from asyncord.gateway.events.base import GatewayEvent, ReadyEvent
+from asyncord.snowflake import Snowflake
+
+__all__ = (
+    'DEFAULT_GUILD_READY_TIMEOUT',
+    'ReadinessProgress',
+    'ReadinessTracker',
+    'ShardReadyEvent',
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GUILD_READY_TIMEOUT: Final[float] = 5
+"""Default time to wait for the next guild in seconds."""
+
+
+class ShardReadyEvent(GatewayEvent):
+    """Dispatched when all guilds listed in READY have arrived or the timeout expired.
+
+    The event is synthetic: it's produced by the client, not sent by the gateway.
+
+    Ready means the guilds are received, not handled. The inline dispatcher runs
+    guild handlers before the event, but `PartitionedEventDispatcher` runs them
+    on workers, so they can still be queued or running when the event is handled.
+    """
+
+    __event_name__: ClassVar[str] = 'SHARD_READY'
+
+    shard_id: int
+    """Shard id."""
+
+    guild_ids: list[Snowflake]
+    """Guilds which arrived available."""
+
+    missing_guild_ids: list[Snowflake]
+    """Guilds which arrived unavailable or didn't arrive before the timeout."""
+
+    timed_out: bool = False
+    """True if the timeout expired before all guilds arrived."""
+
+
+@dataclass(frozen=True, slots=True)
+class ReadinessProgress:
+    """Progress of loading guilds of a shard."""
+
+    shard_id: int
+    """Shard id."""
+
+    expected: int
+    """Number of guilds listed in READY."""
+
+    received: int
+    """Number of guilds which arrived."""
+
+    ready: bool
+    """Whether the shard is ready."""
+
+    elapsed: float | None
+    """Time from READY to readiness, or to now if the shard isn't ready yet, in seconds."""
+
+    @property
+    def pending(self) -> int:
+        """Number of guilds which haven't arrived yet."""
+        return self.expected - self.received
+
+
+type ShardReadyCallback = Callable[[ShardReadyEvent], Awaitable[None]]
+"""Type alias for a function to dispatch the shard ready event."""
+
+
+class ReadinessTracker:
+    """Tracker of guilds which haven't arrived after READY.
+
+    Attributes:
+        timeout: Time to wait for the next guild in seconds. The shard is considered
+            ready when it expires, with missing guilds listed in the event.
+    """
+
+    def __init__(self, on_ready: ShardReadyCallback, timeout: float = DEFAULT_GUILD_READY_TIMEOUT) -> None:
+        """Initialize the tracker.
+
+        Args:
+            on_ready: Function to dispatch the shard ready event.
+            timeout: Time to wait for the next guild in seconds.
+        """
+        self.timeout = timeout
+        self._on_ready = on_ready
+        self._shard_id = 0
+        self._pending: set[int] = set()
+        self._loaded: list[int] = []
+        self._missing: list[int] = []
+        self._expected = 0
+        self._tracking = False
+        self._ready = False
+        self._started_at: float | None = None
+        self._ready_at: float | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        self._timeout_task: asyncio.Task[None] | None = None
+
+    @property
+    def tracking(self) -> bool:
+        """Whether guilds are loading."""
+        return self._tracking
+
+    @property
+    def ready(self) -> bool:
+        """Whether all guilds of the current session have loaded."""
+        return self._ready
+
+    @property
+    def progress(self) -> ReadinessProgress:
+        """Progress of loading guilds."""
+        elapsed = None
+        if self._started_at is not None:
+            elapsed = (self._ready_at or time.monotonic()) - self._started_at
+
+        return ReadinessProgress(
+            shard_id=self._shard_id,
+            expected=self._expected,
+            received=len(self._loaded) + len(self._missing),
+            ready=self._ready,
+            elapsed=elapsed,
+        )
+
+    async def start(self, event: ReadyEvent) -> None:
+        """Start tracking guilds listed in READY.
+
+        Args:
+            event: Ready event of the new session.
+        """
+        self.reset()
+        self._shard_id = event.shard.shard_id if event.shard else 0
+        self._pending = {int(guild.id) for guild in event.guilds}
+        self._expected = len(self._pending)
+        self._started_at = time.monotonic()
+        self._tracking = True
+
+        if self._pending:
+            self._schedule_timeout()
+        else:
+            await self._complete()
+
+    async def guild_received(self, guild_id: int, *, available: bool = True) -> None:
+        """Mark a guild as arrived.
+
+        Args:
+            guild_id: Guild id.
+            available: Whether the guild arrived available. Guilds unavailable
+                because of an outage arrive as GUILD_DELETE.
+        """
+        if not self._tracking or guild_id not in self._pending:
+            return
+
+        self._pending.discard(guild_id)
+        if available:
+            self._loaded.append(guild_id)
+        else:
+            self._missing.append(guild_id)
+
+        if self._pending:
+            self._schedule_timeout()
+        else:
+            await self._complete()
+
+    def reset(self) -> None:
+        """Stop tracking, for example when the connection is closed."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._pending = set()
+        self._loaded = []
+        self._missing = []
+        self._expected = 0
+        self._tracking = False
+        self._ready = False
+        self._started_at = None
+        self._ready_at = None
+
+    def _schedule_timeout(self) -> None:
+        """Restart the timer of waiting for the next guild."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(self.timeout, self._on_timeout)
+
+    def _on_timeout(self) -> None:
+        """Consider the shard ready without the pending guilds."""
+        self._timer = None
+        logger.warning(
+            'Shard %i is ready without %i of %i guilds: no guild arrived for %.1f seconds',
+            self._shard_id,
+            len(self._pending),
+            self._expected,
+            self.timeout,
+        )
+        # the state is finished before the task starts, so late guilds don't complete it again
+        self._timeout_task = asyncio.create_task(
+            self._on_ready(self._finish(timed_out=True)),
+            name='ReadinessTracker.on_ready',
+        )
+
+    async def _complete(self) -> None:
+        """Mark the shard as ready and dispatch the event."""
+        await self._on_ready(self._finish(timed_out=False))
+
+    def _finish(self, *, timed_out: bool) -> ShardReadyEvent:
+        """Mark the shard as ready.
+
+        Returns:
+            Event to dispatch.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        event = ShardReadyEvent(
+            shard_id=self._shard_id,
+            guild_ids=self._loaded,  # type: ignore[arg-type]
+            missing_guild_ids=[*self._missing, *self._pending],  # type: ignore[list-item]
+            timed_out=timed_out,
+        )
+        self._pending = set()
+        self._tracking = False
+        self._ready = True
+        self._ready_at = time.monotonic()
+        return event
@@ -0,0 +1,352 @@
+"""This module contains the out-of-process event relay.
+
+The relay splits a bot into a small stable process which keeps gateway connections
+and handler processes which can be scaled and redeployed without dropping the websocket.
+
+The gateway process runs `EventRelayServer` and passes it to gateway clients.
+Raw dispatch payloads are sent over a Unix socket to subscribers before they are
+validated, so the gateway process doesn't spend time on parsing events it doesn't handle:
+
+    relay = EventRelayServer('/run/bot/events.sock')
+    await relay.start()
+    client_group.gateway_client.event_relay = relay
+
+Handler processes run `EventRelaySubscriber` with a regular `EventDispatcher`:
+
+    dispatcher = EventDispatcher()
+    dispatcher.add_handler(on_message)
+    await EventRelaySubscriber('/run/bot/events.sock', dispatcher, group='handlers').run()
+
+Every event is delivered to one subscriber of each consumer group. Subscribers of
+a group share events by guild, so events of one guild go to the same subscriber
+while the group membership doesn't change.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import struct
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, Self
+
+from pydantic import ValidationError
+
+from asyncord.gateway.events.event_map import EVENT_MAP
+
+if TYPE_CHECKING:
+    from asyncord.gateway.dispatcher import EventDispatcher
+
+__all__ = (
+    'DEFAULT_RELAY_BUFFER',
+    'DEFAULT_RELAY_GROUP',
+    'DEFAULT_RELAY_RECONNECT_DELAY',
+    'EventRelayServer',
+    'EventRelaySubscriber',
+    'relay_guild_key',
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RELAY_GROUP: Final[str] = 'default'
+"""Default consumer group of subscribers."""
+
+DEFAULT_RELAY_BUFFER: Final[int] = 16 * 1024 * 1024
+"""Default maximum size of unsent data of a subscriber in bytes.
+
+Events are dropped for the subscriber while its buffer is over the limit, so a stuck
+subscriber can't make the gateway process run out of memory.
+"""
+
+DEFAULT_RELAY_RECONNECT_DELAY: Final[float] = 1
+"""Default delay before reconnecting a subscriber to the server in seconds."""
+
+_FRAME_HEADER: Final = struct.Struct('>I')
+"""Header of a frame with the size of the payload."""
+
+_GUILD_ID_EVENTS: Final[frozenset[str]] = frozenset({'GUILD_CREATE', 'GUILD_UPDATE', 'GUILD_DELETE'})
+"""Events which carry the guild id in the `id` field."""
+
+
+def relay_guild_key(event_name: str, data: Any) -> int:  # noqa: ANN401
+    """Get the key to balance a raw event between subscribers of a group.
+
+    Events are balanced by guild id. Events without a guild (DMs) are balanced
+    by channel id, other events go to the first subscriber.
+
+    Args:
+        event_name: Name of the event.
+        data: Raw event data.
+
+    Returns:
+        Balancing key.
+    """
+    if not isinstance(data, dict):
+        return 0
+
+    key = data.get('guild_id')
+    if key is None and event_name in _GUILD_ID_EVENTS:
+        key = data.get('id')
+    if key is None:
+        key = data.get('channel_id')
+    return int(key) if key is not None else 0
+
+
+def _encode_frame(payload: Any) -> bytes:  # noqa: ANN401
+    """Encode a payload to a frame."""
+    body = json.dumps(payload, separators=(',', ':')).encode()
+    return _FRAME_HEADER.pack(len(body)) + body
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Any:  # noqa: ANN401
+    """Read a frame and decode its payload.
+
+    Raises:
+        asyncio.IncompleteReadError: If the connection is closed.
+    """
+    (size,) = _FRAME_HEADER.unpack(await reader.readexactly(_FRAME_HEADER.size))
+    return json.loads(await reader.readexactly(size))
+
+
+class _RelayMember:
+    """Subscriber connected to the server."""
+
+    __slots__ = ('event_names', 'group', 'writer')
+
+    def __init__(self, writer: asyncio.StreamWriter, group: str, event_names: frozenset[str] | None) -> None:
+        self.writer = writer
+        self.group = group
+        self.event_names = event_names
+
+    def wants(self, event_name: str) -> bool:
+        """Check if the subscriber handles the event."""
+        return self.event_names is None or event_name in self.event_names
+
+
+class EventRelayServer:
+    """Server which relays raw dispatch payloads to subscriber processes.
+
+    Publishing never waits for subscribers. Events are dropped for subscribers which
+    have more than `max_buffer` bytes of unsent data.
+
+    Attributes:
+        path: Path of the Unix socket.
+        max_buffer: Maximum size of unsent data of a subscriber in bytes.
+        published: Number of published events.
+        sent: Number of events sent to subscribers.
+        dropped: Number of events dropped because of slow subscribers.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], max_buffer: int = DEFAULT_RELAY_BUFFER) -> None:
+        """Initialize the relay server.
+
+        Args:
+            path: Path of the Unix socket.
+            max_buffer: Maximum size of unsent data of a subscriber in bytes.
+        """
+        self.path = Path(path)
+        self.max_buffer = max_buffer
+        self.published = 0
+        self.sent = 0
+        self.dropped = 0
+
+        self._server: asyncio.Server | None = None
+        self._groups: dict[str, list[_RelayMember]] = {}
+
+    @property
+    def groups(self) -> dict[str, int]:
+        """Number of subscribers in every consumer group."""
+        return {group: len(members) for group, members in self._groups.items()}
+
+    async def start(self) -> None:
+        """Start accepting subscribers."""
+        if self._server is not None:
+            raise RuntimeError('Relay server is already started')
+
+        self.path.unlink(missing_ok=True)
+        self._server = await asyncio.start_unix_server(self._handle_connection, self.path)
+        logger.info('Event relay is listening on %s', self.path)
+
+    async def close(self) -> None:
+        """Disconnect subscribers and stop the server."""
+        if self._server is None:
+            return
+
+        self._server.close()
+        for members in self._groups.values():
+            for member in members:
+                member.writer.close()
+        self._groups.clear()
+        await self._server.wait_closed()
+        self._server = None
+        self.path.unlink(missing_ok=True)
+
+    def publish(self, event_name: str, sequence_number: int, data: Any) -> None:  # noqa: ANN401
+        """Send a raw event to one subscriber of every consumer group.
+
+        Args:
+            event_name: Name of the event.
+            sequence_number: Sequence number of the event.
+            data: Raw event data.
+        """
+        self.published += 1
+        frame = b''
+        key = 0
+        for members in self._groups.values():
+            candidates = [member for member in members if member.wants(event_name)]
+            if not candidates:
+                continue
+
+            if not frame:
+                key = relay_guild_key(event_name, data)
+                frame = _encode_frame({'t': event_name, 's': sequence_number, 'd': data})
+
+            member = candidates[key % len(candidates)]
+            transport = member.writer.transport
+            if transport.is_closing() or transport.get_write_buffer_size() > self.max_buffer:
+                self.dropped += 1
+                continue
+
+            member.writer.write(frame)
+            self.sent += 1
+
+    async def __aenter__(self) -> Self:
+        """Start the server."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        """Stop the server."""
+        await self.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Register a subscriber and wait until it disconnects."""
+        try:
+            hello = await _read_frame(reader)
+            group = str(hello['group'])
+            event_names = None if hello.get('events') is None else frozenset(hello['events'])
+        except (asyncio.IncompleteReadError, ValueError, KeyError, TypeError):
+            logger.warning('Invalid subscriber handshake, closing the connection')
+            writer.close()
+            return
+
+        member = _RelayMember(writer, group, event_names)
+        self._groups.setdefault(group, []).append(member)
+        logger.info('Subscriber joined group %s', group)
+        try:
+            # subscribers don't send anything after the handshake
+            await reader.read()
+        finally:
+            members = self._groups.get(group, [])
+            if member in members:
+                members.remove(member)
+                if not members:
+                    del self._groups[group]
+            writer.close()
+            logger.info('Subscriber left group %s', group)
+
+
+class EventRelaySubscriber:
+    """Subscriber which dispatches events received from the relay server.
+
+    Events are validated and dispatched only if the dispatcher has subscribers for them.
+    The subscriber tells the server which events it handles on connect, so handlers
+    should be added before the subscriber is started.
+
+    Attributes:
+        path: Path of the Unix socket.
+        dispatcher: Dispatcher to dispatch events to.
+        group: Consumer group of the subscriber.
+        reconnect_delay: Delay before reconnecting to the server in seconds.
+        received: Number of received events.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        dispatcher: EventDispatcher,
+        group: str = DEFAULT_RELAY_GROUP,
+        reconnect_delay: float = DEFAULT_RELAY_RECONNECT_DELAY,
+    ) -> None:
+        """Initialize the relay subscriber.
+
+        Args:
+            path: Path of the Unix socket.
+            dispatcher: Dispatcher to dispatch events to.
+            group: Consumer group of the subscriber.
+            reconnect_delay: Delay before reconnecting to the server in seconds.
+        """
+        self.path = Path(path)
+        self.dispatcher = dispatcher
+        self.group = group
+        self.reconnect_delay = reconnect_delay
+        self.received = 0
+
+        self.connected = asyncio.Event()
+        self._closing = False
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def run(self) -> None:
+        """Receive and dispatch events until the subscriber is closed.
+
+        The subscriber reconnects if the server is not available or the connection is lost.
+        """
+        self._closing = False
+        while not self._closing:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            except OSError:
+                logger.debug('Event relay %s is not available', self.path)
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            self._writer = writer
+            try:
+                writer.write(_encode_frame({'group': self.group, 'events': self._event_names()}))
+                await writer.drain()
+                self.connected.set()
+                await self._receive(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                logger.info('Connection to event relay %s is lost', self.path)
+            finally:
+                self.connected.clear()
+                self._writer = None
+                writer.close()
+
+            if not self._closing:
+                await asyncio.sleep(self.reconnect_delay)
+
+    def close(self) -> None:
+        """Disconnect from the server and stop running."""
+        self._closing = True
+        if self._writer is not None:
+            self._writer.close()
+
+    def _event_names(self) -> list[str]:
+        """Get names of events the dispatcher has subscribers for."""
+        return sorted(event_type.__event_name__ for event_type in self.dispatcher.subscribed_event_types)
+
+    async def _receive(self, reader: asyncio.StreamReader) -> None:
+        """Dispatch events from the connection.
+
+        Events which fail validation are logged and skipped.
+        """
+        while not self._closing:
+            message = await _read_frame(reader)
+            self.received += 1
+
+            event_type = EVENT_MAP.get(message['t'])
+            if event_type is None:
+                continue
+
+            if self.dispatcher.has_subscribers(event_type):
+                try:
+                    event = event_type.model_validate(message['d'])
+                except ValidationError:
+                    logger.exception('Failed to validate event %s from event relay', message['t'])
+                else:
+                    await self.dispatcher.dispatch(event)
+            if self.dispatcher.has_projections(event_type):
+                await self.dispatcher.dispatch_projections(event_type, message['d'])
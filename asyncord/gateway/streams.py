@@ -0,0 +1,334 @@
+"""This module defines async iterators over dispatched events.
+
+Streams are an alternative to event handlers for pipeline-style consumers which
+process events in batches, like log shippers or analytics. Every stream has a bounded
+buffer and an overflow policy which decides what happens when the consumer lags behind.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import enum
+from collections import deque
+from collections.abc import Callable, Hashable
+from typing import Any, Final, Self
+
+from asyncord.gateway.events.base import GatewayEvent
+from asyncord.gateway.filters import EventFilter, FilterIndex, get_author_id, get_channel_id, get_guild_id
+
+__all__ = (
+    'DEFAULT_STREAM_MAXSIZE',
+    'CoalesceKeyFunc',
+    'EventStream',
+    'EventStreams',
+    'StreamOverflow',
+    'default_coalesce_key',
+)
+
+DEFAULT_STREAM_MAXSIZE: Final[int] = 1000
+"""Default maximum number of buffered events of a stream."""
+
+type CoalesceKeyFunc = Callable[[Any], Hashable]
+"""Type alias for a function to get the key of events replacing each other."""
+
+
+class StreamOverflow(enum.StrEnum):
+    """Policy to apply when the buffer of a stream is full."""
+
+    DROP_OLDEST = 'drop_oldest'
+    """Drop the oldest buffered event to make room for the new one."""
+
+    BLOCK = 'block'
+    """Wait until the consumer takes an event.
+
+    Dispatching of all following events waits too, so it's a backpressure on the gateway.
+    """
+
+    COALESCE = 'coalesce'
+    """Replace the buffered event with the same key by the new one.
+
+    The new event keeps the position of the replaced one. If there is no event
+    with the same key and the buffer is full, the oldest event is dropped.
+    """
+
+
+def default_coalesce_key(event: Any) -> Hashable:  # noqa: ANN401
+    """Get the key of an event for coalescing.
+
+    Events of the same object replace each other: the same message, the same user
+    presence in the same guild, etc.
+
+    Args:
+        event: Event to get the key for.
+
+    Returns:
+        Key of the event.
+    """
+    object_id = getattr(getattr(event, 'root', event), 'id', None)
+    return (
+        get_guild_id(event),
+        get_channel_id(event),
+        get_author_id(event),
+        None if object_id is None else int(object_id),
+    )
+
+
+class EventStream[EVENT_T: GatewayEvent]:
+    """Async iterator over dispatched events with a bounded buffer.
+
+    Use it as an async context manager to unsubscribe when the consumer is done:
+
+        async with dispatcher.stream(MessageCreateEvent, maxsize=500) as stream:
+            async for event in stream:
+                ...
+
+    Attributes:
+        maxsize: Maximum number of buffered events.
+        overflow: Policy to apply when the buffer is full.
+        received: Number of events received by the stream.
+        delivered: Number of events taken by the consumer.
+        dropped: Number of events dropped because of the full buffer.
+        coalesced: Number of events replaced by newer events with the same key.
+        max_lag: Maximum number of buffered events seen so far.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_STREAM_MAXSIZE,
+        overflow: StreamOverflow | str = StreamOverflow.DROP_OLDEST,
+        coalesce_key: CoalesceKeyFunc = default_coalesce_key,
+        on_close: Callable[[EventStream[EVENT_T]], None] | None = None,
+    ) -> None:
+        """Initialize the event stream.
+
+        Args:
+            maxsize: Maximum number of buffered events.
+            overflow: Policy to apply when the buffer is full.
+            coalesce_key: Function to get the key of events for the coalesce policy.
+            on_close: Callback to call when the stream is closed.
+        """
+        if maxsize < 1:
+            raise ValueError('Maximum size of the stream must be positive')
+
+        self.maxsize = maxsize
+        self.overflow = StreamOverflow(overflow)
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_lag = 0
+
+        self._coalesce_key = coalesce_key
+        self._on_close = on_close
+        self._buffer: deque[EVENT_T] = deque()
+        self._latest: dict[Hashable, EVENT_T] = {}
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._closed = False
+
+    @property
+    def lag(self) -> int:
+        """Number of buffered events not taken by the consumer yet."""
+        return len(self._buffer) + len(self._latest)
+
+    @property
+    def closed(self) -> bool:
+        """Whether the stream is closed."""
+        return self._closed
+
+    async def put(self, event: EVENT_T) -> None:
+        """Put an event to the buffer according to the overflow policy.
+
+        Events put to a closed stream are ignored.
+
+        Args:
+            event: Event to put.
+        """
+        if self._closed:
+            return
+
+        self.received += 1
+        match self.overflow:
+            case StreamOverflow.COALESCE:
+                key = self._coalesce_key(event)
+                if key in self._latest:
+                    self._latest[key] = event
+                    self.coalesced += 1
+                    return
+                if len(self._latest) >= self.maxsize:
+                    del self._latest[next(iter(self._latest))]
+                    self.dropped += 1
+                self._latest[key] = event
+
+            case StreamOverflow.BLOCK:
+                while len(self._buffer) >= self.maxsize:
+                    self._not_full.clear()
+                    await self._not_full.wait()
+                    if self._closed:
+                        return
+                self._buffer.append(event)
+
+            case StreamOverflow.DROP_OLDEST:
+                if len(self._buffer) >= self.maxsize:
+                    self._buffer.popleft()
+                    self.dropped += 1
+                self._buffer.append(event)
+
+        self.max_lag = max(self.max_lag, self.lag)
+        self._not_empty.set()
+
+    async def get_batch(self, max_size: int) -> list[EVENT_T]:
+        """Wait for events and take up to `max_size` of them.
+
+        Args:
+            max_size: Maximum number of events to take.
+
+        Returns:
+            Taken events. The list is empty only if the stream is closed and drained.
+        """
+        if not await self._wait_events():
+            return []
+
+        batch = [self._pop() for _ in range(min(max_size, self.lag))]
+        self.delivered += len(batch)
+        self._not_full.set()
+        return batch
+
+    def close(self) -> None:
+        """Close the stream.
+
+        The consumer gets events which are still buffered, then the iteration stops.
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+        self._not_empty.set()
+        self._not_full.set()
+        if self._on_close is not None:
+            self._on_close(self)
+
+    def __aiter__(self) -> Self:
+        """Get the async iterator."""
+        return self
+
+    async def __anext__(self) -> EVENT_T:
+        """Wait for the next event.
+
+        Raises:
+            StopAsyncIteration: If the stream is closed and drained.
+        """
+        if not await self._wait_events():
+            raise StopAsyncIteration
+
+        event = self._pop()
+        self.delivered += 1
+        self._not_full.set()
+        return event
+
+    async def __aenter__(self) -> Self:
+        """Enter the stream context."""
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        """Close the stream on exit."""
+        self.close()
+
+    async def _wait_events(self) -> bool:
+        """Wait until the buffer has events.
+
+        Returns:
+            False if the stream is closed and drained.
+        """
+        while not self.lag:
+            if self._closed:
+                return False
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return True
+
+    def _pop(self) -> EVENT_T:
+        """Take the oldest buffered event."""
+        if self._latest:
+            return self._latest.pop(next(iter(self._latest)))
+        return self._buffer.popleft()
+
+
+class EventStreams:
+    """Registry of open event streams."""
+
+    def __init__(self) -> None:
+        """Initialize the stream registry."""
+        self._index: dict[type[GatewayEvent], FilterIndex[EventStream[Any]]] = {}
+        self._entries: dict[EventStream[Any], tuple[type[GatewayEvent], int]] = {}
+
+    def __len__(self) -> int:
+        """Get the number of open streams."""
+        return len(self._entries)
+
+    @property
+    def event_types(self) -> frozenset[type[GatewayEvent]]:
+        """Event types which have open streams."""
+        return frozenset(self._index)
+
+    def has_streams(self, event_type: type[GatewayEvent]) -> bool:
+        """Check if the event type has open streams.
+
+        Args:
+            event_type: Event type to check.
+
+        Returns:
+            True if at least one stream receives the event type.
+        """
+        return event_type in self._index
+
+    def open[EVENT_T: GatewayEvent](
+        self,
+        event_type: type[EVENT_T],
+        event_filter: EventFilter | None,
+        maxsize: int,
+        overflow: StreamOverflow | str,
+        coalesce_key: CoalesceKeyFunc,
+    ) -> EventStream[EVENT_T]:
+        """Open a new stream.
+
+        Args:
+            event_type: Event type to receive.
+            event_filter: Filter of the events.
+            maxsize: Maximum number of buffered events.
+            overflow: Policy to apply when the buffer is full.
+            coalesce_key: Function to get the key of events for the coalesce policy.
+
+        Returns:
+            Opened stream.
+        """
+        stream = EventStream[EVENT_T](maxsize, overflow, coalesce_key, on_close=self._unregister)
+        entry_id = self._index.setdefault(event_type, FilterIndex()).add(stream, event_filter)
+        self._entries[stream] = (event_type, entry_id)
+        return stream
+
+    async def publish(self, event: GatewayEvent) -> None:
+        """Put the event to matching streams.
+
+        Args:
+            event: Dispatched event.
+        """
+        index = self._index.get(type(event))
+        if index is None:
+            return
+
+        for stream in index.match(event):
+            await stream.put(event)
+
+    def close_all(self) -> None:
+        """Close all open streams."""
+        for stream in list(self._entries):
+            stream.close()
+
+    def _unregister(self, stream: EventStream[Any]) -> None:
+        """Remove a closed stream from the index."""
+        event_type, entry_id = self._entries.pop(stream)
+        index = self._index[event_type]
+        index.remove(entry_id)
+        if not len(index):
+            del self._index[event_type]
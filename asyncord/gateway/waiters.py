@@ -0,0 +1,207 @@
+"""This module defines the registry of one-shot event waiters.
+
+A waiter is a future resolved by the next event which matches its filters and predicate.
+Waiters are indexed like event handlers, and their timeouts share a single timer, so
+thousands of pending waiters don't cost a task or a timer handle each.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+from collections.abc import Callable
+from typing import Any, Final
+
+from asyncord.gateway.events.base import GatewayEvent
+from asyncord.gateway.filters import EventFilter, FilterIndex
+
+__all__ = ('EventWaiters', 'WaiterPredicate')
+
+type WaiterPredicate = Callable[[Any], bool]
+"""Type alias for a predicate to check events for a waiter."""
+
+_HEAP_COMPACT_THRESHOLD: Final[int] = 64
+"""Minimum size of the timeout heap to drop resolved waiters from it."""
+
+
+class _Waiter:
+    """Pending waiter for an event."""
+
+    __slots__ = ('entry_id', 'event_type', 'future', 'predicate')
+
+    def __init__(
+        self,
+        event_type: type[GatewayEvent],
+        future: asyncio.Future[Any],
+        predicate: WaiterPredicate | None,
+    ) -> None:
+        """Initialize the waiter.
+
+        Args:
+            event_type: Type of the awaited event.
+            future: Future to resolve with the event.
+            predicate: Additional check of the event.
+        """
+        self.event_type = event_type
+        self.future = future
+        self.predicate = predicate
+        self.entry_id = -1
+
+
+class EventWaiters:
+    """Registry of pending event waiters.
+
+    Timeouts are kept in a heap ordered by deadline. Only the earliest deadline
+    is scheduled in the event loop, when it fires, all expired waiters are
+    timed out and the next deadline is scheduled.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the waiter registry."""
+        self._index: dict[type[GatewayEvent], FilterIndex[_Waiter]] = {}
+        self._deadlines: list[tuple[float, int, _Waiter]] = []
+        self._deadline_ids = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._pending = 0
+
+    def __len__(self) -> int:
+        """Get the number of pending waiters."""
+        return self._pending
+
+    @property
+    def event_types(self) -> frozenset[type[GatewayEvent]]:
+        """Event types which have pending waiters."""
+        return frozenset(self._index)
+
+    def has_waiters(self, event_type: type[GatewayEvent]) -> bool:
+        """Check if the event type has pending waiters.
+
+        Args:
+            event_type: Event type to check.
+
+        Returns:
+            True if at least one waiter waits for the event type.
+        """
+        return event_type in self._index
+
+    async def wait(
+        self,
+        event_type: type[GatewayEvent],
+        predicate: WaiterPredicate | None,
+        event_filter: EventFilter | None,
+        timeout: float | None,
+    ) -> Any:  # noqa: ANN401
+        """Wait for the next matching event.
+
+        Args:
+            event_type: Type of the event to wait for.
+            predicate: Additional check of the event.
+            event_filter: Filter of the event.
+            timeout: Maximum time to wait in seconds. If None, wait forever.
+
+        Returns:
+            Matched event.
+
+        Raises:
+            TimeoutError: If no matching event was dispatched in time.
+        """
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(event_type, loop.create_future(), predicate)
+        waiter.entry_id = self._index.setdefault(event_type, FilterIndex()).add(waiter, event_filter)
+        self._pending += 1
+
+        if timeout is not None:
+            self._add_deadline(loop, loop.time() + timeout, waiter)
+
+        try:
+            return await waiter.future
+        finally:
+            self._discard(waiter)
+
+    def resolve(self, event: GatewayEvent) -> None:
+        """Resolve waiters matching the event.
+
+        Args:
+            event: Dispatched event.
+        """
+        index = self._index.get(type(event))
+        if index is None:
+            return
+
+        for waiter in index.match(event):
+            if waiter.future.done():
+                continue
+
+            if waiter.predicate is not None:
+                try:
+                    if not waiter.predicate(event):
+                        continue
+                except Exception as exc:
+                    # the error belongs to the code waiting for the event
+                    waiter.future.set_exception(exc)
+                    self._discard(waiter)
+                    continue
+
+            waiter.future.set_result(event)
+            self._discard(waiter)
+
+    def cancel_all(self) -> None:
+        """Cancel all pending waiters."""
+        for index in list(self._index.values()):
+            for waiter in list(index):
+                waiter.future.cancel()
+                self._discard(waiter)
+
+        self._deadlines.clear()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _discard(self, waiter: _Waiter) -> None:
+        """Remove the waiter from the index.
+
+        The waiter stays in the deadline heap and is skipped when it expires.
+        """
+        if waiter.entry_id < 0:
+            return
+
+        index = self._index[waiter.event_type]
+        index.remove(waiter.entry_id)
+        waiter.entry_id = -1
+        self._pending -= 1
+        if not len(index):
+            del self._index[waiter.event_type]
+
+        deadlines = self._deadlines
+        if len(deadlines) > _HEAP_COMPACT_THRESHOLD and len(deadlines) > 2 * self._pending:
+            self._deadlines = [item for item in deadlines if item[2].entry_id >= 0]
+            heapq.heapify(self._deadlines)
+
+    def _add_deadline(self, loop: asyncio.AbstractEventLoop, deadline: float, waiter: _Waiter) -> None:
+        """Add the waiter deadline and reschedule the timer if it is the earliest one."""
+        heapq.heappush(self._deadlines, (deadline, next(self._deadline_ids), waiter))
+        if self._timer is None or deadline < self._timer.when():
+            self._schedule(loop)
+
+    def _schedule(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Schedule the timer for the earliest deadline."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if self._deadlines:
+            self._timer = loop.call_at(self._deadlines[0][0], self._expire, loop)
+
+    def _expire(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Time out all waiters which deadlines have passed."""
+        self._timer = None
+        now = loop.time()
+        # discarding can compact the heap, so don't keep a reference to it
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, _, waiter = heapq.heappop(self._deadlines)
+            if waiter.entry_id >= 0 and not waiter.future.done():
+                waiter.future.set_exception(TimeoutError())
+            self._discard(waiter)
+
+        self._schedule(loop)
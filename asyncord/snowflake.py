@@ -1,39 +1,71 @@
-"""A set of auxiliary entities for working with Snowflake."""
+"""A set of auxiliary entities for working with Snowflake.
+
+Batch helpers work on arrays of raw ids: int64 NumPy arrays if NumPy is installed,
+and `array('q')` otherwise. They process millions of ids without creating
+`Snowflake` and `datetime` objects per id.
+"""
 
 from __future__ import annotations
 
 import datetime
-from collections.abc import Callable
+from array import array
+from collections.abc import Callable, Iterable, Sequence
 from typing import Annotated, Any, Final, Self
 
 from pydantic import BaseModel
 from pydantic_core import CoreSchema, core_schema
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 DISCORD_EPOCH: Final[int] = 1420070400000
 """The start of discord epoch.
 
 The first second of 01.01.2015.
 """
 
+_TIMESTAMP_SHIFT: Final[int] = 22
+"""Position of the timestamp in snowflakes."""
+
+_WORKER_ID_MASK: Final[int] = 0x3E0000
+"""Bits of the internal worker id."""
+
+_WORKER_ID_SHIFT: Final[int] = 17
+"""Position of the internal worker id."""
+
+_PROCESS_ID_MASK: Final[int] = 0x1F000
+"""Bits of the internal process id."""
+
+_PROCESS_ID_SHIFT: Final[int] = 12
+"""Position of the internal process id."""
+
+_MAX_PART: Final[int] = 0x1F
+"""Maximum internal worker and process id."""
+
+_MAX_INCREMENT: Final[int] = 0xFFF
+"""Maximum increment."""
+
 
-class Snowflake:
+class Snowflake(int):
     """Discord ID.
 
     It's variant of twitter's snowflake format of IDs.
 
+    Snowflakes are ints created from ints or strings: they hash, sort and compare
+    as ints and can be used as keys of int-keyed dicts.
+
+    Snowflakes are not equal to their decimal string forms: string equality would
+    need string hashes, which break int-keyed lookups and make every lookup format
+    the id. Compare with ids read as strings, for example from configs, with
+    `same_snowflake`, and look up string-keyed dicts by `str(snowflake)`.
+
     Reference:
     https://discord.com/developers/docs/reference#snowflakes
     """
 
-    __slots__ = ('_raw_value',)
-
-    def __init__(self, raw_snowflake: int | str) -> None:
-        """Create new snowflake object from raw int.
-
-        Args:
-            raw_snowflake: Raw value of snowflake.
-        """
-        self._raw_value = int(raw_snowflake)
+    __slots__ = ()
 
     @classmethod
     def build(
@@ -42,7 +74,7 @@ class Snowflake:
         internal_worker_id: int,
         internal_process_id: int,
         increment: int,
-    ) -> Snowflake:
+    ) -> Self:
         """Build snowflake from separate parameters.
 
         Args:
@@ -65,7 +97,7 @@ class Snowflake:
             | increment
         )
         # fmt: on
-        return Snowflake(raw_snowflake)
+        return cls(raw_snowflake)
 
     @property
     def timestamp(self) -> datetime.datetime:
@@ -80,7 +112,7 @@ class Snowflake:
         Returns:
             Extracted timestamp.
         """
-        timestamp_secs: float = ((self._raw_value >> 22) + DISCORD_EPOCH) / 1000
+        timestamp_secs: float = ((self >> 22) + DISCORD_EPOCH) / 1000
         return datetime.datetime.fromtimestamp(timestamp_secs, tz=datetime.UTC)
 
     @property
@@ -97,7 +129,7 @@ class Snowflake:
         """
         # ampersand operation removes left first 22 bits of snowflake and takes the rest
         # shift operation removes right 17 zero bits
-        return (self._raw_value & 0x3E0000) >> 17
+        return (self & 0x3E0000) >> 17
 
     @property
     def internal_process_id(self) -> int:
@@ -111,7 +143,7 @@ class Snowflake:
         Returns:
             Internal process id.
         """
-        return (self._raw_value & 0x1F000) >> 12
+        return (self & 0x1F000) >> 12
 
     @property
     def increment(self) -> int:
@@ -125,7 +157,7 @@ class Snowflake:
         Returns:
             Increment part of snowflake.
         """
-        return self._raw_value & 0xFFF
+        return self & 0xFFF
 
     @classmethod
     def validate(cls, value: str | int | Self) -> Self:
@@ -140,12 +172,12 @@ class Snowflake:
         Raises:
             ValueError: If value is not valid snowflake.
         """
+        if type(value) is cls:
+            return value
+
         if isinstance(value, str | int):
             return cls(value)
 
-        if isinstance(value, cls):
-            return value
-
         raise ValueError('Invalid value type')
 
     @classmethod
@@ -156,6 +188,9 @@ class Snowflake:
     ) -> CoreSchema:
         """Pydantic auxiliary method to get schema.
 
+        Values are validated by a single function call, without trying the int
+        and str schemas one by one.
+
         Args:
             _source: Source of schema.
             _handler: Handler of schema.
@@ -163,54 +198,188 @@ class Snowflake:
         Returns:
             Pydantic core schema.
         """
-        schema = core_schema.union_schema([
-            core_schema.int_schema(),
-            core_schema.str_schema(),
-            core_schema.is_instance_schema(cls),
-        ])
-
-        return core_schema.no_info_after_validator_function(
+        return core_schema.no_info_plain_validator_function(
             function=cls.validate,
-            schema=schema,
+            json_schema_input_schema=core_schema.union_schema([
+                core_schema.int_schema(),
+                core_schema.str_schema(),
+            ]),
             serialization=core_schema.to_string_ser_schema(),
         )
 
-    def __eq__(self, other: object) -> bool:
-        """Compare snowflakes."""
-        match other:
-            case Snowflake():
-                return self._raw_value == other._raw_value
-            case int():
-                return self._raw_value == other
-            case str():
-                return str(self._raw_value) == other
-
-        return super().__eq__(other)
-
-    def __int__(self) -> int:
-        """Get int value of snowflake."""
-        return self._raw_value
-
-    def __str__(self) -> str:
-        """Get str value of snowflake."""
-        return str(self._raw_value)
+    # formatting in C is faster than any cache of string forms
+    __str__ = int.__repr__
 
     def __repr__(self) -> str:
         """Get representation of snowflake."""
         class_name = self.__class__.__name__
-        return f'{class_name}({self._raw_value})'
+        return f'{class_name}({int.__repr__(self)})'
 
-    def __hash__(self) -> int:
-        """Get snowflake hash.
 
-        Needed for searching with `in` operator. `str` representation used because
-        it's most popular type to search for snowflake in lists.
+type SnowflakeInputType = Annotated[int | str | Snowflake, Snowflake]
+"""Snowflake input type."""
 
-        Returns:
-            Hash of snowflake.
-        """
-        return hash(str(self._raw_value))
 
+def same_snowflake(first: int | str | None, second: int | str | None) -> bool:
+    """Check whether two ids are the same snowflake.
 
-type SnowflakeInputType = Annotated[int | str | Snowflake, Snowflake]
-"""Snowflake input type."""
+    Ids can be snowflakes, ints or decimal strings, so snowflakes can be compared
+    with ids read as strings:
+
+        if not same_snowflake(thread.parent_id, os.getenv('GALLERY_CHANNEL_ID')):
+            ...
+
+    Args:
+        first: First id.
+        second: Second id.
+
+    Returns:
+        True if both ids are set and equal.
+    """
+    if first is None or second is None:
+        return False
+    return int(first) == int(second)
+
+
+type SnowflakeArray = Sequence[int]
+"""Array of raw snowflakes, an int64 NumPy array or `array('q')`."""
+
+
+def to_snowflake_array(snowflakes: Iterable[int]) -> SnowflakeArray:
+    """Convert snowflakes to an array.
+
+    Args:
+        snowflakes: Snowflakes or raw ids.
+
+    Returns:
+        Int64 NumPy array if NumPy is installed, `array('q')` otherwise.
+    """
+    if numpy is not None:
+        if isinstance(snowflakes, numpy.ndarray):
+            return snowflakes.astype(numpy.int64, copy=False)
+        return numpy.fromiter(snowflakes, dtype=numpy.int64)
+    if isinstance(snowflakes, array) and snowflakes.typecode == 'q':
+        return snowflakes
+    return array('q', snowflakes)
+
+
+def snowflake_timestamps(snowflakes: Iterable[int]) -> SnowflakeArray:
+    """Extract timestamps of snowflakes.
+
+    Args:
+        snowflakes: Snowflakes or raw ids.
+
+    Returns:
+        Array of Unix timestamps in milliseconds.
+    """
+    ids = to_snowflake_array(snowflakes)
+    if numpy is not None:
+        return (ids >> _TIMESTAMP_SHIFT) + DISCORD_EPOCH  # type: ignore[operator]
+    return array('q', [(raw_id >> _TIMESTAMP_SHIFT) + DISCORD_EPOCH for raw_id in ids])
+
+
+def snowflake_worker_ids(snowflakes: Iterable[int]) -> SnowflakeArray:
+    """Extract internal worker ids of snowflakes.
+
+    Args:
+        snowflakes: Snowflakes or raw ids.
+
+    Returns:
+        Array of internal worker ids.
+    """
+    ids = to_snowflake_array(snowflakes)
+    if numpy is not None:
+        return (ids & _WORKER_ID_MASK) >> _WORKER_ID_SHIFT  # type: ignore[operator]
+    return array('q', [(raw_id & _WORKER_ID_MASK) >> _WORKER_ID_SHIFT for raw_id in ids])
+
+
+def snowflake_process_ids(snowflakes: Iterable[int]) -> SnowflakeArray:
+    """Extract internal process ids of snowflakes.
+
+    Args:
+        snowflakes: Snowflakes or raw ids.
+
+    Returns:
+        Array of internal process ids.
+    """
+    ids = to_snowflake_array(snowflakes)
+    if numpy is not None:
+        return (ids & _PROCESS_ID_MASK) >> _PROCESS_ID_SHIFT  # type: ignore[operator]
+    return array('q', [(raw_id & _PROCESS_ID_MASK) >> _PROCESS_ID_SHIFT for raw_id in ids])
+
+
+def snowflake_time_buckets(snowflakes: Iterable[int], interval: datetime.timedelta) -> SnowflakeArray:
+    """Get time buckets of snowflakes, for example to count messages per hour.
+
+    Args:
+        snowflakes: Snowflakes or raw ids.
+        interval: Size of buckets.
+
+    Returns:
+        Array of Unix timestamps in milliseconds of bucket starts.
+    """
+    interval_ms = int(interval.total_seconds() * 1000)
+    if interval_ms <= 0:
+        raise ValueError('Interval must be positive')
+
+    timestamps = snowflake_timestamps(snowflakes)
+    if numpy is not None:
+        return timestamps - timestamps % interval_ms  # type: ignore[operator]
+    return array('q', [timestamp - timestamp % interval_ms for timestamp in timestamps])
+
+
+def snowflake_time_range(start: datetime.datetime, end: datetime.datetime) -> tuple[Snowflake, Snowflake]:
+    """Get cursors of snowflakes created in a time range.
+
+    Cursors can be passed as `after` and `before` parameters of requests to get
+    objects created from `start` inclusive to `end` exclusive.
+
+    Args:
+        start: Start of the range.
+        end: End of the range.
+
+    Returns:
+        Snowflakes to get objects after and before.
+    """
+    after = Snowflake.build(start, 0, 0, 0) - 1
+    before = Snowflake.build(end, 0, 0, 0)
+    return Snowflake(max(after, 0)), before
+
+
+def filter_snowflakes_by_age(
+    snowflakes: Iterable[int],
+    *,
+    newer_than: datetime.timedelta | None = None,
+    older_than: datetime.timedelta | None = None,
+    now: datetime.datetime | None = None,
+) -> SnowflakeArray:
+    """Filter snowflakes by age in a single pass.
+
+    For example, messages older than two weeks can't be deleted in bulk:
+
+        deletable = filter_snowflakes_by_age(message_ids, newer_than=datetime.timedelta(days=14))
+
+    Args:
+        snowflakes: Snowflakes or raw ids.
+        newer_than: Keep only snowflakes created less than this time ago.
+        older_than: Keep only snowflakes created more than this time ago.
+        now: Time to count the age from. Defaults to the current time.
+
+    Returns:
+        Array of matching snowflakes in the original order.
+    """
+    now = now or datetime.datetime.now(tz=datetime.UTC)
+    # ids are ordered by time, so age bounds are compared to ids built from times
+    lowest = 0 if newer_than is None else Snowflake.build(now - newer_than, 0, 0, 0)
+    highest = None if older_than is None else Snowflake.build(now - older_than, _MAX_PART, _MAX_PART, _MAX_INCREMENT)
+
+    ids = to_snowflake_array(snowflakes)
+    if numpy is not None:
+        mask = ids >= lowest  # type: ignore[operator]
+        if highest is not None:
+            mask &= ids < highest  # type: ignore[operator]
+        return ids[mask]  # type: ignore[index]
+
+    if highest is None:
+        return array('q', [raw_id for raw_id in ids if raw_id >= lowest])
+    return array('q', [raw_id for raw_id in ids if lowest <= raw_id < highest])
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""Benchmark of skipping validation for events without subscribers.
+
+The stream is processed by `DispatchHandler` twice: with a handler for every event
+type in the stream (everything is validated, as it was before) and with a handler
+only for MESSAGE_CREATE (presence, typing and reaction events are skipped).
+
+Usage:
+    python -m benchmarks.dispatch_validation [--count N] [--stream recorded.jsonl]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Any
+from unittest.mock import Mock
+
+from asyncord.gateway.client.client import ConnectionData
+from asyncord.gateway.client.member_requests import MemberRequestRegistry
+from asyncord.gateway.client.opcode_handlers import DispatchHandler
+from asyncord.gateway.dispatcher import EventDispatcher
+from asyncord.gateway.events.base import GatewayEvent
+from asyncord.gateway.events.event_map import EVENT_MAP
+from asyncord.gateway.events.messages import MessageCreateEvent
+from asyncord.gateway.message import DispatchMessage
+from asyncord.gateway.readiness import ReadinessTracker
+from benchmarks.recorded_stream import generate_stream, load_stream
+
+
+async def _noop_handler(_event: GatewayEvent) -> None:
+    pass
+
+
+async def _run(frames: list[dict[str, Any]], event_types: set[type[GatewayEvent]]) -> float:
+    dispatcher = EventDispatcher()
+    for event_type in event_types:
+        dispatcher.add_handler(event_type, _noop_handler)
+
+    # optional features are disabled: a mocked cache or filter would make every event look needed
+    client = Mock(
+        conn_data=ConnectionData(token='token'),  # noqa: S106
+        dispatcher=dispatcher,
+        cache=None,
+        payload_filter=None,
+        event_relay=None,
+        member_requests=MemberRequestRegistry(),
+        readiness=ReadinessTracker(dispatcher.dispatch),
+    )
+    handler = DispatchHandler(client, logging.getLogger(__name__))
+    messages = [DispatchMessage.model_validate(frame) for frame in frames]
+
+    started_at = time.perf_counter()
+    for message in messages:
+        await handler.handle(message)
+    return time.perf_counter() - started_at
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=20_000, help='number of generated frames')
+    parser.add_argument('--stream', type=Path, help='file with a recorded stream, one frame per line')
+    args = parser.parse_args()
+
+    frames = load_stream(args.stream) if args.stream else generate_stream(args.count)
+    all_types = {EVENT_MAP[frame['t']] for frame in frames if frame['t'] in EVENT_MAP}
+
+    validate_all = asyncio.run(_run(frames, all_types))
+    subscribed_only = asyncio.run(_run(frames, {MessageCreateEvent}))
+
+    frame_count = len(frames)
+    print(f'frames: {frame_count}')  # noqa: T201
+    for title, elapsed in (('validate all', validate_all), ('subscribed only', subscribed_only)):
+        print(f'{title:>16}: {elapsed:.3f}s, {elapsed / frame_count * 1e6:.2f} us/frame')  # noqa: T201
+    print(f'{"speedup":>16}: {validate_all / subscribed_only:.1f}x')  # noqa: T201
+
+
+if __name__ == '__main__':
+    main()
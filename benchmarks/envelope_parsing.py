@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+"""Benchmark of gateway envelope parsing.
+
+Compares full validation of the frame with `GatewayMessageAdapter` and the fast
+dispatch path of `parse_gateway_message`. Frames are already decoded, so only the
+envelope cost is measured.
+
+Usage:
+    python -m benchmarks.envelope_parsing [--count N] [--stream recorded.jsonl]
+"""
+
+from __future__ import annotations
+
+import time
+from argparse import ArgumentParser
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from asyncord.gateway.message import GatewayMessageAdapter, parse_gateway_message
+from benchmarks.recorded_stream import generate_stream, load_stream
+
+
+def _measure(parse: Callable[[dict[str, Any]], object], frames: list[dict[str, Any]]) -> float:
+    started_at = time.perf_counter()
+    for frame in frames:
+        parse(frame)
+    return time.perf_counter() - started_at
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=100_000, help='number of generated frames')
+    parser.add_argument('--stream', type=Path, help='file with a recorded stream, one frame per line')
+    args = parser.parse_args()
+
+    frames = load_stream(args.stream) if args.stream else generate_stream(args.count)
+
+    adapter = _measure(GatewayMessageAdapter.validate_python, frames)
+    fast_path = _measure(parse_gateway_message, frames)
+
+    frame_count = len(frames)
+    print(f'frames: {frame_count}')  # noqa: T201
+    for title, elapsed in (('adapter', adapter), ('fast path', fast_path)):
+        print(f'{title:>10}: {elapsed / frame_count * 1e9:.0f} ns/frame')  # noqa: T201
+    print(f'{"speedup":>10}: {adapter / fast_path:.1f}x')  # noqa: T201
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""Benchmark of incremental decoding of large GUILD_CREATE frames.
+
+A frame of a guild with many members is loaded into the member cache twice: decoded
+and validated in one go, as the client does for regular frames, and decoded
+incrementally. The longest stall of the event loop is measured by a ticker task.
+
+Usage:
+    python -m benchmarks.guild_create_streaming [--count N]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from argparse import ArgumentParser
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from asyncord.gateway.cache.entity_cache import CacheFlag, EntityCache
+from asyncord.gateway.client.large_frames import decode_large_frame
+from asyncord.gateway.events.guilds import GuildCreateEvent
+
+_BASE_ID = 175928847299117063
+_GUILD_ID = '81384788765712384'
+
+
+def _member_data(user_id: int) -> dict[str, Any]:
+    return {
+        'user': {
+            'id': str(_BASE_ID + user_id),
+            'username': f'user{user_id}',
+            'discriminator': '0',
+            'global_name': f'User {user_id}',
+            'avatar': None,
+        },
+        'nick': None,
+        'roles': [_GUILD_ID],
+        'joined_at': '2023-05-01T12:00:00.000000+00:00',
+        'deaf': False,
+        'mute': False,
+        'flags': 0,
+    }
+
+
+def _frame(count: int) -> str:
+    payload = {
+        'id': _GUILD_ID,
+        'name': 'guild',
+        'icon': None,
+        'splash': None,
+        'discovery_splash': None,
+        'owner_id': str(_BASE_ID),
+        'afk_channel_id': None,
+        'afk_timeout': 300,
+        'verification_level': 0,
+        'default_message_notifications': 0,
+        'explicit_content_filter': 0,
+        'roles': [],
+        'emojis': [],
+        'features': [],
+        'mfa_level': 0,
+        'application_id': None,
+        'system_channel_id': None,
+        'system_channel_flags': 0,
+        'rules_channel_id': None,
+        'vanity_url_code': None,
+        'description': None,
+        'banner': None,
+        'premium_tier': 0,
+        'premium_subscription_count': 0,
+        'max_members': 500000,
+        'preferred_locale': 'en-US',
+        'public_updates_channel_id': None,
+        'nsfw_level': 0,
+        'premium_progress_bar_enabled': False,
+        'safety_alerts_channel_id': None,
+        'members': [_member_data(user_id) for user_id in range(count)],
+        'presences': [{'user': {'id': str(_BASE_ID + user_id)}, 'status': 'online'} for user_id in range(count)],
+    }
+    return json.dumps({'t': 'GUILD_CREATE', 's': 1, 'op': 0, 'd': payload})
+
+
+async def _measure(load: Callable[[EntityCache], Awaitable[Any]]) -> tuple[float, float]:
+    """Get the total time and the longest loop stall of loading in seconds."""
+    cache = EntityCache(CacheFlag.GUILDS | CacheFlag.MEMBERS, compact_members=True)
+    max_stall = 0.0
+
+    async def ticker() -> None:
+        nonlocal max_stall
+        last_tick = time.perf_counter()
+        while True:
+            await asyncio.sleep(0)
+            now = time.perf_counter()
+            max_stall = max(max_stall, now - last_tick)
+            last_tick = now
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    started_at = time.perf_counter()
+    await load(cache)
+    elapsed = time.perf_counter() - started_at
+    await asyncio.sleep(0)
+    ticker_task.cancel()
+    return elapsed, max_stall
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=20_000, help='number of guild members')
+    args = parser.parse_args()
+
+    text = _frame(args.count)
+
+    async def load_at_once(cache: EntityCache) -> None:  # noqa: RUF029
+        cache.update(GuildCreateEvent.model_validate(json.loads(text)['d']))
+
+    async def load_incrementally(cache: EntityCache) -> None:
+        frame = await decode_large_frame(text, cache)
+        cache.update(GuildCreateEvent.model_validate(frame['d']))
+
+    print(f'frame: {len(text) / 1e6:.1f} MB, {args.count} members')  # noqa: T201
+    for title, load in (('at once', load_at_once), ('incremental', load_incrementally)):
+        elapsed, max_stall = asyncio.run(_measure(load))
+        print(f'{title:>12}: {elapsed * 1e3:7.1f} ms total, {max_stall * 1e3:6.1f} ms longest stall')  # noqa: T201
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""Benchmark of memory taken by cached guild members.
+
+Members with a realistic mix of nicknames and role combinations are stored as pydantic
+models and in the compact columnar store. The benchmark reports memory per 100k members
+measured with tracemalloc, and the cost of adding and reading members.
+
+Usage:
+    python -m benchmarks.member_store [--count N]
+"""
+
+from __future__ import annotations
+
+import gc
+import random
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from typing import Any
+
+from asyncord.client.members.models.responses import MemberResponse
+from asyncord.gateway.cache.members import CompactMemberStore, DictMemberStore, MemberStore
+
+_ROLE_COMBINATIONS = [(), (1,), (1, 2), (1, 3), (2, 3, 4), (5,), (1, 5, 6)]
+_GLOBAL_NAME_SHARE = 0.7
+_AVATAR_SHARE = 0.5
+_NICK_SHARE = 0.2
+
+
+def _member_data(user_id: int, rnd: random.Random) -> dict[str, Any]:
+    roles = rnd.choice(_ROLE_COMBINATIONS)
+    return {
+        'user': {
+            'id': str(1_000_000_000_000_000 + user_id),
+            'username': f'user{user_id}',
+            'discriminator': '0',
+            'global_name': f'User {user_id}' if rnd.random() < _GLOBAL_NAME_SHARE else None,
+            'avatar': f'{rnd.getrandbits(128):032x}' if rnd.random() < _AVATAR_SHARE else None,
+        },
+        'nick': f'nick{user_id}' if rnd.random() < _NICK_SHARE else None,
+        'roles': [str(900_000_000_000_000_000 + role_id) for role_id in roles],
+        'joined_at': '2023-05-01T12:00:00.000000+00:00',
+        'deaf': False,
+        'mute': False,
+        'flags': 0,
+    }
+
+
+def _measure_memory(store: MemberStore, members: list[MemberResponse]) -> float:
+    """Get memory taken by filling the store in bytes."""
+    gc.collect()
+    tracemalloc.start()
+    for member in members:
+        store.set(member)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return memory
+
+
+def _measure_time(store: MemberStore, members: list[MemberResponse]) -> float:
+    """Get time of filling the store in seconds.
+
+    It's measured separately, tracemalloc slows down allocations.
+    """
+    started_at = time.perf_counter()
+    for member in members:
+        store.set(member)
+    return time.perf_counter() - started_at
+
+
+def _run(count: int) -> None:
+    rnd = random.Random(0)  # noqa: S311
+    raw_members = [_member_data(user_id, rnd) for user_id in range(count)]
+
+    # memory of models is measured from raw data, as they are kept after parsing the event
+    gc.collect()
+    tracemalloc.start()
+    members = [MemberResponse.model_validate(data) for data in raw_members]
+    models_memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    dict_memory = _measure_memory(DictMemberStore(), members)
+    compact_memory = _measure_memory(CompactMemberStore(), members)
+    dict_filled_in = _measure_time(DictMemberStore(), members)
+    compact_store = CompactMemberStore()
+    compact_filled_in = _measure_time(compact_store, members)
+
+    user_ids = [int(member.user.id) for member in members if member.user]
+    started_at = time.perf_counter()
+    for user_id in user_ids:
+        compact_store.get(user_id)
+    read_in = time.perf_counter() - started_at
+
+    scale = 100_000 / count
+    print(f'members: {count}, role combinations: {compact_store.role_sets}')  # noqa: T201
+    print(f'{"models":>16}: {(models_memory + dict_memory) * scale / 2**20:.1f} MiB per 100k')  # noqa: T201
+    print(f'{"compact store":>16}: {compact_memory * scale / 2**20:.1f} MiB per 100k')  # noqa: T201
+    print(f'{"ratio":>16}: {(models_memory + dict_memory) / compact_memory:.1f}x')  # noqa: T201
+    print(f'{"dict set":>16}: {dict_filled_in / count * 1e6:.2f} us/member')  # noqa: T201
+    print(f'{"compact set":>16}: {compact_filled_in / count * 1e6:.2f} us/member')  # noqa: T201
+    print(f'{"compact get":>16}: {read_in / count * 1e6:.2f} us/member')  # noqa: T201
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=100_000, help='number of members')
+    args = parser.parse_args()
+
+    _run(args.count)
+
+
+if __name__ == '__main__':
+    main()
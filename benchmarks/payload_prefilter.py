@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""Benchmark of the raw payload filter on a presence-heavy stream.
+
+The stream is processed by `DispatchHandler` with handlers of all event types, first
+without a filter and then with a filter which denies the five noisiest guilds and
+samples a tenth of presence and typing events.
+
+Usage:
+    python -m benchmarks.payload_prefilter [--count N] [--stream recorded.jsonl]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from argparse import ArgumentParser
+from collections import Counter
+from pathlib import Path
+from typing import Any
+from unittest.mock import Mock
+
+from asyncord.gateway.client.client import ConnectionData
+from asyncord.gateway.client.opcode_handlers import DispatchHandler
+from asyncord.gateway.client.prefilter import PayloadFilter
+from asyncord.gateway.dispatcher import EventDispatcher
+from asyncord.gateway.events.base import GatewayEvent
+from asyncord.gateway.events.event_map import EVENT_MAP
+from asyncord.gateway.message import DispatchMessage
+from benchmarks.recorded_stream import generate_stream, load_stream
+
+_NOISY_GUILDS = 5
+_SAMPLE_RATE = 0.1
+
+
+async def _noop_handler(_event: GatewayEvent) -> None:
+    pass
+
+
+def _make_filter(frames: list[dict[str, Any]]) -> PayloadFilter:
+    guild_counts = Counter(frame['d'].get('guild_id') for frame in frames)
+    guild_counts.pop(None, None)
+    return PayloadFilter(
+        denied_guild_ids=[guild_id for guild_id, _ in guild_counts.most_common(_NOISY_GUILDS)],
+        sample_rates={'PRESENCE_UPDATE': _SAMPLE_RATE, 'TYPING_START': _SAMPLE_RATE},
+    )
+
+
+async def _run(frames: list[dict[str, Any]], payload_filter: PayloadFilter | None) -> float:
+    dispatcher = EventDispatcher()
+    for event_type in {EVENT_MAP[frame['t']] for frame in frames if frame['t'] in EVENT_MAP}:
+        dispatcher.add_handler(event_type, _noop_handler)
+
+    client = Mock(
+        conn_data=ConnectionData(token='token'),  # noqa: S106
+        dispatcher=dispatcher,
+        event_relay=None,
+        cache=None,
+        payload_filter=payload_filter,
+    )
+    handler = DispatchHandler(client, logging.getLogger(__name__))
+    messages = [DispatchMessage.model_validate(frame) for frame in frames]
+
+    started_at = time.process_time()
+    for message in messages:
+        await handler.handle(message)
+    return time.process_time() - started_at
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=20_000, help='number of generated frames')
+    parser.add_argument('--stream', type=Path, help='file with a recorded stream, one frame per line')
+    args = parser.parse_args()
+
+    frames = load_stream(args.stream) if args.stream else generate_stream(args.count)
+    payload_filter = _make_filter(frames)
+
+    unfiltered = asyncio.run(_run(frames, None))
+    filtered = asyncio.run(_run(frames, payload_filter))
+
+    frame_count = len(frames)
+    print(f'frames: {frame_count}, dropped: {payload_filter.total_dropped}')  # noqa: T201
+    for reason, count in payload_filter.drop_reasons.most_common():
+        print(f'{reason:>16}: {count}')  # noqa: T201
+    for title, elapsed in (('no filter', unfiltered), ('filter', filtered)):
+        print(f'{title:>16}: {elapsed:.3f}s CPU, {elapsed / frame_count * 1e6:.2f} us/frame')  # noqa: T201
+    print(f'{"CPU saved":>16}: {unfiltered - filtered:.3f}s ({1 - filtered / unfiltered:.0%})')  # noqa: T201
+
+
+if __name__ == '__main__':
+    main()
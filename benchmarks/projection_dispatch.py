@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""Benchmark of projection handlers on a message-heavy stream.
+
+The stream is processed by `DispatchHandler` twice: with a MESSAGE_CREATE handler
+which receives the full event, and with a projection handler which receives a slim
+model of the fields it reads (content, author id and channel id).
+
+Usage:
+    python -m benchmarks.projection_dispatch [--count N] [--stream recorded.jsonl]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Any
+from unittest.mock import Mock
+
+from pydantic import BaseModel
+
+from asyncord.gateway.client.client import ConnectionData
+from asyncord.gateway.client.member_requests import MemberRequestRegistry
+from asyncord.gateway.client.opcode_handlers import DispatchHandler
+from asyncord.gateway.dispatcher import EventDispatcher
+from asyncord.gateway.events.messages import MessageCreateEvent
+from asyncord.gateway.message import DispatchMessage
+from asyncord.gateway.readiness import ReadinessTracker
+from asyncord.snowflake import Snowflake
+from benchmarks.recorded_stream import generate_stream, load_stream
+
+_MESSAGE_HEAVY_MIX = {
+    'MESSAGE_CREATE': 0.7,
+    'TYPING_START': 0.2,
+    'PRESENCE_UPDATE': 0.1,
+}
+
+
+class _Author(BaseModel):
+    id: Snowflake
+
+
+class _MessageText(BaseModel):
+    channel_id: Snowflake
+    author: _Author
+    content: str
+
+
+async def _full_handler(_event: MessageCreateEvent) -> None:
+    pass
+
+
+async def _projection_handler(_message: _MessageText) -> None:
+    pass
+
+
+async def _run(frames: list[dict[str, Any]], *, projection: bool) -> float:
+    dispatcher = EventDispatcher()
+    if projection:
+        dispatcher.add_projection_handler(MessageCreateEvent, _MessageText, _projection_handler)
+    else:
+        dispatcher.add_handler(MessageCreateEvent, _full_handler)
+
+    # optional features are disabled: a mocked cache or filter would make every event look needed
+    client = Mock(
+        conn_data=ConnectionData(token='token'),  # noqa: S106
+        dispatcher=dispatcher,
+        cache=None,
+        payload_filter=None,
+        event_relay=None,
+        member_requests=MemberRequestRegistry(),
+        readiness=ReadinessTracker(dispatcher.dispatch),
+    )
+    handler = DispatchHandler(client, logging.getLogger(__name__))
+    messages = [DispatchMessage.model_validate(frame) for frame in frames]
+
+    started_at = time.process_time()
+    for message in messages:
+        await handler.handle(message)
+    return time.process_time() - started_at
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=20_000, help='number of generated frames')
+    parser.add_argument('--stream', type=Path, help='file with a recorded stream, one frame per line')
+    args = parser.parse_args()
+
+    frames = load_stream(args.stream) if args.stream else generate_stream(args.count, _MESSAGE_HEAVY_MIX)
+
+    full = asyncio.run(_run(frames, projection=False))
+    projected = asyncio.run(_run(frames, projection=True))
+
+    frame_count = len(frames)
+    print(f'frames: {frame_count}')  # noqa: T201
+    for title, elapsed in (('full event', full), ('projection', projected)):
+        print(f'{title:>16}: {elapsed:.3f}s CPU, {elapsed / frame_count * 1e6:.2f} us/frame')  # noqa: T201
+    print(f'{"CPU saved":>16}: {full - projected:.3f}s ({1 - projected / full:.0%})')  # noqa: T201
+
+
+if __name__ == '__main__':
+    main()
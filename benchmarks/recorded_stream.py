@@ -0,0 +1,185 @@
+"""Gateway stream used by the benchmarks.
+
+A recorded stream can be loaded from a file with one gateway frame (JSON) per line.
+If no recording is available, a synthetic stream with the same shape as a busy shard
+can be generated: presence and typing floods with a small share of messages.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Final
+
+__all__ = (
+    'DEFAULT_EVENT_MIX',
+    'generate_stream',
+    'iter_frames',
+    'load_stream',
+    'make_payload',
+)
+
+DEFAULT_EVENT_MIX: Final[dict[str, float]] = {
+    'PRESENCE_UPDATE': 0.6,
+    'TYPING_START': 0.25,
+    'MESSAGE_CREATE': 0.1,
+    'MESSAGE_REACTION_ADD': 0.05,
+}
+"""Share of event types in the generated stream.
+
+Presence and typing events dominate the traffic of a big shard.
+"""
+
+_GUILD_COUNT: Final[int] = 50
+_CHANNELS_PER_GUILD: Final[int] = 20
+_USER_COUNT: Final[int] = 10_000
+_BASE_ID: Final[int] = 175928847299117063
+
+
+def _snowflake(rnd: random.Random, bound: int, offset: int = 0) -> str:
+    return str(_BASE_ID + offset + rnd.randrange(bound))
+
+
+def _user(rnd: random.Random) -> dict[str, Any]:
+    user_id = _snowflake(rnd, _USER_COUNT, offset=10_000_000)
+    return {
+        'id': user_id,
+        'username': f'user{user_id[-5:]}',
+        'global_name': f'User {user_id[-5:]}',
+        'discriminator': '0',
+        'avatar': 'a_' + 'f' * 30,
+    }
+
+
+def _member(rnd: random.Random) -> dict[str, Any]:
+    return {
+        'roles': [_snowflake(rnd, 100, offset=5_000_000) for _ in range(rnd.randrange(4))],
+        'joined_at': '2021-03-01T12:00:00.000000+00:00',
+        'deaf': False,
+        'mute': False,
+        'flags': 0,
+    }
+
+
+def make_payload(event_name: str, rnd: random.Random) -> dict[str, Any]:
+    """Make a payload of the event.
+
+    Args:
+        event_name: Name of the event.
+        rnd: Random generator.
+
+    Returns:
+        Event payload, the `d` field of the frame.
+    """
+    guild_id = _snowflake(rnd, _GUILD_COUNT)
+    channel_id = _snowflake(rnd, _GUILD_COUNT * _CHANNELS_PER_GUILD, offset=1_000_000)
+    user = _user(rnd)
+
+    match event_name:
+        case 'PRESENCE_UPDATE':
+            return {
+                'user': {'id': user['id']},
+                'guild_id': guild_id,
+                'status': rnd.choice(['online', 'idle', 'dnd']),
+                'activities': [
+                    {
+                        'name': 'Custom Status',
+                        'type': 4,
+                        'created_at': 1700000000000,
+                        'state': 'Working on something',
+                    },
+                ],
+                'client_status': {'desktop': 'online', 'mobile': 'idle'},
+            }
+        case 'TYPING_START':
+            return {
+                'channel_id': channel_id,
+                'guild_id': guild_id,
+                'user_id': user['id'],
+                'timestamp': 1700000000,
+                'member': {**_member(rnd), 'user': user},
+            }
+        case 'MESSAGE_CREATE':
+            return {
+                'id': _snowflake(rnd, 10**9, offset=20_000_000),
+                'channel_id': channel_id,
+                'guild_id': guild_id,
+                'author': user,
+                'member': _member(rnd),
+                'content': 'Hello world! ' * rnd.randrange(1, 10),
+                'timestamp': '2024-01-01T12:00:00.000000+00:00',
+                'edited_timestamp': None,
+                'tts': False,
+                'mention_everyone': False,
+                'mentions': [],
+                'mention_roles': [],
+                'attachments': [],
+                'embeds': [],
+                'pinned': False,
+                'type': 0,
+                'flags': 0,
+                'components': [],
+            }
+        case 'MESSAGE_REACTION_ADD':
+            return {
+                'user_id': user['id'],
+                'channel_id': channel_id,
+                'message_id': _snowflake(rnd, 10**9, offset=20_000_000),
+                'guild_id': guild_id,
+                'emoji': {'name': '\N{THUMBS UP SIGN}', 'id': None},
+            }
+
+    raise ValueError(f'Unknown event: {event_name}')
+
+
+def generate_stream(
+    count: int,
+    event_mix: dict[str, float] = DEFAULT_EVENT_MIX,
+    seed: int = 0,
+) -> list[dict[str, Any]]:
+    """Generate a synthetic stream of dispatch frames.
+
+    Args:
+        count: Number of frames.
+        event_mix: Share of event types in the stream.
+        seed: Seed of the random generator to make streams reproducible.
+
+    Returns:
+        List of decoded frames.
+    """
+    rnd = random.Random(seed)  # noqa: S311
+    event_names = rnd.choices(list(event_mix), weights=list(event_mix.values()), k=count)
+    return [
+        {'op': 0, 's': seq, 't': event_name, 'd': make_payload(event_name, rnd)}
+        for seq, event_name in enumerate(event_names, start=1)
+    ]
+
+
+def load_stream(path: Path) -> list[dict[str, Any]]:
+    """Load a recorded stream.
+
+    Args:
+        path: Path to a file with one JSON frame per line.
+
+    Returns:
+        List of decoded dispatch frames.
+    """
+    with path.open(encoding='utf-8') as stream_file:
+        frames = (json.loads(line) for line in stream_file if line.strip())
+        return [frame for frame in frames if frame.get('op') == 0]
+
+
+def iter_frames(frames: list[dict[str, Any]], repeat: int) -> Iterator[dict[str, Any]]:
+    """Iterate over frames several times.
+
+    Args:
+        frames: Frames to iterate over.
+        repeat: Number of repetitions.
+
+    Yields:
+        Frames.
+    """
+    for _ in range(repeat):
+        yield from frames
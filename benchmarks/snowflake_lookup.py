@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""Micro-benchmarks of snowflake lookups.
+
+Snowflakes are compared with the previous implementation, which wrapped an int and
+hashed its string form: dict and set lookups, sorting, formatting and pydantic
+validation of ids. New snowflakes look up string-keyed dicts by `str(snowflake)`.
+
+Usage:
+    python -m benchmarks.snowflake_lookup [--count N]
+"""
+
+from __future__ import annotations
+
+import random
+import timeit
+from argparse import ArgumentParser
+from collections.abc import Callable
+from typing import Any
+
+from pydantic import BaseModel
+
+from asyncord.snowflake import Snowflake
+
+_REPEATS = 5
+_BASE_ID = 175928847299117063
+
+
+class _StrHashSnowflake:
+    """Previous snowflake implementation, kept for comparison."""
+
+    __slots__ = ('_raw_value',)
+
+    def __init__(self, raw_snowflake: int | str) -> None:
+        self._raw_value = int(raw_snowflake)
+
+    def __eq__(self, other: object) -> bool:
+        match other:
+            case _StrHashSnowflake():
+                return self._raw_value == other._raw_value
+            case int():
+                return self._raw_value == other
+            case str():
+                return str(self._raw_value) == other
+        return NotImplemented
+
+    def __lt__(self, other: _StrHashSnowflake) -> bool:
+        return self._raw_value < other._raw_value
+
+    def __hash__(self) -> int:
+        return hash(str(self._raw_value))
+
+    def __str__(self) -> str:
+        return str(self._raw_value)
+
+
+class _Model(BaseModel):
+    id: Snowflake
+    channel_id: Snowflake
+    guild_id: Snowflake
+
+
+def _best(func: Callable[[], Any], count: int) -> float:
+    """Get the best time of a call per item in nanoseconds."""
+    return min(timeit.repeat(func, number=1, repeat=_REPEATS)) / count * 1e9
+
+
+def _report(name: str, old: float, new: float) -> None:
+    print(f'{name:>16}: {old:8.1f} ns -> {new:8.1f} ns ({old / new:.1f}x)')  # noqa: T201
+
+
+def _run(count: int) -> None:
+    rnd = random.Random(0)  # noqa: S311
+    raw_ids = [_BASE_ID + rnd.getrandbits(40) for _ in range(count)]
+    old_ids = [_StrHashSnowflake(raw_id) for raw_id in raw_ids]
+    new_ids = [Snowflake(raw_id) for raw_id in raw_ids]
+
+    old_by_id = {snowflake: snowflake for snowflake in old_ids}
+    new_by_id = {snowflake: snowflake for snowflake in new_ids}
+    by_str = {str(raw_id): raw_id for raw_id in raw_ids}
+    old_set = set(old_ids)
+    new_set = set(new_ids)
+
+    _report(
+        'dict lookup',
+        _best(lambda: [old_by_id[snowflake] for snowflake in old_ids], count),
+        _best(lambda: [new_by_id[snowflake] for snowflake in new_ids], count),
+    )
+    _report(
+        'str-keyed lookup',
+        _best(lambda: [by_str[snowflake] for snowflake in old_ids], count),
+        _best(lambda: [by_str[str(snowflake)] for snowflake in new_ids], count),
+    )
+    _report(
+        'set membership',
+        _best(lambda: [snowflake in old_set for snowflake in old_ids], count),
+        _best(lambda: [snowflake in new_set for snowflake in new_ids], count),
+    )
+    _report(
+        'sorting',
+        _best(lambda: sorted(old_ids), count),
+        _best(lambda: sorted(new_ids), count),
+    )
+    _report(
+        'formatting',
+        _best(lambda: [str(snowflake) for snowflake in old_ids], count),
+        _best(lambda: [str(snowflake) for snowflake in new_ids], count),
+    )
+
+    payloads = [{'id': str(raw_id), 'channel_id': str(raw_id), 'guild_id': str(raw_id)} for raw_id in raw_ids]
+    validate_in = _best(lambda: [_Model.model_validate(payload) for payload in payloads], count)
+    print(f'{"validation":>16}: {validate_in:8.1f} ns per model of 3 ids')  # noqa: T201
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=50_000, help='number of ids')
+    args = parser.parse_args()
+
+    _run(args.count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""Benchmark of many concurrent event waiters.
+
+Every waiter waits for a message in its own channel with a timeout, like pending
+interactive menus do. The benchmark measures memory of pending waiters and the cost
+of dispatching events while they are pending.
+
+Usage:
+    python -m benchmarks.waiters [--count N]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import tracemalloc
+from argparse import ArgumentParser
+
+from asyncord.gateway.dispatcher import EventDispatcher
+from asyncord.gateway.events.base import GatewayEvent
+
+
+class ChannelEvent(GatewayEvent):
+    """Minimal event with a channel id."""
+
+    channel_id: int
+
+
+async def _register(dispatcher: EventDispatcher, count: int) -> list[asyncio.Task[ChannelEvent]]:
+    waiters = [
+        asyncio.create_task(dispatcher.wait_for(ChannelEvent, channel_id=channel_id, timeout=600))
+        for channel_id in range(count)
+    ]
+    await asyncio.sleep(0)
+    return waiters
+
+
+async def _measure_memory(count: int) -> float:
+    dispatcher = EventDispatcher()
+    tracemalloc.start()
+    await _register(dispatcher, count)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await dispatcher.close()
+    return memory / count
+
+
+async def _run(count: int) -> None:
+    memory_per_waiter = await _measure_memory(count)
+
+    dispatcher = EventDispatcher()
+    started_at = time.perf_counter()
+    waiters = await _register(dispatcher, count)
+    registered_in = time.perf_counter() - started_at
+
+    # events of unrelated channels go through the index without touching waiters
+    unrelated = [ChannelEvent(channel_id=count + num) for num in range(count)]
+    started_at = time.perf_counter()
+    for event in unrelated:
+        await dispatcher.dispatch(event)
+    unrelated_in = time.perf_counter() - started_at
+
+    events = [ChannelEvent(channel_id=channel_id) for channel_id in range(count)]
+    started_at = time.perf_counter()
+    for event in events:
+        await dispatcher.dispatch(event)
+    await asyncio.gather(*waiters)
+    resolved_in = time.perf_counter() - started_at
+
+    print(f'waiters: {count}')  # noqa: T201
+    print(f'{"register":>16}: {registered_in / count * 1e6:.2f} us/waiter')  # noqa: T201
+    print(f'{"memory":>16}: {memory_per_waiter:.0f} bytes/waiter with its task')  # noqa: T201
+    print(f'{"unrelated event":>16}: {unrelated_in / count * 1e6:.2f} us/event')  # noqa: T201
+    print(f'{"resolve":>16}: {resolved_in / count * 1e6:.2f} us/waiter')  # noqa: T201
+    print(f'{"timer handles":>16}: {int(dispatcher._waiters._timer is not None)}')  # noqa: T201
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=100_000, help='number of concurrent waiters')
+    args = parser.parse_args()
+
+    asyncio.run(_run(args.count))
+
+
+if __name__ == '__main__':
+    main()
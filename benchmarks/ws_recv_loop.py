@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""Benchmark of the gateway client receive loop.
+
+A local websocket server pushes N dispatch frames to `GatewayClient._ws_recv_loop`
+and closes the connection. Events are RESUMED with an empty payload, so the result
+shows the cost of the loop itself rather than the cost of event validation.
+
+Usage:
+    python -m benchmarks.ws_recv_loop [--count N]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import time
+from argparse import ArgumentParser
+
+import aiohttp
+from aiohttp import web
+from yarl import URL
+
+from asyncord.gateway.client.client import ConnectionData, GatewayClient
+from asyncord.gateway.client.errors import ConnectionClosedError
+from asyncord.gateway.dispatcher import EventDispatcher
+from asyncord.gateway.events.base import ResumedEvent
+
+
+async def _push_frames(request: web.Request) -> web.WebSocketResponse:
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+
+    count: int = request.app['count']
+    for seq in range(1, count + 1):
+        await ws.send_str(json.dumps({'op': 0, 's': seq, 't': 'RESUMED', 'd': {}}))
+    await ws.close()
+    return ws
+
+
+async def _run(count: int) -> float:
+    app = web.Application()
+    app['count'] = count
+    app.router.add_get('/', _push_frames)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore
+
+    received = 0
+
+    async def on_resumed(_event: ResumedEvent) -> None:  # noqa: RUF029
+        nonlocal received
+        received += 1
+
+    dispatcher = EventDispatcher()
+    dispatcher.add_handler(on_resumed)
+
+    async with aiohttp.ClientSession() as session:
+        client = GatewayClient(
+            token='token',  # noqa: S106
+            session=session,
+            conn_data=ConnectionData(token='token', resume_url=URL(f'ws://127.0.0.1:{port}/')),  # noqa: S106
+            dispatcher=dispatcher,
+        )
+        client.is_started = True
+        async with session.ws_connect(client.conn_data.resume_url) as ws:
+            client._ws = ws
+            started_at = time.perf_counter()
+            with contextlib.suppress(ConnectionClosedError):
+                await client._ws_recv_loop(ws)
+            elapsed = time.perf_counter() - started_at
+        client.is_started = False
+        client.heartbeat.stop()
+
+    await runner.cleanup()
+    if received != count:
+        raise RuntimeError(f'Expected {count} events, received {received}')
+    return elapsed
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=50_000, help='number of frames to push')
+    args = parser.parse_args()
+
+    elapsed = asyncio.run(_run(args.count))
+    print(f'frames: {args.count}, elapsed: {elapsed:.3f}s')  # noqa: T201
+    print(f'{args.count / elapsed:,.0f} frames/s, {elapsed / args.count * 1e6:.2f} us/frame')  # noqa: T201
+
+
+if __name__ == '__main__':
+    main()
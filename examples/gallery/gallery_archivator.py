@@ -10,7 +10,7 @@ import os
 from dotenv import load_dotenv
 
 from asyncord.client.rest import RestClient
-from asyncord.snowflake import SnowflakeInputType
+from asyncord.snowflake import SnowflakeInputType, same_snowflake
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -53,7 +53,7 @@ class GalleryArchivator:
         threads_to_process = []
 
         for thread in guild_threads_resp.threads:
-            if thread.parent_id != self.gallery_channel_id:
+            if not same_snowflake(thread.parent_id, self.gallery_channel_id):
                 continue
             if thread.thread_metadata.archived:
                 continue
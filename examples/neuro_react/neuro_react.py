@@ -20,7 +20,7 @@ from asyncord.client.channels.models.requests.updating import UpdateChannelReque
 from asyncord.client.rest import RestClient
 from asyncord.client_hub import ClientHub
 from asyncord.gateway.events.channels import ThreadCreateEvent
-from asyncord.snowflake import SnowflakeInputType
+from asyncord.snowflake import SnowflakeInputType, same_snowflake
 
 load_dotenv()
 API_TOKEN: str = os.getenv('API_TOKEN')  # type: ignore
@@ -134,7 +134,7 @@ async def on_thread_created(
     ai_client: AsyncOpenAI,
 ) -> None:
     """Handle the thread creation event."""
-    if event.parent_id != FORUM_CHANNEL_ID:
+    if not same_snowflake(event.parent_id, FORUM_CHANNEL_ID):
         return
 
     title = event.name
@@ -0,0 +1,161 @@
+"""Raw gateway payloads for cache tests."""
+
+from typing import Any
+
+GUILD_ID = 100
+
+
+def role_data(role_id: int, permissions: int = 0, position: int = 1) -> dict[str, Any]:
+    """Return raw role data."""
+    return {
+        'id': str(role_id),
+        'name': f'role-{role_id}',
+        'color': 0,
+        'hoist': False,
+        'position': position,
+        'permissions': str(permissions),
+        'managed': False,
+        'mentionable': False,
+        'flags': 0,
+    }
+
+
+def user_data(user_id: int) -> dict[str, Any]:
+    """Return raw user data."""
+    return {
+        'id': str(user_id),
+        'username': f'user-{user_id}',
+        'discriminator': '0',
+        'global_name': None,
+        'avatar': None,
+    }
+
+
+def member_data(user_id: int, roles: list[int] | None = None, nick: str | None = None) -> dict[str, Any]:
+    """Return raw member data."""
+    return {
+        'user': user_data(user_id),
+        'nick': nick,
+        'roles': [str(role_id) for role_id in roles or []],
+        'joined_at': '2024-01-01T00:00:00+00:00',
+        'deaf': False,
+        'mute': False,
+        'flags': 0,
+    }
+
+
+def channel_data(
+    channel_id: int,
+    parent_id: int | None = None,
+    overwrites: list[dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    """Return raw text channel data as sent in GUILD_CREATE."""
+    return {
+        'id': str(channel_id),
+        'type': 0,
+        'name': f'channel-{channel_id}',
+        'parent_id': None if parent_id is None else str(parent_id),
+        'permission_overwrites': overwrites or [],
+    }
+
+
+def thread_data(thread_id: int, parent_id: int) -> dict[str, Any]:
+    """Return raw public thread data."""
+    return {
+        'id': str(thread_id),
+        'type': 11,
+        'name': f'thread-{thread_id}',
+        'parent_id': str(parent_id),
+        'owner_id': '1',
+        'message_count': 0,
+        'member_count': 1,
+        'total_message_sent': 0,
+        'thread_metadata': {
+            'archived': False,
+            'auto_archive_duration': 60,
+            'archive_timestamp': '2024-01-01T00:00:00+00:00',
+            'locked': False,
+        },
+    }
+
+
+def overwrite_data(target_id: int, allow: int = 0, deny: int = 0, *, member: bool = False) -> dict[str, Any]:
+    """Return raw permission overwrite data."""
+    return {'id': str(target_id), 'type': int(member), 'allow': str(allow), 'deny': str(deny)}
+
+
+def guild_create_data(guild_id: int = GUILD_ID, **fields: Any) -> dict[str, Any]:  # noqa: ANN401
+    """Return raw GUILD_CREATE data."""
+    data: dict[str, Any] = {
+        'id': str(guild_id),
+        'name': 'guild',
+        'icon': None,
+        'splash': None,
+        'discovery_splash': None,
+        'owner_id': '1',
+        'afk_channel_id': None,
+        'afk_timeout': 300,
+        'verification_level': 0,
+        'default_message_notifications': 0,
+        'explicit_content_filter': 0,
+        'roles': [role_data(guild_id)],
+        'emojis': [{'id': '300', 'name': 'emoji'}],
+        'features': [],
+        'mfa_level': 0,
+        'application_id': None,
+        'system_channel_id': None,
+        'system_channel_flags': 0,
+        'rules_channel_id': None,
+        'max_members': 1000,
+        'vanity_url_code': None,
+        'description': None,
+        'banner': None,
+        'premium_tier': 0,
+        'premium_subscription_count': 0,
+        'preferred_locale': 'en-US',
+        'public_updates_channel_id': None,
+        'nsfw_level': 0,
+        'premium_progress_bar_enabled': False,
+        'safety_alerts_channel_id': None,
+        'channels': [channel_data(200), channel_data(201)],
+        'threads': [thread_data(250, parent_id=200)],
+        'members': [member_data(1), member_data(2, roles=[guild_id])],
+    }
+    data.update(fields)
+    return data
+
+
+def message_data(
+    message_id: int,
+    channel_id: int = 200,
+    content: str = 'text',
+    attachment_ids: list[int] | None = None,
+) -> dict[str, Any]:
+    """Return raw MESSAGE_CREATE data."""
+    return {
+        'id': str(message_id),
+        'channel_id': str(channel_id),
+        'guild_id': str(GUILD_ID),
+        'author': user_data(1),
+        'content': content,
+        'timestamp': '2024-01-01T00:00:00+00:00',
+        'edited_timestamp': None,
+        'tts': False,
+        'mention_everyone': False,
+        'mentions': [],
+        'mention_roles': [],
+        'attachments': [
+            {
+                'id': str(attachment_id),
+                'filename': 'file.txt',
+                'size': 1,
+                'url': 'https://a/f',
+                'proxy_url': 'https://a/f',
+            }
+            for attachment_id in attachment_ids or []
+        ],
+        'embeds': [],
+        'pinned': False,
+        'type': 0,
+        'flags': 0,
+    }
@@ -0,0 +1,205 @@
+import logging
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from asyncord.gateway.cache.entity_cache import DEFAULT_CACHE_FLAGS, CacheFlag, EntityCache
+from asyncord.gateway.client.client import ConnectionData
+from asyncord.gateway.client.opcode_handlers import DispatchHandler
+from asyncord.gateway.events.channels import (
+    ChannelCreateEvent,
+    ChannelDeleteEvent,
+    ThreadDeleteEvent,
+    ThreadListSyncEvent,
+)
+from asyncord.gateway.events.guilds import (
+    GuildCreateEvent,
+    GuildDeleteEvent,
+    GuildEmojisUpdateEvent,
+    GuildMemberAddEvent,
+    GuildMemberRemoveEvent,
+    GuildMembersChunkEvent,
+    GuildMemberUpdateEvent,
+    GuildRoleDeleteEvent,
+    GuildRoleUpdateEvent,
+)
+from asyncord.gateway.message import DispatchEnvelope
+from tests.gateway.cache.payloads import (
+    GUILD_ID,
+    channel_data,
+    guild_create_data,
+    member_data,
+    role_data,
+    thread_data,
+    user_data,
+)
+
+
+@pytest.fixture
+def cache() -> EntityCache:
+    """Return a cache of all entities filled with a guild."""
+    cache = EntityCache(DEFAULT_CACHE_FLAGS | CacheFlag.MEMBERS)
+    cache.update(GuildCreateEvent.model_validate(guild_create_data()))
+    return cache
+
+
+def test_guild_create(cache: EntityCache) -> None:
+    """Test caching all entities of a created guild."""
+    guild = cache.get_guild(GUILD_ID)
+    assert guild
+    assert guild.name == 'guild'
+    assert guild.roles is None
+
+    assert [channel.id for channel in cache.guild_channels(GUILD_ID)] == [200, 201]
+    channel = cache.get_channel(200)
+    assert channel
+    assert channel.guild_id == GUILD_ID
+    assert cache.get_thread(250)
+    assert cache.get_role(GUILD_ID)
+    assert cache.get_emoji(300)
+
+    member = cache.get_member(GUILD_ID, 2)
+    assert member
+    assert member.roles == [GUILD_ID]
+    assert len(cache.guild_members(GUILD_ID)) == 2
+
+
+def test_flags_disable_entities() -> None:
+    """Test that disabled entities are not cached and their events are not handled."""
+    cache = EntityCache(CacheFlag.GUILDS | CacheFlag.ROLES)
+    cache.update(GuildCreateEvent.model_validate(guild_create_data()))
+
+    assert cache.get_guild(GUILD_ID)
+    assert cache.get_role(GUILD_ID)
+    assert not cache.get_channel(200)
+    assert not cache.get_member(GUILD_ID, 1)
+    assert not cache.get_emoji(300)
+    assert cache.handles(GuildRoleUpdateEvent)
+    assert not cache.handles(GuildMemberAddEvent)
+    assert not cache.handles(ChannelCreateEvent)
+
+
+def test_default_flags_skip_members() -> None:
+    """Test that members are not cached by default."""
+    cache = EntityCache()
+    assert CacheFlag.MEMBERS not in cache.flags
+    assert not cache.handles(GuildMembersChunkEvent)
+
+
+def test_channel_events(cache: EntityCache) -> None:
+    """Test creating and deleting channels with their threads."""
+    cache.update(ChannelCreateEvent.model_validate({**channel_data(202), 'guild_id': str(GUILD_ID)}))
+    assert cache.get_channel(202)
+
+    cache.update(ChannelDeleteEvent.model_validate({'id': '200', 'type': 0, 'guild_id': str(GUILD_ID)}))
+    assert not cache.get_channel(200)
+    assert not cache.get_thread(250)
+    assert {int(channel.id) for channel in cache.guild_channels(GUILD_ID)} == {201, 202}
+
+
+def test_thread_events(cache: EntityCache) -> None:
+    """Test syncing and deleting threads."""
+    cache.update(
+        ThreadListSyncEvent.model_validate({
+            'guild_id': str(GUILD_ID),
+            'channel_ids': ['200'],
+            'threads': [{**thread_data(251, parent_id=200), 'guild_id': str(GUILD_ID)}],
+            'members': [],
+        }),
+    )
+    assert not cache.get_thread(250)
+    assert cache.get_thread(251)
+
+    cache.update(ThreadDeleteEvent.model_validate({'id': '251', 'type': 11, 'parent_id': '200'}))
+    assert not cache.guild_threads(GUILD_ID)
+
+
+def test_role_and_emoji_events(cache: EntityCache) -> None:
+    """Test updating roles and emojis."""
+    cache.update(GuildRoleUpdateEvent.model_validate({'guild_id': GUILD_ID, 'role': role_data(400)}))
+    assert cache.get_role(400)
+
+    cache.update(GuildRoleDeleteEvent.model_validate({'guild_id': GUILD_ID, 'role_id': 400}))
+    assert not cache.get_role(400)
+
+    cache.update(GuildEmojisUpdateEvent.model_validate({'guild_id': GUILD_ID, 'emojis': [{'id': 301, 'name': 'x'}]}))
+    assert not cache.get_emoji(300)
+    assert cache.get_emoji(301)
+
+
+def test_member_events(cache: EntityCache) -> None:
+    """Test adding, chunking and removing members."""
+    cache.update(GuildMemberAddEvent.model_validate({**member_data(3), 'guild_id': GUILD_ID}))
+    cache.update(
+        GuildMembersChunkEvent.model_validate({
+            'guild_id': GUILD_ID,
+            'members': [member_data(4, nick='four')],
+            'chunk_index': 0,
+            'chunk_count': 1,
+        }),
+    )
+    member = cache.get_member(GUILD_ID, 4)
+    assert member
+    assert member.nick == 'four'
+
+    cache.update(GuildMemberRemoveEvent.model_validate({'guild_id': GUILD_ID, 'user': user_data(3)}))
+    assert not cache.get_member(GUILD_ID, 3)
+    assert len(cache.guild_members(GUILD_ID)) == 3
+
+
+@pytest.mark.parametrize('compact_members', [False, True])
+def test_member_update_keeps_missing_fields(compact_members: bool) -> None:
+    """Test that a partial member update is merged into the cached member."""
+    cache = EntityCache(CacheFlag.GUILDS | CacheFlag.MEMBERS, compact_members=compact_members)
+    cache.update(GuildCreateEvent.model_validate(guild_create_data()))
+    cache.update(GuildMemberAddEvent.model_validate({**member_data(3), 'deaf': True, 'guild_id': GUILD_ID}))
+
+    update = member_data(3, roles=[10], nick='three')
+    del update['deaf'], update['mute'], update['joined_at']
+    update |= {'pending': False, 'communication_disabled_until': None, 'guild_id': GUILD_ID}
+    cache.update(GuildMemberUpdateEvent.model_validate(update))
+
+    member = cache.get_member(GUILD_ID, 3)
+    assert member
+    assert member.nick == 'three'
+    assert [int(role_id) for role_id in member.roles] == [10]
+    assert member.deaf is True
+    assert member.mute is False
+    assert member.joined_at
+
+
+def test_guild_delete_removes_entities(cache: EntityCache) -> None:
+    """Test that deleting a guild removes all its entities."""
+    cache.update(GuildDeleteEvent(id=GUILD_ID, unavailable=True))
+
+    assert not cache.get_guild(GUILD_ID)
+    assert not cache.get_channel(200)
+    assert not cache.get_thread(250)
+    assert not cache.get_role(GUILD_ID)
+    assert not cache.get_emoji(300)
+    assert not cache.get_member(GUILD_ID, 1)
+
+
+def test_clear(cache: EntityCache) -> None:
+    """Test removing all entities."""
+    cache.clear()
+    assert not cache.guilds()
+    assert not cache.get_channel(200)
+    assert not cache.guild_members(GUILD_ID)
+
+
+async def test_dispatch_handler_updates_cache() -> None:
+    """Test that the dispatch handler feeds the cache before dispatching."""
+    client = AsyncMock()
+    client.conn_data = ConnectionData(token='token')  # noqa: S106
+    client.event_relay = None
+    client.cache = EntityCache()
+    client.dispatcher.has_subscribers = Mock(return_value=False)
+    client.dispatcher.has_projections = Mock(return_value=False)
+    client.payload_filter = None
+    handler = DispatchHandler(client, logging.getLogger(__name__))
+
+    await handler.handle(DispatchEnvelope('GUILD_CREATE', 1, guild_create_data()))
+
+    assert client.cache.get_guild(GUILD_ID)
+    client.dispatcher.dispatch.assert_not_called()
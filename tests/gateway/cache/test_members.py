@@ -0,0 +1,106 @@
+import datetime
+
+import pytest
+
+from asyncord.client.members.models.responses import MemberResponse
+from asyncord.gateway.cache.entity_cache import CacheFlag, EntityCache
+from asyncord.gateway.cache.members import CompactMember, CompactMemberStore, DictMemberStore, MemberStore
+from asyncord.gateway.events.guilds import GuildCreateEvent
+from tests.gateway.cache.payloads import GUILD_ID, guild_create_data, member_data
+
+
+def make_member(user_id: int, roles: list[int] | None = None, **fields: object) -> MemberResponse:
+    """Return a validated member."""
+    return MemberResponse.model_validate({**member_data(user_id, roles), **fields})
+
+
+@pytest.mark.parametrize('store_type', [DictMemberStore, CompactMemberStore])
+def test_store_operations(store_type: type[MemberStore]) -> None:
+    """Test adding, replacing and removing members."""
+    store = store_type()
+    for user_id in range(1, 4):
+        store.set(make_member(user_id, roles=[20, 10]))
+    store.set(make_member(2, nick='two'))
+
+    assert len(store) == 3
+    member = store.get(2)
+    assert member
+    assert member.nick == 'two'
+
+    removed = store.pop(1)
+    assert removed
+    assert removed.nick is None
+    assert store.pop(1) is None
+    assert store.get(1) is None
+    assert len(list(store)) == 2
+
+
+def test_compact_member_fields() -> None:
+    """Test that compact members keep fields of the member."""
+    store = CompactMemberStore()
+    source = make_member(
+        1,
+        roles=[30, 10],
+        nick='nick',
+        pending=False,
+        premium_since='2024-02-01T10:00:00.123000+00:00',
+        deaf=True,
+    )
+    store.set(source)
+
+    member = store.get(1)
+    assert isinstance(member, CompactMember)
+    assert member.user_id == 1
+    assert member.username == 'user-1'
+    assert member.roles == (10, 30)
+    assert member.nick == 'nick'
+    assert member.pending is False
+    assert member.deaf
+    assert not member.mute
+    assert member.joined_at == source.joined_at
+    assert member.premium_since == datetime.datetime(2024, 2, 1, 10, 0, 0, 123000, tzinfo=datetime.UTC)
+    assert member.communication_disabled_until is None
+
+    response = member.to_response()
+    assert response.user
+    assert response.user.id == 1
+    assert response.roles == [10, 30]
+
+
+def test_compact_store_interns_role_sets() -> None:
+    """Test that members with the same roles share the role tuple."""
+    store = CompactMemberStore()
+    store.set(make_member(1, roles=[2, 1]))
+    store.set(make_member(2, roles=[1, 2]))
+    store.set(make_member(3, roles=[1]))
+
+    assert store.role_sets == 2
+    assert store.get_roles(1) is store.get_roles(2)
+    assert store.get_roles(4) is None
+
+
+def test_compact_store_keeps_rows_after_removal() -> None:
+    """Test that moving the last row into a removed one keeps lookups correct."""
+    store = CompactMemberStore()
+    for user_id in range(1, 6):
+        store.set(make_member(user_id, nick=f'nick-{user_id}'))
+
+    store.pop(2)
+    store.pop(5)
+
+    assert sorted(member.user_id for member in store) == [1, 3, 4]
+    for user_id in (1, 3, 4):
+        member = store.get(user_id)
+        assert member
+        assert member.nick == f'nick-{user_id}'
+
+
+def test_entity_cache_with_compact_members() -> None:
+    """Test that the cache keeps members in compact stores on request."""
+    cache = EntityCache(CacheFlag.MEMBERS, compact_members=True)
+    cache.update(GuildCreateEvent.model_validate(guild_create_data()))
+
+    member = cache.get_member(GUILD_ID, 2)
+    assert isinstance(member, CompactMember)
+    assert member.roles == (GUILD_ID,)
+    assert len(cache.guild_members(GUILD_ID)) == 2
@@ -0,0 +1,128 @@
+import pytest
+
+from asyncord.gateway.cache.entity_cache import EntityCache
+from asyncord.gateway.cache.messages import MessageCache
+from asyncord.gateway.events.channels import ThreadDeleteEvent
+from asyncord.gateway.events.messages import (
+    CachedMessage,
+    MessageCreateEvent,
+    MessageDeleteBulkEvent,
+    MessageDeleteEvent,
+    MessageUpdateEvent,
+)
+from tests.gateway.cache.payloads import GUILD_ID, message_data
+
+
+def create(cache: MessageCache | EntityCache, message_id: int, channel_id: int = 200, content: str = 'text') -> None:
+    """Feed a created message to the cache."""
+    cache.update(MessageCreateEvent.model_validate(message_data(message_id, channel_id, content)))
+
+
+def test_message_is_cached_compactly() -> None:
+    """Test that only ids and the content of messages are kept."""
+    cache = MessageCache()
+    cache.update(MessageCreateEvent.model_validate(message_data(1, content='hello', attachment_ids=[10])))
+
+    assert cache.get(200, 1) == CachedMessage(
+        id=1,
+        channel_id=200,
+        guild_id=GUILD_ID,
+        author_id=1,
+        content='hello',
+        edited_timestamp=None,
+        attachment_ids=(10,),
+    )
+    assert cache.get(200, 2) is None
+    stats = cache.stats
+    assert (stats.entries, stats.hits, stats.misses) == (1, 1, 1)
+
+
+def test_update_carries_prior_version() -> None:
+    """Test that the update event gets the message before the update."""
+    cache = MessageCache()
+    create(cache, 1, content='before')
+    event = MessageUpdateEvent.model_validate({
+        'id': '1',
+        'channel_id': '200',
+        'content': 'after',
+        'edited_timestamp': '2024-01-02T00:00:00+00:00',
+    })
+    cache.update(event)
+
+    assert event.cached_message
+    assert event.cached_message.content == 'before'
+    updated = cache.get(200, 1)
+    assert updated
+    assert updated.content == 'after'
+    assert updated.edited_timestamp
+    assert 'cached_message' not in event.model_dump()
+
+
+def test_delete_events_carry_deleted_messages() -> None:
+    """Test that delete events get the deleted messages."""
+    cache = MessageCache()
+    for message_id in range(1, 4):
+        create(cache, message_id, content=f'message-{message_id}')
+
+    delete_event = MessageDeleteEvent.model_validate({'id': '1', 'channel_id': '200'})
+    cache.update(delete_event)
+    assert delete_event.cached_message
+    assert delete_event.cached_message.content == 'message-1'
+
+    bulk_event = MessageDeleteBulkEvent.model_validate({'ids': ['2', '3', '4'], 'channel_id': '200'})
+    cache.update(bulk_event)
+    assert [message.id for message in bulk_event.cached_messages] == [2, 3]
+    assert cache.stats.entries == 0
+    assert cache.stats.bytes == 0
+
+
+def test_channel_sizes() -> None:
+    """Test that channels keep only their latest messages."""
+    cache = MessageCache(max_messages=2, channel_sizes={201: 0})
+    for message_id in range(1, 5):
+        create(cache, message_id)
+    create(cache, 10, channel_id=201)
+
+    assert [message.id for message in cache.channel_messages(200)] == [3, 4]
+    assert cache.channel_messages(201) == []
+    assert cache.stats.evictions == 2
+
+    cache.set_channel_size(200, 1)
+    assert [message.id for message in cache.channel_messages(200)] == [4]
+
+
+def test_memory_cap_evicts_least_active_channels() -> None:
+    """Test that the global cap evicts messages of the least recently active channel."""
+    cache = MessageCache()
+    create(cache, 1, channel_id=200, content='x' * 1000)
+    create(cache, 2, channel_id=201, content='x' * 1000)
+    cache.max_bytes = cache.stats.bytes
+    create(cache, 3, channel_id=201, content='x' * 1000)
+
+    assert cache.channel_messages(200) == []
+    assert [message.id for message in cache.channel_messages(201)] == [2, 3]
+    assert cache.stats.bytes <= cache.max_bytes
+
+
+def test_channel_delete_drops_buffer() -> None:
+    """Test that messages of deleted threads are removed."""
+    cache = MessageCache()
+    create(cache, 1, channel_id=250)
+    cache.update(ThreadDeleteEvent.model_validate({'id': '250', 'type': 11, 'parent_id': '200'}))
+    assert cache.channel_messages(250) == []
+    assert cache.stats.bytes == 0
+
+
+@pytest.mark.parametrize('active', [True, False])
+def test_entity_cache_feeds_messages(active: bool) -> None:
+    """Test that the entity cache passes message events through its guild filter."""
+    active_guilds = {GUILD_ID} if active else set()
+    cache = EntityCache(messages=MessageCache(), guild_filter=active_guilds.__contains__)
+    assert cache.handles(MessageCreateEvent)
+
+    create(cache, 1)
+    assert cache.messages
+    assert bool(cache.messages.channel_messages(200)) is active
+
+    cache.evict_guild(GUILD_ID)
+    assert cache.messages.channel_messages(200) == []
@@ -0,0 +1,125 @@
+import pytest
+
+from asyncord.client.models.permissions import PermissionFlag
+from asyncord.gateway.cache.entity_cache import ALL_CACHE_FLAGS, EntityCache
+from asyncord.gateway.cache.permissions import ALL_PERMISSIONS
+from asyncord.gateway.events.channels import ChannelUpdateEvent
+from asyncord.gateway.events.guilds import GuildCreateEvent, GuildMemberUpdateEvent, GuildRoleUpdateEvent
+from tests.gateway.cache.payloads import (
+    GUILD_ID,
+    channel_data,
+    guild_create_data,
+    member_data,
+    overwrite_data,
+    role_data,
+    thread_data,
+)
+
+MOD_ROLE = 110
+ADMIN_ROLE = 120
+
+VIEW = PermissionFlag.VIEW_CHANNEL
+SEND = PermissionFlag.SEND_MESSAGES
+MANAGE = PermissionFlag.MANAGE_MESSAGES
+
+
+def private_channel_data() -> dict[str, object]:
+    """Return a channel visible only to moderators."""
+    return channel_data(200, overwrites=[overwrite_data(GUILD_ID, deny=VIEW), overwrite_data(MOD_ROLE, allow=VIEW)])
+
+
+@pytest.fixture(params=[False, True], ids=['models', 'compact'])
+def cache(request: pytest.FixtureRequest) -> EntityCache:
+    """Return a cache with a guild of a private channel, a public channel and four members."""
+    cache = EntityCache(ALL_CACHE_FLAGS, compact_members=request.param)
+    cache.update(
+        GuildCreateEvent.model_validate(
+            guild_create_data(
+                roles=[
+                    role_data(GUILD_ID, permissions=VIEW | SEND),
+                    role_data(MOD_ROLE, permissions=MANAGE),
+                    role_data(ADMIN_ROLE, permissions=PermissionFlag.ADMINISTRATOR),
+                ],
+                channels=[
+                    private_channel_data(),
+                    channel_data(201, overwrites=[overwrite_data(3, deny=SEND, member=True)]),
+                ],
+                threads=[thread_data(250, parent_id=200)],
+                members=[
+                    member_data(1),
+                    member_data(2, roles=[MOD_ROLE]),
+                    member_data(3),
+                    member_data(4, roles=[ADMIN_ROLE]),
+                ],
+            ),
+        ),
+    )
+    return cache
+
+
+def test_channel_permissions(cache: EntityCache) -> None:
+    """Test resolving overwrites of roles and members."""
+    resolver = cache.permissions
+    assert resolver.channel_permissions(200, 1) == ALL_PERMISSIONS
+    assert resolver.channel_permissions(200, 2) == VIEW | SEND | MANAGE
+    assert resolver.channel_permissions(200, 3) == PermissionFlag(0)
+    assert resolver.channel_permissions(200, 4) == ALL_PERMISSIONS
+    assert resolver.channel_permissions(201, 3) == VIEW
+    assert resolver.channel_permissions(250, 2) == VIEW | SEND | MANAGE
+
+    assert resolver.guild_permissions(GUILD_ID, 3) == VIEW | SEND
+    assert resolver.channel_permissions(999, 3) is None
+    assert resolver.channel_permissions(200, 999) is None
+
+
+def test_role_sets_are_memoized(cache: EntityCache) -> None:
+    """Test that members with the same roles share memoized permissions."""
+    resolver = cache.permissions
+    assert resolver.role_permissions(GUILD_ID, [], channel_id=200) == PermissionFlag(0)
+    assert resolver.role_permissions(GUILD_ID, [MOD_ROLE, MOD_ROLE], channel_id=250) == VIEW | SEND | MANAGE
+
+    assert sorted(resolver.members_with(200)) == [1, 2, 4]
+    assert resolver.members_with(201, SEND, user_ids=[2, 3, 999]) == [2]
+    assert resolver.stats.entries == 5
+
+
+def test_role_update_invalidates_role_sets(cache: EntityCache) -> None:
+    """Test that a role update drops only permissions of role sets with the role."""
+    resolver = cache.permissions
+    assert sorted(resolver.members_with(200)) == [1, 2, 4]
+    entries = resolver.stats.entries
+
+    cache.update(
+        GuildRoleUpdateEvent.model_validate({
+            'guild_id': str(GUILD_ID),
+            'role': role_data(MOD_ROLE, permissions=0),
+        }),
+    )
+    assert resolver.stats.entries == entries - 1
+    assert resolver.channel_permissions(200, 2) == VIEW | SEND
+
+    cache.update(
+        GuildRoleUpdateEvent.model_validate({'guild_id': str(GUILD_ID), 'role': role_data(GUILD_ID, permissions=0)}),
+    )
+    assert resolver.stats.entries == 0
+    assert resolver.guild_permissions(GUILD_ID, 3) == PermissionFlag(0)
+
+
+def test_overwrite_and_member_updates(cache: EntityCache) -> None:
+    """Test that channel and member updates are reflected in permissions."""
+    resolver = cache.permissions
+    assert resolver.channel_permissions(200, 3) == PermissionFlag(0)
+
+    cache.update(
+        GuildMemberUpdateEvent.model_validate({
+            **member_data(3, roles=[MOD_ROLE]),
+            'guild_id': str(GUILD_ID),
+            'pending': False,
+            'communication_disabled_until': None,
+        }),
+    )
+    assert resolver.channel_permissions(200, 3) == VIEW | SEND | MANAGE
+
+    cache.update(ChannelUpdateEvent.model_validate({**channel_data(200), 'guild_id': str(GUILD_ID)}))
+    assert resolver.channel_permissions(250, 3) == VIEW | SEND | MANAGE
+    assert sorted(resolver.members_with(200)) == [1, 2, 3, 4]
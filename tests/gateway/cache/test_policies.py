@@ -0,0 +1,159 @@
+import pytest
+
+from asyncord.gateway.cache import policies as policies_module
+from asyncord.gateway.cache.entity_cache import ALL_CACHE_FLAGS, CacheFlag, EntityCache
+from asyncord.gateway.cache.policies import CachePolicy, CacheStats, PolicyTracker, estimate_size
+from asyncord.gateway.events.channels import ChannelCreateEvent
+from asyncord.gateway.events.guilds import GuildCreateEvent, GuildMemberAddEvent
+from tests.gateway.cache.payloads import GUILD_ID, channel_data, guild_create_data, member_data
+
+
+class Clock:
+    """Fake monotonic clock."""
+
+    def __init__(self) -> None:
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Get the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    """Replace the clock of policy trackers."""
+    clock = Clock()
+    monkeypatch.setattr(policies_module, 'monotonic', clock)
+    return clock
+
+
+def test_lru_evicts_least_recently_used() -> None:
+    """Test that lookups protect entries from eviction."""
+    tracker = PolicyTracker[int](CachePolicy.lru(max_entries=2), CacheStats())
+    assert tracker.touch(1) == []
+    assert tracker.touch(2) == []
+    assert tracker.access(1)
+
+    assert tracker.touch(3) == [2]
+    assert tracker.stats.evictions == 1
+    assert len(tracker) == 2
+
+
+def test_byte_budget() -> None:
+    """Test that entries are evicted to fit the byte budget."""
+    tracker = PolicyTracker[int](CachePolicy.lru(max_bytes=100), CacheStats())
+    tracker.touch(1, 60)
+    tracker.touch(2, 30)
+    assert tracker.stats.bytes == 90
+
+    assert tracker.touch(1, 80) == [2]
+    assert tracker.stats.bytes == 80
+    assert tracker.touch(3, 200) == [1, 3]
+    assert tracker.stats.bytes == 0
+
+
+def test_ttl_ignores_lookups(clock: Clock) -> None:
+    """Test that TTL entries expire after the update regardless of lookups."""
+    tracker = PolicyTracker[int](CachePolicy.ttl(10), CacheStats())
+    tracker.touch(1)
+    clock.now = 8
+    assert tracker.access(1)
+    clock.now = 11
+    assert not tracker.access(1)
+    assert len(tracker) == 0
+    assert tracker.stats.evictions == 1
+
+
+def test_seen_within_refreshes_on_lookups(clock: Clock) -> None:
+    """Test that looked up entries stay in the cache."""
+    tracker = PolicyTracker[int](CachePolicy.seen_within(10), CacheStats())
+    tracker.touch(1)
+    tracker.touch(2)
+    clock.now = 8
+    assert tracker.access(1)
+    clock.now = 15
+
+    assert tracker.expire() == [2]
+    assert tracker.access(1)
+
+
+def test_estimate_size_counts_nested_objects() -> None:
+    """Test that the estimation includes fields of models."""
+    event = ChannelCreateEvent.model_validate({**channel_data(200), 'guild_id': str(GUILD_ID)})
+    shared = 'x' * 1000
+    assert estimate_size(event) > estimate_size(channel_data(200))
+    assert estimate_size([shared, shared]) < 2 * estimate_size(shared)
+
+
+def test_cache_counts_hits_and_misses() -> None:
+    """Test hit and miss counters of the cache."""
+    cache = EntityCache()
+    cache.update(GuildCreateEvent.model_validate(guild_create_data()))
+    assert cache.get_channel(200)
+    assert cache.get_channel(999) is None
+
+    stats = cache.stats()
+    assert stats[CacheFlag.CHANNELS] == CacheStats(entries=2, hits=1, misses=1)
+    assert CacheFlag.MEMBERS not in stats
+
+
+def test_cache_evicts_channels_over_limit() -> None:
+    """Test that channels over the limit are evicted from all indexes."""
+    cache = EntityCache(policies={CacheFlag.CHANNELS | CacheFlag.THREADS: CachePolicy.lru(max_entries=1)})
+    cache.update(GuildCreateEvent.model_validate(guild_create_data()))
+
+    assert cache.get_channel(200) is None
+    assert [channel.id for channel in cache.guild_channels(GUILD_ID)] == [201]
+    assert cache.get_thread(250)
+    assert cache.stats()[CacheFlag.CHANNELS].evictions == 1
+
+
+def test_cache_byte_budget() -> None:
+    """Test that the byte budget of the cache is respected."""
+    budget = 3 * estimate_size(ChannelCreateEvent.model_validate({**channel_data(200), 'guild_id': str(GUILD_ID)}))
+    cache = EntityCache(policies={CacheFlag.CHANNELS: CachePolicy.lru(max_bytes=budget)})
+    for channel_id in range(200, 210):
+        cache.update(ChannelCreateEvent.model_validate({**channel_data(channel_id), 'guild_id': str(GUILD_ID)}))
+
+    stats = cache.stats()[CacheFlag.CHANNELS]
+    assert 0 < stats.bytes <= budget
+    assert stats.entries == len(cache.guild_channels(GUILD_ID)) < 10
+
+
+@pytest.mark.parametrize('compact_members', [False, True])
+def test_cache_keeps_recently_seen_members(clock: Clock, compact_members: bool) -> None:
+    """Test keeping only members seen recently."""
+    cache = EntityCache(
+        ALL_CACHE_FLAGS,
+        compact_members=compact_members,
+        policies={CacheFlag.MEMBERS: CachePolicy.seen_within(600, max_bytes=1 << 20)},
+    )
+    cache.update(GuildCreateEvent.model_validate(guild_create_data()))
+    clock.now = 500
+    cache.update(GuildMemberAddEvent.model_validate({**member_data(3), 'guild_id': str(GUILD_ID)}))
+    clock.now = 700
+
+    assert cache.get_member(GUILD_ID, 1) is None
+    assert len(cache.guild_members(GUILD_ID)) == 1
+    assert cache.get_member(GUILD_ID, 3)
+    stats = cache.stats()[CacheFlag.MEMBERS]
+    assert stats.entries == 1
+    assert stats.evictions == 2
+    assert stats.bytes > 0
+
+
+def test_guild_filter() -> None:
+    """Test that guilds rejected by the filter are not cached."""
+    active_guilds = {GUILD_ID}
+    cache = EntityCache(guild_filter=active_guilds.__contains__)
+    cache.update(GuildCreateEvent.model_validate(guild_create_data()))
+    cache.update(GuildCreateEvent.model_validate(guild_create_data(guild_id=101, channels=[channel_data(210)])))
+
+    assert cache.get_guild(GUILD_ID)
+    assert cache.get_guild(101) is None
+    assert cache.get_channel(210) is None
+
+    cache.evict_guild(GUILD_ID)
+    assert cache.guilds() == []
+    assert cache.guild_channels(GUILD_ID) == []
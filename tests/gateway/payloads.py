@@ -0,0 +1,34 @@
+"""Raw gateway payloads for gateway tests."""
+
+from typing import Any
+
+READY_EVENT_DATA: dict[str, Any] = {
+    'v': 9,
+    'user': {
+        'id': '1234567890',
+        'username': 'example_user',
+        'global_name': 'example_user#1234',
+        'discriminator': '1234',
+        'avatar': 'example_avatar',
+    },
+    'guilds': [
+        {
+            'id': '123',
+            'unavailable': True,
+        },
+        {
+            'id': '123',
+            'unavailable': False,
+        },
+    ],
+    'session_id': 'example_session_id',
+    'resume_gateway_url': 'example_gateway_url',
+    'shard': {
+        'shard_id': 0,
+        'num_shards': 1,
+    },
+    'application': {
+        'id': '1234567890',
+        'flags': 0,
+    },
+}
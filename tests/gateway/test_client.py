@@ -8,7 +8,7 @@ import pytest
 from pytest_mock import MockFixture
 
 from asyncord.client.http.middleware.auth import BotTokenAuthStrategy
-from asyncord.gateway.client.client import ConnectionData, GatewayClient, GatewayCommandOpcode
+from asyncord.gateway.client.client import RESUMABLE_CLOSE_CODE, ConnectionData, GatewayClient, GatewayCommandOpcode
 from asyncord.gateway.client.errors import ConnectionClosedError
 from asyncord.gateway.client.heartbeat import Heartbeat, HeartbeatFactory
 from asyncord.gateway.commands import IdentifyCommand, PresenceUpdateData, ResumeCommand
@@ -16,6 +16,7 @@ from asyncord.gateway.dispatcher import EventDispatcher
 from asyncord.gateway.intents import DEFAULT_INTENTS, Intent
 from asyncord.gateway.message import (
     DatalessMessage,
+    DispatchEnvelope,
     DispatchMessage,
     FallbackGatewayMessage,
     GatewayMessageOpcode,
@@ -230,7 +231,7 @@ async def test_update_presence(gw_client: GatewayClient) -> None:
     with patch.object(gw_client, 'send_command', new_callable=AsyncMock) as mock_send_command:
         await gw_client.update_presence(mock_presence_data)
 
-    mock_send_command.assert_called_once_with(GatewayCommandOpcode.PRESENCE_UPDATE, {'test': 'data'})
+    mock_send_command.assert_called_once_with(GatewayCommandOpcode.PRESENCE_UPDATE, {'test': 'data'}, coalesce=True)
 
 
 async def test_send_heartbeat_no_ws(gw_client: GatewayClient) -> None:
@@ -386,37 +387,71 @@ async def test_websocket_receive_loop_message_waiting(gw_client: GatewayClient,
 
 
 async def test_ws_recv_loop_restart_waiting(gw_client: GatewayClient, mocker: MockFixture) -> None:
-    """Test _ws_recv_loop when waiting for restart."""
-    # dummy message which will not be completed
-    message_future = asyncio.Future()
+    """Test _ws_recv_loop when waiting for restart.
 
-    async def _coro(_ws_resp: object) -> None:
-        await message_future
-
-    mocker.patch.object(gw_client, '_get_message', new=_coro)
+    The restart watcher closes the websocket, which breaks the pending receive.
+    """
+    closed = asyncio.Event()
+    ws = Mock()
+    ws.close = AsyncMock(side_effect=lambda **_: closed.set())
 
-    # Mock the handler to stop the client
-    async def _mock_handler_message(_message: object) -> None:
-        gw_client.is_started = False
+    async def _wait_close(_ws_resp: object) -> None:
+        await closed.wait()
+        raise ConnectionClosedError
 
-    mocker.patch.object(gw_client, '_handle_message', new=_mock_handler_message)
+    mocker.patch.object(gw_client, '_get_message', new=_wait_close)
+    mock_handle_message = mocker.patch.object(gw_client, '_handle_message', new_callable=AsyncMock)
     gw_client.is_started = True
 
     async def _set_need_restart() -> None:
         # Add a delay before setting the need_restart flag
-        # This will ensure that the loop continues to the restart branch
-        await asyncio.sleep(1)
+        # This will ensure that the loop is waiting for a message
+        await asyncio.sleep(0.1)
         return gw_client._need_restart.set()
 
-    # After not so long, the need_restart flag will be set
-    # This will continue the loop to the restart branch
-    await asyncio.gather(
-        gw_client._ws_recv_loop(Mock()),
-        _set_need_restart(),
+    await asyncio.wait_for(
+        asyncio.gather(
+            gw_client._ws_recv_loop(ws),
+            _set_need_restart(),
+        ),
+        timeout=1,
     )
 
     assert gw_client._need_restart.is_set()
-    assert message_future.cancelled()
+    # the session is kept to resume it after the restart
+    ws.close.assert_awaited_once_with(code=RESUMABLE_CLOSE_CODE)
+    mock_handle_message.assert_not_called()
+
+
+async def test_ws_recv_loop_connection_closed_by_server(gw_client: GatewayClient, mocker: MockFixture) -> None:
+    """Test _ws_recv_loop raises when the connection is closed without restart."""
+    mocker.patch.object(gw_client, '_get_message', side_effect=ConnectionClosedError)
+    gw_client.is_started = True
+
+    with pytest.raises(ConnectionClosedError):
+        await gw_client._ws_recv_loop(Mock())
+
+
+async def test_ws_recv_loop_does_not_create_task_per_message(gw_client: GatewayClient, mocker: MockFixture) -> None:
+    """Test _ws_recv_loop creates only the restart watcher task for the whole connection."""
+    messages_left = 100
+
+    async def _get_message(_ws_resp: object) -> FallbackGatewayMessage:
+        nonlocal messages_left
+        messages_left -= 1
+        if not messages_left:
+            gw_client.is_started = False
+        return FallbackGatewayMessage(op=100)  # type: ignore
+
+    mocker.patch.object(gw_client, '_get_message', new=_get_message)
+    mock_handle_message = mocker.patch.object(gw_client, '_handle_message', new_callable=AsyncMock)
+    spy_create_task = mocker.spy(asyncio, 'create_task')
+    gw_client.is_started = True
+
+    await gw_client._ws_recv_loop(Mock())
+
+    assert mock_handle_message.call_count == 100
+    assert spy_create_task.call_count == 1
 
 
 async def test__get_message_text(gw_client: GatewayClient, mocker: MockFixture) -> None:
@@ -467,6 +502,28 @@ async def test__handle_message_dispatch(gw_client: GatewayClient, mocker: MockFi
     mock_logger.debug.assert_called_once_with('Dispatching event: %s', message.event_name)
 
 
+async def test__get_message_dispatch(gw_client: GatewayClient) -> None:
+    """Test _get_message returns the lightweight envelope for dispatch messages."""
+    ws = AsyncMock()
+    message = Mock()
+    message.type = aiohttp.WSMsgType.TEXT
+    message.json.return_value = {'op': 0, 's': 3, 't': 'RESUMED', 'd': {}}
+    ws.receive.return_value = message
+
+    result = await gw_client._get_message(ws)
+
+    assert result == DispatchEnvelope(event_name='RESUMED', sequence_number=3, data={})
+
+
+async def test__handle_message_dispatch_envelope(gw_client: GatewayClient, mocker: MockFixture) -> None:
+    """Test handling a dispatch envelope routes it to the dispatch handler."""
+    handler = gw_client._opcode_handlers[GatewayMessageOpcode.DISPATCH]
+    mock_handler = mocker.patch.object(handler, 'handle')
+    message = DispatchEnvelope(event_name='RESUMED', sequence_number=3, data={})
+    await gw_client._handle_message(message)
+    mock_handler.assert_called_once_with(message)
+
+
 async def test__handle_message_non_dispatch(gw_client: GatewayClient, mocker: MockFixture) -> None:
     """Test handling a non-dispatch event."""
     mock_logger = mocker.patch.object(gw_client, 'logger')
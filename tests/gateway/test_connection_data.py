@@ -33,3 +33,26 @@ def test_reset() -> None:
     assert conn_data.resume_url == GATEWAY_URL
     assert conn_data.session_id is None
     assert conn_data.seq == 0
+
+
+def test_session_state_round_trip() -> None:
+    """Test saving and restoring the session state."""
+    conn_data = ConnectionData(
+        token='token',  # noqa: S106
+        resume_url=URL('ws://localhost'),
+        session_id='session_id',
+        seq=5,
+    )
+    state = conn_data.session_state
+    assert state
+
+    restored = ConnectionData(token='token')  # noqa: S106
+    restored.restore(state)
+
+    assert restored.can_resume
+    assert restored.session_state == state
+
+
+def test_session_state_cannot_resume() -> None:
+    """Test that there is no state to save if the session can't be resumed."""
+    assert ConnectionData(token='token').session_state is None  # noqa: S106
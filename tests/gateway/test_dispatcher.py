@@ -2,6 +2,7 @@ import logging
 from unittest import mock
 
 import pytest
+from pydantic import BaseModel
 
 from asyncord.gateway.dispatcher import EventDispatcher, GatewayEvent
 
@@ -211,3 +212,139 @@ async def test_dispatch_with_multiple_handlers(dispatcher: EventDispatcher) -> N
     handler1.assert_called_once_with(event)
     handler2.assert_called_once_with(event, arg1='value1')
     handler3.assert_not_called()
+
+
+def test_has_subscribers(dispatcher: EventDispatcher) -> None:
+    """Test checking if an event type has subscribers."""
+
+    async def handler(_: CustomEvent) -> None:
+        pass
+
+    assert not dispatcher.has_subscribers(CustomEvent)
+    assert not dispatcher.subscribed_event_types
+
+    dispatcher.add_handler(handler)
+
+    assert dispatcher.has_subscribers(CustomEvent)
+    assert not dispatcher.has_subscribers(CustomEvent2)
+    assert dispatcher.subscribed_event_types == {CustomEvent}
+
+
+class ChannelEvent(GatewayEvent):
+    """Custom channel event for testing."""
+
+    channel_id: int
+    guild_id: int | None = None
+
+
+async def test_dispatch_with_filters(dispatcher: EventDispatcher) -> None:
+    """Test that filtered handlers receive matching events only."""
+    handled: list[tuple[str, int]] = []
+
+    async def any_channel(event: ChannelEvent) -> None:
+        handled.append(('any', event.channel_id))
+
+    async def first_channel(event: ChannelEvent) -> None:
+        handled.append(('first', event.channel_id))
+
+    dispatcher.add_handler(any_channel)
+    dispatcher.add_handler(first_channel, channel_id=1)
+
+    await dispatcher.dispatch(ChannelEvent(channel_id=1))
+    await dispatcher.dispatch(ChannelEvent(channel_id=2))
+
+    assert handled == [('any', 1), ('first', 1), ('any', 2)]
+
+
+def test_add_handler_with_unknown_filter(dispatcher: EventDispatcher) -> None:
+    """Test that unknown filters are rejected on registration."""
+
+    async def handler(_: ChannelEvent) -> None:
+        pass
+
+    with pytest.raises(TypeError, match='Unknown event filters'):
+        dispatcher.add_handler(handler, channel=1)  # type: ignore
+
+    assert not dispatcher.has_subscribers(ChannelEvent)
+
+
+class ChannelProjection(BaseModel):
+    """Slim projection of the channel event for testing."""
+
+    channel_id: int
+
+
+async def test_dispatch_projections(dispatcher: EventDispatcher) -> None:
+    """Test that projection handlers receive payloads validated into their models once."""
+    handled: list[ChannelProjection] = []
+
+    async def first(projection: ChannelProjection) -> None:
+        handled.append(projection)
+
+    async def second(projection: ChannelProjection) -> None:
+        handled.append(projection)
+
+    dispatcher.add_projection_handler(ChannelEvent, ChannelProjection, first)
+    dispatcher.add_projection_handler(ChannelEvent, ChannelProjection, second)
+
+    assert dispatcher.has_projections(ChannelEvent)
+    assert not dispatcher.has_subscribers(ChannelEvent)
+    assert dispatcher.subscribed_event_types == {ChannelEvent}
+
+    await dispatcher.dispatch_projections(ChannelEvent, {'channel_id': 1, 'guild_id': 2})
+
+    assert handled == [ChannelProjection(channel_id=1)] * 2
+    assert handled[0] is handled[1]
+
+
+async def test_dispatch_projections_with_filters(dispatcher: EventDispatcher) -> None:
+    """Test that filters are applied to projections."""
+    handled: list[int] = []
+
+    async def handler(projection: ChannelProjection) -> None:
+        handled.append(projection.channel_id)
+
+    dispatcher.add_projection_handler(ChannelEvent, ChannelProjection, handler, channel_id=1)
+
+    await dispatcher.dispatch_projections(ChannelEvent, {'channel_id': 1})
+    await dispatcher.dispatch_projections(ChannelEvent, {'channel_id': 2})
+
+    assert handled == [1]
+
+
+async def test_dispatch_projections_skips_invalid_payloads(
+    dispatcher: EventDispatcher,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test that payloads which don't fit a projection are logged and skipped."""
+    dispatcher.add_projection_handler(ChannelEvent, ChannelProjection, _projection_handler)
+
+    with caplog.at_level(logging.ERROR):
+        await dispatcher.dispatch_projections(ChannelEvent, {'guild_id': 1})
+
+    assert 'ChannelProjection' in caplog.text
+
+
+async def _projection_handler(_: ChannelProjection) -> None:
+    raise AssertionError('Invalid projection must not be dispatched')
+
+
+def test_projection_requires_event_type(dispatcher: EventDispatcher) -> None:
+    """Test that the event type can't be inferred from a projection."""
+    with pytest.raises(TypeError, match='Event type must be specified'):
+        dispatcher.add_handler(_projection_handler)
+
+
+def test_handler_annotated_with_model_is_rejected(dispatcher: EventDispatcher) -> None:
+    """Test that handlers annotated with a model which is not an event are not turned into projections."""
+    with pytest.raises(TypeError, match='use add_projection_handler'):
+        dispatcher.add_handler(ChannelEvent, _projection_handler)  # type: ignore[arg-type]
+
+    assert not dispatcher.has_subscribers(ChannelEvent)
+    assert not dispatcher.has_projections(ChannelEvent)
+
+
+def test_projection_type_must_be_model(dispatcher: EventDispatcher) -> None:
+    """Test that projections are validated into pydantic models only."""
+    with pytest.raises(TypeError, match='Projection type must be a pydantic model'):
+        dispatcher.add_projection_handler(ChannelEvent, dict, _projection_handler)  # type: ignore[arg-type]
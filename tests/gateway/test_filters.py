@@ -0,0 +1,171 @@
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from asyncord.gateway.events.base import GatewayEvent
+from asyncord.gateway.events.channels import ChannelCreateEvent, ChannelDeleteEvent, ChannelUpdateEvent
+from asyncord.gateway.events.guilds import GuildCreateEvent, GuildDeleteEvent, GuildUpdateEvent
+from asyncord.gateway.filters import (
+    EventFilter,
+    FilterIndex,
+    get_author_id,
+    get_channel_id,
+    get_command_name,
+    get_custom_id,
+    get_guild_id,
+)
+from asyncord.snowflake import Snowflake
+from tests.gateway.cache.payloads import guild_create_data
+
+
+def make_message(channel_id: int, author_id: int, guild_id: int | None = None) -> SimpleNamespace:
+    """Make a message-like event."""
+    return SimpleNamespace(
+        guild_id=guild_id,
+        channel_id=channel_id,
+        author=SimpleNamespace(id=author_id),
+    )
+
+
+def make_interaction(custom_id: str | None = None, name: str | None = None) -> SimpleNamespace:
+    """Make an interaction-like root model event."""
+    data = SimpleNamespace(custom_id=custom_id, name=name)
+    user = SimpleNamespace(id=7)
+    return SimpleNamespace(root=SimpleNamespace(guild_id=1, channel_id=2, data=data, member=SimpleNamespace(user=user)))
+
+
+@pytest.mark.parametrize(
+    ('event', 'expected_id'),
+    [
+        (make_message(channel_id=1, author_id=5), 5),
+        (SimpleNamespace(user_id=Snowflake(6)), 6),
+        (make_interaction(custom_id='button'), 7),
+        (SimpleNamespace(user=SimpleNamespace(id=8)), 8),
+        (SimpleNamespace(), None),
+    ],
+)
+def test_get_author_id(event: SimpleNamespace, expected_id: int | None) -> None:
+    """Test getting the author id from different events."""
+    assert get_author_id(event) == expected_id
+
+
+def test_get_interaction_fields() -> None:
+    """Test getting the custom id and the command name from interactions."""
+    assert get_custom_id(make_interaction(custom_id='vote:1')) == 'vote:1'
+    assert get_command_name(make_interaction(name='ping')) == 'ping'
+    assert get_custom_id(make_message(channel_id=1, author_id=1)) is None
+
+
+def test_build_filter() -> None:
+    """Test building a filter from keyword arguments."""
+    assert EventFilter.build() is None
+    assert EventFilter.build(channel_id=None) is None
+
+    event_filter = EventFilter.build(channel_id=[1, '2'], author_id=Snowflake(3), command_name='ping')
+    assert event_filter == EventFilter(
+        channel_id=frozenset({1, 2}),
+        author_id=frozenset({3}),
+        command_name=frozenset({'ping'}),
+    )
+
+
+def test_build_filter_with_unknown_field() -> None:
+    """Test that unknown filter fields are rejected."""
+    with pytest.raises(TypeError, match='Unknown event filters: user'):
+        EventFilter.build(user=1)
+
+
+@pytest.mark.parametrize('filter_args', [{'channel_id': []}, {'command_name': ()}, {'guild_id': 1, 'author_id': set()}])
+def test_build_filter_with_empty_values(filter_args: dict[str, Any]) -> None:
+    """Test that empty collections of allowed values are rejected."""
+    with pytest.raises(ValueError, match='must not be empty'):
+        EventFilter.build(**filter_args)
+
+
+def test_filter_matches() -> None:
+    """Test checking events against a filter."""
+    event_filter = EventFilter.build(guild_id=1, channel_id=2, custom_id_prefix='vote:')
+    assert event_filter
+
+    assert event_filter.matches(make_interaction(custom_id='vote:yes'))
+    assert not event_filter.matches(make_interaction(custom_id='poll:yes'))
+    assert not event_filter.matches(make_message(channel_id=2, author_id=1, guild_id=1))
+    assert not event_filter.matches(make_message(channel_id=3, author_id=1, guild_id=1))
+
+
+def test_index_match_keeps_order() -> None:
+    """Test that matched items keep the order they were added."""
+    index: FilterIndex[str] = FilterIndex()
+    index.add('all')
+    index.add('channel', EventFilter.build(channel_id=1))
+    index.add('author', EventFilter.build(author_id=5))
+    index.add('other channel', EventFilter.build(channel_id=2))
+    index.add('channel and author', EventFilter.build(channel_id=1, author_id=6))
+    index.add('all again')
+
+    assert index.match(make_message(channel_id=1, author_id=5)) == ['all', 'channel', 'author', 'all again']
+    assert index.match(make_message(channel_id=1, author_id=6)) == ['all', 'channel', 'channel and author', 'all again']
+    assert len(index) == 6
+
+
+def test_index_match_custom_id_prefix() -> None:
+    """Test matching interactions by the custom id prefix."""
+    index: FilterIndex[str] = FilterIndex()
+    index.add('vote', EventFilter.build(custom_id_prefix='vote:'))
+    index.add('vote yes', EventFilter.build(custom_id_prefix='vote:yes'))
+    index.add('ping', EventFilter.build(command_name='ping'))
+
+    assert index.match(make_interaction(custom_id='vote:yes')) == ['vote', 'vote yes']
+    assert index.match(make_interaction(custom_id='vote:no')) == ['vote']
+    assert index.match(make_interaction(custom_id='v')) == []
+    assert index.match(make_interaction(name='ping')) == ['ping']
+
+
+def test_index_remove() -> None:
+    """Test removing items from the index."""
+    index: FilterIndex[str] = FilterIndex()
+    all_id = index.add('all')
+    channel_id = index.add('channels', EventFilter.build(channel_id=[1, 2]))
+    prefix_id = index.add('prefix', EventFilter.build(custom_id_prefix='vote:'))
+
+    index.remove(channel_id)
+    assert index.match(make_message(channel_id=1, author_id=1)) == ['all']
+    assert sorted(index) == ['all', 'prefix']
+
+    index.remove(all_id)
+    index.remove(prefix_id)
+    assert not len(index)
+    assert index.match(make_interaction(custom_id='vote:yes')) == []
+
+
+@pytest.mark.parametrize(
+    'event',
+    [
+        GuildCreateEvent.model_validate(guild_create_data(guild_id=1)),
+        GuildUpdateEvent.model_validate(guild_create_data(guild_id=1)),
+        GuildDeleteEvent(id=Snowflake(1)),
+    ],
+)
+def test_index_match_guild_events(event: GatewayEvent) -> None:
+    """Test that guild filters match guild events, which carry the guild id in the id field."""
+    index: FilterIndex[str] = FilterIndex()
+    index.add('guild', EventFilter.build(guild_id=1))
+    index.add('other guild', EventFilter.build(guild_id=2))
+
+    assert get_guild_id(event) == 1
+    assert index.match(event) == ['guild']
+
+
+@pytest.mark.parametrize('event_type', [ChannelCreateEvent, ChannelUpdateEvent, ChannelDeleteEvent])
+def test_index_match_channel_events(event_type: type[GatewayEvent]) -> None:
+    """Test that channel filters match channel events, which carry the channel id in the id field."""
+    event = event_type.model_validate({'id': '10', 'type': 0, 'guild_id': '1'})
+    index: FilterIndex[str] = FilterIndex()
+    index.add('channel', EventFilter.build(channel_id=10))
+    index.add('guild and channel', EventFilter.build(guild_id=1, channel_id=10))
+    index.add('other channel', EventFilter.build(channel_id=11))
+
+    assert get_channel_id(event) == 10
+    assert get_guild_id(event) == 1
+    assert index.match(event) == ['channel', 'guild and channel']
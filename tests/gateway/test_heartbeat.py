@@ -210,3 +210,52 @@ async def test_wait_heartbeat_ack_no_ack_received(
     assert mock_wait_for.call_count == 100
 
     assert 'ack not received after 100 attempts' in caplog.text
+
+
+async def test_heartbeat_ack_records_latency(
+    heartbeat: Heartbeat,
+    conn_data: ConnectionData,
+    mocker: MockerFixture,
+) -> None:
+    """Test that the time between sending a heartbeat and its ack is recorded."""
+    conn_data.seq = 1
+    mocker.patch('asyncord.gateway.client.heartbeat.time.perf_counter', side_effect=[10.0, 10.25])
+
+    async def send_heartbeat(seq: int) -> None:
+        await heartbeat.handle_heartbeat_ack()
+
+    heartbeat.client.send_heartbeat = send_heartbeat
+
+    await heartbeat._wait_heartbeat_ack()
+
+    assert heartbeat.latency.last == 0.25
+    # duplicated acks are not counted
+    await heartbeat.handle_heartbeat_ack()
+    assert heartbeat.latency.snapshot().samples == 1
+
+
+async def test_heartbeat_latency_counts_resends_separately(
+    heartbeat: Heartbeat,
+    conn_data: ConnectionData,
+    mocker: MockerFixture,
+) -> None:
+    """Test that the round-trip time is measured from the last attempt and resends are counted."""
+    conn_data.seq = 1
+    heartbeat._ack_event = Mock()  # suppress the RuntimeWarning
+    mocker.patch('asyncord.gateway.client.heartbeat.time.perf_counter', side_effect=[10.0, 15.0, 15.25])
+    mocker.patch('asyncio.wait_for', side_effect=[TimeoutError(), None])
+    sent: list[int] = []
+
+    async def send_heartbeat(seq: int) -> None:
+        sent.append(seq)
+        if len(sent) == 2:
+            await heartbeat.handle_heartbeat_ack()
+
+    heartbeat.client.send_heartbeat = send_heartbeat
+
+    await heartbeat._wait_heartbeat_ack()
+
+    assert sent == [1, 1]
+    snapshot = heartbeat.latency.snapshot()
+    assert snapshot.last == 0.25
+    assert snapshot.resends == 1
@@ -0,0 +1,60 @@
+import pytest
+
+from asyncord.gateway.cache.entity_cache import CacheFlag, EntityCache
+from asyncord.gateway.client.client import GatewayClient
+from asyncord.gateway.events.event_map import EVENT_MAP
+from asyncord.gateway.events.messages import MessageCreateEvent
+from asyncord.gateway.intents import (
+    AUTO_INTENTS,
+    DEFAULT_INTENTS,
+    EVENT_INTENTS,
+    Intent,
+    intents_for_events,
+)
+
+
+def test_event_intents_match_known_events() -> None:
+    """Test that the table refers to existing events, apart from not modeled ones."""
+    not_modeled = {'VOICE_STATE_UPDATE', 'WEBHOOKS_UPDATE'}
+
+    assert EVENT_INTENTS.keys() - EVENT_MAP.keys() == not_modeled
+
+
+def test_intents_for_events() -> None:
+    """Test that only intents of the given events are included."""
+    intents = intents_for_events(['MESSAGE_CREATE', 'MESSAGE_REACTION_ADD', 'READY', 'INTERACTION_CREATE'])
+
+    assert intents == (
+        Intent.GUILDS
+        | Intent.GUILD_MESSAGES
+        | Intent.DIRECT_MESSAGES
+        | Intent.GUILD_MESSAGE_REACTIONS
+        | Intent.DIRECT_MESSAGE_REACTIONS
+    )
+    assert not intents & (Intent.GUILD_PRESENCES | Intent.GUILD_MESSAGE_TYPING | Intent.MESSAGE_CONTENT)
+
+
+def test_privileged_intents_are_warned(caplog: pytest.LogCaptureFixture) -> None:
+    """Test that events needing privileged intents are reported unless the base has them."""
+    with caplog.at_level('WARNING', logger='asyncord.gateway.intents'):
+        intents = intents_for_events(['PRESENCE_UPDATE', 'GUILD_MEMBER_ADD'], base=Intent.GUILDS | Intent.GUILD_MEMBERS)
+
+    assert intents == Intent.GUILDS | Intent.GUILD_MEMBERS | Intent.GUILD_PRESENCES
+    assert len(caplog.records) == 1
+    assert 'PRESENCE_UPDATE needs the privileged GUILD_PRESENCES intent' in caplog.text
+
+
+async def test_client_auto_intents(gw_client: GatewayClient) -> None:
+    """Test that auto intents cover handlers and the cache."""
+    assert gw_client.identify_intents == DEFAULT_INTENTS
+
+    async def on_message(_: MessageCreateEvent) -> None:
+        pass
+
+    gw_client.intents = AUTO_INTENTS
+    gw_client.dispatcher.add_handler(on_message)
+    gw_client.cache = EntityCache(CacheFlag.GUILDS | CacheFlag.MEMBERS)
+
+    intents = gw_client.identify_intents
+
+    assert intents == Intent.GUILDS | Intent.GUILD_MESSAGES | Intent.DIRECT_MESSAGES | Intent.GUILD_MEMBERS
@@ -0,0 +1,141 @@
+import asyncio
+import json
+from typing import Any
+
+import aiohttp
+import pytest
+from pytest_mock import MockerFixture
+
+from asyncord.client.members.models.responses import MemberResponse
+from asyncord.gateway.cache.entity_cache import CacheFlag, EntityCache
+from asyncord.gateway.client.client import GatewayClient
+from asyncord.gateway.client.large_frames import decode_large_frame
+from asyncord.gateway.client.prefilter import PayloadFilter
+from asyncord.gateway.events.guilds import GuildCreateEvent
+from tests.gateway.cache.payloads import GUILD_ID, guild_create_data, member_data
+
+
+@pytest.fixture
+def cache() -> EntityCache:
+    """Return an entity cache with members."""
+    return EntityCache(CacheFlag.GUILDS | CacheFlag.MEMBERS)
+
+
+def _guild_frame(payload: dict[str, Any]) -> str:
+    """Return the text of a GUILD_CREATE frame."""
+    return json.dumps({'t': 'GUILD_CREATE', 's': 1, 'op': 0, 'd': payload})
+
+
+async def test_members_are_streamed_to_cache(cache: EntityCache) -> None:
+    """Test that members are fed to the cache and removed from the payload."""
+    members = [member_data(user_id) for user_id in range(1, 11)]
+    payload = guild_create_data(members=members, presences=[{'user': {'id': '1'}, 'status': 'online'}])
+
+    frame = await decode_large_frame(_guild_frame(payload), cache, chunk_size=3)
+
+    expected = {key: value for key, value in payload.items() if key not in {'members', 'presences'}}
+    assert frame == {'t': 'GUILD_CREATE', 's': 1, 'op': 0, 'd': expected}
+    assert len(cache.guild_members(GUILD_ID)) == len(members)
+
+    cache.update(GuildCreateEvent.model_validate(frame['d']))
+    assert len(cache.guild_members(GUILD_ID)) == len(members)
+
+
+async def test_members_before_guild_id(cache: EntityCache) -> None:
+    """Test that members are kept until the guild id is read."""
+    payload = guild_create_data()
+    payload = {'members': [member_data(5)], **{key: value for key, value in payload.items() if key != 'members'}}
+
+    frame = await decode_large_frame(_guild_frame(payload), cache, chunk_size=1)
+
+    assert 'members' not in frame['d']
+    assert cache.get_member(GUILD_ID, 5)
+
+
+async def test_stale_members_are_replaced(cache: EntityCache) -> None:
+    """Test that the first streamed chunk replaces previously cached members."""
+    cache.add_members(GUILD_ID, [MemberResponse.model_validate(member_data(1))])
+
+    await decode_large_frame(_guild_frame(guild_create_data(members=[member_data(7), member_data(8)])), cache, 1)
+
+    assert {member.user.id for member in cache.guild_members(GUILD_ID)} == {7, 8}  # type: ignore
+
+
+async def test_members_are_dropped_if_not_cached() -> None:
+    """Test that members are skipped without validation if the cache doesn't keep them."""
+    cache = EntityCache(CacheFlag.GUILDS)
+
+    frame = await decode_large_frame(_guild_frame(guild_create_data(members=[{'broken': True}])), cache)
+
+    assert 'members' not in frame['d']
+
+
+@pytest.mark.parametrize(
+    'frame',
+    [
+        {'t': 'MESSAGE_CREATE', 's': 1, 'op': 0, 'd': {'members': [1, 2]}},
+        {'d': {'id': '1', 'members': [member_data(1)]}, 't': 'GUILD_CREATE', 's': 1, 'op': 0},
+        {'op': 11, 'd': None},
+    ],
+)
+async def test_other_frames_are_decoded_as_usual(cache: EntityCache, frame: dict[str, Any]) -> None:
+    """Test that frames which are not streamed are decoded completely."""
+    text = json.dumps(frame, indent=1)
+
+    assert await decode_large_frame(text, cache) == frame
+
+
+async def test_decoding_yields_to_event_loop(cache: EntityCache) -> None:
+    """Test that other tasks run while a large array is decoded."""
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    payload = guild_create_data(members=[member_data(user_id) for user_id in range(1, 101)])
+    await decode_large_frame(_guild_frame(payload), cache, chunk_size=10)
+    task.cancel()
+
+    assert ticks >= 10
+
+
+@pytest.mark.parametrize(
+    'text',
+    [
+        '{"t": "GUILD_CREATE", "d": {"id": "1", "members": [{}, }}',
+        '{"t": "GUILD_CREATE", "d": {"id": "1" "members": []}}',
+        '{"t": "GUILD_CREATE", "d": {"id": "1", "members": [{} {}]}}',
+        '{"op": 1} extra',
+        '{"op": 1',
+    ],
+)
+async def test_invalid_frames(cache: EntityCache, text: str) -> None:
+    """Test that malformed frames raise decoding errors."""
+    with pytest.raises(ValueError, match=r'Expecting|Extra|Unexpected'):
+        await decode_large_frame(text, cache)
+
+
+async def test_filtered_guilds_are_not_streamed(
+    gw_client: GatewayClient,
+    cache: EntityCache,
+    mocker: MockerFixture,
+) -> None:
+    """Test that members of a guild dropped by the payload filter are not cached."""
+    mocker.patch('asyncord.gateway.client.client.LARGE_FRAME_SIZE', 0)
+    gw_client.cache = cache
+    gw_client.stream_large_guilds = True
+    gw_client.payload_filter = PayloadFilter(denied_guild_ids=[GUILD_ID])
+    frame = _guild_frame(guild_create_data(members=[member_data(1)]))
+    ws = mocker.AsyncMock(receive=mocker.AsyncMock(return_value=aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, frame, None)))
+
+    message = await gw_client._get_message(ws)
+    assert message
+    await gw_client._handle_message(message)
+
+    assert not cache.get_guild(GUILD_ID)
+    assert not cache.guild_members(GUILD_ID)
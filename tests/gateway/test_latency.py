@@ -0,0 +1,54 @@
+import pytest
+
+from asyncord.gateway.client.latency import LatencySnapshot, LatencyTracker
+
+
+def test_empty_tracker() -> None:
+    """Test statistics without samples."""
+    tracker = LatencyTracker()
+    assert tracker.last is None
+    assert tracker.snapshot() == LatencySnapshot(last=None, p50=None, p99=None, samples=0)
+
+
+def test_percentiles() -> None:
+    """Test percentiles of the samples."""
+    tracker = LatencyTracker()
+    for sample in range(100, 0, -1):
+        tracker.record(sample / 1000)
+
+    assert tracker.last == 0.001
+    assert tracker.percentile(0) == 0.001
+    assert tracker.percentile(100) == 0.1
+    assert tracker.snapshot() == LatencySnapshot(last=0.001, p50=0.05, p99=0.099, samples=100)
+
+
+def test_rolling_window() -> None:
+    """Test that only the latest samples are kept."""
+    tracker = LatencyTracker(window=3)
+    for sample in (10.0, 1.0, 2.0, 3.0):
+        tracker.record(sample)
+
+    snapshot = tracker.snapshot()
+    assert snapshot.samples == 3
+    assert snapshot.p99 == 3.0
+
+    tracker.reset()
+    assert not tracker.snapshot().samples
+
+
+def test_resends() -> None:
+    """Test that resends are counted apart from latency samples."""
+    tracker = LatencyTracker()
+    tracker.record_resend()
+    tracker.record_resend()
+
+    assert tracker.snapshot() == LatencySnapshot(last=None, p50=None, p99=None, samples=0, resends=2)
+
+    tracker.reset()
+    assert not tracker.snapshot().resends
+
+
+def test_invalid_window() -> None:
+    """Test that the window must be positive."""
+    with pytest.raises(ValueError, match='must be positive'):
+        LatencyTracker(window=0)
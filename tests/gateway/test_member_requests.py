@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from typing import Any
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from asyncord.gateway.client.client import GatewayClient
+from asyncord.gateway.client.opcode_handlers import DispatchHandler
+from asyncord.gateway.message import DispatchMessage, GatewayCommandOpcode
+from tests.gateway.cache.payloads import member_data
+
+
+def _chunk(guild_id: str, nonce: str, members: list[Any], index: int, count: int) -> DispatchMessage:
+    data = {
+        'guild_id': guild_id,
+        'members': members,
+        'chunk_index': index,
+        'chunk_count': count,
+        'nonce': nonce,
+    }
+    return DispatchMessage(t='GUILD_MEMBERS_CHUNK', d=data, s=1)  # type: ignore
+
+
+@pytest.fixture
+def sent(gw_client: GatewayClient) -> list[dict[str, Any]]:
+    """Respond to member requests with one chunk per member."""
+    handler = DispatchHandler(gw_client, logging.getLogger(__name__))
+    gw_client.dispatcher.has_subscribers = lambda _: False  # type: ignore[method-assign]
+    commands: list[dict[str, Any]] = []
+
+    async def respond(data: dict[str, Any]) -> None:
+        members = [member_data(int(user_id)) for user_id in data.get('user_ids', ['1', '2', '3'])]
+        for index, member in enumerate(members):
+            await asyncio.sleep(0)
+            await handler.handle(_chunk(data['guild_id'], data['nonce'], [member], index, len(members)))
+
+    async def send_command(opcode: GatewayCommandOpcode, data: dict[str, Any]) -> None:
+        assert opcode is GatewayCommandOpcode.REQUEST_GUILD_MEMBERS
+        commands.append(data)
+        asyncio.get_running_loop().create_task(respond(data))
+
+    gw_client.send_command = send_command  # type: ignore[method-assign]
+    return commands
+
+
+async def test_request_members_of_guilds(gw_client: GatewayClient, sent: list[dict[str, Any]]) -> None:
+    """Test that chunks of all guilds are yielded and the request finishes."""
+    request = gw_client.request_guild_members([10, 20])
+
+    chunks = [chunk async for chunk in request]
+
+    assert [(command['guild_id'], command['query'], command['limit']) for command in sent] == [
+        ('10', '', 0),
+        ('20', '', 0),
+    ]
+    assert sent[0]['nonce'] != sent[1]['nonce']
+    assert sorted((int(chunk.guild_id), chunk.chunk_index) for chunk in chunks) == [
+        (guild_id, index) for guild_id in (10, 20) for index in range(3)
+    ]
+    assert (request.chunks, request.members) == (6, 6)
+    assert not len(gw_client.member_requests)
+
+
+async def test_request_members_by_ids(gw_client: GatewayClient, sent: list[dict[str, Any]]) -> None:
+    """Test that users are requested by ids without a query."""
+    async with gw_client.request_guild_members(10, user_ids=[5], presences=True) as request:
+        members = [member async for chunk in request for member in chunk.members]
+
+    assert sent == [{'guild_id': '10', 'limit': 0, 'presences': True, 'user_ids': ['5'], 'nonce': sent[0]['nonce']}]
+    assert [member.user.id for member in members] == [5]  # type: ignore[union-attr]
+
+
+async def test_request_times_out(gw_client: GatewayClient) -> None:
+    """Test that the request fails if no chunk arrives."""
+    gw_client.send_command = AsyncMock()  # type: ignore[method-assign]
+    request = gw_client.request_guild_members(10, timeout=0.01)
+
+    with pytest.raises(TimeoutError):
+        await anext(request)
+
+    assert not len(gw_client.member_requests)
+
+
+async def test_request_fails_when_client_closes(gw_client: GatewayClient) -> None:
+    """Test that waiting requests fail when the client is closed."""
+    gw_client.send_command = AsyncMock()  # type: ignore[method-assign]
+    request = gw_client.request_guild_members(10)
+    waiter = asyncio.create_task(anext(request))
+    await asyncio.sleep(0)
+
+    gw_client.member_requests.fail(RuntimeError('Client is closed'))
+
+    with pytest.raises(RuntimeError, match=r'Client is closed'):
+        await waiter
+
+
+async def test_unrequested_chunks_are_not_validated(gw_client: GatewayClient) -> None:
+    """Test that chunks with unknown nonces are skipped without subscribers."""
+    handler = DispatchHandler(gw_client, logging.getLogger(__name__))
+    gw_client.member_requests.feed = Mock()  # type: ignore[method-assign]
+
+    await handler.handle(_chunk('10', 'unknown', [{'broken': True}], 0, 1))
+
+    gw_client.member_requests.feed.assert_not_called()
+    assert not gw_client.member_requests.expects(None)
@@ -0,0 +1,43 @@
+import pytest
+
+from asyncord.gateway.message import (
+    DatalessMessage,
+    DispatchEnvelope,
+    FallbackGatewayMessage,
+    GatewayMessageOpcode,
+    HelloMessage,
+    InvalidSessionMessage,
+    parse_gateway_message,
+)
+
+
+def test_parse_dispatch_message() -> None:
+    """Test that dispatch frames are read into the envelope without validation."""
+    data = {'channel_id': '123'}
+    message = parse_gateway_message({'op': 0, 's': 42, 't': 'TYPING_START', 'd': data})
+
+    assert isinstance(message, DispatchEnvelope)
+    assert message.opcode is GatewayMessageOpcode.DISPATCH
+    assert message.event_name == 'TYPING_START'
+    assert message.sequence_number == 42
+    assert message.data is data
+
+
+def test_parse_malformed_dispatch_message() -> None:
+    """Test that malformed dispatch frames go through full validation."""
+    message = parse_gateway_message({'op': 0, 'd': {}})
+    assert isinstance(message, FallbackGatewayMessage)
+
+
+@pytest.mark.parametrize(
+    ('frame', 'message_type'),
+    [
+        ({'op': 10, 'd': {'heartbeat_interval': 41250}}, HelloMessage),
+        ({'op': 9, 'd': True}, InvalidSessionMessage),
+        ({'op': 11}, DatalessMessage),
+        ({'op': 4321, 'd': {'foo': 'bar'}}, FallbackGatewayMessage),
+    ],
+)
+def test_parse_control_message(frame: dict, message_type: type) -> None:
+    """Test that control frames are fully validated."""
+    assert isinstance(parse_gateway_message(frame), message_type)
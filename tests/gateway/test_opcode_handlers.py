@@ -2,7 +2,9 @@ import logging
 from unittest.mock import AsyncMock, Mock
 
 import pytest
+from pytest_mock import MockerFixture
 
+from asyncord.gateway.cache.entity_cache import EntityCache
 from asyncord.gateway.client.client import ConnectionData
 from asyncord.gateway.client.opcode_handlers import (
     DispatchHandler,
@@ -13,7 +15,9 @@ from asyncord.gateway.client.opcode_handlers import (
 )
 from asyncord.gateway.commands import IdentifyCommand, ResumeCommand
 from asyncord.gateway.events.base import ReadyEvent
+from asyncord.gateway.events.presence import TypingStartEvent
 from asyncord.gateway.message import DispatchMessage
+from tests.gateway.payloads import READY_EVENT_DATA
 
 
 @pytest.fixture
@@ -26,6 +30,14 @@ def client() -> Mock:
         session_id='session_id',
     )
     client.reconnect = Mock()
+    client.release_commands = Mock()
+    client.dispatcher.has_subscribers = Mock(return_value=True)
+    client.dispatcher.has_projections = Mock(return_value=False)
+    client.payload_filter = None
+    client.shard = None
+    client.identify_gate = None
+    client.event_relay = None
+    client.cache = None
     return client
 
 
@@ -48,42 +60,67 @@ async def test_dispatch_unhandled_event(
 async def test_dispatch_ready_event(client: Mock) -> None:
     """Test dispatching a ready event."""
     handler = DispatchHandler(client, logging.getLogger('asyncord.gateway.client.opcode_handlers'))
-    event_data = {
-        'v': 9,
-        'user': {
-            'id': '1234567890',
-            'username': 'example_user',
-            'global_name': 'example_user#1234',
-            'discriminator': '1234',
-            'avatar': 'example_avatar',
-        },
-        'guilds': [
-            {
-                'id': '123',
-                'unavailable': True,
-            },
-            {
-                'id': '123',
-                'unavailable': False,
-            },
-        ],
-        'session_id': 'example_session_id',
-        'resume_gateway_url': 'example_gateway_url',
-        'shard': {
-            'shard_id': 0,
-            'num_shards': 1,
-        },
-        'application': {
-            'id': '1234567890',
-            'flags': 0,
-        },
-    }
-
-    message = DispatchMessage(t=ReadyEvent.__event_name__, d=event_data, s=1)  # type: ignore
+    message = DispatchMessage(t=ReadyEvent.__event_name__, d=READY_EVENT_DATA, s=1)  # type: ignore
     await handler.handle(message)
     assert client.conn_data.seq == 1
     assert client.conn_data.session_id == 'example_session_id'
     client.dispatcher.dispatch.assert_called_once()
+    client.release_commands.assert_called_once()
+
+
+async def test_dispatch_ready_event_without_subscribers(client: Mock) -> None:
+    """Test that the ready event updates the session even if nobody listens to it."""
+    client.dispatcher.has_subscribers = Mock(return_value=False)
+    handler = DispatchHandler(client, logging.getLogger('asyncord.gateway.client.opcode_handlers'))
+
+    message = DispatchMessage(t=ReadyEvent.__event_name__, d=READY_EVENT_DATA, s=1)  # type: ignore
+    await handler.handle(message)
+    assert client.conn_data.session_id == 'example_session_id'
+    client.dispatcher.dispatch.assert_not_called()
+
+
+async def test_dispatch_skips_validation_without_subscribers(client: Mock, mocker: MockerFixture) -> None:
+    """Test that events nobody listens to are not validated."""
+    client.dispatcher.has_subscribers = Mock(return_value=False)
+    handler = DispatchHandler(client, logging.getLogger('asyncord.gateway.client.opcode_handlers'))
+    mock_validate = mocker.patch.object(TypingStartEvent, 'model_validate')
+
+    message = DispatchMessage(t=TypingStartEvent.__event_name__, d={'broken': 'data'}, s=5)  # type: ignore
+    await handler.handle(message)
+
+    assert client.conn_data.seq == 5
+    client.dispatcher.has_subscribers.assert_called_once_with(TypingStartEvent)
+    mock_validate.assert_not_called()
+    client.dispatcher.dispatch.assert_not_called()
+
+
+async def test_dispatch_skips_validation_for_events_not_cached(client: Mock, mocker: MockerFixture) -> None:
+    """Test that a configured cache doesn't make events it doesn't handle validated."""
+    client.dispatcher.has_subscribers = Mock(return_value=False)
+    client.cache = EntityCache()
+    handler = DispatchHandler(client, logging.getLogger('asyncord.gateway.client.opcode_handlers'))
+    mock_validate = mocker.patch.object(TypingStartEvent, 'model_validate')
+
+    message = DispatchMessage(t=TypingStartEvent.__event_name__, d={'broken': 'data'}, s=5)  # type: ignore
+    await handler.handle(message)
+
+    assert not client.cache.handles(TypingStartEvent)
+    mock_validate.assert_not_called()
+    client.dispatcher.dispatch.assert_not_called()
+
+
+async def test_dispatch_publishes_raw_payload_to_relay(client: Mock, mocker: MockerFixture) -> None:
+    """Test that raw payloads are sent to the event relay without validation."""
+    client.dispatcher.has_subscribers = Mock(return_value=False)
+    client.event_relay = Mock()
+    handler = DispatchHandler(client, logging.getLogger('asyncord.gateway.client.opcode_handlers'))
+    mock_validate = mocker.patch.object(TypingStartEvent, 'model_validate')
+
+    message = DispatchMessage(t=TypingStartEvent.__event_name__, d={'raw': 'data'}, s=5)  # type: ignore
+    await handler.handle(message)
+
+    client.event_relay.publish.assert_called_once_with(TypingStartEvent.__event_name__, 5, {'raw': 'data'})
+    mock_validate.assert_not_called()
 
 
 async def test_reconnect_handler_handle(client: Mock) -> None:
@@ -120,8 +157,8 @@ async def test_hello_handler_handle_can_resume(client: Mock) -> None:
     client.conn_data.seq = 1
     handler = HelloHandler(client, Mock())
 
-    await handler.handle(Mock())
-    client.heartbeat.run.assert_called_once()
+    await handler.handle(Mock(data=Mock(heartbeat_interval=45000)))
+    client.heartbeat.run.assert_called_once_with(interval=45000)
     client.send_resume.assert_called_once_with(
         ResumeCommand(
             token=client.conn_data.token,
@@ -138,8 +175,8 @@ async def test_hello_handler_handle_cannot_resume(client: Mock) -> None:
     client.hearbeat.run = AsyncMock()
     handler = HelloHandler(client, Mock())
 
-    await handler.handle(Mock())
-    client.heartbeat.run.assert_called_once()
+    await handler.handle(Mock(data=Mock(heartbeat_interval=45000)))
+    client.heartbeat.run.assert_called_once_with(interval=45000)
     client.send_resume.assert_not_called()
     client.identify.assert_called_once_with(
         IdentifyCommand(
@@ -154,3 +191,38 @@ async def test_heartbeat_ack_handler_handle(client: Mock) -> None:
     handler = HeartbeatAckHandler(client, Mock())
     await handler.handle(Mock())
     client.heartbeat.handle_heartbeat_ack.assert_called_once()
+
+
+async def test_hello_handler_identifies_shard(client: Mock) -> None:
+    """Test that sharded clients wait for the identify gate."""
+    client.heartbeat = Mock()
+    client.conn_data.session_id = None
+    client.shard = (3, 4)
+    client.identify_gate = AsyncMock()
+    handler = HelloHandler(client, Mock())
+
+    await handler.handle(Mock(data=Mock(heartbeat_interval=45000)))
+
+    client.identify_gate.assert_awaited_once_with(3)
+    client.identify.assert_called_once_with(
+        IdentifyCommand(
+            token=client.conn_data.token,
+            intents=client.intents,
+            shard=(3, 4),
+        ),
+    )
+
+
+async def test_dispatch_projections_without_full_validation(client: Mock, mocker: MockerFixture) -> None:
+    """Test that events with projection handlers only are not validated into full events."""
+    client.dispatcher.has_subscribers = Mock(return_value=False)
+    client.dispatcher.has_projections = Mock(return_value=True)
+    handler = DispatchHandler(client, logging.getLogger('asyncord.gateway.client.opcode_handlers'))
+    mock_validate = mocker.patch.object(TypingStartEvent, 'model_validate')
+
+    message = DispatchMessage(t=TypingStartEvent.__event_name__, d={'raw': 'data'}, s=5)  # type: ignore
+    await handler.handle(message)
+
+    mock_validate.assert_not_called()
+    client.dispatcher.dispatch.assert_not_called()
+    client.dispatcher.dispatch_projections.assert_awaited_once_with(TypingStartEvent, {'raw': 'data'})
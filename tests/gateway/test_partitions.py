@@ -0,0 +1,194 @@
+import asyncio
+import logging
+from collections.abc import AsyncGenerator
+
+import pytest
+from pydantic import BaseModel
+
+from asyncord.gateway.dispatcher import GatewayEvent
+from asyncord.gateway.events.guilds import GuildDeleteEvent
+from asyncord.gateway.partitions import PartitionedEventDispatcher, default_partition_key
+from asyncord.snowflake import Snowflake
+
+
+class GuildEvent(GatewayEvent):
+    """Custom guild event for testing."""
+
+    guild_id: Snowflake | None = None
+    channel_id: Snowflake | None = None
+    num: int = 0
+
+
+@pytest.fixture
+async def dispatcher() -> AsyncGenerator[PartitionedEventDispatcher, None]:
+    """Return a partitioned event dispatcher."""
+    dispatcher = PartitionedEventDispatcher(workers=4)
+    yield dispatcher
+    await dispatcher.close()
+
+
+@pytest.mark.parametrize(
+    ('event', 'expected_key'),
+    [
+        (GuildEvent(guild_id=1, channel_id=2), 1),
+        (GuildEvent(channel_id=2), 2),
+        (GuildEvent(), None),
+        (GuildDeleteEvent(id=3), 3),
+    ],
+)
+def test_default_partition_key(event: GatewayEvent, expected_key: int | None) -> None:
+    """Test extracting the partition key from events."""
+    assert default_partition_key(event) == expected_key
+
+
+async def test_ordering_within_partition(dispatcher: PartitionedEventDispatcher) -> None:
+    """Test that events of the same partition are handled in order."""
+    handled: list[int] = []
+
+    async def handler(event: GuildEvent) -> None:
+        # later events are faster, so they would overtake without ordering
+        await asyncio.sleep(0.01 / (event.num + 1))
+        handled.append(event.num)
+
+    dispatcher.add_handler(handler)
+    for num in range(10):
+        await dispatcher.dispatch(GuildEvent(guild_id=1, num=num))
+
+    await dispatcher.join()
+    assert handled == list(range(10))
+
+
+async def test_partitions_run_in_parallel(dispatcher: PartitionedEventDispatcher) -> None:
+    """Test that different partitions are handled concurrently."""
+    started = asyncio.Event()
+    release = asyncio.Event()
+    handled: list[int] = []
+
+    async def handler(event: GuildEvent) -> None:
+        if event.guild_id == 1:
+            started.set()
+            await release.wait()
+        handled.append(int(event.guild_id))  # type: ignore
+        release.set()
+
+    dispatcher.add_handler(handler)
+    await dispatcher.dispatch(GuildEvent(guild_id=1))
+    await started.wait()
+    await dispatcher.dispatch(GuildEvent(guild_id=2))
+
+    await asyncio.wait_for(dispatcher.join(), timeout=1)
+    assert handled == [2, 1]
+
+
+async def test_idle_partitions_are_released(dispatcher: PartitionedEventDispatcher) -> None:
+    """Test that empty partition queues are removed."""
+
+    async def handler(_: GuildEvent) -> None:
+        await asyncio.sleep(0)
+
+    dispatcher.add_handler(handler)
+    for guild_id in range(100):
+        await dispatcher.dispatch(GuildEvent(guild_id=guild_id))
+
+    assert dispatcher.partition_count
+    await dispatcher.join()
+
+    assert dispatcher.partition_count == 0
+    assert dispatcher.pending == 0
+
+
+async def test_dispatch_waits_when_queue_is_full() -> None:
+    """Test that dispatching blocks when the pending limit is reached."""
+    dispatcher = PartitionedEventDispatcher(workers=1, max_pending=1)
+    release = asyncio.Event()
+
+    async def handler(_: GuildEvent) -> None:
+        await release.wait()
+
+    dispatcher.add_handler(handler)
+    await dispatcher.dispatch(GuildEvent(guild_id=1))
+
+    second_dispatch = asyncio.create_task(dispatcher.dispatch(GuildEvent(guild_id=2)))
+    await asyncio.sleep(0.01)
+    assert not second_dispatch.done()
+
+    release.set()
+    await asyncio.wait_for(second_dispatch, timeout=1)
+    await dispatcher.join()
+    await dispatcher.close()
+
+
+async def test_close_drops_pending_events() -> None:
+    """Test that closing the dispatcher stops workers and clears queues."""
+    dispatcher = PartitionedEventDispatcher(workers=1)
+
+    async def handler(_: GuildEvent) -> None:
+        await asyncio.sleep(1)
+
+    dispatcher.add_handler(handler)
+    await dispatcher.dispatch(GuildEvent(guild_id=1))
+    await dispatcher.dispatch(GuildEvent(guild_id=1))
+    await dispatcher.close()
+
+    assert dispatcher.pending == 0
+    assert dispatcher.partition_count == 0
+
+
+async def test_close_releases_join(caplog: pytest.LogCaptureFixture) -> None:
+    """Test that closing the dispatcher releases joins waiting for dropped events."""
+    dispatcher = PartitionedEventDispatcher(workers=1)
+    started = asyncio.Event()
+
+    async def handler(_: GuildEvent) -> None:
+        started.set()
+        await asyncio.sleep(10)
+
+    dispatcher.add_handler(handler)
+    for guild_id in (1, 1, 2, 3):
+        await dispatcher.dispatch(GuildEvent(guild_id=guild_id))
+
+    join = asyncio.create_task(dispatcher.join())
+    await started.wait()
+    assert not join.done()
+
+    with caplog.at_level(logging.WARNING):
+        await dispatcher.close()
+    await asyncio.wait_for(join, timeout=1)
+
+    assert '3 pending events in 3 partitions' in caplog.text
+    await asyncio.wait_for(dispatcher.join(), timeout=1)
+
+
+@pytest.mark.parametrize(('workers', 'max_pending'), [(0, 1), (1, 0)])
+def test_invalid_arguments(workers: int, max_pending: int) -> None:
+    """Test that invalid arguments are rejected."""
+    with pytest.raises(ValueError, match='must be positive'):
+        PartitionedEventDispatcher(workers=workers, max_pending=max_pending)
+
+
+class GuildProjection(BaseModel):
+    """Slim projection of the guild event for testing."""
+
+    guild_id: Snowflake
+    num: int
+
+
+async def test_projections_keep_partition_order(dispatcher: PartitionedEventDispatcher) -> None:
+    """Test that projections are queued with events of their partition."""
+    handled: list[tuple[str, int]] = []
+
+    async def event_handler(event: GuildEvent) -> None:
+        await asyncio.sleep(0.01)
+        handled.append(('event', event.num))
+
+    async def projection_handler(projection: GuildProjection) -> None:
+        handled.append(('projection', projection.num))
+
+    dispatcher.add_handler(event_handler)
+    dispatcher.add_projection_handler(GuildEvent, GuildProjection, projection_handler)
+
+    await dispatcher.dispatch(GuildEvent(guild_id=1, num=1))
+    await dispatcher.dispatch_projections(GuildEvent, {'guild_id': '1', 'num': 2})
+
+    await asyncio.wait_for(dispatcher.join(), timeout=1)
+    assert handled == [('event', 1), ('projection', 2)]
@@ -0,0 +1,119 @@
+import logging
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from asyncord.gateway.client.client import GatewayClient
+from asyncord.gateway.client.opcode_handlers import DispatchHandler
+from asyncord.gateway.client.prefilter import DropReason, PayloadFilter
+from asyncord.gateway.events.presence import TypingStartEvent
+from asyncord.gateway.message import DispatchMessage
+
+TYPING_DATA = {'channel_id': '20', 'guild_id': '10', 'user_id': '30', 'timestamp': 1}
+
+
+@pytest.mark.parametrize(
+    ('payload_filter', 'event_name', 'data', 'reason'),
+    [
+        (PayloadFilter(denied_guild_ids=[10]), 'TYPING_START', TYPING_DATA, DropReason.DENIED),
+        (PayloadFilter(allowed_guild_ids=[11]), 'TYPING_START', TYPING_DATA, DropReason.NOT_ALLOWED),
+        (PayloadFilter(allowed_guild_ids=[11]), 'GUILD_UPDATE', {'id': '10'}, DropReason.NOT_ALLOWED),
+        (PayloadFilter(allowed_guild_ids=['10']), 'TYPING_START', TYPING_DATA, None),
+        (PayloadFilter(allowed_guild_ids=[11]), 'MESSAGE_CREATE', {'channel_id': '20'}, None),
+        (PayloadFilter(denied_channel_ids=[20]), 'TYPING_START', TYPING_DATA, DropReason.DENIED),
+        (PayloadFilter(allowed_channel_ids=[21]), 'TYPING_START', TYPING_DATA, DropReason.NOT_ALLOWED),
+        (PayloadFilter(denied_user_ids=[30]), 'TYPING_START', TYPING_DATA, DropReason.DENIED),
+        (PayloadFilter(denied_user_ids=[30]), 'MESSAGE_CREATE', {'author': {'id': '30'}}, DropReason.DENIED),
+        (PayloadFilter(denied_user_ids=[30]), 'PRESENCE_UPDATE', {'user': {'id': '30'}}, DropReason.DENIED),
+        (
+            PayloadFilter(denied_user_ids=[30]),
+            'INTERACTION_CREATE',
+            {'member': {'user': {'id': '30'}}},
+            DropReason.DENIED,
+        ),
+        (PayloadFilter(allowed_user_ids=[31]), 'TYPING_START', TYPING_DATA, DropReason.NOT_ALLOWED),
+        (PayloadFilter(denied_guild_ids=[10]), 'READY', {'guild_id': '10'}, None),
+    ],
+)
+def test_id_filters(
+    payload_filter: PayloadFilter,
+    event_name: str,
+    data: dict[str, Any],
+    reason: DropReason | None,
+) -> None:
+    """Test that payloads are matched against allow and deny sets."""
+    assert payload_filter.accept(event_name, data) is (reason is None)
+
+    if reason is None:
+        assert not payload_filter.total_dropped
+    else:
+        assert payload_filter.dropped == {event_name: 1}
+        assert payload_filter.drop_reasons == {reason: 1}
+
+
+@pytest.mark.parametrize(('rate', 'count', 'expected'), [(0.25, 100, 25), (0.1, 100, 10), (0.3, 30, 9), (1, 5, 5)])
+def test_sampling(rate: float, count: int, expected: int) -> None:
+    """Test that a fraction of events of the type is accepted."""
+    payload_filter = PayloadFilter(sample_rates={'TYPING_START': rate})
+
+    accepted = [payload_filter.accept('TYPING_START', TYPING_DATA) for _ in range(count)]
+
+    assert accepted.count(True) == expected
+    assert payload_filter.drop_reasons[DropReason.SAMPLED] == count - expected
+    assert payload_filter.accept('MESSAGE_CREATE', {})
+
+
+def test_sampling_accepts_every_tenth_event() -> None:
+    """Test that sampling by 0.1 accepts exactly every tenth event."""
+    payload_filter = PayloadFilter(sample_rates={'TYPING_START': 0.1})
+
+    accepted = [num for num in range(1, 101) if payload_filter.accept('TYPING_START', TYPING_DATA)]
+
+    assert accepted == list(range(10, 101, 10))
+
+
+def test_rate_shedding(mocker: MockerFixture) -> None:
+    """Test that events over the rate limit are dropped until tokens refill."""
+    monotonic = mocker.patch('asyncord.gateway.client.prefilter.time.monotonic', return_value=100.0)
+    payload_filter = PayloadFilter(rate_limits={'PRESENCE_UPDATE': 3})
+
+    accepted = [payload_filter.accept('PRESENCE_UPDATE', {}) for _ in range(5)]
+    assert accepted == [True, True, True, False, False]
+
+    monotonic.return_value = 100.5
+    accepted = [payload_filter.accept('PRESENCE_UPDATE', {}) for _ in range(3)]
+    assert accepted == [True, False, False]
+    assert payload_filter.dropped == {'PRESENCE_UPDATE': 4}
+    assert payload_filter.drop_reasons == {DropReason.SHED: 4}
+
+
+@pytest.mark.parametrize(
+    'kwargs',
+    [
+        {'sample_rates': {'TYPING_START': 1.5}},
+        {'sample_rates': {'TYPING_START': -0.1}},
+        {'rate_limits': {'TYPING_START': 0}},
+    ],
+)
+def test_invalid_settings(kwargs: dict[str, Any]) -> None:
+    """Test that invalid sample rates and limits are rejected."""
+    with pytest.raises(ValueError, match=r'must be'):
+        PayloadFilter(**kwargs)
+
+
+async def test_dropped_events_are_not_validated(gw_client: GatewayClient, mocker: MockerFixture) -> None:
+    """Test that the dispatch handler skips validation and dispatching of dropped events."""
+    handler = DispatchHandler(gw_client, logging.getLogger(__name__))
+    gw_client.payload_filter = PayloadFilter(denied_guild_ids=[10])
+    gw_client.dispatcher.dispatch = mocker.AsyncMock()  # type: ignore[method-assign]
+    gw_client.dispatcher.has_subscribers = Mock(return_value=True)  # type: ignore[method-assign]
+    validate = mocker.spy(TypingStartEvent, 'model_validate')
+
+    await handler.handle(DispatchMessage(t='TYPING_START', d=TYPING_DATA, s=1))  # type: ignore
+    await handler.handle(DispatchMessage(t='TYPING_START', d={**TYPING_DATA, 'guild_id': '11'}, s=2))  # type: ignore
+
+    validate.assert_called_once()
+    gw_client.dispatcher.dispatch.assert_awaited_once()
+    assert gw_client.conn_data.seq == 2
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+from typing import Any
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from asyncord.gateway.client.client import ConnectionData
+from asyncord.gateway.client.opcode_handlers import DispatchHandler
+from asyncord.gateway.events.base import ReadyEvent
+from asyncord.gateway.events.guilds import GuildCreateEvent
+from asyncord.gateway.message import DispatchMessage
+from asyncord.gateway.partitions import PartitionedEventDispatcher
+from asyncord.gateway.readiness import ReadinessTracker, ShardReadyEvent
+from tests.gateway.cache.payloads import guild_create_data
+
+
+def _ready_event(*guild_ids: int, shard_id: int = 0) -> ReadyEvent:
+    """Return a ready event with unavailable guilds."""
+    return ReadyEvent.model_validate({
+        'v': 10,
+        'user': {'id': '1', 'username': 'bot', 'global_name': None, 'discriminator': '0', 'avatar': None},
+        'guilds': [{'id': str(guild_id), 'unavailable': True} for guild_id in guild_ids],
+        'session_id': 'session_id',
+        'resume_gateway_url': 'wss://gateway.discord.gg',
+        'shard': {'shard_id': shard_id, 'num_shards': 2},
+        'application': {'id': '1', 'flags': 0},
+    })
+
+
+@pytest.fixture
+def events() -> list[ShardReadyEvent]:
+    """Return a list of dispatched shard ready events."""
+    return []
+
+
+@pytest.fixture
+def tracker(events: list[ShardReadyEvent]) -> ReadinessTracker:
+    """Return a tracker collecting dispatched events."""
+
+    async def on_ready(event: ShardReadyEvent) -> None:
+        events.append(event)
+
+    return ReadinessTracker(on_ready, timeout=0.05)
+
+
+async def test_ready_when_all_guilds_arrived(tracker: ReadinessTracker, events: list[ShardReadyEvent]) -> None:
+    """Test that the event is dispatched when the last guild arrives."""
+    await tracker.start(_ready_event(1, 2, 3, shard_id=1))
+    await tracker.guild_received(1)
+    await tracker.guild_received(3, available=False)
+    assert not events
+    assert tracker.progress.pending == 1
+
+    await tracker.guild_received(2)
+
+    assert events == [ShardReadyEvent(shard_id=1, guild_ids=[1, 2], missing_guild_ids=[3])]  # type: ignore
+    assert tracker.ready
+    assert not tracker.tracking
+    progress = tracker.progress
+    assert (progress.shard_id, progress.expected, progress.received, progress.pending) == (1, 3, 3, 0)
+    assert progress.elapsed is not None
+
+
+async def test_unknown_and_repeated_guilds_are_ignored(
+    tracker: ReadinessTracker,
+    events: list[ShardReadyEvent],
+) -> None:
+    """Test that guilds not listed in READY don't count."""
+    await tracker.start(_ready_event(1, 2))
+    await tracker.guild_received(1)
+    await tracker.guild_received(1)
+    await tracker.guild_received(5)
+
+    assert not events
+    assert tracker.progress.received == 1
+
+
+async def test_ready_without_guilds(tracker: ReadinessTracker, events: list[ShardReadyEvent]) -> None:
+    """Test that the shard without guilds is ready at once."""
+    await tracker.start(_ready_event())
+
+    assert events == [ShardReadyEvent(shard_id=0, guild_ids=[], missing_guild_ids=[])]
+    assert tracker.ready
+
+
+async def test_ready_after_timeout(tracker: ReadinessTracker, events: list[ShardReadyEvent]) -> None:
+    """Test that the shard is ready without guilds which didn't arrive in time."""
+    await tracker.start(_ready_event(1, 2))
+    await tracker.guild_received(1)
+
+    await asyncio.sleep(0.1)
+
+    assert events == [ShardReadyEvent(shard_id=0, guild_ids=[1], missing_guild_ids=[2], timed_out=True)]  # type: ignore
+    await tracker.guild_received(2)
+    assert len(events) == 1
+
+
+async def test_reset_cancels_timeout(tracker: ReadinessTracker, events: list[ShardReadyEvent]) -> None:
+    """Test that the event is not dispatched after the tracker is reset."""
+    await tracker.start(_ready_event(1))
+    tracker.reset()
+
+    await asyncio.sleep(0.1)
+
+    assert not events
+    assert not tracker.ready
+    assert tracker.progress.elapsed is None
+
+
+@pytest.fixture
+def client(tracker: ReadinessTracker) -> Mock:
+    """Return a mock client with a real tracker and without subscribers."""
+    client = AsyncMock()
+    client.conn_data = ConnectionData(token='token', seq=0)  # noqa: S106
+    client.dispatcher.has_subscribers = Mock(return_value=False)
+    client.dispatcher.has_projections = Mock(return_value=False)
+    client.payload_filter = None
+    client.release_commands = Mock()
+    client.event_relay = None
+    client.cache = None
+    client.readiness = tracker
+    return client
+
+
+def _message(event_name: str, data: dict[str, Any], seq: int) -> DispatchMessage:
+    return DispatchMessage(t=event_name, d=data, s=seq)  # type: ignore
+
+
+async def test_dispatch_handler_tracks_guilds(client: Mock, events: list[ShardReadyEvent]) -> None:
+    """Test that guilds are counted without validation if nobody listens to them."""
+    handler = DispatchHandler(client, logging.getLogger(__name__))
+    ready = _ready_event(1, 2, 3).model_dump(mode='json', by_alias=True)
+
+    await handler.handle(_message('READY', ready, 1))
+    await handler.handle(_message('GUILD_CREATE', {'id': '1', 'broken': True}, 2))
+    await handler.handle(_message('GUILD_CREATE', guild_create_data(2), 3))
+    await handler.handle(_message('GUILD_DELETE', {'id': '3', 'unavailable': True}, 4))
+
+    assert events == [ShardReadyEvent(shard_id=0, guild_ids=[1, 2], missing_guild_ids=[3])]  # type: ignore
+
+
+async def test_ready_with_partitioned_dispatcher_means_received(client: Mock) -> None:
+    """Test that with a partitioned dispatcher the shard is ready before guild handlers complete."""
+    dispatcher = PartitionedEventDispatcher(workers=2)
+    client.dispatcher = dispatcher
+    client.readiness = ReadinessTracker(dispatcher.dispatch, timeout=1)
+    release_guilds = asyncio.Event()
+    shard_ready = asyncio.Event()
+    handled_guilds: list[int] = []
+
+    async def on_guild_create(event: GuildCreateEvent) -> None:
+        await release_guilds.wait()
+        handled_guilds.append(event.id)
+
+    async def on_shard_ready(_event: ShardReadyEvent) -> None:
+        shard_ready.set()
+
+    dispatcher.add_handler(GuildCreateEvent, on_guild_create)
+    dispatcher.add_handler(ShardReadyEvent, on_shard_ready)
+    handler = DispatchHandler(client, logging.getLogger(__name__))
+
+    try:
+        await handler.handle(_message('READY', _ready_event(1).model_dump(mode='json', by_alias=True), 1))
+        await handler.handle(_message('GUILD_CREATE', guild_create_data(1), 2))
+
+        await asyncio.wait_for(shard_ready.wait(), timeout=1)
+        assert not handled_guilds
+
+        release_guilds.set()
+        await dispatcher.join()
+        assert handled_guilds == [1]
+    finally:
+        await dispatcher.close()
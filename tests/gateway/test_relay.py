@@ -0,0 +1,144 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from asyncord.gateway.dispatcher import EventDispatcher
+from asyncord.gateway.events.channels import ChannelPinsUpdateEvent
+from asyncord.gateway.events.presence import TypingStartEvent
+from asyncord.gateway.relay import EventRelayServer, EventRelaySubscriber, relay_guild_key
+
+
+def pins_update(guild_id: int) -> dict[str, Any]:
+    """Return raw data of a channel pins update event."""
+    return {'guild_id': str(guild_id), 'channel_id': '10', 'last_pin_timestamp': None}
+
+
+class Collector:
+    """Subscriber process with a dispatcher collecting guild ids of events."""
+
+    def __init__(self, path: Path, group: str, event_type: type[Any] = ChannelPinsUpdateEvent) -> None:
+        """Initialize the collector."""
+        self.guild_ids: list[int] = []
+        self.dispatcher = EventDispatcher()
+        self.dispatcher.add_handler(event_type, self.handle)
+        self.subscriber = EventRelaySubscriber(path, self.dispatcher, group, reconnect_delay=0.01)
+        self.task = asyncio.create_task(self.subscriber.run())
+
+    async def handle(self, event: Any) -> None:  # noqa: ANN401
+        """Collect the guild id of the event."""
+        self.guild_ids.append(int(event.guild_id))
+
+    async def close(self) -> None:
+        """Stop the subscriber."""
+        self.subscriber.close()
+        await asyncio.wait_for(self.task, 1)
+
+
+@pytest.fixture
+async def server(tmp_path: Path) -> AsyncGenerator[EventRelayServer, None]:
+    """Return a started relay server."""
+    async with EventRelayServer(tmp_path / 'relay.sock') as server:
+        yield server
+
+
+async def wait_for_members(server: EventRelayServer, groups: dict[str, int]) -> None:
+    """Wait until subscribers join the server."""
+    async with asyncio.timeout(1):
+        while server.groups != groups:
+            await asyncio.sleep(0.01)
+
+
+@pytest.mark.parametrize(
+    ('event_name', 'data', 'expected'),
+    [
+        ('MESSAGE_CREATE', {'guild_id': '5', 'channel_id': '7'}, 5),
+        ('GUILD_CREATE', {'id': '6'}, 6),
+        ('MESSAGE_CREATE', {'channel_id': '7'}, 7),
+        ('USER_UPDATE', {'id': '8'}, 0),
+        ('RESUMED', None, 0),
+    ],
+)
+def test_relay_guild_key(event_name: str, data: Any, expected: int) -> None:  # noqa: ANN401
+    """Test getting the balancing key of raw events."""
+    assert relay_guild_key(event_name, data) == expected
+
+
+async def test_consumer_groups(server: EventRelayServer, tmp_path: Path) -> None:
+    """Test that every group gets every event once, balanced by guild."""
+    first = Collector(tmp_path / 'relay.sock', 'handlers')
+    await wait_for_members(server, {'handlers': 1})
+    second = Collector(tmp_path / 'relay.sock', 'handlers')
+    logger = Collector(tmp_path / 'relay.sock', 'logger')
+    await wait_for_members(server, {'handlers': 2, 'logger': 1})
+
+    for guild_id in [1, 2, 3, 4, 1]:
+        server.publish(ChannelPinsUpdateEvent.__event_name__, guild_id, pins_update(guild_id))
+
+    async with asyncio.timeout(1):
+        while len(logger.guild_ids) < 5 or len(first.guild_ids) + len(second.guild_ids) < 5:
+            await asyncio.sleep(0.01)
+
+    assert logger.guild_ids == [1, 2, 3, 4, 1]
+    assert first.guild_ids == [2, 4]
+    assert second.guild_ids == [1, 3, 1]
+    assert server.published == 5
+    assert server.sent == 10
+
+    for collector in (first, second, logger):
+        await collector.close()
+    await wait_for_members(server, {})
+
+
+async def test_events_are_sent_only_to_interested_subscribers(server: EventRelayServer, tmp_path: Path) -> None:
+    """Test that subscribers receive only events their dispatchers handle."""
+    typing = Collector(tmp_path / 'relay.sock', 'typing', TypingStartEvent)
+    pins = Collector(tmp_path / 'relay.sock', 'pins')
+    await wait_for_members(server, {'typing': 1, 'pins': 1})
+
+    server.publish(ChannelPinsUpdateEvent.__event_name__, 1, pins_update(1))
+    async with asyncio.timeout(1):
+        while not pins.guild_ids:
+            await asyncio.sleep(0.01)
+
+    assert server.sent == 1
+    assert typing.subscriber.received == 0
+    await typing.close()
+    await pins.close()
+
+
+async def test_invalid_events_are_skipped(server: EventRelayServer, tmp_path: Path) -> None:
+    """Test that the subscriber keeps receiving after an event fails validation."""
+    collector = Collector(tmp_path / 'relay.sock', 'handlers')
+    await wait_for_members(server, {'handlers': 1})
+
+    server.publish(ChannelPinsUpdateEvent.__event_name__, 1, {'guild_id': '1'})
+    server.publish(ChannelPinsUpdateEvent.__event_name__, 2, pins_update(2))
+    async with asyncio.timeout(1):
+        while not collector.guild_ids:
+            await asyncio.sleep(0.01)
+
+    assert collector.guild_ids == [2]
+    assert collector.subscriber.received == 2
+    await collector.close()
+
+
+async def test_subscriber_reconnects(tmp_path: Path) -> None:
+    """Test that the subscriber waits for the server and reconnects after restarts."""
+    path = tmp_path / 'relay.sock'
+    collector = Collector(path, 'handlers')
+    await asyncio.sleep(0.05)
+    assert not collector.subscriber.connected.is_set()
+
+    for guild_id in [1, 2]:
+        async with EventRelayServer(path) as server:
+            await wait_for_members(server, {'handlers': 1})
+            server.publish(ChannelPinsUpdateEvent.__event_name__, guild_id, pins_update(guild_id))
+            async with asyncio.timeout(1):
+                while len(collector.guild_ids) < guild_id:
+                    await asyncio.sleep(0.01)
+
+    assert collector.guild_ids == [1, 2]
+    await collector.close()
@@ -0,0 +1,186 @@
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+from pytest_mock import MockFixture
+
+from asyncord.gateway.client.client import GatewayClient
+from asyncord.gateway.client.send_queue import CommandRateLimiter, GatewaySendQueue
+from asyncord.gateway.message import GatewayCommandOpcode
+
+
+class FakeClock:
+    """Monotonic clock controlled by tests."""
+
+    def __init__(self) -> None:
+        """Initialize the clock."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Get the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock(mocker: MockFixture) -> FakeClock:
+    """Patch the clock of the rate limiter."""
+    clock = FakeClock()
+    mocker.patch('asyncord.gateway.client.send_queue.time.monotonic', clock)
+    return clock
+
+
+def test_rate_limiter_reserves_tokens_for_heartbeats(clock: FakeClock) -> None:
+    """Test that regular commands can't take the heartbeat reserve."""
+    limiter = CommandRateLimiter(limit=10, period=10, burst=4, heartbeat_reserve=1)
+
+    assert [limiter.acquire() for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire() == pytest.approx(1 / 0.6)
+
+    limiter.acquire_heartbeat()
+    assert limiter.tokens == 0
+
+    clock.now += 5
+    assert limiter.tokens == pytest.approx(3)
+    assert limiter.acquire() == 0
+
+
+def test_rate_limiter_never_exceeds_limit(clock: FakeClock) -> None:
+    """Test that no window of the period has more commands than the limit."""
+    limiter = CommandRateLimiter()
+    sent_at: list[float] = []
+    while clock.now < 300:
+        delay = limiter.acquire()
+        if delay:
+            clock.now += delay
+        else:
+            sent_at.append(clock.now)
+
+    for index, started_at in enumerate(sent_at):
+        in_window = [moment for moment in sent_at[index:] if moment < started_at + limiter.period]
+        assert len(in_window) <= limiter.limit - limiter.heartbeat_reserve
+
+
+def test_rate_limiter_invalid_arguments() -> None:
+    """Test that inconsistent limits are rejected."""
+    with pytest.raises(ValueError, match='must satisfy'):
+        CommandRateLimiter(limit=10, burst=10)
+
+
+async def test_queue_sends_in_order() -> None:
+    """Test that queued commands are sent in order."""
+    sent: list[tuple[GatewayCommandOpcode, Any]] = []
+
+    async def send(opcode: GatewayCommandOpcode, data: Any) -> None:  # noqa: ANN401
+        sent.append((opcode, data))
+
+    queue = GatewaySendQueue(send, CommandRateLimiter())
+    await asyncio.gather(*(queue.put(GatewayCommandOpcode.REQUEST_GUILD_MEMBERS, num) for num in range(3)))
+
+    assert sent == [(GatewayCommandOpcode.REQUEST_GUILD_MEMBERS, num) for num in range(3)]
+    assert queue.depth == 0
+
+
+async def test_queue_coalesces_commands() -> None:
+    """Test that coalescing commands replace the queued data."""
+    release = asyncio.Event()
+    sent: list[Any] = []
+
+    async def send(_: GatewayCommandOpcode, data: Any) -> None:  # noqa: ANN401
+        await release.wait()
+        sent.append(data)
+
+    queue = GatewaySendQueue(send, CommandRateLimiter())
+    first = asyncio.create_task(queue.put(GatewayCommandOpcode.PRESENCE_UPDATE, 'first', coalesce=True))
+    await asyncio.sleep(0)
+
+    # the first update is being sent, the next ones wait in the queue
+    updates = [
+        asyncio.create_task(queue.put(GatewayCommandOpcode.PRESENCE_UPDATE, status, coalesce=True))
+        for status in ('second', 'third', 'latest')
+    ]
+    other = asyncio.create_task(queue.put(GatewayCommandOpcode.REQUEST_GUILD_MEMBERS, 'members'))
+    await asyncio.sleep(0)
+    assert queue.depth == 2
+
+    release.set()
+    await asyncio.gather(first, other, *updates)
+    assert sent == ['first', 'latest', 'members']
+
+
+async def test_queue_waits_for_rate_limit(mocker: MockFixture) -> None:
+    """Test that the queue waits when the rate limit is reached."""
+    limiter = CommandRateLimiter(limit=10, period=1, burst=2, heartbeat_reserve=1)
+    send = AsyncMock()
+    sleep = mocker.spy(asyncio, 'sleep')
+
+    queue = GatewaySendQueue(send, limiter)
+    await asyncio.gather(*(queue.put(GatewayCommandOpcode.PRESENCE_UPDATE, num) for num in range(3)))
+
+    assert send.await_count == 3
+    assert sleep.call_count >= 2
+
+
+async def test_queue_close_fails_pending_commands() -> None:
+    """Test that closing the queue fails commands waiting in it."""
+    limiter = CommandRateLimiter(limit=10, period=100, burst=2, heartbeat_reserve=1)
+    queue = GatewaySendQueue(AsyncMock(), limiter)
+
+    await queue.put(GatewayCommandOpcode.PRESENCE_UPDATE, 0)
+    pending = asyncio.create_task(queue.put(GatewayCommandOpcode.PRESENCE_UPDATE, 1))
+    await asyncio.sleep(0)
+    assert queue.depth == 1
+
+    await queue.close(RuntimeError('Client is closed'))
+    with pytest.raises(RuntimeError, match='Client is closed'):
+        await pending
+    assert queue.depth == 0
+
+
+async def test_held_queue_keeps_commands() -> None:
+    """Test that a held queue sends commands only after it's released."""
+    send = AsyncMock()
+    queue = GatewaySendQueue(send, CommandRateLimiter())
+    queue.hold()
+
+    pending = asyncio.create_task(queue.put(GatewayCommandOpcode.PRESENCE_UPDATE, 0))
+    await asyncio.sleep(0)
+    assert queue.held
+    assert queue.depth == 1
+    send.assert_not_awaited()
+
+    queue.release()
+    await pending
+    send.assert_awaited_once_with(GatewayCommandOpcode.PRESENCE_UPDATE, 0)
+
+
+async def test_client_sends_heartbeat_out_of_queue(gw_client: GatewayClient) -> None:
+    """Test that heartbeats skip the queue and use the reserved budget."""
+    gw_client._ws = AsyncMock()
+    gw_client._send_queue.rate_limiter = CommandRateLimiter(limit=10, period=100, burst=2, heartbeat_reserve=1)
+
+    await gw_client.send_command(GatewayCommandOpcode.PRESENCE_UPDATE, {})
+    pending = asyncio.create_task(gw_client.send_command(GatewayCommandOpcode.PRESENCE_UPDATE, {}))
+    await asyncio.sleep(0)
+    assert gw_client.send_queue_depth == 1
+
+    await gw_client.send_heartbeat(1)
+    gw_client._ws.send_json.assert_awaited_with({'op': GatewayCommandOpcode.HEARTBEAT, 'd': 1})
+
+    pending.cancel()
+    await gw_client._send_queue.close(RuntimeError('Client is closed'))
+
+
+async def test_client_sends_session_commands_before_queued(gw_client: GatewayClient) -> None:
+    """Test that identify skips commands held while connecting."""
+    gw_client._ws = AsyncMock()
+    gw_client._send_queue.hold()
+
+    pending = asyncio.create_task(gw_client.send_command(GatewayCommandOpcode.REQUEST_GUILD_MEMBERS, {}))
+    await asyncio.sleep(0)
+    await gw_client.send_command(GatewayCommandOpcode.IDENTIFY, {'token': 'token'})
+    gw_client._ws.send_json.assert_awaited_once_with({'op': GatewayCommandOpcode.IDENTIFY, 'd': {'token': 'token'}})
+
+    gw_client.release_commands()
+    await pending
+    gw_client._ws.send_json.assert_awaited_with({'op': GatewayCommandOpcode.REQUEST_GUILD_MEMBERS, 'd': {}})
@@ -0,0 +1,149 @@
+import asyncio
+import json
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+import pytest
+from aiohttp import web
+from yarl import URL
+
+from asyncord.gateway.client.client import RESUMABLE_CLOSE_CODE, ConnectionData, GatewayClient
+from asyncord.gateway.client.session_store import FileSessionStore, SessionState
+from asyncord.gateway.message import GatewayCommandOpcode
+from tests.gateway.payloads import READY_EVENT_DATA
+
+STATE = SessionState(session_id='session_id', seq=10, resume_url='ws://localhost')
+
+
+async def test_file_store(tmp_path: Path) -> None:
+    """Test saving, loading and clearing sessions."""
+    store = FileSessionStore(tmp_path / 'nested' / 'sessions.json')
+    assert await store.load('bot') is None
+
+    await store.save('bot', STATE)
+    await store.save('other', STATE.model_copy(update={'seq': 1}))
+    assert await store.load('bot') == STATE
+    assert await FileSessionStore(store.path).load('other') == STATE.model_copy(update={'seq': 1})
+
+    await store.clear('bot')
+    assert await store.load('bot') is None
+    assert list(json.loads(store.path.read_text())) == ['other']
+
+
+async def test_file_store_ignores_broken_data(tmp_path: Path) -> None:
+    """Test that broken files and states are ignored."""
+    path = tmp_path / 'sessions.json'
+    store = FileSessionStore(path)
+
+    path.write_text('not json')
+    assert await store.load('bot') is None
+
+    path.write_text(json.dumps({'bot': {'session_id': 'session_id'}}))
+    assert await store.load('bot') is None
+
+
+class FakeGateway:
+    """Local gateway which supports identifying and resuming sessions."""
+
+    def __init__(self) -> None:
+        """Initialize the fake gateway."""
+        self.url = URL()
+        self.commands: list[dict[str, Any]] = []
+        self.close_codes: list[int | None] = []
+        self.sessions: dict[str, int] = {}
+        self.ready = asyncio.Event()
+
+    async def handle(self, request: web.Request) -> web.WebSocketResponse:
+        """Handle a gateway connection."""
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({'op': 10, 'd': {'heartbeat_interval': 45000}})
+
+        async for msg in ws:
+            command = msg.json()
+            self.commands.append(command)
+            if command['op'] == GatewayCommandOpcode.IDENTIFY:
+                await self._identify(ws)
+            elif command['op'] == GatewayCommandOpcode.RESUME:
+                await self._resume(ws, command['d'])
+
+        self.close_codes.append(ws.close_code)
+        return ws
+
+    async def _identify(self, ws: web.WebSocketResponse) -> None:
+        session_id = f'session-{len(self.sessions) + 1}'
+        self.sessions[session_id] = 2
+        ready_data = {**READY_EVENT_DATA, 'session_id': session_id, 'resume_gateway_url': str(self.url)}
+        await ws.send_json({'op': 0, 's': 1, 't': 'READY', 'd': ready_data})
+        await ws.send_json({'op': 0, 's': 2, 't': 'RESUMED', 'd': {}})
+        self.ready.set()
+
+    async def _resume(self, ws: web.WebSocketResponse, data: dict[str, Any]) -> None:
+        if self.sessions.get(data['session_id']) != data['seq']:
+            await ws.send_json({'op': 9, 'd': False})
+            return
+        await ws.send_json({'op': 0, 's': data['seq'] + 1, 't': 'RESUMED', 'd': {}})
+        self.ready.set()
+
+
+@pytest.fixture
+async def gateway() -> AsyncGenerator[FakeGateway, None]:
+    """Run a fake gateway on a local port."""
+    fake_gateway = FakeGateway()
+    app = web.Application()
+    app.router.add_get('/', fake_gateway.handle)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore
+    fake_gateway.url = URL(f'ws://127.0.0.1:{port}/')
+
+    yield fake_gateway
+    await runner.cleanup()
+
+
+async def _run_client(gateway: FakeGateway, session: aiohttp.ClientSession, store: FileSessionStore) -> None:
+    client = GatewayClient(
+        token='token',  # noqa: S106
+        session=session,
+        conn_data=ConnectionData(token='token', resume_url=gateway.url),  # noqa: S106
+        name='bot',
+    )
+    client.session_store = store
+
+    gateway.ready.clear()
+    connection = asyncio.create_task(client.connect())
+    await asyncio.wait_for(gateway.ready.wait(), timeout=5)
+    # let the client handle the last event
+    await asyncio.sleep(0.05)
+
+    await client.close()
+    await asyncio.wait_for(connection, timeout=5)
+
+
+async def test_session_is_resumed_after_restart(gateway: FakeGateway, tmp_path: Path) -> None:
+    """Test that a new client resumes the session saved by the previous one."""
+    store = FileSessionStore(tmp_path / 'sessions.json')
+
+    async with aiohttp.ClientSession() as session:
+        await _run_client(gateway, session, store)
+        saved_sessions = json.loads(store.path.read_text())
+        assert [state['session_id'] for state in saved_sessions.values()] == ['session-1']
+        assert [state['seq'] for state in saved_sessions.values()] == [2]
+
+        await _run_client(gateway, session, store)
+
+    assert [command['op'] for command in gateway.commands] == [
+        GatewayCommandOpcode.IDENTIFY,
+        GatewayCommandOpcode.RESUME,
+    ]
+    assert gateway.commands[1]['d']['session_id'] == 'session-1'
+    assert gateway.close_codes == [RESUMABLE_CLOSE_CODE, RESUMABLE_CLOSE_CODE]
+
+    resumed_state = await store.load(next(iter(saved_sessions)))
+    assert resumed_state
+    assert resumed_state.seq == 3
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from asyncord.gateway.dispatcher import EventDispatcher, GatewayEvent
+from asyncord.gateway.streams import EventStream, StreamOverflow
+
+
+class ChannelEvent(GatewayEvent):
+    """Custom channel event for testing."""
+
+    channel_id: int
+    num: int = 0
+
+
+@pytest.fixture
+def dispatcher() -> EventDispatcher:
+    """Return an event dispatcher."""
+    return EventDispatcher()
+
+
+async def test_stream_receives_events(dispatcher: EventDispatcher) -> None:
+    """Test iterating over dispatched events."""
+    async with dispatcher.stream(ChannelEvent, channel_id=1) as stream:
+        assert dispatcher.has_subscribers(ChannelEvent)
+        for num in range(3):
+            await dispatcher.dispatch(ChannelEvent(channel_id=1, num=num))
+        await dispatcher.dispatch(ChannelEvent(channel_id=2))
+
+        events = [await anext(stream) for _ in range(3)]
+
+    assert [event.num for event in events] == [0, 1, 2]
+    assert stream.received == stream.delivered == 3
+    assert stream.closed
+    assert not dispatcher.has_subscribers(ChannelEvent)
+
+
+async def test_drop_oldest(dispatcher: EventDispatcher) -> None:
+    """Test that the oldest events are dropped when the buffer is full."""
+    stream = dispatcher.stream(ChannelEvent, maxsize=2)
+    for num in range(5):
+        await dispatcher.dispatch(ChannelEvent(channel_id=1, num=num))
+    stream.close()
+
+    assert [event.num async for event in stream] == [3, 4]
+    assert stream.dropped == 3
+    assert stream.max_lag == 2
+
+
+async def test_coalesce(dispatcher: EventDispatcher) -> None:
+    """Test that events with the same key replace each other."""
+    stream = dispatcher.stream(ChannelEvent, maxsize=2, overflow='coalesce')
+    for channel_id, num in [(1, 0), (2, 1), (1, 2), (3, 3)]:
+        await dispatcher.dispatch(ChannelEvent(channel_id=channel_id, num=num))
+    stream.close()
+
+    assert stream.overflow is StreamOverflow.COALESCE
+    assert [event.num async for event in stream] == [1, 3]
+    assert stream.coalesced == 1
+    assert stream.dropped == 1
+
+
+async def test_block(dispatcher: EventDispatcher) -> None:
+    """Test that dispatching waits for the consumer when the buffer is full."""
+    stream = dispatcher.stream(ChannelEvent, maxsize=1, overflow='block')
+    await dispatcher.dispatch(ChannelEvent(channel_id=1, num=0))
+
+    blocked_dispatch = asyncio.create_task(dispatcher.dispatch(ChannelEvent(channel_id=1, num=1)))
+    await asyncio.sleep(0.01)
+    assert not blocked_dispatch.done()
+    assert stream.lag == 1
+
+    assert (await anext(stream)).num == 0
+    await asyncio.wait_for(blocked_dispatch, timeout=1)
+    assert (await anext(stream)).num == 1
+    assert not stream.dropped
+
+
+async def test_get_batch(dispatcher: EventDispatcher) -> None:
+    """Test taking events in batches."""
+    stream = dispatcher.stream(ChannelEvent)
+    consumer = asyncio.create_task(stream.get_batch(2))
+    await asyncio.sleep(0)
+
+    for num in range(3):
+        await dispatcher.dispatch(ChannelEvent(channel_id=1, num=num))
+
+    assert [event.num for event in await consumer] == [0, 1]
+    assert [event.num for event in await stream.get_batch(10)] == [2]
+
+    await dispatcher.close()
+    assert await stream.get_batch(10) == []
+
+
+async def test_close_releases_blocked_producer() -> None:
+    """Test that closing the stream releases dispatching blocked on it."""
+    stream: EventStream[ChannelEvent] = EventStream(maxsize=1, overflow=StreamOverflow.BLOCK)
+    await stream.put(ChannelEvent(channel_id=1))
+    blocked_put = asyncio.create_task(stream.put(ChannelEvent(channel_id=1)))
+    await asyncio.sleep(0)
+
+    stream.close()
+    await asyncio.wait_for(blocked_put, timeout=1)
+    assert stream.lag == 1
+
+
+def test_invalid_stream_arguments() -> None:
+    """Test that invalid stream arguments are rejected."""
+    with pytest.raises(ValueError, match='must be positive'):
+        EventStream(maxsize=0)
+
+    with pytest.raises(ValueError, match='is not a valid StreamOverflow'):
+        EventStream(overflow='drop_newest')
@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from asyncord.gateway.dispatcher import EventDispatcher, GatewayEvent
+
+
+class ChannelEvent(GatewayEvent):
+    """Custom channel event for testing."""
+
+    channel_id: int
+    num: int = 0
+
+
+@pytest.fixture
+def dispatcher() -> EventDispatcher:
+    """Return an event dispatcher."""
+    return EventDispatcher()
+
+
+async def test_wait_for_event(dispatcher: EventDispatcher) -> None:
+    """Test waiting for the next event matching filters and the predicate."""
+    waiter = asyncio.create_task(
+        dispatcher.wait_for(ChannelEvent, lambda event: event.num > 1, channel_id=1, timeout=1),
+    )
+    await asyncio.sleep(0)
+    assert dispatcher.has_subscribers(ChannelEvent)
+
+    await dispatcher.dispatch(ChannelEvent(channel_id=2, num=5))
+    await dispatcher.dispatch(ChannelEvent(channel_id=1, num=1))
+    await dispatcher.dispatch(ChannelEvent(channel_id=1, num=2))
+
+    event = await waiter
+    assert event.num == 2
+    assert not dispatcher.has_subscribers(ChannelEvent)
+
+
+async def test_wait_for_resolves_before_handlers(dispatcher: EventDispatcher) -> None:
+    """Test that waiters are resolved before handlers are called."""
+    waiter = asyncio.create_task(dispatcher.wait_for(ChannelEvent))
+    await asyncio.sleep(0)
+
+    pending_in_handler: list[int] = []
+
+    async def handler(_: ChannelEvent) -> None:
+        pending_in_handler.append(len(dispatcher._waiters))
+
+    dispatcher.add_handler(handler)
+    event = ChannelEvent(channel_id=1)
+    await dispatcher.dispatch(event)
+
+    assert pending_in_handler == [0]
+    assert await waiter is event
+
+
+async def test_wait_for_timeout(dispatcher: EventDispatcher) -> None:
+    """Test that waiters time out in deadline order."""
+    slow = asyncio.create_task(dispatcher.wait_for(ChannelEvent, timeout=0.05))
+    fast = asyncio.create_task(dispatcher.wait_for(ChannelEvent, timeout=0.01))
+    no_timeout = asyncio.create_task(dispatcher.wait_for(ChannelEvent))
+
+    with pytest.raises(TimeoutError):
+        await fast
+    assert not slow.done()
+
+    with pytest.raises(TimeoutError):
+        await slow
+
+    assert dispatcher.has_subscribers(ChannelEvent)
+    await dispatcher.dispatch(ChannelEvent(channel_id=1))
+    assert (await no_timeout).channel_id == 1
+
+
+async def test_wait_for_predicate_error(dispatcher: EventDispatcher) -> None:
+    """Test that predicate errors are raised to the waiting code."""
+
+    def predicate(_: ChannelEvent) -> bool:
+        raise ValueError('bad predicate')
+
+    waiter = asyncio.create_task(dispatcher.wait_for(ChannelEvent, predicate))
+    await asyncio.sleep(0)
+    await dispatcher.dispatch(ChannelEvent(channel_id=1))
+
+    with pytest.raises(ValueError, match='bad predicate'):
+        await waiter
+    assert not dispatcher.has_subscribers(ChannelEvent)
+
+
+async def test_cancelled_waiter_is_removed(dispatcher: EventDispatcher) -> None:
+    """Test that cancelled waiters don't stay in the index."""
+    waiter = asyncio.create_task(dispatcher.wait_for(ChannelEvent, timeout=10))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert not dispatcher.has_subscribers(ChannelEvent)
+
+
+async def test_many_waiters(dispatcher: EventDispatcher) -> None:
+    """Test that many waiters with timeouts share one timer and resolve by key."""
+    waiters = [
+        asyncio.create_task(dispatcher.wait_for(ChannelEvent, channel_id=channel_id, timeout=10))
+        for channel_id in range(1000)
+    ]
+    await asyncio.sleep(0)
+    assert len(dispatcher._waiters) == 1000
+
+    for channel_id in reversed(range(1000)):
+        await dispatcher.dispatch(ChannelEvent(channel_id=channel_id))
+
+    events = await asyncio.gather(*waiters)
+    assert [event.channel_id for event in events] == list(range(1000))
+    assert not len(dispatcher._waiters)
+    assert len(dispatcher._waiters._deadlines) <= 64
+
+
+async def test_close_cancels_waiters(dispatcher: EventDispatcher) -> None:
+    """Test that closing the dispatcher cancels pending waiters."""
+    waiter = asyncio.create_task(dispatcher.wait_for(ChannelEvent, timeout=10))
+    await asyncio.sleep(0)
+
+    await dispatcher.close()
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert not dispatcher.has_subscribers(ChannelEvent)
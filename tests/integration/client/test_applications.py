@@ -51,7 +51,7 @@ async def test_get_application(
     """Test get application."""
     app = await applications_res.get_application()
 
-    assert app.id == integration_data.app_id
+    assert app.id == int(integration_data.app_id)
 
 
 async def test_get_application_role_metadata(
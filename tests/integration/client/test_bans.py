@@ -28,7 +28,7 @@ async def test_ban_cycle(
 
     # test get ban after ban
     ban = await ban_managment.get(integration_data.user_to_ban)
-    assert ban.user.id == integration_data.user_to_ban
+    assert ban.user.id == int(integration_data.user_to_ban)
     assert ban.reason == ban_reason
 
     # test get list bans after ban
@@ -48,7 +48,7 @@ async def test_bulk_ban(ban_managment: BanResource, integration_data: Integratio
     """Test the bulk ban method."""
     await ban_managment.bulk_ban([integration_data.user_to_ban])
     bans = await ban_managment.get_list()
-    assert integration_data.user_to_ban in [ban.user.id for ban in bans]
+    assert int(integration_data.user_to_ban) in [ban.user.id for ban in bans]
     await ban_managment.unban(integration_data.user_to_ban)
 
 
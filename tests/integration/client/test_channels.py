@@ -88,7 +88,7 @@ async def test_create_and_delete_channel(
 ) -> None:
     """Test creating and deleting channels."""
     channel = await channel_res.create_channel(integration_data.guild_id, channel_input)
-    assert channel.guild_id == integration_data.guild_id
+    assert channel.guild_id == int(integration_data.guild_id)
     assert channel.name == CHANNEL_NAME
 
     await channel_res.delete(channel.id)
@@ -140,8 +140,8 @@ async def test_get_channel(
 ) -> None:
     """Test getting a channel."""
     channel = await channel_res.get(integration_data.channel_id)
-    assert channel.id == integration_data.channel_id
-    assert channel.guild_id == integration_data.guild_id
+    assert channel.id == int(integration_data.channel_id)
+    assert channel.guild_id == int(integration_data.guild_id)
     assert channel.type is ChannelType.GUILD_TEXT
 
 
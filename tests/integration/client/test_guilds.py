@@ -242,7 +242,7 @@ async def test_get_widget(
 ) -> None:
     """Test getting the widget."""
     widget = await guilds_res.get_widget(integration_data.guild_id)
-    assert widget.id == integration_data.guild_id
+    assert widget.id == int(integration_data.guild_id)
 
 
 @pytest.mark.parametrize('style', [None] + [style for style in WidgetStyleOptions])
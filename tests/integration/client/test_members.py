@@ -13,7 +13,7 @@ async def test_get_member(
     """Test getting a member."""
     member = await members_res.get(integration_data.member_id)
     assert member.user
-    assert member.user.id == integration_data.member_id
+    assert member.user.id == int(integration_data.member_id)
 
 
 async def test_list_members(members_res: MemberResource) -> None:
@@ -32,7 +32,7 @@ async def test_search_members(
     member_list = await members_res.search(nick_or_name='Cuca')
     assert len(member_list) == 1
     assert member_list[0].user
-    assert member_list[0].user.id == integration_data.member_id
+    assert member_list[0].user.id == int(integration_data.member_id)
 
 
 async def test_update_current_member(members_res: MemberResource) -> None:
@@ -56,7 +56,7 @@ async def test_role_operations(
     )
 
     member = await members_res.get(integration_data.member_id)
-    assert integration_data.role_id in member.roles
+    assert int(integration_data.role_id) in member.roles
 
     # check role removal
     await members_res.remove_role(
@@ -65,7 +65,7 @@ async def test_role_operations(
     )
 
     member = await members_res.get(integration_data.member_id)
-    assert integration_data.role_id not in member.roles
+    assert int(integration_data.role_id) not in member.roles
 
 
 @pytest.mark.parametrize(
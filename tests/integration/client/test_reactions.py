@@ -26,7 +26,7 @@ async def test_get_reactions(
     integration_data: IntegrationTestData,
 ) -> None:
     """Test adding and getting reactions."""
-    assert (await reactions_res.get(TEST_EMOJI1))[0].id == integration_data.member_id
+    assert (await reactions_res.get(TEST_EMOJI1))[0].id == int(integration_data.member_id)
 
 
 async def test_get_reactions_with_after_param(
@@ -96,7 +96,7 @@ async def test_create_dm(
     recipients = channel.recipients
     assert recipients
     assert len(recipients)
-    assert integration_data.user_id in {recipient.id for recipient in recipients}
+    assert int(integration_data.user_id) in {recipient.id for recipient in recipients}
 
 
 async def test_get_connections(
@@ -4,7 +4,7 @@ from unittest.mock import AsyncMock, Mock
 import pytest
 from pytest_mock import MockerFixture
 
-from asyncord.client_hub import ClientHub, connect
+from asyncord.client_hub import ClientGroup, ClientHub, connect
 
 
 async def test_create_hub_without_session() -> None:
@@ -73,3 +73,21 @@ async def test_start_handles_exceptions(mocker: MockerFixture) -> None:
     hub.heartbeat_factory.start.assert_called_once()
     for client in hub.client_groups.values():
         client.connect.assert_called()  # type: ignore
+
+
+async def test_latency_snapshot() -> None:
+    """Test collecting latency of gateway clients of all groups."""
+    hub = ClientHub(session=Mock())
+    hub.create_client_group('with_gateway', auth='token')
+    hub.client_groups['without_gateway'] = ClientGroup(
+        name='without_gateway',
+        dispatcher=Mock(),
+        rest_client=Mock(),
+        gateway_client=None,
+    )
+
+    hub.client_groups['with_gateway'].gateway_client.heartbeat.latency.record(0.1)
+
+    snapshot = hub.latency_snapshot()
+    assert list(snapshot) == ['with_gateway']
+    assert snapshot['with_gateway'].last == 0.1
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import sys
+from multiprocessing.connection import Connection
+from pathlib import Path
+
+import pytest
+
+from asyncord import cluster as cluster_module
+from asyncord.client_hub import ClientGroup
+from asyncord.cluster import IdentifyScheduler, ShardCluster, ShardStatus, WorkerSpec, run_worker, split_shards
+from asyncord.gateway.intents import DEFAULT_INTENTS
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason='Cluster uses Unix event loop readers')
+
+
+def _setup(_: ClientGroup) -> None:
+    """Set up nothing, workers are fake in tests."""
+
+
+def _shard_status(shard_id: int) -> ShardStatus:
+    return ShardStatus(
+        shard_id=shard_id,
+        connected=True,
+        seq=1,
+        latency_p50=None,
+        latency_p99=None,
+        send_queue_depth=0,
+    )
+
+
+def _identifying_worker(spec: WorkerSpec, conn: Connection) -> None:
+    """Identify all shards through the supervisor and wait for the stop message."""
+    for shard_id in spec.shard_ids:
+        conn.send(('identify', shard_id))
+        assert conn.recv() == ('identify_ok', shard_id)
+    conn.send(('status', tuple(_shard_status(shard_id) for shard_id in spec.shard_ids)))
+    while conn.recv() != ('stop',):
+        pass
+
+
+def _crashing_worker(spec: WorkerSpec, conn: Connection) -> None:
+    """Crash on the first start and report status after the restart."""
+    marker = Path(spec.token) / f'worker-{spec.worker_id}'
+    if not marker.exists():
+        marker.touch()
+        sys.exit(1)
+    _identifying_worker(spec, conn)
+
+
+async def _wait_reports(cluster: ShardCluster) -> None:
+    statuses = cluster.status()
+    while not statuses or not all(status.reported_at for status in statuses):
+        await asyncio.sleep(0.05)
+        statuses = cluster.status()
+
+
+@pytest.mark.parametrize(
+    ('shard_count', 'workers', 'expected'),
+    [
+        (4, 2, [(0, 1), (2, 3)]),
+        (5, 2, [(0, 1, 2), (3, 4)]),
+        (2, 4, [(0,), (1,)]),
+        (1, 1, [(0,)]),
+    ],
+)
+def test_split_shards(shard_count: int, workers: int, expected: list[tuple[int, ...]]) -> None:
+    """Test splitting shards into contiguous ranges."""
+    assert split_shards(shard_count, workers) == expected
+
+
+def test_split_shards_validates_arguments() -> None:
+    """Test that the number of shards and workers must be positive."""
+    with pytest.raises(ValueError, match='must be positive'):
+        split_shards(0, 1)
+
+
+async def test_identify_scheduler_spaces_shards_of_one_bucket() -> None:
+    """Test that shards of the same bucket identify one per interval."""
+    scheduler = IdentifyScheduler(max_concurrency=2, interval=0.1)
+    loop = asyncio.get_running_loop()
+    granted: dict[int, float] = {}
+
+    async def acquire(shard_id: int) -> None:
+        await scheduler.acquire(shard_id)
+        granted[shard_id] = loop.time()
+
+    started_at = loop.time()
+    await asyncio.gather(*(acquire(shard_id) for shard_id in range(4)))
+
+    # shards 0 and 1 are in different buckets and identify at once
+    assert granted[0] - started_at < 0.05
+    assert granted[1] - started_at < 0.05
+    assert granted[2] - granted[0] >= 0.09
+    assert granted[3] - granted[1] >= 0.09
+
+
+async def test_worker_waits_for_identify_permission() -> None:
+    """Test that the worker identifies only when the supervisor allows it."""
+    parent_conn, child_conn = multiprocessing.Pipe()
+    spec = WorkerSpec(
+        worker_id=0,
+        token='token',  # noqa: S106
+        shard_ids=(3,),
+        shard_count=4,
+        setup=_setup,
+        intents=DEFAULT_INTENTS,
+        gateway_url='wss://localhost',
+        status_interval=1,
+    )
+    runtime = cluster_module._WorkerRuntime(spec, child_conn)
+    loop = asyncio.get_running_loop()
+    loop.add_reader(child_conn.fileno(), runtime._on_message)
+    try:
+        identify_task = asyncio.create_task(runtime.wait_identify(3))
+        await asyncio.sleep(0)
+        assert parent_conn.recv() == ('identify', 3)
+        assert not identify_task.done()
+
+        parent_conn.send(('identify_ok', 3))
+        await asyncio.wait_for(identify_task, 1)
+    finally:
+        loop.remove_reader(child_conn.fileno())
+        parent_conn.close()
+        child_conn.close()
+
+
+def test_default_worker_target() -> None:
+    """Test that the cluster runs the real worker by default."""
+    cluster = ShardCluster('token', _setup, shard_count=4, workers=8)
+    assert cluster.workers == 4
+    assert cluster._worker_target is run_worker
+
+
+async def test_cluster_grants_identifies_and_collects_status() -> None:
+    """Test that the supervisor coordinates workers and collects their status."""
+    cluster = ShardCluster('token', _setup, shard_count=4, workers=2, max_concurrency=4)
+    cluster._worker_target = _identifying_worker
+    cluster_task = asyncio.create_task(cluster.start())
+    try:
+        await asyncio.wait_for(_wait_reports(cluster), 30)
+        statuses = cluster.status()
+        assert [status.shard_ids for status in statuses] == [(0, 1), (2, 3)]
+        assert [shard.shard_id for status in statuses for shard in status.shards] == [0, 1, 2, 3]
+        assert all(status.alive for status in statuses)
+    finally:
+        await cluster.stop()
+        await cluster_task
+
+    assert not any(status.alive for status in cluster.status())
+
+
+async def test_cluster_restarts_crashed_worker(tmp_path: Path) -> None:
+    """Test that the supervisor restarts a worker which exited unexpectedly."""
+    cluster = ShardCluster(str(tmp_path), _setup, shard_count=2, workers=1)
+    cluster._worker_target = _crashing_worker
+    cluster.restart_delay = 0
+    cluster_task = asyncio.create_task(cluster.start())
+    try:
+        await asyncio.wait_for(_wait_reports(cluster), 30)
+        [status] = cluster.status()
+        assert status.restarts == 1
+        assert status.alive
+    finally:
+        await cluster.stop()
+        await cluster_task
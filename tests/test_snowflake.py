@@ -1,10 +1,35 @@
 import datetime
 import random
+from array import array
 
 import pytest
-from pydantic import BaseModel
-
-from asyncord.snowflake import Snowflake
+from pydantic import BaseModel, ValidationError
+
+from asyncord import snowflake as snowflake_module
+from asyncord.snowflake import (
+    DISCORD_EPOCH,
+    Snowflake,
+    filter_snowflakes_by_age,
+    same_snowflake,
+    snowflake_process_ids,
+    snowflake_time_buckets,
+    snowflake_time_range,
+    snowflake_timestamps,
+    snowflake_worker_ids,
+    to_snowflake_array,
+)
+
+NOW = datetime.datetime(2024, 1, 1, tzinfo=datetime.UTC)
+
+
+@pytest.fixture(params=['numpy', 'array'])
+def array_backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Run batch helpers with NumPy and with the `array` fallback."""
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(snowflake_module, 'numpy', None)
+    return request.param
 
 
 @pytest.fixture
@@ -39,13 +64,43 @@ def test_incriment(snowflake: Snowflake) -> None:
     assert snowflake.increment == 7
 
 
-@pytest.mark.parametrize('snowflake_type', [Snowflake, int, str])
+@pytest.mark.parametrize('snowflake_type', [Snowflake, int])
 def test_equality(snowflake: Snowflake, raw_snowflake: int, snowflake_type: type) -> None:
     """Test that snowflakes are equal."""
     assert snowflake == snowflake_type(raw_snowflake)
     assert snowflake != snowflake_type(raw_snowflake + random.randint(1, 100))
 
 
+def test_int_hashing(snowflake: Snowflake, raw_snowflake: int) -> None:
+    """Test that snowflakes can be looked up in int-keyed collections."""
+    assert hash(snowflake) == hash(raw_snowflake)
+    assert snowflake in {raw_snowflake}
+    assert {raw_snowflake: 'value'}[snowflake] == 'value'
+    assert Snowflake(raw_snowflake) in {snowflake}
+
+
+def test_string_interop(snowflake: Snowflake, raw_snowflake: int) -> None:
+    """Test that snowflakes are not equal to strings, but are matched and looked up explicitly."""
+    assert snowflake != str(raw_snowflake)
+    assert same_snowflake(snowflake, str(raw_snowflake))
+    assert same_snowflake(str(raw_snowflake), raw_snowflake)
+    assert not same_snowflake(snowflake, str(raw_snowflake + 1))
+    assert not same_snowflake(snowflake, None)
+    assert {str(raw_snowflake): 'value'}[str(snowflake)] == 'value'
+    assert f'{snowflake}' == str(raw_snowflake)
+    assert repr(snowflake) == f'Snowflake({raw_snowflake})'
+
+
+def test_ordering() -> None:
+    """Test that snowflakes are ordered by creation time."""
+    older = Snowflake.build(DISCORD_EPOCH + 1000, 0, 0, 0)
+    newer = Snowflake.build(DISCORD_EPOCH + 2000, 0, 0, 0)
+    assert older < newer
+    assert newer >= int(older)
+    assert sorted([newer, older]) == [older, newer]
+    assert isinstance(Snowflake.build(DISCORD_EPOCH, 0, 0, 0), Snowflake)
+
+
 def test_int_convertation(snowflake: Snowflake, raw_snowflake: int) -> None:
     """Test that snowflake can be converted to int."""
     assert int(snowflake) == raw_snowflake
@@ -87,3 +142,104 @@ def test_snowflake_as_part_of_model(raw_snowflake: int, snowflake_type: type) ->
 
     assert model.model_dump() == {'id': Snowflake(raw_snowflake)}
     assert model.model_dump(mode='json') == {'id': str(raw_snowflake)}
+
+
+def test_invalid_snowflake_in_model() -> None:
+    """Test that invalid snowflakes fail model validation."""
+
+    class Model(BaseModel):
+        id: Snowflake
+
+    with pytest.raises(ValidationError):
+        Model(id='not a snowflake')
+    with pytest.raises(ValidationError):
+        Model(id=None)  # type: ignore[arg-type]
+
+
+@pytest.mark.usefixtures('array_backend')
+def test_to_snowflake_array(snowflake: Snowflake, raw_snowflake: int) -> None:
+    """Test that snowflakes are converted to int64 arrays."""
+    ids = to_snowflake_array([snowflake, raw_snowflake])
+
+    assert list(ids) == [raw_snowflake, raw_snowflake]
+    assert list(to_snowflake_array(ids)) == [raw_snowflake, raw_snowflake]
+
+
+def test_array_fallback_type(monkeypatch: pytest.MonkeyPatch, raw_snowflake: int) -> None:
+    """Test that the fallback uses signed 64-bit arrays without copying them."""
+    monkeypatch.setattr(snowflake_module, 'numpy', None)
+    ids = array('q', [raw_snowflake])
+
+    assert to_snowflake_array(ids) is ids
+    assert to_snowflake_array([raw_snowflake]).typecode == 'q'  # type: ignore[attr-defined]
+
+
+@pytest.mark.usefixtures('array_backend')
+def test_batch_fields_match_snowflake() -> None:
+    """Test that batch fields match fields of single snowflakes."""
+    rnd = random.Random(0)
+    snowflakes = [
+        Snowflake.build(NOW - datetime.timedelta(seconds=index), rnd.randrange(32), rnd.randrange(32), index)
+        for index in range(100)
+    ]
+
+    timestamps = snowflake_timestamps(snowflakes)
+    assert [int(timestamp) for timestamp in timestamps] == [
+        int(snowflake.timestamp.timestamp() * 1000) for snowflake in snowflakes
+    ]
+    assert list(snowflake_worker_ids(snowflakes)) == [snowflake.internal_worker_id for snowflake in snowflakes]
+    assert list(snowflake_process_ids(snowflakes)) == [snowflake.internal_process_id for snowflake in snowflakes]
+
+
+@pytest.mark.usefixtures('array_backend')
+def test_time_buckets() -> None:
+    """Test that snowflakes are grouped into buckets by their timestamps."""
+    snowflakes = [
+        Snowflake.build(NOW, 0, 0, 0),
+        Snowflake.build(NOW + datetime.timedelta(minutes=59), 1, 1, 1),
+        Snowflake.build(NOW + datetime.timedelta(minutes=61), 0, 0, 0),
+    ]
+
+    buckets = snowflake_time_buckets(snowflakes, datetime.timedelta(hours=1))
+
+    hour_start = int(NOW.timestamp() * 1000)
+    assert list(buckets) == [hour_start, hour_start, hour_start + 3_600_000]
+
+
+def test_time_buckets_invalid_interval(snowflake: Snowflake) -> None:
+    """Test that empty intervals are rejected."""
+    with pytest.raises(ValueError, match='Interval'):
+        snowflake_time_buckets([snowflake], datetime.timedelta())
+
+
+def test_time_range() -> None:
+    """Test that time range cursors include the start and exclude the end."""
+    end = NOW + datetime.timedelta(hours=1)
+    after, before = snowflake_time_range(NOW, end)
+
+    assert isinstance(after, Snowflake)
+    assert after < Snowflake.build(NOW, 0, 0, 0)
+    assert before == Snowflake.build(end, 0, 0, 0)
+    assert after < Snowflake.build(end - datetime.timedelta(milliseconds=1), 31, 31, 4095) < before
+
+
+@pytest.mark.usefixtures('array_backend')
+def test_filter_by_age() -> None:
+    """Test that snowflakes are filtered by age keeping their order."""
+    day_old = Snowflake.build(NOW - datetime.timedelta(days=1), 1, 2, 3)
+    week_old = Snowflake.build(NOW - datetime.timedelta(days=7), 1, 2, 3)
+    month_old = Snowflake.build(NOW - datetime.timedelta(days=30), 1, 2, 3)
+    snowflakes = [week_old, month_old, day_old]
+
+    newer = filter_snowflakes_by_age(snowflakes, newer_than=datetime.timedelta(days=14), now=NOW)
+    older = filter_snowflakes_by_age(snowflakes, older_than=datetime.timedelta(days=2), now=NOW)
+    between = filter_snowflakes_by_age(
+        snowflakes,
+        newer_than=datetime.timedelta(days=14),
+        older_than=datetime.timedelta(days=2),
+        now=NOW,
+    )
+
+    assert list(newer) == [week_old, day_old]
+    assert list(older) == [week_old, month_old]
+    assert list(between) == [week_old]